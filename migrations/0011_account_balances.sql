@@ -0,0 +1,38 @@
+-- up
+PRAGMA foreign_keys = ON;
+
+-- Materialized running ledger balance per account, maintained by
+-- insert_transaction_bundle in the same transaction as the postings.
+-- balance is stored as canonical 4dp decimal TEXT so increments stay exact.
+CREATE TABLE IF NOT EXISTS account_balances (
+  account_id TEXT PRIMARY KEY REFERENCES accounts(account_id),
+  balance TEXT NOT NULL,
+  posting_count INTEGER NOT NULL,
+  max_posting_date TEXT NOT NULL,
+  updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Backfill from existing postings.  Amounts are summed as integer minor units
+-- (1e-4) and formatted without going through floating point.
+INSERT OR REPLACE INTO account_balances (account_id, balance, posting_count, max_posting_date)
+SELECT
+  totals.account_id,
+  CASE WHEN totals.units < 0 THEN '-' ELSE '' END
+    || (ABS(totals.units) / 10000)
+    || '.'
+    || printf('%04d', ABS(totals.units) % 10000),
+  totals.posting_count,
+  totals.max_posting_date
+FROM (
+  SELECT
+    p.account_id,
+    SUM(CAST(ROUND(p.amount * 10000) AS INTEGER)) AS units,
+    COUNT(*) AS posting_count,
+    MAX(date(t.transaction_date)) AS max_posting_date
+  FROM ledger_postings p
+  JOIN ledger_transactions t ON t.transaction_id = p.transaction_id
+  GROUP BY p.account_id
+) AS totals;
+
+-- down
+-- DROP TABLE IF EXISTS account_balances;
@@ -0,0 +1,38 @@
+-- up
+PRAGMA foreign_keys = ON;
+
+-- Per-account, per-day cumulative ledger balance.  One row exists for every
+-- day an account has postings; the ledger balance as of any date is the
+-- cumulative value of the latest row at or before that date (an index seek
+-- on the primary key).  Amounts are integer minor units (1e-4) so the
+-- cumulative shift applied by back-dated inserts stays exact in SQL.
+CREATE TABLE IF NOT EXISTS account_daily_balances (
+  account_id TEXT NOT NULL REFERENCES accounts(account_id),
+  balance_date TEXT NOT NULL,
+  day_delta_units INTEGER NOT NULL,
+  cumulative_units INTEGER NOT NULL,
+  PRIMARY KEY (account_id, balance_date)
+) WITHOUT ROWID;
+
+INSERT OR REPLACE INTO account_daily_balances (account_id, balance_date, day_delta_units, cumulative_units)
+SELECT
+  daily.account_id,
+  daily.balance_date,
+  daily.units,
+  SUM(daily.units) OVER (
+    PARTITION BY daily.account_id
+    ORDER BY daily.balance_date
+    ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+  )
+FROM (
+  SELECT
+    p.account_id,
+    date(t.transaction_date) AS balance_date,
+    SUM(CAST(ROUND(p.amount * 10000) AS INTEGER)) AS units
+  FROM ledger_postings p
+  JOIN ledger_transactions t ON t.transaction_id = p.transaction_id
+  GROUP BY p.account_id, date(t.transaction_date)
+) AS daily;
+
+-- down
+-- DROP TABLE IF EXISTS account_daily_balances;
@@ -0,0 +1,9 @@
+-- rollback
+DROP TRIGGER IF EXISTS trg_obligations_expected_amount_units_update;
+DROP TRIGGER IF EXISTS trg_obligations_expected_amount_units_insert;
+DROP TRIGGER IF EXISTS trg_balance_snapshots_balance_units_update;
+DROP TRIGGER IF EXISTS trg_balance_snapshots_balance_units_insert;
+DROP TRIGGER IF EXISTS trg_ledger_postings_amount_units_insert;
+ALTER TABLE obligations DROP COLUMN expected_amount_units;
+ALTER TABLE balance_snapshots DROP COLUMN balance_units;
+ALTER TABLE ledger_postings DROP COLUMN amount_units;
@@ -0,0 +1,82 @@
+-- up
+PRAGMA foreign_keys = ON;
+
+-- Exact integer storage for money columns: amounts are held as 64-bit
+-- integer minor units (1e-4, matching MONEY_QUANT) so SUM/ABS/equality run on
+-- SQLite's integer paths without REAL rounding.  The legacy NUMERIC columns
+-- are still written alongside for compatibility but are no longer read.
+BEGIN;
+
+ALTER TABLE ledger_postings ADD COLUMN amount_units INTEGER;
+ALTER TABLE balance_snapshots ADD COLUMN balance_units INTEGER;
+ALTER TABLE obligations ADD COLUMN expected_amount_units INTEGER;
+
+-- Backfill.  ledger_postings is append-only, so the UPDATE guard is lifted
+-- for the duration of this transaction and restored unchanged.
+DROP TRIGGER IF EXISTS trg_ledger_postings_append_only_update;
+UPDATE ledger_postings SET amount_units = CAST(ROUND(amount * 10000) AS INTEGER);
+CREATE TRIGGER IF NOT EXISTS trg_ledger_postings_append_only_update
+BEFORE UPDATE ON ledger_postings
+FOR EACH ROW
+BEGIN
+  SELECT RAISE(ABORT, 'Append-only table: ledger_postings UPDATE not permitted');
+END;
+
+UPDATE balance_snapshots SET balance_units = CAST(ROUND(balance * 10000) AS INTEGER);
+UPDATE obligations SET expected_amount_units = CAST(ROUND(expected_amount * 10000) AS INTEGER);
+
+-- Every write must carry the integer column, and it must agree with the
+-- legacy decimal column it shadows.
+CREATE TRIGGER IF NOT EXISTS trg_ledger_postings_amount_units_insert
+BEFORE INSERT ON ledger_postings
+FOR EACH ROW
+WHEN NEW.amount_units IS NULL OR NEW.amount_units != CAST(ROUND(NEW.amount * 10000) AS INTEGER)
+BEGIN
+  SELECT RAISE(ABORT, 'ledger_postings.amount_units must equal amount in minor units');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_balance_snapshots_balance_units_insert
+BEFORE INSERT ON balance_snapshots
+FOR EACH ROW
+WHEN NEW.balance_units IS NULL OR NEW.balance_units != CAST(ROUND(NEW.balance * 10000) AS INTEGER)
+BEGIN
+  SELECT RAISE(ABORT, 'balance_snapshots.balance_units must equal balance in minor units');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_balance_snapshots_balance_units_update
+BEFORE UPDATE OF balance, balance_units ON balance_snapshots
+FOR EACH ROW
+WHEN NEW.balance_units IS NULL OR NEW.balance_units != CAST(ROUND(NEW.balance * 10000) AS INTEGER)
+BEGIN
+  SELECT RAISE(ABORT, 'balance_snapshots.balance_units must equal balance in minor units');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_obligations_expected_amount_units_insert
+BEFORE INSERT ON obligations
+FOR EACH ROW
+WHEN NEW.expected_amount_units IS NULL
+  OR NEW.expected_amount_units != CAST(ROUND(NEW.expected_amount * 10000) AS INTEGER)
+BEGIN
+  SELECT RAISE(ABORT, 'obligations.expected_amount_units must equal expected_amount in minor units');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_obligations_expected_amount_units_update
+BEFORE UPDATE OF expected_amount, expected_amount_units ON obligations
+FOR EACH ROW
+WHEN NEW.expected_amount_units IS NULL
+  OR NEW.expected_amount_units != CAST(ROUND(NEW.expected_amount * 10000) AS INTEGER)
+BEGIN
+  SELECT RAISE(ABORT, 'obligations.expected_amount_units must equal expected_amount in minor units');
+END;
+
+COMMIT;
+
+-- down
+-- DROP TRIGGER IF EXISTS trg_obligations_expected_amount_units_update;
+-- DROP TRIGGER IF EXISTS trg_obligations_expected_amount_units_insert;
+-- DROP TRIGGER IF EXISTS trg_balance_snapshots_balance_units_update;
+-- DROP TRIGGER IF EXISTS trg_balance_snapshots_balance_units_insert;
+-- DROP TRIGGER IF EXISTS trg_ledger_postings_amount_units_insert;
+-- ALTER TABLE obligations DROP COLUMN expected_amount_units;
+-- ALTER TABLE balance_snapshots DROP COLUMN balance_units;
+-- ALTER TABLE ledger_postings DROP COLUMN amount_units;
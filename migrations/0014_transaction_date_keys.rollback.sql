@@ -0,0 +1,5 @@
+-- rollback
+DROP INDEX IF EXISTS idx_ledger_transactions_source_entity_epoch;
+DROP INDEX IF EXISTS idx_ledger_transactions_day_id;
+ALTER TABLE ledger_transactions DROP COLUMN transaction_epoch;
+ALTER TABLE ledger_transactions DROP COLUMN transaction_day;
@@ -0,0 +1,30 @@
+-- up
+PRAGMA foreign_keys = ON;
+
+-- Normalized, index-friendly date keys for ledger_transactions.  Filters of
+-- the form date(transaction_date) = date(?) can never use an index on
+-- transaction_date; these generated columns hold the UTC calendar day as an
+-- integer yyyymmdd and the instant as integer epoch seconds.  They are
+-- computed on insert (and for existing rows) by SQLite itself, so no writer
+-- can populate them inconsistently, and the indexes below materialize them.
+ALTER TABLE ledger_transactions
+ADD COLUMN transaction_day INTEGER
+GENERATED ALWAYS AS (CAST(strftime('%Y%m%d', transaction_date) AS INTEGER)) VIRTUAL;
+
+ALTER TABLE ledger_transactions
+ADD COLUMN transaction_epoch INTEGER
+GENERATED ALWAYS AS (CAST(strftime('%s', transaction_date) AS INTEGER)) VIRTUAL;
+
+-- Duplicate-risk matching: equality on the calendar day.
+CREATE INDEX IF NOT EXISTS idx_ledger_transactions_day_id
+ON ledger_transactions (transaction_day, transaction_id);
+
+-- Policy velocity windows: per source/entity range scan on the instant.
+CREATE INDEX IF NOT EXISTS idx_ledger_transactions_source_entity_epoch
+ON ledger_transactions (source_system, entity_id, transaction_epoch);
+
+-- down
+-- DROP INDEX IF EXISTS idx_ledger_transactions_source_entity_epoch;
+-- DROP INDEX IF EXISTS idx_ledger_transactions_day_id;
+-- ALTER TABLE ledger_transactions DROP COLUMN transaction_epoch;
+-- ALTER TABLE ledger_transactions DROP COLUMN transaction_day;
@@ -0,0 +1,4 @@
+-- rollback
+DROP INDEX IF EXISTS idx_ledger_postings_transaction_account;
+DROP TRIGGER IF EXISTS trg_ledger_postings_fingerprint_insert;
+DROP TABLE IF EXISTS ledger_posting_fingerprints;
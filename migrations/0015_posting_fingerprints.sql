@@ -0,0 +1,43 @@
+-- up
+PRAGMA foreign_keys = ON;
+
+-- Posting fingerprints for duplicate-risk matching.  One row per distinct
+-- (UTC day, account, amount in minor units, transaction); the primary key is
+-- the lookup order, so checking whether a bundle repeats an existing
+-- transaction is one point seek per posting key instead of a join over every
+-- posting booked that day.  Rows are derived from ledger_postings by the
+-- trigger below, so every insert path keeps the table complete.  Both source
+-- tables are append-only, so no UPDATE/DELETE maintenance is needed.
+CREATE TABLE IF NOT EXISTS ledger_posting_fingerprints (
+  transaction_day INTEGER NOT NULL,
+  account_id TEXT NOT NULL,
+  amount_units INTEGER NOT NULL,
+  transaction_id TEXT NOT NULL REFERENCES ledger_transactions(transaction_id),
+  PRIMARY KEY (transaction_day, account_id, amount_units, transaction_id)
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO ledger_posting_fingerprints (transaction_day, account_id, amount_units, transaction_id)
+SELECT t.transaction_day, p.account_id, p.amount_units, p.transaction_id
+FROM ledger_postings p
+JOIN ledger_transactions t ON t.transaction_id = p.transaction_id;
+
+CREATE TRIGGER IF NOT EXISTS trg_ledger_postings_fingerprint_insert
+AFTER INSERT ON ledger_postings
+FOR EACH ROW
+BEGIN
+  INSERT OR IGNORE INTO ledger_posting_fingerprints (transaction_day, account_id, amount_units, transaction_id)
+  SELECT t.transaction_day, NEW.account_id, NEW.amount_units, NEW.transaction_id
+  FROM ledger_transactions t
+  WHERE t.transaction_id = NEW.transaction_id;
+END;
+
+-- Loading the postings of matched transactions is a seek by transaction_id;
+-- without this index it falls back to scanning the (account_id,
+-- transaction_id) index across the whole ledger.
+CREATE INDEX IF NOT EXISTS idx_ledger_postings_transaction_account
+ON ledger_postings (transaction_id, account_id, amount_units);
+
+-- down
+-- DROP INDEX IF EXISTS idx_ledger_postings_transaction_account;
+-- DROP TRIGGER IF EXISTS trg_ledger_postings_fingerprint_insert;
+-- DROP TABLE IF EXISTS ledger_posting_fingerprints;
@@ -0,0 +1,52 @@
+-- rollback
+DROP TRIGGER IF EXISTS trg_accounts_closure_delete;
+DROP TRIGGER IF EXISTS trg_accounts_closure_update;
+DROP TRIGGER IF EXISTS trg_accounts_closure_guard_update;
+DROP TRIGGER IF EXISTS trg_accounts_closure_insert;
+DROP TRIGGER IF EXISTS trg_accounts_closure_guard_insert;
+DROP INDEX IF EXISTS idx_account_closure_descendant;
+DROP TABLE IF EXISTS account_closure;
+
+CREATE TRIGGER IF NOT EXISTS trg_prevent_account_cycle_insert
+BEFORE INSERT ON accounts
+FOR EACH ROW
+WHEN NEW.parent_account_id IS NOT NULL
+BEGIN
+  SELECT RAISE(ABORT, 'Account cycle detected')
+  WHERE NEW.parent_account_id = NEW.account_id;
+
+  SELECT RAISE(ABORT, 'Account cycle detected')
+  WHERE EXISTS (
+    WITH RECURSIVE ancestors(account_id, parent_account_id) AS (
+      SELECT account_id, parent_account_id FROM accounts WHERE account_id = NEW.parent_account_id
+      UNION ALL
+      SELECT a.account_id, a.parent_account_id
+      FROM accounts a
+      JOIN ancestors an ON a.account_id = an.parent_account_id
+      WHERE an.parent_account_id IS NOT NULL
+    )
+    SELECT 1 FROM ancestors WHERE account_id = NEW.account_id
+  );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_prevent_account_cycle_update
+BEFORE UPDATE OF parent_account_id ON accounts
+FOR EACH ROW
+WHEN NEW.parent_account_id IS NOT NULL
+BEGIN
+  SELECT RAISE(ABORT, 'Account cycle detected')
+  WHERE NEW.parent_account_id = NEW.account_id;
+
+  SELECT RAISE(ABORT, 'Account cycle detected')
+  WHERE EXISTS (
+    WITH RECURSIVE ancestors(account_id, parent_account_id) AS (
+      SELECT account_id, parent_account_id FROM accounts WHERE account_id = NEW.parent_account_id
+      UNION ALL
+      SELECT a.account_id, a.parent_account_id
+      FROM accounts a
+      JOIN ancestors an ON a.account_id = an.parent_account_id
+      WHERE an.parent_account_id IS NOT NULL
+    )
+    SELECT 1 FROM ancestors WHERE account_id = NEW.account_id
+  );
+END;
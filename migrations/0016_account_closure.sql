@@ -0,0 +1,105 @@
+-- up
+PRAGMA foreign_keys = ON;
+
+-- Ancestor/descendant closure of the account hierarchy.  Every account has a
+-- depth-0 row to itself plus one row per ancestor, so a subtree is a single
+-- primary-key range on ancestor_id and "is X an ancestor of Y" (cycle
+-- detection) is a single point lookup.  Rows are maintained by the triggers
+-- below in the same transaction as the accounts write, replacing the
+-- recursive ancestor walks of trg_prevent_account_cycle_insert/update.
+CREATE TABLE IF NOT EXISTS account_closure (
+  ancestor_id TEXT NOT NULL REFERENCES accounts(account_id),
+  descendant_id TEXT NOT NULL REFERENCES accounts(account_id),
+  depth INTEGER NOT NULL CHECK (depth >= 0),
+  PRIMARY KEY (ancestor_id, descendant_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_account_closure_descendant
+ON account_closure (descendant_id, depth, ancestor_id);
+
+INSERT OR IGNORE INTO account_closure (ancestor_id, descendant_id, depth)
+WITH RECURSIVE walk(ancestor_id, descendant_id, depth) AS (
+  SELECT account_id, account_id, 0 FROM accounts
+  UNION ALL
+  SELECT a.parent_account_id, w.descendant_id, w.depth + 1
+  FROM walk w
+  JOIN accounts a ON a.account_id = w.ancestor_id
+  WHERE a.parent_account_id IS NOT NULL
+)
+SELECT ancestor_id, descendant_id, depth FROM walk;
+
+DROP TRIGGER IF EXISTS trg_prevent_account_cycle_insert;
+DROP TRIGGER IF EXISTS trg_prevent_account_cycle_update;
+
+-- A new account has no descendants yet, so it can only close a cycle
+-- through itself.
+CREATE TRIGGER IF NOT EXISTS trg_accounts_closure_guard_insert
+BEFORE INSERT ON accounts
+FOR EACH ROW
+WHEN NEW.parent_account_id IS NOT NULL
+BEGIN
+  SELECT RAISE(ABORT, 'Account cycle detected')
+  WHERE NEW.parent_account_id = NEW.account_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_accounts_closure_insert
+AFTER INSERT ON accounts
+FOR EACH ROW
+BEGIN
+  INSERT INTO account_closure (ancestor_id, descendant_id, depth)
+  VALUES (NEW.account_id, NEW.account_id, 0);
+
+  INSERT INTO account_closure (ancestor_id, descendant_id, depth)
+  SELECT ancestor_id, NEW.account_id, depth + 1
+  FROM account_closure
+  WHERE descendant_id = NEW.parent_account_id;
+END;
+
+-- Re-parenting under one of the account's own descendants (or itself, via
+-- the depth-0 row) is a cycle.
+CREATE TRIGGER IF NOT EXISTS trg_accounts_closure_guard_update
+BEFORE UPDATE OF parent_account_id ON accounts
+FOR EACH ROW
+WHEN NEW.parent_account_id IS NOT NULL
+BEGIN
+  SELECT RAISE(ABORT, 'Account cycle detected')
+  WHERE EXISTS (
+    SELECT 1 FROM account_closure
+    WHERE ancestor_id = NEW.account_id AND descendant_id = NEW.parent_account_id
+  );
+END;
+
+-- Moving a subtree: detach it from every ancestor outside the subtree, then
+-- link it under each ancestor of the new parent.
+CREATE TRIGGER IF NOT EXISTS trg_accounts_closure_update
+AFTER UPDATE OF parent_account_id ON accounts
+FOR EACH ROW
+WHEN OLD.parent_account_id IS NOT NEW.parent_account_id
+BEGIN
+  DELETE FROM account_closure
+  WHERE descendant_id IN (SELECT descendant_id FROM account_closure WHERE ancestor_id = NEW.account_id)
+    AND ancestor_id NOT IN (SELECT descendant_id FROM account_closure WHERE ancestor_id = NEW.account_id);
+
+  INSERT INTO account_closure (ancestor_id, descendant_id, depth)
+  SELECT p.ancestor_id, s.descendant_id, p.depth + s.depth + 1
+  FROM account_closure p
+  JOIN account_closure s ON s.ancestor_id = NEW.account_id
+  WHERE p.descendant_id = NEW.parent_account_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_accounts_closure_delete
+BEFORE DELETE ON accounts
+FOR EACH ROW
+BEGIN
+  DELETE FROM account_closure WHERE descendant_id = OLD.account_id OR ancestor_id = OLD.account_id;
+END;
+
+-- down
+-- DROP TRIGGER IF EXISTS trg_accounts_closure_delete;
+-- DROP TRIGGER IF EXISTS trg_accounts_closure_update;
+-- DROP TRIGGER IF EXISTS trg_accounts_closure_guard_update;
+-- DROP TRIGGER IF EXISTS trg_accounts_closure_insert;
+-- DROP TRIGGER IF EXISTS trg_accounts_closure_guard_insert;
+-- DROP INDEX IF EXISTS idx_account_closure_descendant;
+-- DROP TABLE IF EXISTS account_closure;
+-- (then recreate trg_prevent_account_cycle_insert/update from 0001_ledger_core.sql)
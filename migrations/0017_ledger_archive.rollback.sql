@@ -0,0 +1,23 @@
+-- rollback
+DROP TRIGGER IF EXISTS trg_ledger_postings_append_only_delete;
+DROP TRIGGER IF EXISTS trg_ledger_transactions_append_only_delete;
+DROP TRIGGER IF EXISTS trg_ledger_transactions_archived_insert;
+DROP TRIGGER IF EXISTS trg_ledger_archives_append_only_delete;
+DROP TRIGGER IF EXISTS trg_ledger_archives_immutable;
+DROP TABLE IF EXISTS ledger_archive_checkpoints;
+DROP TABLE IF EXISTS ledger_archived_keys;
+DROP TABLE IF EXISTS ledger_archives;
+
+CREATE TRIGGER IF NOT EXISTS trg_ledger_transactions_append_only_delete
+BEFORE DELETE ON ledger_transactions
+FOR EACH ROW
+BEGIN
+  SELECT RAISE(ABORT, 'Append-only table: ledger_transactions DELETE not permitted');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_ledger_postings_append_only_delete
+BEFORE DELETE ON ledger_postings
+FOR EACH ROW
+BEGIN
+  SELECT RAISE(ABORT, 'Append-only table: ledger_postings DELETE not permitted');
+END;
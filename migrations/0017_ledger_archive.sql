@@ -0,0 +1,107 @@
+-- up
+PRAGMA foreign_keys = ON;
+
+-- One row per calendar year moved out of the hot database into its own
+-- archive file.  The move runs in a single transaction: the row is inserted
+-- as 'moving', which is the only state in which the append-only delete
+-- triggers below admit deletes, and flipped to 'archived' before commit.
+CREATE TABLE IF NOT EXISTS ledger_archives (
+  archive_year INTEGER PRIMARY KEY,
+  archive_path TEXT NOT NULL,
+  first_day INTEGER NOT NULL,
+  last_day INTEGER NOT NULL,
+  transaction_count INTEGER NOT NULL,
+  posting_count INTEGER NOT NULL,
+  content_hash TEXT NOT NULL,
+  status TEXT NOT NULL CHECK (status IN ('moving','archived')),
+  created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  archived_at TEXT
+);
+
+-- Idempotency keys of archived transactions stay hot so replays are still
+-- answered without opening an archive.
+CREATE TABLE IF NOT EXISTS ledger_archived_keys (
+  source_system TEXT NOT NULL,
+  external_id TEXT NOT NULL,
+  transaction_id TEXT NOT NULL,
+  archive_year INTEGER NOT NULL REFERENCES ledger_archives(archive_year),
+  response_payload TEXT,
+  PRIMARY KEY (source_system, external_id)
+) WITHOUT ROWID;
+
+-- Opening-balance checkpoint: per account and day, the net movement and
+-- posting count of the archived postings.  Hot postings plus these rows
+-- reproduce account_balances/account_daily_balances exactly.
+CREATE TABLE IF NOT EXISTS ledger_archive_checkpoints (
+  account_id TEXT NOT NULL REFERENCES accounts(account_id),
+  balance_date TEXT NOT NULL,
+  archive_year INTEGER NOT NULL REFERENCES ledger_archives(archive_year),
+  day_delta_units INTEGER NOT NULL,
+  posting_count INTEGER NOT NULL,
+  PRIMARY KEY (account_id, balance_date, archive_year)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_ledger_archives_immutable
+BEFORE UPDATE ON ledger_archives
+FOR EACH ROW
+WHEN NOT (OLD.status = 'moving' AND NEW.status = 'archived' AND NEW.archive_year = OLD.archive_year
+          AND NEW.content_hash = OLD.content_hash)
+BEGIN
+  SELECT RAISE(ABORT, 'ledger_archives rows are immutable once archived');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_ledger_archives_append_only_delete
+BEFORE DELETE ON ledger_archives
+FOR EACH ROW
+BEGIN
+  SELECT RAISE(ABORT, 'Append-only table: ledger_archives DELETE not permitted');
+END;
+
+-- Archived days are frozen, even for period-lock overrides.
+CREATE TRIGGER IF NOT EXISTS trg_ledger_transactions_archived_insert
+BEFORE INSERT ON ledger_transactions
+FOR EACH ROW
+WHEN EXISTS (
+  SELECT 1 FROM ledger_archives a
+  WHERE CAST(strftime('%Y%m%d', NEW.transaction_date) AS INTEGER) BETWEEN a.first_day AND a.last_day
+)
+BEGIN
+  SELECT RAISE(ABORT, 'period_archived');
+END;
+
+DROP TRIGGER IF EXISTS trg_ledger_transactions_append_only_delete;
+CREATE TRIGGER trg_ledger_transactions_append_only_delete
+BEFORE DELETE ON ledger_transactions
+FOR EACH ROW
+WHEN NOT EXISTS (
+  SELECT 1 FROM ledger_archives a
+  WHERE a.status = 'moving' AND OLD.transaction_day BETWEEN a.first_day AND a.last_day
+)
+BEGIN
+  SELECT RAISE(ABORT, 'Append-only table: ledger_transactions DELETE not permitted');
+END;
+
+DROP TRIGGER IF EXISTS trg_ledger_postings_append_only_delete;
+CREATE TRIGGER trg_ledger_postings_append_only_delete
+BEFORE DELETE ON ledger_postings
+FOR EACH ROW
+WHEN NOT EXISTS (
+  SELECT 1
+  FROM ledger_transactions t
+  JOIN ledger_archives a ON a.status = 'moving' AND t.transaction_day BETWEEN a.first_day AND a.last_day
+  WHERE t.transaction_id = OLD.transaction_id
+)
+BEGIN
+  SELECT RAISE(ABORT, 'Append-only table: ledger_postings DELETE not permitted');
+END;
+
+-- down
+-- DROP TRIGGER IF EXISTS trg_ledger_postings_append_only_delete;
+-- DROP TRIGGER IF EXISTS trg_ledger_transactions_append_only_delete;
+-- DROP TRIGGER IF EXISTS trg_ledger_transactions_archived_insert;
+-- DROP TRIGGER IF EXISTS trg_ledger_archives_append_only_delete;
+-- DROP TRIGGER IF EXISTS trg_ledger_archives_immutable;
+-- DROP TABLE IF EXISTS ledger_archive_checkpoints;
+-- DROP TABLE IF EXISTS ledger_archived_keys;
+-- DROP TABLE IF EXISTS ledger_archives;
+-- (then recreate the unconditional append-only delete triggers from 0002_security_and_append_only.sql)
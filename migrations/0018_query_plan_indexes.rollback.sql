@@ -0,0 +1,3 @@
+-- rollback
+DROP INDEX IF EXISTS idx_ledger_transactions_date_desc_id;
+DROP INDEX IF EXISTS idx_approval_decisions_proposal_created;
@@ -0,0 +1,12 @@
+-- up
+PRAGMA foreign_keys = ON;
+
+CREATE INDEX IF NOT EXISTS idx_approval_decisions_proposal_created
+ON approval_decisions (proposal_id, created_at, decision_id);
+
+CREATE INDEX IF NOT EXISTS idx_ledger_transactions_date_desc_id
+ON ledger_transactions (transaction_date DESC, transaction_id);
+
+-- down
+-- DROP INDEX IF EXISTS idx_ledger_transactions_date_desc_id;
+-- DROP INDEX IF EXISTS idx_approval_decisions_proposal_created;
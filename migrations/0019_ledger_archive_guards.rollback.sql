@@ -0,0 +1,28 @@
+-- rollback
+DROP TRIGGER IF EXISTS trg_ledger_archives_moving_insert;
+
+DROP TRIGGER IF EXISTS trg_ledger_transactions_append_only_delete;
+CREATE TRIGGER trg_ledger_transactions_append_only_delete
+BEFORE DELETE ON ledger_transactions
+FOR EACH ROW
+WHEN NOT EXISTS (
+  SELECT 1 FROM ledger_archives a
+  WHERE a.status = 'moving' AND OLD.transaction_day BETWEEN a.first_day AND a.last_day
+)
+BEGIN
+  SELECT RAISE(ABORT, 'Append-only table: ledger_transactions DELETE not permitted');
+END;
+
+DROP TRIGGER IF EXISTS trg_ledger_postings_append_only_delete;
+CREATE TRIGGER trg_ledger_postings_append_only_delete
+BEFORE DELETE ON ledger_postings
+FOR EACH ROW
+WHEN NOT EXISTS (
+  SELECT 1
+  FROM ledger_transactions t
+  JOIN ledger_archives a ON a.status = 'moving' AND t.transaction_day BETWEEN a.first_day AND a.last_day
+  WHERE t.transaction_id = OLD.transaction_id
+)
+BEGIN
+  SELECT RAISE(ABORT, 'Append-only table: ledger_postings DELETE not permitted');
+END;
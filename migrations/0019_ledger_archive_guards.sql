@@ -0,0 +1,76 @@
+-- up
+PRAGMA foreign_keys = ON;
+
+-- A 'moving' archive row used to open the append-only delete triggers for
+-- its whole day range on its own.  The move now writes the idempotency keys
+-- and opening-balance checkpoints first (with foreign keys deferred), and
+-- the 'moving' row is only accepted when it covers exactly its calendar
+-- year, no other move is in flight, and its non-zero counts match those
+-- rows: one key per hot transaction of the year in a locked period, and as
+-- many checkpointed postings as those transactions hold.  Deletes also
+-- require the row's own key under the moving year.
+CREATE TRIGGER IF NOT EXISTS trg_ledger_archives_moving_insert
+BEFORE INSERT ON ledger_archives
+FOR EACH ROW
+WHEN NEW.status <> 'moving'
+  OR NEW.transaction_count = 0
+  OR NEW.first_day <> NEW.archive_year * 10000 + 101
+  OR NEW.last_day <> NEW.archive_year * 10000 + 1231
+  OR EXISTS (SELECT 1 FROM ledger_archives WHERE status = 'moving')
+  OR NEW.transaction_count <> (
+    SELECT COUNT(*)
+    FROM ledger_archived_keys k
+    JOIN ledger_transactions t ON t.transaction_id = k.transaction_id
+    JOIN accounting_periods ap
+      ON ap.period_key = strftime('%Y-%m', t.transaction_date) AND ap.entity_id = t.entity_id AND ap.status = 'locked'
+    WHERE k.archive_year = NEW.archive_year AND t.transaction_day BETWEEN NEW.first_day AND NEW.last_day
+  )
+  OR NEW.transaction_count <> (SELECT COUNT(*) FROM ledger_archived_keys WHERE archive_year = NEW.archive_year)
+  OR NEW.posting_count <> (
+    SELECT COUNT(*)
+    FROM ledger_postings p
+    JOIN ledger_archived_keys k ON k.transaction_id = p.transaction_id AND k.archive_year = NEW.archive_year
+  )
+  OR NEW.posting_count <> (
+    SELECT COALESCE(SUM(posting_count), 0) FROM ledger_archive_checkpoints WHERE archive_year = NEW.archive_year
+  )
+BEGIN
+  SELECT RAISE(ABORT, 'ledger_archives rows must be recorded by a ledger archive move');
+END;
+
+DROP TRIGGER IF EXISTS trg_ledger_transactions_append_only_delete;
+CREATE TRIGGER trg_ledger_transactions_append_only_delete
+BEFORE DELETE ON ledger_transactions
+FOR EACH ROW
+WHEN NOT EXISTS (
+  SELECT 1
+  FROM ledger_archived_keys k
+  JOIN ledger_archives a ON a.archive_year = k.archive_year
+  WHERE k.transaction_id = OLD.transaction_id
+    AND a.status = 'moving'
+    AND OLD.transaction_day BETWEEN a.first_day AND a.last_day
+)
+BEGIN
+  SELECT RAISE(ABORT, 'Append-only table: ledger_transactions DELETE not permitted');
+END;
+
+DROP TRIGGER IF EXISTS trg_ledger_postings_append_only_delete;
+CREATE TRIGGER trg_ledger_postings_append_only_delete
+BEFORE DELETE ON ledger_postings
+FOR EACH ROW
+WHEN NOT EXISTS (
+  SELECT 1
+  FROM ledger_transactions t
+  JOIN ledger_archived_keys k ON k.transaction_id = t.transaction_id
+  JOIN ledger_archives a ON a.archive_year = k.archive_year
+  WHERE t.transaction_id = OLD.transaction_id
+    AND a.status = 'moving'
+    AND t.transaction_day BETWEEN a.first_day AND a.last_day
+)
+BEGIN
+  SELECT RAISE(ABORT, 'Append-only table: ledger_postings DELETE not permitted');
+END;
+
+-- down
+-- DROP TRIGGER IF EXISTS trg_ledger_archives_moving_insert;
+-- (then recreate the 0017_ledger_archive.sql delete triggers)
@@ -0,0 +1,26 @@
+-- rollback
+CREATE TABLE IF NOT EXISTS account_balances (
+  account_id TEXT PRIMARY KEY REFERENCES accounts(account_id),
+  balance TEXT NOT NULL,
+  posting_count INTEGER NOT NULL,
+  max_posting_date TEXT NOT NULL,
+  updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT OR REPLACE INTO account_balances (account_id, balance, posting_count, max_posting_date)
+SELECT
+  latest.account_id,
+  CASE WHEN latest.units < 0 THEN '-' ELSE '' END
+    || (ABS(latest.units) / 10000)
+    || '.'
+    || printf('%04d', ABS(latest.units) % 10000),
+  COALESCE((SELECT COUNT(*) FROM ledger_postings p WHERE p.account_id = latest.account_id), 0)
+    + COALESCE((SELECT SUM(c.posting_count) FROM ledger_archive_checkpoints c WHERE c.account_id = latest.account_id), 0),
+  latest.balance_date
+FROM (
+  SELECT d.account_id, d.balance_date, d.cumulative_units AS units
+  FROM account_daily_balances d
+  WHERE d.balance_date = (
+    SELECT MAX(x.balance_date) FROM account_daily_balances x WHERE x.account_id = d.account_id
+  )
+) AS latest;
@@ -0,0 +1,12 @@
+-- up
+PRAGMA foreign_keys = ON;
+
+-- account_balances held a running TEXT total per account that every posted
+-- bundle re-read and upserted.  Balance reads are served from
+-- account_daily_balances (the latest cumulative_units per account is the
+-- current balance), so nothing reads it any more.
+DROP TABLE IF EXISTS account_balances;
+
+-- down
+-- Recreate account_balances (0011_account_balances.sql) and backfill it from
+-- account_daily_balances; see 0020_drop_account_balances.rollback.sql.
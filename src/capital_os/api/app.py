@@ -1,14 +1,32 @@
 from __future__ import annotations
 
+from contextlib import nullcontext
 from datetime import timezone, datetime
+import hashlib
 from time import perf_counter
+from typing import Iterator
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.datastructures import Headers
 
-from capital_os.db.session import probe_ready_noncreating, transaction
+from capital_os.api.lanes import READ_LANE, WRITE_LANE, LaneSaturatedError, get_lane, lane_stats
+from capital_os.config import get_settings
+from capital_os.db.session import connection_pool_stats, probe_ready_noncreating, transaction
+from capital_os.db.writer import run_write, writer_stats
+from capital_os.domain.ledger.export import EXPORT_FORMATS, EXPORT_MEDIA_TYPES, stream_ledger_export
 from capital_os.observability.event_log import log_event
+from capital_os.observability.event_sink import buffer_event, event_sink_stats
 from capital_os.observability.hashing import payload_hash
-from capital_os.runtime.execute_tool import TOOL_HANDLERS, execute_tool
+from capital_os.observability.metrics import (
+    PROMETHEUS_CONTENT_TYPE,
+    TOOL_DURATION,
+    metrics_enabled,
+    observe,
+    render_metrics,
+)
+from capital_os.observability.profiling import profile_requested
+from capital_os.runtime.execute_tool import TOOL_HANDLERS, WRITE_TOOLS, execute_tool
 from capital_os.security import (
     authenticate_token,
     authorize_tool,
@@ -17,12 +35,15 @@ from capital_os.security import (
 app = FastAPI(title="Capital OS")
 AUTH_TOKEN_HEADER = "x-capital-auth-token"
 CORRELATION_ID_HEADER = "x-correlation-id"
+PROFILE_HEADER = "x-capital-profile"
+EXPORT_LEDGER_CAPABILITY_KEY = "export_ledger"
 
 # HTTP status code mapping from ToolResult.status
 _STATUS_CODE_MAP = {
     "unknown_tool": 404,
     "validation_error": 422,
     "error": 400,
+    "overloaded": 503,
     "event_log_failure": 500,
 }
 
@@ -42,24 +63,31 @@ def _emit_event(
     authorization_result: str | None = None,
     violation_code: str | None = None,
 ) -> None:
-    """Log an event for auth/authz failures (never fail-closed)."""
-    try:
+    """Log an event for auth/authz failures (never fail-closed) and record its latency."""
+    observe(TOOL_DURATION, duration_ms / 1000, tool_name, status, authorization_result or "none")
+    event = {
+        "tool_name": tool_name,
+        "correlation_id": correlation_id,
+        "input_hash": input_hash,
+        "output_hash": output_hash,
+        "duration_ms": duration_ms,
+        "status": status,
+        "error_code": error_code,
+        "error_message": error_message,
+        "actor_id": actor_id,
+        "authn_method": authn_method,
+        "authorization_result": authorization_result,
+        "violation_code": violation_code,
+    }
+    if buffer_event(**event):
+        return
+
+    def _log() -> None:
         with transaction() as conn:
-            log_event(
-                conn,
-                tool_name=tool_name,
-                correlation_id=correlation_id,
-                input_hash=input_hash,
-                output_hash=output_hash,
-                duration_ms=duration_ms,
-                status=status,
-                error_code=error_code,
-                error_message=error_message,
-                actor_id=actor_id,
-                authn_method=authn_method,
-                authorization_result=authorization_result,
-                violation_code=violation_code,
-            )
+            log_event(conn, **event)
+
+    try:
+        run_write(_log)
     except Exception:
         pass
 
@@ -73,6 +101,138 @@ def health() -> dict:
     return {"status": "ok", "timestamp": datetime.now(timezone.utc).isoformat()}
 
 
+@app.get("/health/queues")
+def queue_health() -> dict:
+    """Report tool-lane, writer-queue, event-log buffer and connection-pool saturation."""
+    pool = connection_pool_stats()
+    return {
+        "lanes": lane_stats(),
+        "writer": writer_stats(),
+        "event_log": event_sink_stats(),
+        "db_pool": {"reader": pool["reader"], "writer": pool["writer"]},
+    }
+
+
+@app.get("/metrics")
+def metrics() -> Response:
+    """Expose tool latency histograms and contention counters for Prometheus."""
+    if not metrics_enabled():
+        raise HTTPException(status_code=404, detail={"error": "metrics_disabled"})
+    return Response(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@app.get("/exports/ledger")
+def export_ledger(
+    request: Request,
+    correlation_id: str = Query(..., min_length=1),
+    format: str = Query("ndjson"),
+    date_from: str | None = Query(None),
+    date_to: str | None = Query(None),
+    entity_id: str | None = Query(None),
+    after: str | None = Query(None),
+):
+    """Stream transactions with their postings as NDJSON or CSV.
+
+    Authorized like a read tool (``export_ledger`` capability).  Pass the
+    ``checkpoint`` of the last fully received transaction as ``after`` to
+    resume an interrupted export.
+    """
+    started = perf_counter()
+    params = {
+        "correlation_id": correlation_id,
+        "format": format,
+        "date_from": date_from,
+        "date_to": date_to,
+        "entity_id": entity_id,
+        "after": after,
+    }
+    input_hash = payload_hash(params)
+
+    auth_context = authenticate_token(request.headers.get(AUTH_TOKEN_HEADER))
+    if auth_context is None:
+        error_payload = {"error": "authentication_required"}
+        _emit_event(
+            tool_name=EXPORT_LEDGER_CAPABILITY_KEY,
+            correlation_id=correlation_id,
+            input_hash=input_hash,
+            output_hash=payload_hash(error_payload),
+            duration_ms=int((perf_counter() - started) * 1000),
+            status="auth_error",
+            error_code="authentication_required",
+            error_message="authentication_required",
+            authorization_result="denied",
+        )
+        raise HTTPException(status_code=401, detail=error_payload)
+    if not authorize_tool(auth_context, EXPORT_LEDGER_CAPABILITY_KEY):
+        error_payload = {"error": "forbidden"}
+        _emit_event(
+            tool_name=EXPORT_LEDGER_CAPABILITY_KEY,
+            correlation_id=correlation_id,
+            input_hash=input_hash,
+            output_hash=payload_hash(error_payload),
+            duration_ms=int((perf_counter() - started) * 1000),
+            status="authz_denied",
+            error_code="forbidden",
+            error_message="forbidden",
+            actor_id=auth_context.actor_id,
+            authn_method=auth_context.authn_method,
+            authorization_result="denied",
+        )
+        raise HTTPException(status_code=403, detail=error_payload)
+
+    try:
+        chunks = stream_ledger_export(
+            format, date_from=date_from, date_to=date_to, entity_id=entity_id, after=after
+        )
+    except ValueError as exc:
+        error_payload = {"error": "validation_error", "message": str(exc), "formats": list(EXPORT_FORMATS)}
+        _emit_event(
+            tool_name=EXPORT_LEDGER_CAPABILITY_KEY,
+            correlation_id=correlation_id,
+            input_hash=input_hash,
+            output_hash=payload_hash(error_payload),
+            duration_ms=int((perf_counter() - started) * 1000),
+            status="validation_error",
+            error_code="validation_error",
+            error_message=str(exc),
+            actor_id=auth_context.actor_id,
+            authn_method=auth_context.authn_method,
+            authorization_result="allowed",
+        )
+        raise HTTPException(status_code=422, detail=error_payload) from exc
+
+    def body() -> Iterator[bytes]:
+        # The export is logged once the stream ends; the output hash covers
+        # the exact bytes sent.
+        digest = hashlib.sha256()
+        status = "error"
+        try:
+            for chunk in chunks:
+                data = chunk.encode("utf-8")
+                digest.update(data)
+                yield data
+            status = "ok"
+        finally:
+            _emit_event(
+                tool_name=EXPORT_LEDGER_CAPABILITY_KEY,
+                correlation_id=correlation_id,
+                input_hash=input_hash,
+                output_hash=digest.hexdigest(),
+                duration_ms=int((perf_counter() - started) * 1000),
+                status=status,
+                error_code=None if status == "ok" else "export_interrupted",
+                actor_id=auth_context.actor_id,
+                authn_method=auth_context.authn_method,
+                authorization_result="allowed",
+            )
+
+    return StreamingResponse(body(), media_type=EXPORT_MEDIA_TYPES[format])
+
+
+def _retry_after_headers() -> dict[str, str]:
+    return {"Retry-After": str(get_settings().api_retry_after_seconds)}
+
+
 @app.post("/tools/{tool_name}")
 async def run_tool(tool_name: str, request: Request):
     # Early unknown-tool check (before auth, preserving existing behaviour)
@@ -83,12 +243,27 @@ async def run_tool(tool_name: str, request: Request):
     if not isinstance(payload, dict):
         payload = {}
 
+    # Everything past request parsing (auth event logging, SQLite I/O,
+    # hashing) is synchronous, so it runs on a bounded lane instead of the
+    # event loop.  A saturated lane sheds load immediately.
+    lane = get_lane(WRITE_LANE if tool_name in WRITE_TOOLS else READ_LANE)
+    try:
+        return await lane.run(lambda: _run_tool_sync(tool_name, payload, request.headers))
+    except LaneSaturatedError as exc:
+        raise HTTPException(
+            status_code=429,
+            detail={"error": "too_many_requests", "lane": exc.lane},
+            headers=_retry_after_headers(),
+        ) from exc
+
+
+def _run_tool_sync(tool_name: str, payload: dict, headers: Headers):
     started = perf_counter()
     input_hash = payload_hash(payload)
     correlation_id = payload.get("correlation_id", "unknown")
 
     # --- 1. Authenticate ---
-    auth_context = authenticate_token(request.headers.get(AUTH_TOKEN_HEADER))
+    auth_context = authenticate_token(headers.get(AUTH_TOKEN_HEADER))
     if auth_context is None:
         error_payload = {"error": "authentication_required"}
         output_hash = payload_hash(error_payload)
@@ -126,7 +301,7 @@ async def run_tool(tool_name: str, request: Request):
 
     # --- 2b. Tool-specific correlation header enforcement ---
     if tool_name == "update_account_profile":
-        header_correlation_id = request.headers.get(CORRELATION_ID_HEADER)
+        header_correlation_id = headers.get(CORRELATION_ID_HEADER)
         body_correlation_id = payload.get("correlation_id")
         if not isinstance(header_correlation_id, str) or not header_correlation_id:
             error_payload = {
@@ -182,17 +357,20 @@ async def run_tool(tool_name: str, request: Request):
             raise HTTPException(status_code=422, detail=error_payload)
 
     # --- 3. Delegate to shared runtime executor ---
-    result = execute_tool(
-        tool_name,
-        payload,
-        actor_id=auth_context.actor_id,
-        authn_method=auth_context.authn_method,
-        authorization_result="allowed",
-    )
+    profile = (headers.get(PROFILE_HEADER) or "").strip().lower() in {"1", "true", "yes", "on"}
+    with profile_requested() if profile else nullcontext():
+        result = execute_tool(
+            tool_name,
+            payload,
+            actor_id=auth_context.actor_id,
+            authn_method=auth_context.authn_method,
+            authorization_result="allowed",
+        )
 
     # --- 4. Map ToolResult to HTTP response ---
     if result.success:
         return result.payload
 
     status_code = _STATUS_CODE_MAP.get(result.status, 400)
-    raise HTTPException(status_code=status_code, detail=result.payload)
+    response_headers = _retry_after_headers() if status_code == 503 else None
+    raise HTTPException(status_code=status_code, detail=result.payload, headers=response_headers)
@@ -0,0 +1,145 @@
+"""Bounded execution lanes for offloading tool calls from the event loop.
+
+``execute_tool`` is synchronous (SQLite I/O, hashing), so the HTTP adapter
+runs it on a dedicated thread pool instead of the event loop.  Read and write
+tools get separate lanes so a burst of slow reads cannot starve writes (and
+vice versa).  Each lane admits at most ``workers + queue_max`` calls; beyond
+that ``LaneSaturatedError`` is raised immediately so the endpoint can shed
+load with a fast 429 instead of queueing without bound.
+"""
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+import contextvars
+import threading
+from time import perf_counter
+from typing import Callable, TypeVar
+
+from capital_os.config import get_settings
+from capital_os.observability.metrics import LANE_QUEUE_DEPTH, LANE_REJECTED, inc
+
+
+T = TypeVar("T")
+
+READ_LANE = "read"
+WRITE_LANE = "write"
+
+
+class LaneSaturatedError(RuntimeError):
+    """Raised when a lane has no free worker or queue slot."""
+
+    def __init__(self, lane: str) -> None:
+        super().__init__(f"{lane} lane is saturated")
+        self.lane = lane
+
+
+class ExecutionLane:
+    """Thread pool with an admission limit and queue/wait-time accounting."""
+
+    def __init__(self, name: str, *, workers: int, queue_max: int) -> None:
+        self.name = name
+        self._workers = workers
+        self._capacity = workers + queue_max
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"capital-os-{name}")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._queued = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
+
+    def submit(self, fn: Callable[[], T]) -> Future:
+        """Admit *fn* to the lane or raise ``LaneSaturatedError``."""
+        with self._lock:
+            if self._in_flight >= self._capacity:
+                self._rejected += 1
+                inc(LANE_REJECTED, self.name)
+                raise LaneSaturatedError(self.name)
+            self._in_flight += 1
+            self._queued += 1
+            self._submitted += 1
+        inc(LANE_QUEUE_DEPTH, self.name)
+
+        enqueued = perf_counter()
+        started = False
+        context = contextvars.copy_context()
+
+        def _call() -> T:
+            nonlocal started
+            waited_ms = (perf_counter() - enqueued) * 1000
+            with self._lock:
+                started = True
+                self._queued -= 1
+                self._wait_ms_total += waited_ms
+                self._wait_ms_max = max(self._wait_ms_max, waited_ms)
+            inc(LANE_QUEUE_DEPTH, self.name, amount=-1)
+            return context.run(fn)
+
+        def _done(_: Future) -> None:
+            with self._lock:
+                if not started:
+                    # Cancelled while still queued.
+                    self._queued -= 1
+                    inc(LANE_QUEUE_DEPTH, self.name, amount=-1)
+                self._in_flight -= 1
+                self._completed += 1
+
+        future = self._executor.submit(_call)
+        future.add_done_callback(_done)
+        return future
+
+    async def run(self, fn: Callable[[], T]) -> T:
+        """Run *fn* on the lane without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self._workers,
+                "capacity": self._capacity,
+                "in_flight": self._in_flight,
+                "queue_depth": self._queued,
+                "running": self._in_flight - self._queued,
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+                "completed": self._completed,
+                "wait_ms_total": round(self._wait_ms_total, 3),
+                "wait_ms_max": round(self._wait_ms_max, 3),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_LANES: dict[str, ExecutionLane] = {}
+_LANES_LOCK = threading.Lock()
+
+
+def get_lane(name: str) -> ExecutionLane:
+    lane = _LANES.get(name)
+    if lane is not None:
+        return lane
+    with _LANES_LOCK:
+        lane = _LANES.get(name)
+        if lane is None:
+            settings = get_settings()
+            workers = settings.api_read_workers if name == READ_LANE else settings.api_write_workers
+            lane = ExecutionLane(name, workers=workers, queue_max=settings.api_lane_queue_max)
+            _LANES[name] = lane
+        return lane
+
+
+def lane_stats() -> dict:
+    """Return queue depth, wait-time and rejection stats for both lanes."""
+    return {name: get_lane(name).stats() for name in (READ_LANE, WRITE_LANE)}
+
+
+def shutdown_lanes(wait: bool = True) -> None:
+    with _LANES_LOCK:
+        lanes = list(_LANES.values())
+        _LANES.clear()
+    for lane in lanes:
+        lane.shutdown(wait=wait)
@@ -0,0 +1,101 @@
+"""CLI commands for performance benchmarks."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import sys
+import tempfile
+from typing import Annotated, Optional
+
+import typer
+
+from capital_os.cli.context import _die
+
+bench_app = typer.Typer(
+    name="bench",
+    help="Performance benchmarks against synthetic ledgers.",
+    no_args_is_help=True,
+)
+
+
+# ── bench scaling ─────────────────────────────────────────────────────
+
+@bench_app.command("scaling")
+def scaling(
+    transactions: Annotated[
+        Optional[list[int]],
+        typer.Option("--transactions", help="Dataset size in transactions; repeat for each size (default: 1000, 10000, 100000)."),
+    ] = None,
+    repeats: Annotated[int, typer.Option("--repeats", help="Timed calls per tool and size.")] = 5,
+    seed: Annotated[int, typer.Option("--seed", help="Seed for the synthetic ledgers.")] = 22,
+    history: Annotated[
+        str,
+        typer.Option("--history", help="JSON history file the run is appended to."),
+    ] = "data/perf/scaling-history.json",
+    work_dir: Annotated[
+        Optional[str],
+        typer.Option("--work-dir", help="Directory for the per-size databases (default: a temporary directory)."),
+    ] = None,
+    max_exponent: Annotated[
+        float,
+        typer.Option("--max-exponent", help="Growth exponent above which a tool is flagged as super-linear."),
+    ] = 1.2,
+    min_ms: Annotated[
+        float,
+        typer.Option("--min-ms", help="Medians below this are treated as noise and never flagged."),
+    ] = 1.0,
+    fail_on_superlinear: Annotated[
+        bool,
+        typer.Option("--fail-on-superlinear", help="Exit non-zero when any tool scales super-linearly."),
+    ] = False,
+) -> None:
+    """Time every tool against synthetic ledgers of increasing size.
+
+    Each size gets a fresh database under the work directory; the configured
+    database is never touched.
+
+    Example:
+
+        capital-os bench scaling --transactions 10000 --transactions 100000 --transactions 1000000
+    """
+    sizes = transactions or [1_000, 10_000, 100_000]
+    if any(size < 1 for size in sizes):
+        _die("--transactions must be >= 1")
+
+    from capital_os.config import get_settings
+    from capital_os.db.testing import reset_test_database
+    from capital_os.runtime.benchmark import append_history, run_scaling_sweep
+
+    root = Path(work_dir) if work_dir else Path(tempfile.mkdtemp(prefix="capital-os-bench-"))
+    root.mkdir(parents=True, exist_ok=True)
+
+    def prepare_database(size: int) -> None:
+        os.environ["CAPITAL_OS_DB_URL"] = f"sqlite:///{(root / f'scaling-{size}.db').resolve()}"
+        get_settings.cache_clear()
+        reset_test_database()
+
+    try:
+        run = run_scaling_sweep(
+            sizes,
+            prepare_database=prepare_database,
+            seed=seed,
+            repeats=repeats,
+            max_exponent=max_exponent,
+            min_ms=min_ms,
+        )
+    except (RuntimeError, ValueError) as exc:
+        _die(str(exc))
+    append_history(history, run)
+
+    output = {
+        "status": "ok" if not run["superlinear"] else "superlinear",
+        "history": history,
+        "sizes": run["sizes"],
+        "median_ms": {tool: series["median_ms"] for tool, series in run["tools"].items()},
+        "superlinear": run["superlinear"],
+    }
+    sys.stdout.write(json.dumps(output, indent=2) + "\n")
+    if run["superlinear"] and fail_on_superlinear:
+        raise SystemExit(1)
@@ -0,0 +1,549 @@
+"""CLI commands for ledger maintenance."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import sqlite3
+import sys
+import time
+from typing import Annotated, Optional
+
+import typer
+
+from capital_os.cli.context import _die, configure_db_path, ensure_db_ready
+
+ledger_app = typer.Typer(
+    name="ledger",
+    help="Ledger maintenance commands.",
+    no_args_is_help=True,
+)
+
+
+# ── ledger verify-balances ────────────────────────────────────────────
+
+@ledger_app.command("verify-balances")
+def verify_balances(
+    db_path: Annotated[
+        Optional[str],
+        typer.Option("--db-path", help="Path to SQLite database file."),
+    ] = None,
+) -> None:
+    """Prove materialized account balances match the raw postings.
+
+    Exits non-zero and lists every mismatching account when they differ.
+
+    Example:
+
+        capital-os ledger verify-balances
+    """
+    configure_db_path(db_path)
+    ensure_db_ready()
+
+    from capital_os.db.session import read_only_connection
+    from capital_os.domain.ledger.balances import verify_account_balances
+
+    with read_only_connection() as conn:
+        mismatches = verify_account_balances(conn)
+
+    output = {"status": "ok" if not mismatches else "mismatch", "mismatches": mismatches}
+    if mismatches:
+        sys.stderr.write(json.dumps(output, indent=2) + "\n")
+        raise SystemExit(1)
+    sys.stdout.write(json.dumps(output, indent=2) + "\n")
+
+
+# ── ledger rebuild-balances ───────────────────────────────────────────
+
+@ledger_app.command("rebuild-balances")
+def rebuild_balances(
+    db_path: Annotated[
+        Optional[str],
+        typer.Option("--db-path", help="Path to SQLite database file."),
+    ] = None,
+) -> None:
+    """Regenerate materialized account balances from raw postings.
+
+    Example:
+
+        capital-os ledger rebuild-balances
+    """
+    configure_db_path(db_path)
+    ensure_db_ready()
+
+    from capital_os.db.session import transaction
+    from capital_os.domain.ledger.balances import rebuild_account_balances, verify_account_balances
+
+    with transaction() as conn:
+        accounts = rebuild_account_balances(conn)
+        mismatches = verify_account_balances(conn)
+
+    output = {"status": "rebuilt" if not mismatches else "mismatch", "accounts": accounts, "mismatches": mismatches}
+    if mismatches:
+        sys.stderr.write(json.dumps(output, indent=2) + "\n")
+        raise SystemExit(1)
+    sys.stdout.write(json.dumps(output, indent=2) + "\n")
+
+
+# ── ledger verify-amounts ─────────────────────────────────────────────
+
+@ledger_app.command("verify-amounts")
+def verify_amounts(
+    db_path: Annotated[
+        Optional[str],
+        typer.Option("--db-path", help="Path to SQLite database file."),
+    ] = None,
+) -> None:
+    """Prove integer minor-unit amount columns match their decimal columns.
+
+    Covers postings, balance snapshots and obligations. Exits non-zero and
+    lists every mismatching row when they differ.
+
+    Example:
+
+        capital-os ledger verify-amounts
+    """
+    configure_db_path(db_path)
+    ensure_db_ready()
+
+    from capital_os.db.session import read_only_connection
+    from capital_os.domain.ledger.minor_units import verify_minor_unit_columns
+
+    with read_only_connection() as conn:
+        mismatches = verify_minor_unit_columns(conn)
+
+    output = {"status": "ok" if not mismatches else "mismatch", "mismatches": mismatches}
+    if mismatches:
+        sys.stderr.write(json.dumps(output, indent=2) + "\n")
+        raise SystemExit(1)
+    sys.stdout.write(json.dumps(output, indent=2) + "\n")
+
+
+# ── ledger export ─────────────────────────────────────────────────────
+
+_EXPORT_CHECKPOINT_EVERY = 1000
+
+
+def _write_checkpoint_file(path: str, state: dict) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        handle.write(json.dumps(state, indent=2) + "\n")
+    os.replace(tmp_path, path)
+
+
+@ledger_app.command("export")
+def export(
+    export_format: Annotated[
+        str,
+        typer.Option("--format", help="Output format: ndjson (one transaction per line) or csv (one posting per line)."),
+    ] = "ndjson",
+    date_from: Annotated[
+        Optional[str],
+        typer.Option("--from", help="First UTC transaction day to include (YYYY-MM-DD)."),
+    ] = None,
+    date_to: Annotated[
+        Optional[str],
+        typer.Option("--to", help="Last UTC transaction day to include (YYYY-MM-DD)."),
+    ] = None,
+    entity_id: Annotated[
+        Optional[str],
+        typer.Option("--entity-id", help="Only export transactions of this entity."),
+    ] = None,
+    output: Annotated[
+        Optional[str],
+        typer.Option("--output", help="Write to this file instead of stdout."),
+    ] = None,
+    checkpoint_file: Annotated[
+        Optional[str],
+        typer.Option(
+            "--checkpoint-file",
+            help="Record progress here and resume from it on the next run (requires --output).",
+        ),
+    ] = None,
+    after: Annotated[
+        Optional[str],
+        typer.Option("--after", help="Resume after this checkpoint token."),
+    ] = None,
+    db_path: Annotated[
+        Optional[str],
+        typer.Option("--db-path", help="Path to SQLite database file."),
+    ] = None,
+) -> None:
+    """Stream transactions and their postings as NDJSON or CSV.
+
+    Memory stays constant regardless of ledger size. With --checkpoint-file
+    the last fully written transaction and the output size at that point are
+    recorded every 1000 transactions; rerunning the same command after an
+    interruption truncates --output back to that point and appends the rest.
+
+    Example:
+
+        capital-os ledger export --format csv --from 2026-01-01 --to 2026-01-31 --output jan.csv --checkpoint-file jan.ckpt
+    """
+    configure_db_path(db_path)
+    ensure_db_ready()
+
+    from capital_os.domain.ledger.export import EXPORT_FORMATS, open_ledger_export, render_export
+
+    if export_format not in EXPORT_FORMATS:
+        _die(f"--format must be one of {'|'.join(EXPORT_FORMATS)}")
+
+    filters = {"format": export_format, "date_from": date_from, "date_to": date_to, "entity_id": entity_id}
+    state = {**filters, "checkpoint": after, "transactions": 0, "output_bytes": 0, "complete": False}
+    resumed = False
+    if checkpoint_file is not None:
+        if output is None:
+            _die("--checkpoint-file requires --output")
+        if Path(checkpoint_file).exists():
+            saved = json.loads(Path(checkpoint_file).read_text(encoding="utf-8"))
+            if any(saved.get(key) != value for key, value in filters.items()):
+                _die(f"Checkpoint file {checkpoint_file} was written for different export options")
+            if saved.get("complete"):
+                sys.stdout.write(json.dumps({"status": "complete", **saved}, indent=2) + "\n")
+                return
+            state = saved
+            resumed = True
+    header = state["checkpoint"] is None
+
+    handle = open(output, "a" if resumed else "w", encoding="utf-8", newline="") if output else sys.stdout
+    if resumed:
+        # Drop anything written after the last checkpoint by an interrupted run.
+        handle.truncate(state["output_bytes"])
+    try:
+        try:
+            export = open_ledger_export(
+                date_from=date_from,
+                date_to=date_to,
+                entity_id=entity_id,
+                after=state["checkpoint"],
+            )
+        except ValueError as exc:
+            _die(str(exc))
+
+        with export as records:
+            def tracked(records):
+                for record in records:
+                    yield record
+                    # Resumed only after the chunk for ``record`` was written.
+                    state["checkpoint"] = record["checkpoint"]
+                    state["transactions"] += 1
+                    if checkpoint_file is not None and state["transactions"] % _EXPORT_CHECKPOINT_EVERY == 0:
+                        handle.flush()
+                        state["output_bytes"] = os.fstat(handle.fileno()).st_size
+                        _write_checkpoint_file(checkpoint_file, state)
+
+            for chunk in render_export(export_format, tracked(records), header=header):
+                handle.write(chunk)
+        handle.flush()
+    finally:
+        if output:
+            handle.close()
+
+    state["complete"] = True
+    if checkpoint_file is not None:
+        state["output_bytes"] = os.path.getsize(output)
+        _write_checkpoint_file(checkpoint_file, state)
+    summary = json.dumps({"status": "ok", **state}, indent=2) + "\n"
+    (sys.stdout if output else sys.stderr).write(summary)
+
+
+# ── ledger import ─────────────────────────────────────────────────────
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@ledger_app.command("import")
+def import_statement(
+    statement: Annotated[str, typer.Argument(help="CSV or OFX statement file.")],
+    mapping: Annotated[
+        str,
+        typer.Option("--mapping", help="YAML/JSON file mapping statement rows to transaction bundles."),
+    ],
+    chunk_size: Annotated[
+        int,
+        typer.Option("--chunk-size", help="Bundles validated and committed per transaction (max 10000)."),
+    ] = 2000,
+    checkpoint_file: Annotated[
+        Optional[str],
+        typer.Option("--checkpoint-file", help="Record progress here and resume from it on the next run."),
+    ] = None,
+    correlation_id: Annotated[
+        Optional[str],
+        typer.Option("--correlation-id", help="Correlation id prefix (default: derived from the statement hash)."),
+    ] = None,
+    db_path: Annotated[
+        Optional[str],
+        typer.Option("--db-path", help="Path to SQLite database file."),
+    ] = None,
+) -> None:
+    """Stream a bank statement into the ledger in chunked batch commits.
+
+    Each chunk goes straight to the ledger's bulk insert path and commits in
+    one transaction, with the same idempotency, period, policy and
+    duplicate-risk checks as record_transaction_bundles, run once per chunk.
+    Rows without a bank reference get a derived external_id, so
+    rerunning an import replays committed rows instead of duplicating them.
+    With --checkpoint-file, chunks already committed are skipped on resume.
+    Progress is reported on stderr as one JSON line per chunk.
+
+    Example:
+
+        capital-os ledger import checking.csv --mapping checking.yaml --checkpoint-file checking.ckpt
+    """
+    configure_db_path(db_path)
+    ensure_db_ready()
+
+    from contextlib import nullcontext
+
+    from capital_os.cli.context import CLI_ACTOR_ID, CLI_AUTHN_METHOD, CLI_AUTHORIZATION_RESULT
+    from capital_os.db.session import use_entity_shard
+    from capital_os.db.writer import run_write
+    from capital_os.domain.ledger.service import import_transaction_bundles
+    from capital_os.domain.ledger.statement_import import (
+        MAX_IMPORT_CHUNK_SIZE,
+        StatementImportError,
+        iter_statement_bundles,
+        iter_statement_rows,
+        load_statement_mapping,
+    )
+    from capital_os.security.context import (
+        RequestSecurityContext,
+        clear_request_security_context,
+        set_request_security_context,
+    )
+
+    if not 1 <= chunk_size <= MAX_IMPORT_CHUNK_SIZE:
+        _die(f"--chunk-size must be between 1 and {MAX_IMPORT_CHUNK_SIZE}")
+    for path in (statement, mapping):
+        if not Path(path).is_file():
+            _die(f"File not found: {path}")
+    try:
+        statement_mapping = load_statement_mapping(mapping)
+    except StatementImportError as exc:
+        _die(str(exc))
+
+    statement_sha256 = _file_sha256(statement)
+    state = {
+        "statement_sha256": statement_sha256,
+        "mapping_sha256": _file_sha256(mapping),
+        "correlation_id": correlation_id or f"import-{statement_sha256[:16]}",
+        "rows": 0,
+        "chunks": 0,
+        "committed": 0,
+        "proposed": 0,
+        "replayed": 0,
+        "skipped": 0,
+        "complete": False,
+    }
+    if checkpoint_file is not None and Path(checkpoint_file).exists():
+        saved = json.loads(Path(checkpoint_file).read_text(encoding="utf-8"))
+        if (saved.get("statement_sha256"), saved.get("mapping_sha256")) != (
+            state["statement_sha256"],
+            state["mapping_sha256"],
+        ):
+            _die(f"Checkpoint file {checkpoint_file} was written for a different statement or mapping")
+        if saved.get("complete"):
+            sys.stdout.write(json.dumps({"status": "complete", **saved}, indent=2) + "\n")
+            return
+        state = saved
+
+    started = time.perf_counter()
+    resume_rows = state["rows"]
+    rows_this_run = 0
+    pending: list[dict] = []
+    pending_rows = 0
+
+    def rows_per_sec() -> float:
+        elapsed = time.perf_counter() - started
+        return round(rows_this_run / elapsed, 1) if elapsed > 0 else 0.0
+
+    def flush() -> None:
+        nonlocal pending, pending_rows, rows_this_run
+        if pending:
+            chunk = pending
+            chunk_correlation_id = f"{state['correlation_id']}:chunk-{state['chunks'] + 1}"
+            try:
+                result = run_write(lambda: import_transaction_bundles(chunk, correlation_id=chunk_correlation_id))
+            except Exception as exc:
+                sys.stderr.write(json.dumps({"error": "tool_execution_error", "message": str(exc)}, indent=2) + "\n")
+                _die(
+                    f"Chunk {state['chunks'] + 1} (statement rows {state['rows'] + 1}-{state['rows'] + pending_rows})"
+                    " was rejected; nothing from it was committed"
+                )
+            state["committed"] += result["committed_count"]
+            state["proposed"] += result["proposed_count"]
+            state["replayed"] += result["replayed_count"]
+            state["chunks"] += 1
+        state["rows"] += pending_rows
+        rows_this_run += pending_rows
+        pending, pending_rows = [], 0
+        if checkpoint_file is not None:
+            _write_checkpoint_file(checkpoint_file, state)
+        progress = {key: state[key] for key in ("rows", "chunks", "committed", "proposed", "replayed", "skipped")}
+        sys.stderr.write(json.dumps({"event": "progress", **progress, "rows_per_sec": rows_per_sec()}) + "\n")
+
+    # Events logged by the import carry the trusted CLI identity.
+    context_token = set_request_security_context(
+        RequestSecurityContext(
+            actor_id=CLI_ACTOR_ID,
+            authn_method=CLI_AUTHN_METHOD,
+            authorization_result=CLI_AUTHORIZATION_RESULT,
+        )
+    )
+    try:
+        entity_id = statement_mapping.entity_id
+        with use_entity_shard(entity_id) if entity_id else nullcontext():
+            rows = iter_statement_rows(statement, statement_mapping)
+            for index, (_row, bundle) in enumerate(
+                iter_statement_bundles(rows, statement_mapping, correlation_id=state["correlation_id"])
+            ):
+                # Earlier rows still pass through the iterator so derived
+                # external_ids keep counting identical rows from the top.
+                if index < resume_rows:
+                    continue
+                pending_rows += 1
+                if bundle is None:
+                    state["skipped"] += 1
+                else:
+                    pending.append(bundle)
+                    if len(pending) >= chunk_size:
+                        flush()
+            if pending_rows:
+                flush()
+    except ValueError as exc:
+        # A StatementImportError, or a mapping entity_id with no shard.
+        _die(str(exc))
+    finally:
+        clear_request_security_context(context_token)
+
+    state["complete"] = True
+    if checkpoint_file is not None:
+        _write_checkpoint_file(checkpoint_file, state)
+    sys.stdout.write(json.dumps({"status": "ok", **state, "rows_per_sec": rows_per_sec()}, indent=2) + "\n")
+
+
+# ── ledger archive ────────────────────────────────────────────────────
+
+@ledger_app.command("archive")
+def archive(
+    year: Annotated[int, typer.Option("--year", help="Locked calendar year to move out of the hot database.")],
+    archive_dir: Annotated[
+        Optional[str],
+        typer.Option("--archive-dir", help="Directory for the archive file (default: CAPITAL_OS_ARCHIVE_DIR)."),
+    ] = None,
+    entity_id: Annotated[
+        Optional[str],
+        typer.Option("--entity-id", help="Archive this entity's shard when entity sharding is enabled."),
+    ] = None,
+    db_path: Annotated[
+        Optional[str],
+        typer.Option("--db-path", help="Path to SQLite database file."),
+    ] = None,
+) -> None:
+    """Move a locked year's transactions into a per-year archive database.
+
+    Rows are copied and hash-verified before they are deleted from the hot
+    database; idempotency keys and per-day balance checkpoints stay hot.
+
+    Example:
+
+        capital-os ledger archive --year 2023
+    """
+    configure_db_path(db_path)
+    ensure_db_ready()
+
+    from contextlib import nullcontext
+
+    from capital_os.db.session import use_entity_shard
+    from capital_os.domain.ledger.archive import archive_ledger_year
+
+    try:
+        with use_entity_shard(entity_id) if entity_id else nullcontext():
+            summary = archive_ledger_year(year, archive_dir=archive_dir)
+    except ValueError as exc:
+        _die(str(exc))
+    sys.stdout.write(json.dumps(summary, indent=2) + "\n")
+
+
+# ── ledger copy-events-to-audit ───────────────────────────────────────
+
+@ledger_app.command("copy-events-to-audit")
+def copy_events_to_audit(
+    entity_id: Annotated[
+        Optional[str],
+        typer.Option("--entity-id", help="Copy this entity's shard events when entity sharding is enabled."),
+    ] = None,
+    db_path: Annotated[
+        Optional[str],
+        typer.Option("--db-path", help="Path to SQLite database file."),
+    ] = None,
+) -> None:
+    """Copy event_log rows written before CAPITAL_OS_EVENT_LOG_DB_URL was set into the audit file.
+
+    The ledger file's event_log is append-only, so its rows are copied, not
+    deleted. Rows already in the audit file are skipped, so reruns are safe.
+
+    Example:
+
+        capital-os ledger copy-events-to-audit
+    """
+    configure_db_path(db_path)
+    ensure_db_ready()
+
+    from contextlib import nullcontext
+
+    from capital_os.db.event_log_store import copy_inline_event_log
+    from capital_os.db.session import transaction, use_entity_shard
+    from capital_os.db.writer import run_write
+
+    def copy() -> int:
+        with transaction() as conn:
+            return copy_inline_event_log(conn)
+
+    try:
+        with use_entity_shard(entity_id) if entity_id else nullcontext():
+            copied = run_write(copy)
+    except ValueError as exc:
+        _die(str(exc))
+    sys.stdout.write(json.dumps({"status": "ok", "copied": copied}, indent=2) + "\n")
+
+
+# ── ledger verify-archives ────────────────────────────────────────────
+
+@ledger_app.command("verify-archives")
+def verify_archives(
+    db_path: Annotated[
+        Optional[str],
+        typer.Option("--db-path", help="Path to SQLite database file."),
+    ] = None,
+) -> None:
+    """Re-hash every archive file and check it against the hot checkpoints.
+
+    Exits non-zero and lists every mismatching archive when they differ.
+
+    Example:
+
+        capital-os ledger verify-archives
+    """
+    configure_db_path(db_path)
+    ensure_db_ready()
+
+    from capital_os.domain.ledger.archive import verify_ledger_archives
+
+    try:
+        mismatches = verify_ledger_archives()
+    except sqlite3.Error as exc:
+        _die(f"Could not read archives: {exc}")
+
+    output = {"status": "ok" if not mismatches else "mismatch", "mismatches": mismatches}
+    if mismatches:
+        sys.stderr.write(json.dumps(output, indent=2) + "\n")
+        raise SystemExit(1)
+    sys.stdout.write(json.dumps(output, indent=2) + "\n")
@@ -12,6 +12,14 @@ Examples:
 
     capital-os tool call list_accounts --json '{"correlation_id":"c1"}'
 
+    capital-os ledger verify-balances
+
+    capital-os bench scaling --transactions 1000 --transactions 10000
+
+    capital-os profile list
+
+    capital-os slow-queries top --limit 5
+
     capital-os serve
 """
 
@@ -25,8 +33,12 @@ from typing import Annotated, Optional
 import typer
 from typer import completion
 
+from capital_os.cli.bench import bench_app
 from capital_os.cli.context import configure_db_path, ensure_db_ready
+from capital_os.cli.ledger import ledger_app
+from capital_os.cli.profile import profile_app
 from capital_os.cli.server import server_app
+from capital_os.cli.slow_queries import slow_queries_app
 from capital_os.cli.tool import tool_app
 
 app = typer.Typer(
@@ -39,6 +51,10 @@ app = typer.Typer(
 
 app.add_typer(tool_app, name="tool")
 app.add_typer(server_app, name="serve")
+app.add_typer(ledger_app, name="ledger")
+app.add_typer(bench_app, name="bench")
+app.add_typer(profile_app, name="profile")
+app.add_typer(slow_queries_app, name="slow-queries")
 
 
 @app.callback()
@@ -0,0 +1,74 @@
+"""CLI commands for captured tool-call profiles."""
+
+from __future__ import annotations
+
+import json
+import sys
+from typing import Annotated, Optional
+
+import typer
+
+from capital_os.cli.context import _die, configure_db_path
+
+profile_app = typer.Typer(
+    name="profile",
+    help="List and summarize captured tool-call profiles.",
+    no_args_is_help=True,
+)
+
+
+# ── profile list ──────────────────────────────────────────────────────
+
+@profile_app.command("list")
+def list_captured(
+    limit: Annotated[int, typer.Option("--limit", help="Show at most this many profiles, newest first.")] = 50,
+    db_path: Annotated[
+        Optional[str],
+        typer.Option("--db-path", help="Path to SQLite database file."),
+    ] = None,
+) -> None:
+    """List captured profiles with their tool, correlation id and total time.
+
+    Example:
+
+        capital-os profile list --limit 10
+    """
+    configure_db_path(db_path)
+
+    from capital_os.observability.profiling import list_profiles, profile_output_dir
+
+    profiles = list_profiles()
+    output = {"directory": str(profile_output_dir()), "count": len(profiles), "profiles": profiles[:limit]}
+    sys.stdout.write(json.dumps(output, indent=2) + "\n")
+
+
+# ── profile show ──────────────────────────────────────────────────────
+
+@profile_app.command("show")
+def show(
+    key: Annotated[str, typer.Argument(help="Correlation id or profile file name.")],
+    sort: Annotated[str, typer.Option("--sort", help="cumulative | tottime | calls")] = "cumulative",
+    limit: Annotated[int, typer.Option("--limit", help="Number of functions to show.")] = 20,
+    db_path: Annotated[
+        Optional[str],
+        typer.Option("--db-path", help="Path to SQLite database file."),
+    ] = None,
+) -> None:
+    """Summarize the newest profile for a correlation id: its top functions.
+
+    Example:
+
+        capital-os profile show corr-slow-123 --sort tottime
+    """
+    configure_db_path(db_path)
+
+    from capital_os.observability.profiling import find_profile, summarize_profile
+
+    path = find_profile(key)
+    if path is None:
+        _die(f"No profile found for: {key}")
+    try:
+        summary = summarize_profile(path, sort=sort, limit=limit)
+    except ValueError as exc:
+        _die(str(exc))
+    sys.stdout.write(json.dumps(summary, indent=2) + "\n")
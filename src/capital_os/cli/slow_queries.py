@@ -0,0 +1,54 @@
+"""CLI commands for the slow-query log."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import sys
+from typing import Annotated, Optional
+
+import typer
+
+from capital_os.cli.context import _die, configure_db_path
+
+slow_queries_app = typer.Typer(
+    name="slow-queries",
+    help="Report on statements recorded by the slow-query log.",
+    no_args_is_help=True,
+)
+
+
+# ── slow-queries top ──────────────────────────────────────────────────
+
+@slow_queries_app.command("top")
+def top(
+    limit: Annotated[int, typer.Option("--limit", help="Number of queries to show.")] = 10,
+    sort: Annotated[str, typer.Option("--sort", help="total | max | count")] = "total",
+    log: Annotated[
+        Optional[str],
+        typer.Option("--log", help="Slow-query log file (default: CAPITAL_OS_SLOW_QUERY_LOG or <db file>.slow-queries.jsonl)."),
+    ] = None,
+    db_path: Annotated[
+        Optional[str],
+        typer.Option("--db-path", help="Path to SQLite database file."),
+    ] = None,
+) -> None:
+    """Group logged statements by normalized SQL and rank them.
+
+    Rotated files are included.
+
+    Example:
+
+        capital-os slow-queries top --limit 5 --sort max
+    """
+    configure_db_path(db_path)
+
+    from capital_os.db.slow_query_log import slow_query_log_path, top_slow_queries
+
+    path = Path(log) if log else slow_query_log_path()
+    try:
+        queries = top_slow_queries(limit=limit, sort=sort, path=path)
+    except ValueError as exc:
+        _die(str(exc))
+    output = {"log": str(path), "sort": sort, "queries": queries}
+    sys.stdout.write(json.dumps(output, indent=2) + "\n")
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from contextlib import nullcontext
 import json
 import sys
 from typing import Annotated, NoReturn, Optional
@@ -20,6 +21,7 @@ from capital_os.runtime.execute_tool import (
     execute_tool,
     tool_names,
 )
+from capital_os.observability.profiling import profile_requested
 
 tool_app = typer.Typer(
     name="tool",
@@ -129,6 +131,10 @@ def tool_call(
         Optional[str],
         typer.Option("--db-path", help="Path to SQLite database file."),
     ] = None,
+    profile: Annotated[
+        bool,
+        typer.Option("--profile", help="Capture a cProfile dump of this call (see `capital-os profile`)."),
+    ] = False,
 ) -> None:
     """Invoke a Capital OS tool locally (trusted channel).
 
@@ -139,18 +145,21 @@ def tool_call(
         capital-os tool call create_account --json @payload.json
 
         echo '{"correlation_id":"c1"}' | capital-os tool call list_accounts
+
+        capital-os tool call list_accounts --profile --json '{"correlation_id":"c1"}'
     """
     configure_db_path(db_path)
 
     payload = _resolve_payload(json_payload)
 
-    result = execute_tool(
-        tool_name,
-        payload,
-        actor_id=CLI_ACTOR_ID,
-        authn_method=CLI_AUTHN_METHOD,
-        authorization_result=CLI_AUTHORIZATION_RESULT,
-    )
+    with profile_requested() if profile else nullcontext():
+        result = execute_tool(
+            tool_name,
+            payload,
+            actor_id=CLI_ACTOR_ID,
+            authn_method=CLI_AUTHN_METHOD,
+            authorization_result=CLI_AUTHORIZATION_RESULT,
+        )
 
     if result.success:
         sys.stdout.write(json.dumps(result.payload, indent=2) + "\n")
@@ -25,6 +25,7 @@ DEFAULT_TOOL_CAPABILITIES = {
     "update_account_metadata": "tools:write",
     "update_account_profile": "tools:write",
     "record_transaction_bundle": "tools:write",
+    "record_transaction_bundles": "tools:write",
     "record_balance_snapshot": "tools:write",
     "create_or_update_obligation": "tools:write",
     "fulfill_obligation": "tools:write",
@@ -37,6 +38,7 @@ DEFAULT_TOOL_CAPABILITIES = {
     "list_accounts": "tools:read",
     "get_account_tree": "tools:read",
     "get_account_balances": "tools:read",
+    "get_account_balance_series": "tools:read",
     "list_transactions": "tools:read",
     "get_transaction_by_external_id": "tools:read",
     "list_obligations": "tools:read",
@@ -48,6 +50,7 @@ DEFAULT_TOOL_CAPABILITIES = {
     "reconcile_account": "tools:read",
     "close_period": "tools:write",
     "lock_period": "tools:write",
+    "export_ledger": "tools:read",
 }
 
 
@@ -61,6 +64,26 @@ def _normalize_balance_source_policy(raw_value: str) -> str:
     return value
 
 
+SQLITE_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+def _normalize_synchronous(raw_value: str) -> str:
+    value = raw_value.strip().upper()
+    if value not in SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError("CAPITAL_OS_EVENT_LOG_SYNCHRONOUS must be one of OFF|NORMAL|FULL|EXTRA")
+    return value
+
+
+TRACE_FORMATS = {"jsonl", "otlp"}
+
+
+def _normalize_trace_format(raw_value: str) -> str:
+    value = raw_value.strip().lower()
+    if value not in TRACE_FORMATS:
+        raise ValueError("CAPITAL_OS_TRACE_FORMAT must be one of jsonl|otlp")
+    return value
+
+
 @dataclass(frozen=True)
 class Settings:
     app_env: str
@@ -70,6 +93,111 @@ class Settings:
     balance_source_policy: str = "best_available"
     token_identities: dict[str, dict[str, object]] | None = None
     tool_capabilities: dict[str, str] | None = None
+    db_pool_readers: int = 8
+    db_pool_writers: int = 4
+    db_pool_timeout_seconds: float = 5.0
+    write_queue_enabled: bool = True
+    write_batch_max: int = 64
+    write_queue_max: int = 1024
+    api_read_workers: int = 8
+    api_write_workers: int = 8
+    api_lane_queue_max: int = 64
+    api_retry_after_seconds: int = 1
+    idempotency_cache_enabled: bool = True
+    idempotency_cache_size: int = 4096
+    idempotency_bloom_enabled: bool = False
+    idempotency_bloom_capacity: int = 100_000
+    db_shard_dir: str | None = None
+    archive_dir: str | None = None
+    event_log_async: bool = False
+    event_log_buffer_size: int = 10_000
+    event_log_batch_max: int = 256
+    event_log_flush_ms: int = 250
+    event_log_spill_path: str | None = None
+    event_log_db_url: str | None = None
+    event_log_synchronous: str = "NORMAL"
+    event_log_journal_size_limit: int = 64 * 1024 * 1024
+    event_log_checkpoint_seconds: float = 30.0
+    metrics_enabled: bool = True
+    metrics_dir: str | None = None
+    trace_enabled: bool = False
+    trace_path: str | None = None
+    trace_format: str = "jsonl"
+    profile_enabled: bool = False
+    profile_sample_rate: float = 0.0
+    profile_dir: str | None = None
+    profile_max_files: int = 200
+    slow_query_ms: float | None = None
+    slow_query_log: str | None = None
+    slow_query_log_max_bytes: int = 10 * 1024 * 1024
+    slow_query_log_backups: int = 5
+
+
+def _parse_positive_int(raw_value: str | None, *, env_name: str, default: int) -> int:
+    if raw_value is None or not raw_value.strip():
+        return default
+    try:
+        value = int(raw_value)
+    except ValueError as exc:
+        raise ValueError(f"{env_name} must be an integer") from exc
+    if value < 1:
+        raise ValueError(f"{env_name} must be >= 1")
+    return value
+
+
+def _parse_positive_float(raw_value: str | None, *, env_name: str, default: float) -> float:
+    if raw_value is None or not raw_value.strip():
+        return default
+    try:
+        value = float(raw_value)
+    except ValueError as exc:
+        raise ValueError(f"{env_name} must be a number") from exc
+    if value <= 0:
+        raise ValueError(f"{env_name} must be > 0")
+    return value
+
+
+def _parse_sample_rate(raw_value: str | None, *, env_name: str) -> float:
+    if raw_value is None or not raw_value.strip():
+        return 0.0
+    try:
+        value = float(raw_value)
+    except ValueError as exc:
+        raise ValueError(f"{env_name} must be a number") from exc
+    if not 0.0 <= value <= 1.0:
+        raise ValueError(f"{env_name} must be between 0 and 1")
+    return value
+
+
+def _parse_threshold_ms(raw_value: str | None, *, env_name: str) -> float | None:
+    if raw_value is None or not raw_value.strip():
+        return None
+    try:
+        value = float(raw_value)
+    except ValueError as exc:
+        raise ValueError(f"{env_name} must be a number") from exc
+    if value < 0:
+        raise ValueError(f"{env_name} must be >= 0")
+    return value
+
+
+def _parse_bool(raw_value: str | None, *, env_name: str, default: bool) -> bool:
+    if raw_value is None or not raw_value.strip():
+        return default
+    value = raw_value.strip().lower()
+    if value in {"1", "true", "yes", "on"}:
+        return True
+    if value in {"0", "false", "no", "off"}:
+        return False
+    raise ValueError(f"{env_name} must be a boolean (1|0|true|false)")
+
+
+def _parse_sqlite_url(raw_value: str | None, *, env_name: str) -> str | None:
+    if raw_value is None or not raw_value.strip():
+        return None
+    if not raw_value.startswith("sqlite:///") or raw_value == "sqlite:///":
+        raise ValueError(f"{env_name} must be a sqlite:///path URL")
+    return raw_value
 
 
 def _parse_json_mapping(raw_value: str, *, env_name: str) -> dict:
@@ -136,4 +264,104 @@ def get_settings() -> Settings:
         balance_source_policy=balance_source_policy,
         token_identities=_load_token_identities(),
         tool_capabilities=_load_tool_capabilities(),
+        db_pool_readers=_parse_positive_int(
+            os.getenv("CAPITAL_OS_DB_POOL_READERS"), env_name="CAPITAL_OS_DB_POOL_READERS", default=8
+        ),
+        db_pool_writers=_parse_positive_int(
+            os.getenv("CAPITAL_OS_DB_POOL_WRITERS"), env_name="CAPITAL_OS_DB_POOL_WRITERS", default=4
+        ),
+        db_pool_timeout_seconds=_parse_positive_float(
+            os.getenv("CAPITAL_OS_DB_POOL_TIMEOUT_SECONDS"),
+            env_name="CAPITAL_OS_DB_POOL_TIMEOUT_SECONDS",
+            default=5.0,
+        ),
+        write_queue_enabled=_parse_bool(
+            os.getenv("CAPITAL_OS_WRITE_QUEUE"), env_name="CAPITAL_OS_WRITE_QUEUE", default=True
+        ),
+        write_batch_max=_parse_positive_int(
+            os.getenv("CAPITAL_OS_WRITE_BATCH_MAX"), env_name="CAPITAL_OS_WRITE_BATCH_MAX", default=64
+        ),
+        write_queue_max=_parse_positive_int(
+            os.getenv("CAPITAL_OS_WRITE_QUEUE_MAX"), env_name="CAPITAL_OS_WRITE_QUEUE_MAX", default=1024
+        ),
+        api_read_workers=_parse_positive_int(
+            os.getenv("CAPITAL_OS_API_READ_WORKERS"), env_name="CAPITAL_OS_API_READ_WORKERS", default=8
+        ),
+        api_write_workers=_parse_positive_int(
+            os.getenv("CAPITAL_OS_API_WRITE_WORKERS"), env_name="CAPITAL_OS_API_WRITE_WORKERS", default=8
+        ),
+        api_lane_queue_max=_parse_positive_int(
+            os.getenv("CAPITAL_OS_API_LANE_QUEUE_MAX"), env_name="CAPITAL_OS_API_LANE_QUEUE_MAX", default=64
+        ),
+        api_retry_after_seconds=_parse_positive_int(
+            os.getenv("CAPITAL_OS_API_RETRY_AFTER_SECONDS"),
+            env_name="CAPITAL_OS_API_RETRY_AFTER_SECONDS",
+            default=1,
+        ),
+        idempotency_cache_enabled=_parse_bool(
+            os.getenv("CAPITAL_OS_IDEMPOTENCY_CACHE"), env_name="CAPITAL_OS_IDEMPOTENCY_CACHE", default=True
+        ),
+        idempotency_cache_size=_parse_positive_int(
+            os.getenv("CAPITAL_OS_IDEMPOTENCY_CACHE_SIZE"), env_name="CAPITAL_OS_IDEMPOTENCY_CACHE_SIZE", default=4096
+        ),
+        idempotency_bloom_enabled=_parse_bool(
+            os.getenv("CAPITAL_OS_IDEMPOTENCY_BLOOM"), env_name="CAPITAL_OS_IDEMPOTENCY_BLOOM", default=False
+        ),
+        idempotency_bloom_capacity=_parse_positive_int(
+            os.getenv("CAPITAL_OS_IDEMPOTENCY_BLOOM_CAPACITY"),
+            env_name="CAPITAL_OS_IDEMPOTENCY_BLOOM_CAPACITY",
+            default=100_000,
+        ),
+        db_shard_dir=os.getenv("CAPITAL_OS_DB_SHARD_DIR") or None,
+        archive_dir=os.getenv("CAPITAL_OS_ARCHIVE_DIR") or None,
+        event_log_async=_parse_bool(
+            os.getenv("CAPITAL_OS_EVENT_LOG_ASYNC"), env_name="CAPITAL_OS_EVENT_LOG_ASYNC", default=False
+        ),
+        event_log_buffer_size=_parse_positive_int(
+            os.getenv("CAPITAL_OS_EVENT_LOG_BUFFER_SIZE"), env_name="CAPITAL_OS_EVENT_LOG_BUFFER_SIZE", default=10_000
+        ),
+        event_log_batch_max=_parse_positive_int(
+            os.getenv("CAPITAL_OS_EVENT_LOG_BATCH_MAX"), env_name="CAPITAL_OS_EVENT_LOG_BATCH_MAX", default=256
+        ),
+        event_log_flush_ms=_parse_positive_int(
+            os.getenv("CAPITAL_OS_EVENT_LOG_FLUSH_MS"), env_name="CAPITAL_OS_EVENT_LOG_FLUSH_MS", default=250
+        ),
+        event_log_spill_path=os.getenv("CAPITAL_OS_EVENT_LOG_SPILL_PATH") or None,
+        event_log_db_url=_parse_sqlite_url(
+            os.getenv("CAPITAL_OS_EVENT_LOG_DB_URL"), env_name="CAPITAL_OS_EVENT_LOG_DB_URL"
+        ),
+        event_log_synchronous=_normalize_synchronous(os.getenv("CAPITAL_OS_EVENT_LOG_SYNCHRONOUS", "NORMAL")),
+        event_log_journal_size_limit=_parse_positive_int(
+            os.getenv("CAPITAL_OS_EVENT_LOG_JOURNAL_SIZE_LIMIT"),
+            env_name="CAPITAL_OS_EVENT_LOG_JOURNAL_SIZE_LIMIT",
+            default=64 * 1024 * 1024,
+        ),
+        event_log_checkpoint_seconds=_parse_positive_float(
+            os.getenv("CAPITAL_OS_EVENT_LOG_CHECKPOINT_SECONDS"),
+            env_name="CAPITAL_OS_EVENT_LOG_CHECKPOINT_SECONDS",
+            default=30.0,
+        ),
+        metrics_enabled=_parse_bool(os.getenv("CAPITAL_OS_METRICS"), env_name="CAPITAL_OS_METRICS", default=True),
+        metrics_dir=os.getenv("CAPITAL_OS_METRICS_DIR") or None,
+        trace_enabled=_parse_bool(os.getenv("CAPITAL_OS_TRACE"), env_name="CAPITAL_OS_TRACE", default=False),
+        trace_path=os.getenv("CAPITAL_OS_TRACE_PATH") or None,
+        trace_format=_normalize_trace_format(os.getenv("CAPITAL_OS_TRACE_FORMAT", "jsonl")),
+        profile_enabled=_parse_bool(os.getenv("CAPITAL_OS_PROFILE"), env_name="CAPITAL_OS_PROFILE", default=False),
+        profile_sample_rate=_parse_sample_rate(
+            os.getenv("CAPITAL_OS_PROFILE_SAMPLE_RATE"), env_name="CAPITAL_OS_PROFILE_SAMPLE_RATE"
+        ),
+        profile_dir=os.getenv("CAPITAL_OS_PROFILE_DIR") or None,
+        profile_max_files=_parse_positive_int(
+            os.getenv("CAPITAL_OS_PROFILE_MAX_FILES"), env_name="CAPITAL_OS_PROFILE_MAX_FILES", default=200
+        ),
+        slow_query_ms=_parse_threshold_ms(os.getenv("CAPITAL_OS_SLOW_QUERY_MS"), env_name="CAPITAL_OS_SLOW_QUERY_MS"),
+        slow_query_log=os.getenv("CAPITAL_OS_SLOW_QUERY_LOG") or None,
+        slow_query_log_max_bytes=_parse_positive_int(
+            os.getenv("CAPITAL_OS_SLOW_QUERY_LOG_MAX_BYTES"),
+            env_name="CAPITAL_OS_SLOW_QUERY_LOG_MAX_BYTES",
+            default=10 * 1024 * 1024,
+        ),
+        slow_query_log_backups=_parse_positive_int(
+            os.getenv("CAPITAL_OS_SLOW_QUERY_LOG_BACKUPS"), env_name="CAPITAL_OS_SLOW_QUERY_LOG_BACKUPS", default=5
+        ),
     )
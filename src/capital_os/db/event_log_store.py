@@ -0,0 +1,189 @@
+"""Optional dedicated SQLite file for ``event_log``.
+
+With ``CAPITAL_OS_EVENT_LOG_DB_URL`` set, every pooled connection ATTACHes
+that file as the ``audit`` schema and events are written to
+``audit.event_log`` instead of the ledger file.  Audit rows then grow their
+own file, WAL and checkpoints instead of the ledger's.  Shard databases use
+a sibling ``<shard>-events.db`` so shards stay independent.
+
+Write tools still log in the same transaction as their ledger rows, so an
+event-log failure rolls the ledger change back (fail closed).  SQLite commits
+a transaction that spans WAL-mode files atomically per file only: errors
+roll back both files, but a crash in the middle of the commit can keep one
+file's rows without the other's.
+
+The audit table is not defined here.  It is copied from the migrated ledger
+file: ``event_log`` and its indexes and triggers are created from the
+ledger's ``sqlite_master`` SQL, so ``migrations/`` stays the only schema
+definition.  Indexes and triggers added by later migrations are created in
+an existing audit file on the next start.  A column change is not: opening
+an audit file whose ``event_log`` columns differ from the ledger's raises
+``EventLogSchemaError`` instead of writing rows that no longer match.
+
+Rows written before the setting was enabled stay in the ledger's
+append-only ``event_log``; ``copy_inline_event_log`` (``capital-os ledger
+copy-events-to-audit``) copies them into the audit file.
+
+The audit schema is tuned separately: ``synchronous`` and
+``journal_size_limit`` are per-file pragmas, and the audit WAL is folded by a
+passive checkpoint at most every ``CAPITAL_OS_EVENT_LOG_CHECKPOINT_SECONDS``
+after a commit, in addition to SQLite's connection-wide auto-checkpoint.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import sqlite3
+import threading
+from time import monotonic
+
+from capital_os.config import get_settings
+
+
+EVENT_LOG_SCHEMA = "audit"
+
+
+class EventLogSchemaError(RuntimeError):
+    """The audit file's ``event_log`` no longer matches the migrated ledger's."""
+
+_READY: set[str] = set()
+_READY_LOCK = threading.Lock()
+_LAST_CHECKPOINT: dict[str, float] = {}
+
+
+def _reset_after_fork() -> None:
+    global _READY, _READY_LOCK, _LAST_CHECKPOINT
+    _READY = set()
+    _READY_LOCK = threading.Lock()
+    _LAST_CHECKPOINT = {}
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def event_log_separate() -> bool:
+    return get_settings().event_log_db_url is not None
+
+
+def event_log_table() -> str:
+    """Qualified name to write events to on a pooled connection."""
+    return f"{EVENT_LOG_SCHEMA}.event_log" if event_log_separate() else "event_log"
+
+
+def event_log_db_path(db_path: str) -> str | None:
+    """Event-log file for the ledger file *db_path*, or None when events stay inline."""
+    settings = get_settings()
+    if settings.event_log_db_url is None:
+        return None
+    catalog = Path(settings.db_url.removeprefix("sqlite:///"))
+    if Path(db_path).resolve() == catalog.resolve():
+        return settings.event_log_db_url.removeprefix("sqlite:///")
+    path = Path(db_path)
+    return str(path.with_name(f"{path.stem}-events{path.suffix}"))
+
+
+def _event_log_objects(conn: sqlite3.Connection, schema: str) -> dict[str, tuple[str, str]]:
+    """``name -> (type, sql)`` of ``event_log`` and its indexes and triggers, in creation order."""
+    rows = conn.execute(
+        f"SELECT type, name, sql FROM {schema}.sqlite_master WHERE tbl_name = 'event_log' AND sql IS NOT NULL"
+        " ORDER BY type <> 'table', rowid"
+    ).fetchall()
+    return {name: (object_type, sql) for object_type, name, sql in rows}
+
+
+def _event_log_columns(conn: sqlite3.Connection, schema: str) -> list[tuple]:
+    """``(name, type, notnull, default, pk)`` per column, in table order."""
+    return [tuple(row[1:]) for row in conn.execute(f"PRAGMA {schema}.table_info(event_log)")]
+
+
+def _ensure_event_log_db(events_path: str, db_path: str) -> None:
+    if events_path in _READY:
+        return
+    with _READY_LOCK:
+        if events_path in _READY:
+            return
+        Path(events_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(events_path, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA busy_timeout = 5000")
+            conn.execute("ATTACH DATABASE ? AS ledger", (db_path,))
+            source = _event_log_objects(conn, "ledger")
+            if "event_log" not in source:
+                # Not migrated yet; retried on the next connection.
+                return
+            # Workers starting together serialize on the audit file's lock.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                existing = _event_log_objects(conn, "main")
+                if "event_log" in existing:
+                    audit_columns = _event_log_columns(conn, "main")
+                    ledger_columns = _event_log_columns(conn, "ledger")
+                    if audit_columns != ledger_columns:
+                        raise EventLogSchemaError(
+                            f"event_log in {events_path} does not match the migrated schema of {db_path}: "
+                            f"audit columns {[column[0] for column in audit_columns]}, "
+                            f"ledger columns {[column[0] for column in ledger_columns]}"
+                        )
+                for name, (_object_type, sql) in source.items():
+                    if name not in existing:
+                        conn.execute(sql)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+        _READY.add(events_path)
+
+
+def attach_event_log(conn: sqlite3.Connection, db_path: str) -> None:
+    """ATTACH and tune the event-log file of *db_path* on a fresh connection."""
+    events_path = event_log_db_path(db_path)
+    if events_path is None:
+        return
+    settings = get_settings()
+    _ensure_event_log_db(events_path, db_path)
+    conn.execute(f"ATTACH DATABASE ? AS {EVENT_LOG_SCHEMA}", (events_path,))
+    conn.execute(f"PRAGMA {EVENT_LOG_SCHEMA}.journal_mode = WAL")
+    conn.execute(f"PRAGMA {EVENT_LOG_SCHEMA}.synchronous = {settings.event_log_synchronous}")
+    conn.execute(f"PRAGMA {EVENT_LOG_SCHEMA}.journal_size_limit = {settings.event_log_journal_size_limit}")
+
+
+def copy_inline_event_log(conn: sqlite3.Connection) -> int:
+    """Copy the ledger file's own ``event_log`` rows into the audit file.
+
+    Returns the number of rows copied.  Rows already present (same
+    ``event_id``) are skipped, so reruns copy only what is new.  The ledger
+    table is append-only, so its rows are left in place.
+    """
+    if not event_log_separate():
+        raise ValueError("CAPITAL_OS_EVENT_LOG_DB_URL is not set; events are already in the ledger file")
+    columns = ", ".join(column[0] for column in _event_log_columns(conn, "main"))
+    cursor = conn.execute(
+        f"INSERT OR IGNORE INTO {EVENT_LOG_SCHEMA}.event_log ({columns}) SELECT {columns} FROM main.event_log"
+    )
+    return cursor.rowcount
+
+
+def checkpoint_event_log_if_due(conn: sqlite3.Connection, db_path: str) -> None:
+    """Fold the audit WAL after a commit once its checkpoint interval has passed."""
+    settings = get_settings()
+    if settings.event_log_db_url is None:
+        return
+    now = monotonic()
+    if now - _LAST_CHECKPOINT.get(db_path, 0.0) < settings.event_log_checkpoint_seconds:
+        return
+    _LAST_CHECKPOINT[db_path] = now
+    try:
+        conn.execute(f"PRAGMA {EVENT_LOG_SCHEMA}.wal_checkpoint(PASSIVE)").fetchall()
+    except sqlite3.OperationalError:
+        # A busy checkpoint is retried at the next interval.
+        pass
+
+
+def clear_event_log_state() -> None:
+    with _READY_LOCK:
+        _READY.clear()
+        _LAST_CHECKPOINT.clear()
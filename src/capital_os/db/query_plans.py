@@ -0,0 +1,382 @@
+"""Registry of hot repository queries and the plans they are expected to use.
+
+Each ``QueryPlanCase`` runs real repository code against a seeded database
+(inside a savepoint that is rolled back) and captures the statements it
+issues with SQLite's trace callback.  ``check_query_plans`` runs
+``EXPLAIN QUERY PLAN`` on every captured read and reports:
+
+- ``missing_index``: a ``(table, index)`` pair the case must use appears in
+  none of its plans;
+- ``full_scan``: a plan step scans a large table without an index.  Cases
+  that legitimately read a whole table list it in ``allow_scans``.
+
+Index names are as SQLite prints them (``sqlite_autoindex_*`` for UNIQUE
+constraints, ``PRIMARY KEY`` for WITHOUT ROWID tables); a tuple accepts any
+of several equivalent indexes.  Plans depend on ``sqlite_stat1``, so run ``ANALYZE`` on the seeded
+database first.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal
+import re
+import sqlite3
+from typing import Any, Callable, Mapping
+
+from capital_os.domain.approval import repository as approval_repository
+from capital_os.domain.ledger import repository as ledger_repository
+from capital_os.domain.ledger.invariants import to_minor_units
+from capital_os.domain.periods import service as periods_service
+from capital_os.domain.policy import service as policy_service
+
+
+# Tables expected to grow with ledger volume; an unindexed scan of any of
+# them is a regression unless the case allows it.
+LARGE_TABLES = frozenset(
+    {
+        "accounts",
+        "account_closure",
+        "account_daily_balances",
+        "account_identifier_history",
+        "approval_decisions",
+        "approval_proposals",
+        "balance_snapshots",
+        "event_log",
+        "ledger_posting_fingerprints",
+        "ledger_postings",
+        "ledger_transactions",
+        "obligations",
+    }
+)
+
+# Keys a seeded database must provide for the cases below.
+FIXTURE_KEYS = (
+    "account_id",
+    "root_account_id",
+    "counter_account_id",
+    "source_system",
+    "external_id",
+    "transaction_date",
+    "amount",
+    "proposal_id",
+    "approver_id",
+    "proposal_source_system",
+    "proposal_external_id",
+    "period_date",
+    "as_of_date",
+    "start_date",
+    "end_date",
+)
+
+
+@dataclass(frozen=True)
+class QueryPlanCase:
+    name: str
+    run: Callable[[sqlite3.Connection, Mapping[str, Any]], object]
+    uses: tuple[tuple[str, str | tuple[str, ...]], ...]
+    allow_scans: tuple[str, ...] = ()
+
+
+def _velocity_rule() -> policy_service.PolicyRule:
+    return policy_service.PolicyRule(
+        rule_id="query-plan-velocity",
+        priority=1,
+        tool_name=None,
+        entity_id=None,
+        transaction_category=None,
+        risk_band=None,
+        velocity_limit_count=1_000_000,
+        velocity_window_seconds=86_400,
+        threshold_amount=Decimal("1000000.0000"),
+        required_approvals=1,
+    )
+
+
+def _duplicate_postings(fx: Mapping[str, Any]) -> list[dict[str, Any]]:
+    return [
+        {"account_id": fx["account_id"], "amount": fx["amount"], "currency": "USD"},
+        {"account_id": fx["counter_account_id"], "amount": f"-{fx['amount']}", "currency": "USD"},
+    ]
+
+
+# The UNIQUE (source_system, external_id) constraint and 0007's index cover the
+# same columns; the planner may pick either.
+_EXTERNAL_KEY = ("sqlite_autoindex_ledger_transactions_2", "idx_ledger_transactions_source_external")
+
+
+QUERY_PLAN_CASES: tuple[QueryPlanCase, ...] = (
+    # --- ledger.repository ---------------------------------------------------
+    QueryPlanCase(
+        "ledger.fetch_transaction_by_external_id",
+        lambda conn, fx: ledger_repository.fetch_transaction_by_external_id(
+            conn, fx["source_system"], fx["external_id"]
+        ),
+        uses=(("ledger_transactions", _EXTERNAL_KEY),),
+    ),
+    QueryPlanCase(
+        "ledger.fetch_transactions_by_external_ids",
+        lambda conn, fx: ledger_repository.fetch_transactions_by_external_ids(
+            conn, [(fx["source_system"], fx["external_id"]), (fx["source_system"], "missing")]
+        ),
+        uses=(("ledger_transactions", _EXTERNAL_KEY),),
+    ),
+    QueryPlanCase(
+        "ledger.find_duplicate_risk_matches",
+        lambda conn, fx: ledger_repository.find_duplicate_risk_matches(
+            conn, effective_date=fx["transaction_date"], postings=_duplicate_postings(fx)
+        ),
+        uses=(
+            ("ledger_posting_fingerprints", "PRIMARY KEY"),
+            ("ledger_transactions", "sqlite_autoindex_ledger_transactions_1"),
+            ("ledger_postings", "idx_ledger_postings_transaction_account"),
+        ),
+    ),
+    QueryPlanCase(
+        "ledger.find_duplicate_risk_candidates",
+        lambda conn, fx: ledger_repository.find_duplicate_risk_candidates(
+            conn, posting_keys=[(fx["transaction_date"], fx["account_id"], to_minor_units(fx["amount"]))]
+        ),
+        uses=(
+            ("ledger_posting_fingerprints", "PRIMARY KEY"),
+            ("ledger_transactions", "sqlite_autoindex_ledger_transactions_1"),
+        ),
+    ),
+    QueryPlanCase(
+        "ledger.list_accounts_page",
+        lambda conn, fx: ledger_repository.list_accounts_page(
+            conn, limit=50, cursor={"code": "1000", "account_id": fx["account_id"]}
+        ),
+        uses=(("accounts", "idx_accounts_code_account_id"),),
+    ),
+    QueryPlanCase(
+        "ledger.list_accounts_subtree",
+        lambda conn, fx: ledger_repository.list_accounts_subtree(conn, fx["root_account_id"]),
+        uses=(("account_closure", "PRIMARY KEY"), ("accounts", "sqlite_autoindex_accounts_1")),
+    ),
+    QueryPlanCase(
+        "ledger.fetch_account_tree_rows",
+        lambda conn, fx: ledger_repository.fetch_account_tree_rows(
+            conn, fx["root_account_id"], as_of_date=fx["as_of_date"]
+        ),
+        uses=(
+            ("account_closure", "PRIMARY KEY"),
+            ("account_closure", "idx_account_closure_descendant"),
+            ("account_daily_balances", "PRIMARY KEY"),
+        ),
+    ),
+    QueryPlanCase(
+        "ledger.fetch_account_balance_context",
+        lambda conn, fx: ledger_repository.fetch_account_balance_context(
+            conn, account_id=fx["account_id"], as_of_date=fx["as_of_date"]
+        ),
+        uses=(
+            ("account_daily_balances", "PRIMARY KEY"),
+            ("balance_snapshots", "idx_balance_snapshots_account_date"),
+        ),
+    ),
+    QueryPlanCase(
+        "ledger.fetch_account_balances_as_of",
+        lambda conn, fx: ledger_repository.fetch_account_balances_as_of(
+            conn, as_of_date=fx["as_of_date"], source_policy="best_available"
+        ),
+        uses=(("account_daily_balances", "PRIMARY KEY"),),
+        # Reports every account and ranks every snapshot up to the date.
+        allow_scans=("accounts", "balance_snapshots"),
+    ),
+    QueryPlanCase(
+        "ledger.fetch_account_daily_balances",
+        lambda conn, fx: ledger_repository.fetch_account_daily_balances(
+            conn, account_id=fx["account_id"], start_date=fx["start_date"], end_date=fx["end_date"]
+        ),
+        uses=(("account_daily_balances", "PRIMARY KEY"),),
+    ),
+    QueryPlanCase(
+        "ledger.list_transactions_page",
+        lambda conn, fx: ledger_repository.list_transactions_page(
+            conn,
+            limit=50,
+            cursor={"transaction_date": fx["transaction_date"], "transaction_id": "00000000-0000-0000-0000-000000000000"},
+        ),
+        uses=(
+            ("ledger_transactions", "idx_ledger_transactions_date_desc_id"),
+            ("ledger_postings", "idx_ledger_postings_transaction_account"),
+        ),
+    ),
+    QueryPlanCase(
+        "ledger.fetch_transaction_with_postings_by_external_id",
+        lambda conn, fx: ledger_repository.fetch_transaction_with_postings_by_external_id(
+            conn, source_system=fx["source_system"], external_id=fx["external_id"]
+        ),
+        uses=(
+            ("ledger_transactions", _EXTERNAL_KEY),
+            ("ledger_postings", "idx_ledger_postings_transaction_account"),
+        ),
+    ),
+    QueryPlanCase(
+        "ledger.list_obligations_page",
+        lambda conn, fx: ledger_repository.list_obligations_page(conn, limit=50, cursor=None, active_only=True),
+        uses=(("obligations", "idx_obligations_due_id_active"),),
+    ),
+    QueryPlanCase(
+        "ledger.list_proposals_page",
+        lambda conn, fx: ledger_repository.list_proposals_page(conn, limit=50, cursor=None, status="proposed"),
+        uses=(("approval_proposals", "idx_approval_proposals_created_id_status"),),
+    ),
+    QueryPlanCase(
+        "ledger.fetch_proposal_with_decisions",
+        lambda conn, fx: ledger_repository.fetch_proposal_with_decisions(conn, proposal_id=fx["proposal_id"]),
+        uses=(
+            ("approval_proposals", "sqlite_autoindex_approval_proposals_1"),
+            ("approval_decisions", "idx_approval_decisions_proposal_created"),
+        ),
+    ),
+    # --- approval.repository -------------------------------------------------
+    QueryPlanCase(
+        "approval.fetch_proposal_by_source_external",
+        lambda conn, fx: approval_repository.fetch_proposal_by_source_external(
+            conn,
+            tool_name="record_transaction_bundle",
+            source_system=fx["proposal_source_system"],
+            external_id=fx["proposal_external_id"],
+        ),
+        uses=(("approval_proposals", "sqlite_autoindex_approval_proposals_2"),),
+    ),
+    QueryPlanCase(
+        "approval.fetch_proposal_by_id",
+        lambda conn, fx: approval_repository.fetch_proposal_by_id(conn, fx["proposal_id"]),
+        uses=(("approval_proposals", "sqlite_autoindex_approval_proposals_1"),),
+    ),
+    QueryPlanCase(
+        "approval.has_approver_decision",
+        lambda conn, fx: approval_repository.has_approver_decision(
+            conn, proposal_id=fx["proposal_id"], action="approve", approver_id=fx["approver_id"]
+        ),
+        uses=(("approval_decisions", "idx_approval_decisions_distinct_approver"),),
+    ),
+    QueryPlanCase(
+        "approval.count_distinct_approvers",
+        lambda conn, fx: approval_repository.count_distinct_approvers(
+            conn, proposal_id=fx["proposal_id"], action="approve"
+        ),
+        uses=(("approval_decisions", "idx_approval_decisions_distinct_approver"),),
+    ),
+    # --- policy.service ------------------------------------------------------
+    QueryPlanCase(
+        "policy.load_active_policy_rules",
+        lambda conn, fx: policy_service.load_active_policy_rules(conn),
+        uses=(("policy_rules", "idx_policy_rules_active_priority"),),
+    ),
+    QueryPlanCase(
+        "policy.velocity_window_count",
+        lambda conn, fx: policy_service.evaluate_transaction_policy(
+            conn,
+            payload={"source_system": fx["source_system"], "date": fx["transaction_date"]},
+            impact_amount=Decimal(fx["amount"]),
+            tool_name="record_transaction_bundle",
+            rules=[_velocity_rule()],
+        ),
+        uses=(("ledger_transactions", "idx_ledger_transactions_source_entity_epoch"),),
+    ),
+    # --- periods.service -----------------------------------------------------
+    QueryPlanCase(
+        "periods.enforce_period_write_constraints",
+        lambda conn, fx: periods_service.enforce_period_write_constraints(
+            conn, {"date": fx["period_date"], "is_adjusting_entry": True}
+        ),
+        uses=(("accounting_periods", "sqlite_autoindex_accounting_periods_2"),),
+    ),
+    QueryPlanCase(
+        "periods.fetch_period_statuses",
+        lambda conn, fx: periods_service.fetch_period_statuses(
+            conn, [{"date": fx["period_date"]}, {"date": fx["transaction_date"]}]
+        ),
+        uses=(("accounting_periods", "idx_accounting_periods_entity_period"),),
+    ),
+)
+
+
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN)\s+(?:\w+\.)?(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_NOT_ALIASES = frozenset(
+    {"where", "on", "join", "left", "inner", "cross", "order", "group", "union", "limit", "using", "natural", "intersect", "except"}
+)
+_STEP = re.compile(r"^(?:SCAN|SEARCH) (?:\w+\.)?(\w+)(?: USING (?:COVERING )?INDEX (\w+)| USING (?:INTEGER )?PRIMARY KEY)?")
+
+
+def _table_aliases(sql: str) -> dict[str, set[str]]:
+    # A statement may reuse an alias (a CTE and a table both called ``r``),
+    # so an alias maps to every table it names.
+    aliases: dict[str, set[str]] = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        aliases.setdefault(table, set()).add(table)
+        if alias and alias.lower() not in _NOT_ALIASES:
+            aliases.setdefault(alias, set()).add(table)
+    return aliases
+
+
+def _plan_steps(sql: str, lines: list[str]) -> list[tuple[frozenset[str], str | None, str]]:
+    """``(candidate tables, index, detail)`` for every SCAN/SEARCH step."""
+    aliases = _table_aliases(sql)
+    steps = []
+    for detail in lines:
+        match = _STEP.match(detail)
+        if match is None:
+            continue
+        name = match.group(1)
+        index = match.group(2) or ("PRIMARY KEY" if " PRIMARY KEY" in detail else None)
+        steps.append((frozenset(aliases.get(name, {name})), index, detail))
+    return steps
+
+
+def capture_statements(
+    conn: sqlite3.Connection, case: QueryPlanCase, fixture: Mapping[str, Any]
+) -> list[str]:
+    """Run *case* inside a rolled-back savepoint and return the reads it issued."""
+    statements: list[str] = []
+    conn.execute("SAVEPOINT query_plan_case")
+    conn.set_trace_callback(statements.append)
+    try:
+        case.run(conn, fixture)
+    finally:
+        conn.set_trace_callback(None)
+        conn.execute("ROLLBACK TO query_plan_case")
+        conn.execute("RELEASE query_plan_case")
+    return [sql for sql in statements if sql.lstrip().upper().startswith(("SELECT", "WITH"))]
+
+
+def explain_case(
+    conn: sqlite3.Connection, case: QueryPlanCase, fixture: Mapping[str, Any]
+) -> list[tuple[str, list[str]]]:
+    """``(sql, plan details)`` for every read issued by *case*."""
+    return [
+        (sql, [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")])
+        for sql in capture_statements(conn, case, fixture)
+    ]
+
+
+def check_query_plans(
+    conn: sqlite3.Connection,
+    fixture: Mapping[str, Any],
+    cases: tuple[QueryPlanCase, ...] = QUERY_PLAN_CASES,
+) -> list[dict[str, Any]]:
+    """Return one violation per missing index or unexpected full scan."""
+    violations: list[dict[str, Any]] = []
+    for case in cases:
+        plans = explain_case(conn, case, fixture)
+        if not plans:
+            violations.append({"case": case.name, "check": "no_statements"})
+            continue
+        steps = [step for sql, lines in plans for step in _plan_steps(sql, lines)]
+        details = [detail for _, lines in plans for detail in lines]
+        for table, expected in case.uses:
+            accepted = (expected,) if isinstance(expected, str) else expected
+            if not any(table in tables and index in accepted for tables, index, _ in steps):
+                violations.append(
+                    {"case": case.name, "check": "missing_index", "table": table, "index": expected, "plan": details}
+                )
+        for tables, index, detail in steps:
+            # Only flag a scan when every table the alias could name is large;
+            # CTEs and small lookup tables are expected to be scanned.
+            if index is None and detail.startswith("SCAN ") and tables <= LARGE_TABLES:
+                if not tables <= set(case.allow_scans):
+                    violations.append({"case": case.name, "check": "full_scan", "table": sorted(tables), "plan": details})
+    return violations
@@ -1,11 +1,32 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor, wait
 from contextlib import contextmanager
+from contextvars import ContextVar, Token, copy_context
+import hashlib
+from itertools import count
+import os
 from pathlib import Path
+import re
 import sqlite3
+import threading
+from time import perf_counter
+from typing import Callable, Iterable, TypeVar
 from urllib.parse import quote
 
 from capital_os.config import get_settings
+from capital_os.db.event_log_store import attach_event_log, checkpoint_event_log_if_due, clear_event_log_state
+from capital_os.db.migrations import apply_pending_migrations
+from capital_os.db.slow_query_log import connection_factory
+from capital_os.domain.entities.constants import DEFAULT_ENTITY_ID
+from capital_os.observability.metrics import POOL_TIMEOUTS, POOL_WAIT_SECONDS, POOL_WAITS, inc
+
+
+T = TypeVar("T")
+
+
+class PoolTimeoutError(sqlite3.OperationalError):
+    """Raised when no pooled connection becomes available within the timeout."""
 
 
 def _sqlite_path_from_url(db_url: str) -> str:
@@ -17,17 +38,19 @@ def _sqlite_path_from_url(db_url: str) -> str:
     return path
 
 
-def _connect(read_only: bool = False) -> sqlite3.Connection:
-    db_path = _sqlite_path_from_url(get_settings().db_url)
+def _connect(db_path: str, read_only: bool = False) -> sqlite3.Connection:
     path = Path(db_path)
     if not read_only:
         path.parent.mkdir(parents=True, exist_ok=True)
 
-    conn = sqlite3.connect(db_path)
+    # Pooled connections are handed between threads, so the per-thread
+    # ownership check is disabled; the pool guarantees exclusive checkout.
+    conn = sqlite3.connect(db_path, check_same_thread=False, factory=connection_factory())
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON")
     conn.execute("PRAGMA journal_mode = WAL")
     conn.execute("PRAGMA busy_timeout = 5000")
+    attach_event_log(conn, db_path)
     if read_only:
         # Use query_only pragma instead of mode=ro URI to avoid WAL shm-file
         # creation failures on freshly-reset databases.  Any write attempt
@@ -38,6 +61,518 @@ def _connect(read_only: bool = False) -> sqlite3.Connection:
     return conn
 
 
+def _file_identity(db_path: str) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(db_path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_dev, stat.st_ino)
+
+
+class _ConnectionSlots:
+    """Bounded set of pre-configured connections for a single role.
+
+    Connections are configured once (PRAGMAs, row factory) when opened and are
+    reused across checkouts.  ``invalidate`` bumps a generation counter so
+    connections opened against a replaced database file are closed on return
+    instead of being handed out again.
+    """
+
+    def __init__(self, *, db_path: str, read_only: bool, max_size: int, timeout_seconds: float) -> None:
+        self._db_path = db_path
+        self._read_only = read_only
+        self._max_size = max_size
+        self._timeout_seconds = timeout_seconds
+        self._cond = threading.Condition()
+        self._idle: list[sqlite3.Connection] = []
+        self._generations: dict[int, int] = {}
+        self._generation = 0
+        self._open = 0
+        self._checkouts = 0
+        self._hits = 0
+        self._misses = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
+
+    def acquire(self) -> sqlite3.Connection:
+        waited_ms = 0.0
+        with self._cond:
+            if not self._idle and self._open >= self._max_size:
+                started = perf_counter()
+                self._waits += 1
+                available = self._cond.wait_for(
+                    lambda: self._idle or self._open < self._max_size,
+                    timeout=self._timeout_seconds,
+                )
+                waited_ms = (perf_counter() - started) * 1000
+                self._wait_ms_total += waited_ms
+                self._wait_ms_max = max(self._wait_ms_max, waited_ms)
+                role = "reader" if self._read_only else "writer"
+                inc(POOL_WAITS, role)
+                inc(POOL_WAIT_SECONDS, role, amount=waited_ms / 1000)
+                if not available:
+                    self._timeouts += 1
+                    inc(POOL_TIMEOUTS, role)
+                    raise PoolTimeoutError(f"database connection pool exhausted ({role})")
+
+            self._checkouts += 1
+            if self._idle:
+                self._hits += 1
+                return self._idle.pop()
+
+            self._misses += 1
+            self._open += 1
+            generation = self._generation
+
+        try:
+            conn = _connect(self._db_path, read_only=self._read_only)
+        except BaseException:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._generations[id(conn)] = generation
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        reusable = True
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = sqlite3.Row
+        except sqlite3.Error:
+            reusable = False
+
+        with self._cond:
+            if self._generations.get(id(conn)) != self._generation:
+                reusable = False
+            if reusable:
+                self._idle.append(conn)
+            else:
+                self._generations.pop(id(conn), None)
+                self._open -= 1
+            self._cond.notify()
+
+        if not reusable:
+            _close_quietly(conn)
+
+    def invalidate(self) -> None:
+        with self._cond:
+            self._generation += 1
+            stale = self._idle
+            self._idle = []
+            for conn in stale:
+                self._generations.pop(id(conn), None)
+            self._open -= len(stale)
+            self._cond.notify_all()
+        for conn in stale:
+            _close_quietly(conn)
+
+    def stats(self) -> dict:
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "max_size": self._max_size,
+                "open": self._open,
+                "idle": idle,
+                "in_use": self._open - idle,
+                "checkouts": self._checkouts,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / self._checkouts, 4) if self._checkouts else 0.0,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_ms_total": round(self._wait_ms_total, 3),
+                "wait_ms_max": round(self._wait_ms_max, 3),
+            }
+
+
+def _close_quietly(conn: sqlite3.Connection) -> None:
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+
+_POOL_SERIALS = count(1)
+
+
+class ConnectionPool:
+    """Per-process pool of reader and writer connections for one SQLite file.
+
+    Besides the pooled slots the pool owns one *monitor* connection: an
+    autocommit, query-only connection that never joins a transaction, so it
+    only ever sees committed data and its ``PRAGMA data_version`` changes
+    whenever any other connection, in this process or another, commits.
+    """
+
+    def __init__(self, db_path: str, *, readers: int, writers: int, timeout_seconds: float) -> None:
+        self.db_path = db_path
+        self.pid = os.getpid()
+        self.serial = next(_POOL_SERIALS)
+        self._monitor: sqlite3.Connection | None = None
+        self._monitor_generation = 0
+        self._monitor_lock = threading.Lock()
+        self._identity = _file_identity(db_path)
+        self._identity_lock = threading.Lock()
+        self._readers = _ConnectionSlots(
+            db_path=db_path, read_only=True, max_size=readers, timeout_seconds=timeout_seconds
+        )
+        self._writers = _ConnectionSlots(
+            db_path=db_path, read_only=False, max_size=writers, timeout_seconds=timeout_seconds
+        )
+
+    def _check_identity(self) -> None:
+        # A deleted or replaced database file must not be served through
+        # connections still bound to the old inode.
+        identity = _file_identity(self.db_path)
+        if identity == self._identity:
+            return
+        with self._identity_lock:
+            if identity == self._identity:
+                return
+            previous = self._identity
+            self._identity = identity
+        if previous is not None:
+            self._readers.invalidate()
+            self._writers.invalidate()
+            self._close_monitor()
+
+    @contextmanager
+    def writer(self):
+        self._check_identity()
+        conn = self._writers.acquire()
+        try:
+            yield conn
+        finally:
+            self._writers.release(conn)
+
+    @contextmanager
+    def reader(self):
+        self._check_identity()
+        conn = self._readers.acquire()
+        try:
+            yield conn
+        finally:
+            self._readers.release(conn)
+
+    @contextmanager
+    def monitor(self):
+        """Yield ``(generation, conn)`` for the shared monitor connection.
+
+        The generation changes whenever the monitor is reopened (the file was
+        replaced or the pool closed), so ``data_version`` values are only
+        comparable within one generation.
+        """
+        self._check_identity()
+        with self._monitor_lock:
+            if self._monitor is None:
+                self._monitor = _connect(self.db_path, read_only=True)
+                self._monitor_generation += 1
+            yield self._monitor_generation, self._monitor
+
+    def _close_monitor(self) -> None:
+        with self._monitor_lock:
+            monitor, self._monitor = self._monitor, None
+        if monitor is not None:
+            _close_quietly(monitor)
+
+    def stats(self) -> dict:
+        return {
+            "db_path": self.db_path,
+            "reader": self._readers.stats(),
+            "writer": self._writers.stats(),
+        }
+
+    def close(self) -> None:
+        self._readers.invalidate()
+        self._writers.invalidate()
+        self._close_monitor()
+
+
+_POOLS: dict[str, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _reset_pools_after_fork() -> None:
+    # Inherited SQLite handles must never be used (or closed) in the child;
+    # drop the references and start with a fresh registry.
+    global _POOLS, _POOLS_LOCK, _READY_SHARDS, _SHARDS_LOCK
+    _POOLS = {}
+    _POOLS_LOCK = threading.Lock()
+    _READY_SHARDS = set()
+    _SHARDS_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+
+def _get_pool() -> ConnectionPool:
+    settings = get_settings()
+    db_url = _ACTIVE_DB_URL.get() or settings.db_url
+    pool = _POOLS.get(db_url)
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+
+    with _POOLS_LOCK:
+        pool = _POOLS.get(db_url)
+        if pool is None or pool.pid != os.getpid():
+            pool = ConnectionPool(
+                _sqlite_path_from_url(db_url),
+                readers=settings.db_pool_readers,
+                writers=settings.db_pool_writers,
+                timeout_seconds=settings.db_pool_timeout_seconds,
+            )
+            _POOLS[db_url] = pool
+        return pool
+
+
+# --- Entity shard routing -------------------------------------------------
+#
+# With ``CAPITAL_OS_DB_SHARD_DIR`` set, every entity other than the default
+# one gets its own database file in that directory.  ``CAPITAL_OS_DB_URL``
+# stays the *catalog*: it owns the ``entities`` registry, config and policy
+# rules, and it doubles as the shard of ``entity-default``, so an unsharded
+# deployment is simply one where every entity routes to the catalog.  The
+# active shard is a context variable, so pools, the writer queue and the
+# idempotency cache all follow it without any change to tool code.
+
+_ACTIVE_DB_URL: ContextVar[str | None] = ContextVar("capital_os_active_db_url", default=None)
+_READY_SHARDS: set[str] = set()
+_SHARDS_LOCK = threading.Lock()
+_MIGRATIONS_DIR = Path(__file__).resolve().parents[3] / "migrations"
+_SAFE_SHARD_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$")
+
+
+def sharding_enabled() -> bool:
+    return get_settings().db_shard_dir is not None
+
+
+def active_db_url() -> str:
+    """URL of the database the current context reads and writes."""
+    return _ACTIVE_DB_URL.get() or get_settings().db_url
+
+
+def active_db_path() -> Path:
+    """Filesystem path of the active database."""
+    return Path(_sqlite_path_from_url(active_db_url()))
+
+
+def shard_db_url(entity_id: str) -> str:
+    """URL of the database holding *entity_id*'s rows (the catalog when unsharded)."""
+    settings = get_settings()
+    if settings.db_shard_dir is None or entity_id == DEFAULT_ENTITY_ID:
+        return settings.db_url
+    if _SAFE_SHARD_NAME.match(entity_id):
+        name = entity_id
+    else:
+        name = "entity-" + hashlib.sha256(entity_id.encode("utf-8")).hexdigest()[:24]
+    return f"sqlite:///{Path(settings.db_shard_dir) / name}.db"
+
+
+def _ensure_shard(entity_id: str, db_url: str) -> None:
+    """Create and migrate a shard on first use and copy its entity row in."""
+    if db_url == get_settings().db_url or db_url in _READY_SHARDS:
+        return
+    with _SHARDS_LOCK:
+        if db_url in _READY_SHARDS:
+            return
+        with catalog_connection() as catalog:
+            entity = catalog.execute(
+                "SELECT entity_id, code, name, metadata, created_at FROM entities WHERE entity_id = ?",
+                (entity_id,),
+            ).fetchone()
+        if entity is None:
+            raise ValueError(f"entity_id '{entity_id}' does not exist")
+
+        db_path = Path(_sqlite_path_from_url(db_url))
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        apply_pending_migrations(db_path, _MIGRATIONS_DIR)
+        conn = _connect(str(db_path))
+        try:
+            conn.execute(
+                """
+                INSERT INTO entities (entity_id, code, name, metadata, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(entity_id) DO NOTHING
+                """,
+                tuple(entity),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        _READY_SHARDS.add(db_url)
+
+
+@contextmanager
+def use_database(db_url: str):
+    """Route every pooled connection opened in this context to *db_url*."""
+    token = _ACTIVE_DB_URL.set(db_url)
+    try:
+        yield db_url
+    finally:
+        _ACTIVE_DB_URL.reset(token)
+
+
+def enter_entity_shard(entity_id: str) -> Token:
+    """Make *entity_id*'s shard active, creating it on first use.
+
+    Returns a token for ``exit_entity_shard``.  Raises ``ValueError`` when the
+    entity is not registered in the catalog.
+    """
+    db_url = shard_db_url(entity_id)
+    _ensure_shard(entity_id, db_url)
+    return _ACTIVE_DB_URL.set(db_url)
+
+
+def exit_entity_shard(token: Token) -> None:
+    _ACTIVE_DB_URL.reset(token)
+
+
+@contextmanager
+def use_entity_shard(entity_id: str):
+    token = enter_entity_shard(entity_id)
+    try:
+        yield
+    finally:
+        exit_entity_shard(token)
+
+
+@contextmanager
+def catalog_connection():
+    """Read-only connection to the catalog, whatever shard is active."""
+    with use_database(get_settings().db_url):
+        with read_only_connection() as conn:
+            yield conn
+
+
+def entity_shard_ids() -> list[str]:
+    """Entities whose data lives in a distinct database, in entity_id order.
+
+    The default entity stands for the catalog; entities whose shard was never
+    written are skipped, so fan-out reads do not create empty files.
+    """
+    if not sharding_enabled():
+        return [DEFAULT_ENTITY_ID]
+    with catalog_connection() as catalog:
+        entity_ids = [row["entity_id"] for row in catalog.execute("SELECT entity_id FROM entities ORDER BY entity_id")]
+    shards = [DEFAULT_ENTITY_ID]
+    for entity_id in entity_ids:
+        db_url = shard_db_url(entity_id)
+        if entity_id != DEFAULT_ENTITY_ID and Path(_sqlite_path_from_url(db_url)).exists():
+            shards.append(entity_id)
+    return sorted(shards)
+
+
+_FAN_OUT_EXECUTOR: ThreadPoolExecutor | None = None
+_FAN_OUT_WORKERS = 0
+_FAN_OUT_LOCK = threading.Lock()
+_FAN_OUT_THREAD = threading.local()
+
+
+def _mark_fan_out_thread() -> None:
+    _FAN_OUT_THREAD.active = True
+
+
+def _fan_out_executor() -> ThreadPoolExecutor:
+    """Shared fan-out workers, one per pooled reader a shard read can use."""
+    global _FAN_OUT_EXECUTOR, _FAN_OUT_WORKERS
+    workers = get_settings().db_pool_readers
+    with _FAN_OUT_LOCK:
+        if _FAN_OUT_EXECUTOR is None or _FAN_OUT_WORKERS != workers:
+            # A resized pool replaces the executor; the old one is not shut
+            # down, so a caller still holding it can submit, and its idle
+            # workers exit once it is collected.
+            _FAN_OUT_EXECUTOR = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="capital-os-fan-out", initializer=_mark_fan_out_thread
+            )
+            _FAN_OUT_WORKERS = workers
+        return _FAN_OUT_EXECUTOR
+
+
+def _reset_fan_out_after_fork() -> None:
+    # The parent's worker threads do not exist in the child; the next
+    # fan-out starts a fresh executor.
+    global _FAN_OUT_EXECUTOR, _FAN_OUT_WORKERS, _FAN_OUT_LOCK, _FAN_OUT_THREAD
+    _FAN_OUT_EXECUTOR = None
+    _FAN_OUT_WORKERS = 0
+    _FAN_OUT_LOCK = threading.Lock()
+    _FAN_OUT_THREAD = threading.local()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_fan_out_after_fork)
+
+
+def fan_out_entities(fn: Callable[[str], T], entity_ids: Iterable[str] | None = None) -> list[tuple[str, T]]:
+    """Run ``fn(entity_id)`` inside each entity's shard, in parallel.
+
+    Results come back as ``(entity_id, result)`` pairs in ``entity_id`` order
+    regardless of completion order, so merges built on them are
+    deterministic.  The first failure is re-raised after every call returns.
+    Calls share one module-level executor; a fan-out started from one of its
+    workers runs inline so a nested call cannot wait on its own pool.
+    """
+    targets = sorted(set(entity_ids if entity_ids is not None else entity_shard_ids()))
+
+    def run(entity_id: str) -> T:
+        with use_entity_shard(entity_id):
+            return fn(entity_id)
+
+    if len(targets) <= 1 or getattr(_FAN_OUT_THREAD, "active", False):
+        return [(entity_id, run(entity_id)) for entity_id in targets]
+    executor = _fan_out_executor()
+    futures = [executor.submit(copy_context().run, run, entity_id) for entity_id in targets]
+    wait(futures)
+    return [(entity_id, future.result()) for entity_id, future in zip(targets, futures)]
+
+
+def connection_pool_stats() -> dict:
+    """Return size, wait-time and hit-rate stats for the active DB pool."""
+    return _get_pool().stats()
+
+
+def data_version() -> tuple[int, int, int]:
+    """Opaque token that changes whenever the configured database changes.
+
+    Combines the pool serial and monitor generation (a new pool or a replaced
+    file) with the monitor connection's ``PRAGMA data_version`` (a commit from
+    any connection or process).  Equal tokens mean nothing was committed in
+    between.
+    """
+    pool = _get_pool()
+    with pool.monitor() as (generation, conn):
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+    return pool.serial, generation, int(version)
+
+
+@contextmanager
+def monitor_connection():
+    """Yield the pool's monitor connection; it sees committed data only.
+
+    Callers must finish their statements inside the block (``fetchall``) so
+    the connection never holds a read snapshot between uses.
+    """
+    with _get_pool().monitor() as (_, conn):
+        yield conn
+
+
+def close_connection_pools() -> None:
+    """Close every pooled connection owned by this process."""
+    with _POOLS_LOCK:
+        pools = [pool for pool in _POOLS.values() if pool.pid == os.getpid()]
+        _POOLS.clear()
+    with _SHARDS_LOCK:
+        _READY_SHARDS.clear()
+    clear_event_log_state()
+    for pool in pools:
+        pool.close()
+
+
 def probe_ready_noncreating() -> None:
     """Verify the configured SQLite DB is reachable without creating files.
 
@@ -60,26 +595,79 @@ def probe_ready_noncreating() -> None:
         conn.close()
 
 
+_WRITE_SCOPE = threading.local()
+_SAVEPOINT_IDS = count(1)
+
+
 @contextmanager
-def transaction():
-    conn = _connect()
+def bind_write_connection(conn: sqlite3.Connection):
+    """Make ``transaction()`` on this thread nest inside *conn*'s open transaction.
+
+    Used by the writer service so tool code running on the writer thread
+    joins the current group-commit batch through savepoints instead of
+    checking out (and committing) its own connection.
+    """
+    previous = getattr(_WRITE_SCOPE, "conn", None)
+    _WRITE_SCOPE.conn = conn
     try:
         yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
     finally:
-        conn.close()
+        _WRITE_SCOPE.conn = previous
 
 
 @contextmanager
-def read_only_connection():
-    conn = _connect(read_only=True)
+def savepoint(conn: sqlite3.Connection):
+    """Run a block inside a SAVEPOINT; roll back to it if the block raises."""
+    name = f"sp_{next(_SAVEPOINT_IDS)}"
+    conn.execute(f"SAVEPOINT {name}")
     try:
         yield conn
-    finally:
-        conn.close()
+    except BaseException:
+        if conn.in_transaction:
+            try:
+                conn.execute(f"ROLLBACK TO {name}")
+                conn.execute(f"RELEASE {name}")
+            except sqlite3.Error:
+                pass
+        raise
+    conn.execute(f"RELEASE {name}")
+
+
+@contextmanager
+def transaction():
+    bound = getattr(_WRITE_SCOPE, "conn", None)
+    if bound is not None:
+        with savepoint(bound) as conn:
+            yield conn
+        return
+
+    pool = _get_pool()
+    with pool.writer() as conn:
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        checkpoint_event_log_if_due(conn, pool.db_path)
+
+
+@contextmanager
+def write_connection():
+    """Check out a pooled writer connection without managing a transaction."""
+    with _get_pool().writer() as conn:
+        yield conn
+
+
+def active_pool_db_path() -> str:
+    """Filesystem path the active pool opens (as configured, not resolved)."""
+    return _get_pool().db_path
+
+
+@contextmanager
+def read_only_connection():
+    with _get_pool().reader() as conn:
+        yield conn
 
 
 def run_sql_file(path: str | Path) -> None:
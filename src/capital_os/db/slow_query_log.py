@@ -0,0 +1,351 @@
+"""Opt-in log of slow SQL statements.
+
+With ``CAPITAL_OS_SLOW_QUERY_MS`` set, every connection opened by
+``db.session`` times its statements.  A statement is timed from
+``execute`` until its rows are exhausted, its cursor is closed or dropped,
+or the cursor runs another statement, so the time spent fetching counts
+too.  Statements at or over the threshold are appended as one JSON object
+per line to ``CAPITAL_OS_SLOW_QUERY_LOG`` (default
+``<db file>.slow-queries.jsonl``):
+
+- ``sql``: the statement with literals replaced by ``?``, whitespace
+  collapsed and placeholder lists shortened, and ``query_id``, a hash of
+  that text which groups executions of the same query;
+- ``params``, ``executions`` and ``rows``: bound parameters per execution,
+  the number of parameter sets (``executemany``), and the rows returned or
+  changed;
+- ``duration_ms``, ``tool`` and ``correlation_id`` of the owning
+  ``execute_tool`` call (``null`` outside one), and ``error`` when the
+  statement raised.
+
+Once the file would exceed ``CAPITAL_OS_SLOW_QUERY_LOG_MAX_BYTES`` it is
+rotated to ``.1`` and older files shift up, keeping
+``CAPITAL_OS_SLOW_QUERY_LOG_BACKUPS`` of them.  ``top_slow_queries``
+aggregates the current and rotated files.  When the threshold is unset,
+connections are plain ``sqlite3.Connection`` objects and nothing here runs.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+import hashlib
+import json
+import os
+from pathlib import Path
+import re
+import sqlite3
+import threading
+from time import perf_counter
+from typing import Any, Iterator
+
+from capital_os.config import get_settings
+
+
+SORT_KEYS = ("total", "max", "count")
+
+_SCOPE: ContextVar[tuple[str, str] | None] = ContextVar("capital_os_query_scope", default=None)
+
+
+@contextmanager
+def query_scope(tool_name: str, correlation_id: str) -> Iterator[None]:
+    """Attribute slow statements run in this context to *tool_name*."""
+    if get_settings().slow_query_ms is None:
+        yield
+        return
+    token = _SCOPE.set((tool_name, correlation_id))
+    try:
+        yield
+    finally:
+        _SCOPE.reset(token)
+
+
+# --- normalization --------------------------------------------------------------
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.?:@$])\d+(?:\.\d+)?(?![\w.])")
+_SAVEPOINT_NAME = re.compile(r"\bsp_\d+\b")
+_SPACE = re.compile(r"\s+")
+_PLACEHOLDERS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUE_ROWS = re.compile(r"\((\?(?:, \.\.\.)?)\)(?:\s*,\s*\(\1\))+")
+
+
+def normalize_sql(sql: str) -> str:
+    """*sql* with literals as ``?``, whitespace collapsed and repeated lists shortened."""
+    text = _COMMENT.sub(" ", sql)
+    text = _STRING.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _SAVEPOINT_NAME.sub("sp_?", text)
+    text = _SPACE.sub(" ", text).strip()
+    text = _PLACEHOLDERS.sub("(?, ...)", text)
+    return _VALUE_ROWS.sub(r"(\1), ...", text)
+
+
+def query_id(normalized_sql: str) -> str:
+    return hashlib.sha256(normalized_sql.encode("utf-8")).hexdigest()[:16]
+
+
+# --- timed connections ----------------------------------------------------------
+
+class _Pending:
+    __slots__ = ("sql", "params", "executions", "returns_rows", "rows", "elapsed", "error", "scope")
+
+    def __init__(self, sql: str, params: int, executions: int, scope: tuple[str, str] | None) -> None:
+        self.sql = sql
+        self.params = params
+        self.executions = executions
+        self.returns_rows = False
+        self.rows = 0
+        self.elapsed = 0.0
+        self.error: str | None = None
+        self.scope = scope
+
+
+def _param_count(parameters: Any) -> int:
+    try:
+        return len(parameters)
+    except TypeError:
+        return 0
+
+
+class _TimedCursor(sqlite3.Cursor):
+    __slots__ = ("_pending",)
+
+    def _start(self, pending: _Pending, run) -> "_TimedCursor":
+        self._finish()
+        started = perf_counter()
+        try:
+            run()
+        except sqlite3.Error as exc:
+            pending.elapsed = perf_counter() - started
+            pending.error = type(exc).__name__
+            self._pending = pending
+            self._finish()
+            raise
+        pending.elapsed = perf_counter() - started
+        pending.returns_rows = self.description is not None
+        self._pending = pending
+        if not pending.returns_rows:
+            pending.rows = max(self.rowcount, 0)
+            self._finish()
+        return self
+
+    def execute(self, sql, parameters=(), /):
+        pending = _Pending(sql, _param_count(parameters), 1, _SCOPE.get())
+        return self._start(pending, lambda: sqlite3.Cursor.execute(self, sql, parameters))
+
+    def executemany(self, sql, seq_of_parameters, /):
+        batches = list(seq_of_parameters)
+        pending = _Pending(sql, _param_count(batches[0]) if batches else 0, len(batches), _SCOPE.get())
+        return self._start(pending, lambda: sqlite3.Cursor.executemany(self, sql, batches))
+
+    def _fetched(self, started: float, count: int, exhausted: bool) -> None:
+        pending = getattr(self, "_pending", None)
+        if pending is None:
+            return
+        pending.elapsed += perf_counter() - started
+        pending.rows += count
+        if exhausted:
+            self._finish()
+
+    def fetchone(self):
+        started = perf_counter()
+        row = super().fetchone()
+        self._fetched(started, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        started = perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(started, len(rows), not rows)
+        return rows
+
+    def fetchall(self):
+        started = perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows), True)
+        return rows
+
+    def __next__(self):
+        started = perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(started, 0, True)
+            raise
+        self._fetched(started, 1, False)
+        return row
+
+    def close(self) -> None:
+        self._finish()
+        super().close()
+
+    def __del__(self) -> None:
+        self._finish()
+
+    def _finish(self) -> None:
+        pending = getattr(self, "_pending", None)
+        if pending is None:
+            return
+        self._pending = None
+        threshold_ms = get_settings().slow_query_ms
+        duration_ms = pending.elapsed * 1000
+        if threshold_ms is not None and duration_ms >= threshold_ms:
+            _record(pending, duration_ms)
+
+
+class _TimedConnection(sqlite3.Connection):
+    def cursor(self, factory=_TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=(), /):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters, /):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connection_factory() -> type[sqlite3.Connection]:
+    """The connection class ``sqlite3.connect`` should build."""
+    if get_settings().slow_query_ms is None:
+        return sqlite3.Connection
+    return _TimedConnection
+
+
+# --- log file -------------------------------------------------------------------
+
+_LOG_LOCK = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    global _LOG_LOCK
+    _LOG_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def slow_query_log_path() -> Path:
+    settings = get_settings()
+    if settings.slow_query_log:
+        return Path(settings.slow_query_log)
+    from capital_os.db.session import active_db_path, use_database
+
+    with use_database(settings.db_url):
+        db_path = active_db_path()
+    return db_path.with_name(f"{db_path.name}.slow-queries.jsonl")
+
+
+def _rotate(path: Path, backups: int) -> None:
+    for index in range(backups - 1, 0, -1):
+        older = path.with_name(f"{path.name}.{index}")
+        if older.exists():
+            older.replace(path.with_name(f"{path.name}.{index + 1}"))
+    path.replace(path.with_name(f"{path.name}.1"))
+
+
+def _record(pending: _Pending, duration_ms: float) -> None:
+    settings = get_settings()
+    sql = normalize_sql(pending.sql)
+    tool_name, correlation_id = pending.scope or (None, None)
+    line = json.dumps(
+        {
+            "ts": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "query_id": query_id(sql),
+            "sql": sql,
+            "params": pending.params,
+            "executions": pending.executions,
+            "rows": pending.rows,
+            "duration_ms": round(duration_ms, 3),
+            "tool": tool_name,
+            "correlation_id": correlation_id,
+            "error": pending.error,
+        },
+        separators=(",", ":"),
+    ) + "\n"
+    try:
+        path = slow_query_log_path()
+        with _LOG_LOCK:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                size = path.stat().st_size
+            except FileNotFoundError:
+                size = 0
+            if size and size + len(line) > settings.slow_query_log_max_bytes:
+                _rotate(path, settings.slow_query_log_backups)
+            with path.open("a", encoding="utf-8") as handle:
+                handle.write(line)
+    except OSError:
+        # Logging must never fail the statement being logged.
+        pass
+
+
+# --- reporting ------------------------------------------------------------------
+
+def _log_files(path: Path) -> list[Path]:
+    rotated = []
+    for candidate in path.parent.glob(f"{path.name}.*"):
+        suffix = candidate.name[len(path.name) + 1 :]
+        if suffix.isdigit():
+            rotated.append((int(suffix), candidate))
+    files = [candidate for _, candidate in sorted(rotated, reverse=True)]
+    if path.exists():
+        files.append(path)
+    return files
+
+
+def read_slow_queries(path: Path | None = None) -> Iterator[dict[str, Any]]:
+    """Logged records, oldest file first; unreadable lines are skipped."""
+    for log_file in _log_files(path or slow_query_log_path()):
+        with log_file.open(encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def top_slow_queries(*, limit: int = 10, sort: str = "total", path: Path | None = None) -> list[dict[str, Any]]:
+    """Logged statements grouped by ``query_id``, the top *limit* by *sort*.
+
+    *sort* is ``total`` (summed duration), ``max`` (slowest execution) or
+    ``count`` (number of slow executions).
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of {'|'.join(SORT_KEYS)}")
+    groups: dict[str, dict[str, Any]] = {}
+    for record in read_slow_queries(path):
+        group = groups.get(record["query_id"])
+        if group is None:
+            group = groups[record["query_id"]] = {
+                "query_id": record["query_id"],
+                "sql": record["sql"],
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "rows": 0,
+                "errors": 0,
+                "tools": set(),
+                "slowest_correlation_id": None,
+                "last_seen": None,
+            }
+        group["count"] += 1
+        group["total_ms"] += record["duration_ms"]
+        group["rows"] += record["rows"]
+        group["errors"] += record["error"] is not None
+        if record["tool"] is not None:
+            group["tools"].add(record["tool"])
+        if record["duration_ms"] >= group["max_ms"]:
+            group["max_ms"] = record["duration_ms"]
+            group["slowest_correlation_id"] = record["correlation_id"]
+        group["last_seen"] = max(group["last_seen"] or record["ts"], record["ts"])
+
+    key = {"total": "total_ms", "max": "max_ms", "count": "count"}[sort]
+    ranked = sorted(groups.values(), key=lambda item: (-item[key], item["query_id"]))[:limit]
+    for group in ranked:
+        group["total_ms"] = round(group["total_ms"], 3)
+        group["mean_ms"] = round(group["total_ms"] / group["count"], 3)
+        group["tools"] = sorted(group["tools"])
+    return ranked
@@ -0,0 +1,247 @@
+"""Seeded synthetic ledgers for scale benchmarks.
+
+``generate_synthetic_ledger`` fills the active database with an account
+tree, balanced transactions, balance snapshots, obligations, approval
+proposals and ``event_log`` rows.  Everything is drawn from one
+``random.Random(seed)``, and account, transaction and posting ids are drawn
+from it too, so the same spec always produces the same ledger.  Rows whose
+ids the repository assigns itself (snapshots, obligations, proposals,
+events) get the same content, but their ids differ between runs.
+
+Rows go through the repository's bulk insert paths (``insert_transaction_bundles``,
+``insert_event_rows``), so materialized balances, fingerprints and the
+account closure are maintained exactly as in production.  Each chunk
+commits in its own transaction, so the WAL stays small at large scale.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+import random
+from typing import Any
+from uuid import UUID
+
+from capital_os.db.session import transaction
+from capital_os.domain.approval.repository import insert_decision, insert_proposal, persist_proposal_result
+from capital_os.domain.ledger.repository import (
+    insert_transaction_bundles,
+    prepare_transaction_bundle,
+    upsert_balance_snapshot,
+    upsert_obligation,
+)
+from capital_os.observability.event_log import build_event_row, insert_event_rows
+from capital_os.observability.hashing import payload_hash
+
+
+ACCOUNT_TYPES = ("asset", "liability", "equity", "income", "expense")
+CHUNK_SIZE = 2_000
+
+
+@dataclass(frozen=True)
+class SyntheticLedgerSpec:
+    transactions: int
+    accounts: int
+    snapshots_per_account: int = 4
+    obligations: int = 16
+    proposals: int = 20
+    events: int = 0
+    seed: int = 22
+    start_date: date = date(2025, 1, 1)
+    days: int = 365
+
+    @classmethod
+    def for_transactions(cls, transactions: int, *, seed: int = 22) -> "SyntheticLedgerSpec":
+        """A spec whose other tables grow in proportion to *transactions*."""
+        if transactions < 1:
+            raise ValueError("transactions must be >= 1")
+        accounts = min(max(transactions // 50, 16), 20_000)
+        return cls(
+            transactions=transactions,
+            accounts=accounts,
+            obligations=max(accounts // 3, 4),
+            proposals=max(transactions // 50, 20),
+            events=transactions // 2,
+            seed=seed,
+        )
+
+
+@dataclass(frozen=True)
+class SyntheticLedger:
+    """Ids and keys of a generated ledger that benchmarks address."""
+
+    spec: SyntheticLedgerSpec
+    root_account_ids: tuple[str, ...]
+    account_ids: tuple[str, ...]
+    transaction_keys: tuple[tuple[str, str], ...]
+    obligation_ids: tuple[str, ...]
+    pending_proposal_ids: tuple[str, ...]
+    posting_count: int
+    end_date: date = field(init=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "end_date", self.spec.start_date + timedelta(days=self.spec.days - 1))
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(UUID(int=rng.getrandbits(128), version=4))
+
+
+def _amount(rng: random.Random) -> Decimal:
+    return Decimal(rng.randint(100, 500_000)) / 100
+
+
+def _bundle_payload(rng: random.Random, spec: SyntheticLedgerSpec, accounts: list[str], index: int) -> dict[str, Any]:
+    day = spec.start_date + timedelta(days=rng.randrange(spec.days))
+    # Two-thirds simple transfers, the rest split across two debit accounts.
+    legs = 2 if rng.random() < 2 / 3 else 3
+    chosen = rng.sample(accounts, legs)
+    total = _amount(rng)
+    postings = [{"account_id": chosen[0], "amount": f"{-total:.4f}", "currency": "USD"}]
+    if legs == 2:
+        postings.append({"account_id": chosen[1], "amount": f"{total:.4f}", "currency": "USD"})
+    else:
+        first = (total / 3).quantize(Decimal("0.0001"))
+        postings.append({"account_id": chosen[1], "amount": f"{first:.4f}", "currency": "USD"})
+        postings.append({"account_id": chosen[2], "amount": f"{total - first:.4f}", "currency": "USD"})
+    return {
+        "source_system": rng.choice(("bank", "card", "payroll", "broker")),
+        "external_id": f"syn-{spec.seed}-{index}",
+        "date": f"{day.isoformat()}T12:00:00Z",
+        "description": f"synthetic {index}",
+        "postings": postings,
+        "correlation_id": f"corr-syn-{index}",
+    }
+
+
+def _create_accounts(rng: random.Random, spec: SyntheticLedgerSpec) -> tuple[list[str], list[str]]:
+    roots = [(_uuid(rng), f"{position + 1}000", kind.title(), kind, None) for position, kind in enumerate(ACCOUNT_TYPES)]
+    leaves = []
+    for index in range(spec.accounts):
+        parent = roots[index % len(roots)]
+        leaves.append((_uuid(rng), f"{index % len(roots) + 1}-{index:05d}", f"Account {index}", parent[3], parent[0]))
+    with transaction() as conn:
+        conn.executemany(
+            "INSERT INTO accounts (account_id, code, name, account_type, parent_account_id) VALUES (?, ?, ?, ?, ?)",
+            roots + leaves,
+        )
+    return [row[0] for row in roots], [row[0] for row in leaves]
+
+
+def generate_synthetic_ledger(spec: SyntheticLedgerSpec) -> SyntheticLedger:
+    """Populate the active (empty, migrated) database according to *spec*."""
+    rng = random.Random(spec.seed)
+    root_ids, account_ids = _create_accounts(rng, spec)
+
+    transaction_keys: list[tuple[str, str]] = []
+    posting_count = 0
+    for start in range(0, spec.transactions, CHUNK_SIZE):
+        bundles = []
+        for index in range(start, min(start + CHUNK_SIZE, spec.transactions)):
+            payload = _bundle_payload(rng, spec, account_ids, index)
+            bundle = prepare_transaction_bundle({**payload, "input_hash": payload_hash(payload)})
+            bundle["transaction_id"] = _uuid(rng)
+            for posting in bundle["postings"]:
+                posting["posting_id"] = _uuid(rng)
+            bundles.append(bundle)
+            transaction_keys.append((payload["source_system"], payload["external_id"]))
+            posting_count += len(bundle["postings"])
+        with transaction() as conn:
+            insert_transaction_bundles(conn, bundles)
+
+    step = max(spec.days // max(spec.snapshots_per_account, 1), 1)
+    with transaction() as conn:
+        for index, account_id in enumerate(account_ids):
+            for snapshot in range(spec.snapshots_per_account):
+                upsert_balance_snapshot(
+                    conn,
+                    {
+                        "account_id": account_id,
+                        "snapshot_date": (spec.start_date + timedelta(days=step * (snapshot + 1) - 1)).isoformat(),
+                        "balance": f"{_amount(rng):.4f}",
+                        "currency": "USD",
+                        "source_system": "statement",
+                    },
+                )
+
+    obligation_ids = []
+    with transaction() as conn:
+        for index in range(spec.obligations):
+            obligation_id, _, _ = upsert_obligation(
+                conn,
+                {
+                    "source_system": "bills",
+                    "name": f"Obligation {index}",
+                    "account_id": account_ids[index % len(account_ids)],
+                    "cadence": rng.choice(("monthly", "annual", "custom")),
+                    "expected_amount": f"{_amount(rng):.4f}",
+                    "next_due_date": (spec.start_date + timedelta(days=rng.randrange(spec.days))).isoformat(),
+                    "active": rng.random() < 0.8,
+                },
+            )
+            obligation_ids.append(obligation_id)
+
+    # Even proposals stay pending for approve/reject benchmarks; odd ones are
+    # rejected with a decision so the proposal history has both shapes.
+    pending = []
+    with transaction() as conn:
+        for index in range(spec.proposals):
+            payload = _bundle_payload(rng, spec, account_ids, spec.transactions + index)
+            payload["external_id"] = f"syn-proposal-{spec.seed}-{index}"
+            proposal_id = insert_proposal(
+                conn,
+                tool_name="record_transaction_bundle",
+                source_system=payload["source_system"],
+                external_id=payload["external_id"],
+                correlation_id=payload["correlation_id"],
+                input_hash=payload_hash(payload),
+                policy_threshold_amount="1000.0000",
+                impact_amount=payload["postings"][1]["amount"],
+                request_payload=payload,
+            )
+            if index % 2 == 0:
+                pending.append(proposal_id)
+                continue
+            insert_decision(
+                conn,
+                proposal_id=proposal_id,
+                action="reject",
+                correlation_id=f"corr-syn-decision-{index}",
+                reason="synthetic",
+                approver_id=f"approver-{index % 5}",
+            )
+            response = {"status": "rejected", "proposal_id": proposal_id, "reason": "synthetic"}
+            persist_proposal_result(
+                conn,
+                proposal_id=proposal_id,
+                status="rejected",
+                response_payload=response,
+                output_hash=payload_hash(response),
+                decision_reason="synthetic",
+            )
+
+    tools = ("list_accounts", "list_transactions", "get_account_balances", "record_transaction_bundle")
+    for start in range(0, spec.events, CHUNK_SIZE):
+        rows = [
+            build_event_row(
+                tool_name=tools[index % len(tools)],
+                correlation_id=f"corr-syn-event-{index}",
+                input_hash=f"{index:064x}",
+                output_hash=f"{index:064x}",
+                duration_ms=rng.randint(1, 40),
+                status="ok",
+            )
+            for index in range(start, min(start + CHUNK_SIZE, spec.events))
+        ]
+        with transaction() as conn:
+            insert_event_rows(conn, rows)
+
+    return SyntheticLedger(
+        spec=spec,
+        root_account_ids=tuple(root_ids),
+        account_ids=tuple(account_ids),
+        transaction_keys=tuple(transaction_keys),
+        obligation_ids=tuple(obligation_ids),
+        pending_proposal_ids=tuple(pending),
+        posting_count=posting_count,
+    )
@@ -4,6 +4,7 @@ from pathlib import Path
 
 from capital_os.config import get_settings
 from capital_os.db.migrations import apply_pending_migrations
+from capital_os.db.session import close_connection_pools
 
 
 _MIGRATIONS_DIR = Path(__file__).resolve().parents[3] / "migrations"
@@ -22,6 +23,9 @@ def reset_test_database() -> None:
     db_path = _sqlite_path_from_db_url(get_settings().db_url)
     db_path.parent.mkdir(parents=True, exist_ok=True)
 
+    # Pooled connections would otherwise keep the deleted file open.
+    close_connection_pools()
+
     # Remove the SQLite database and WAL sidecars so test bootstrap is deterministic.
     for suffix in ("", "-wal", "-shm"):
         Path(f"{db_path}{suffix}").unlink(missing_ok=True)
@@ -0,0 +1,294 @@
+"""Single-writer commit queue with group commit.
+
+Write work units are submitted from request threads and executed serially on
+one dedicated thread that owns the write connection.  Units drained from the
+queue together share one ``BEGIN IMMEDIATE ... COMMIT`` (one fsync); each unit
+runs inside its own SAVEPOINT so a failing unit is rolled back without
+affecting the rest of its batch.  Callers block until the batch holding their
+unit has committed, so a returned result is always durable.
+
+Tool code does not need to know about the queue: while a unit runs,
+``capital_os.db.session.transaction()`` is bound to the batch connection and
+nests through savepoints instead of committing on its own.
+
+There is one writer per database file.  With entity sharding enabled, units
+are queued on the writer of the shard active when they are submitted, so
+writes for independent entities commit in parallel.
+"""
+from __future__ import annotations
+
+import contextvars
+import os
+import queue
+import sqlite3
+import threading
+from time import perf_counter
+from typing import Any, Callable, TypeVar
+
+from capital_os.config import get_settings
+from capital_os.db.event_log_store import checkpoint_event_log_if_due
+from capital_os.db.session import (
+    active_db_url,
+    active_pool_db_path,
+    bind_write_connection,
+    savepoint,
+    use_database,
+    write_connection,
+)
+from capital_os.observability.metrics import WRITER_QUEUE_DEPTH, WRITER_QUEUE_FULL, inc
+
+
+T = TypeVar("T")
+
+
+class WriteQueueFullError(sqlite3.OperationalError):
+    """Raised when the write queue stays full for longer than the pool timeout."""
+
+
+class _BatchAborted(sqlite3.OperationalError):
+    """The batch transaction was lost or failed to commit; nothing was committed."""
+
+
+class _WorkUnit:
+    __slots__ = ("fn", "context", "done", "result", "error")
+
+    def __init__(self, fn: Callable[[], Any], context: contextvars.Context) -> None:
+        self.fn = fn
+        self.context = context
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+_STOP = object()
+
+
+class WriterService:
+    """Dedicated writer thread draining a bounded queue of write work units."""
+
+    def __init__(
+        self,
+        *,
+        batch_max: int,
+        queue_max: int,
+        put_timeout_seconds: float,
+        db_url: str | None = None,
+    ) -> None:
+        self._db_url = db_url
+        self._batch_max = batch_max
+        self._put_timeout_seconds = put_timeout_seconds
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_max)
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._units = 0
+        self._max_batch_size = 0
+        self._batch_retries = 0
+        self._commit_ms_total = 0.0
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._run, name="capital-os-writer", daemon=True)
+                thread.start()
+                self._thread = thread
+
+    def submit(self, fn: Callable[[], T]) -> T:
+        """Run *fn* on the writer thread and return once its batch has committed."""
+        if threading.current_thread() is self._thread:
+            return fn()
+
+        self._ensure_started()
+        unit = _WorkUnit(fn, contextvars.copy_context())
+        try:
+            self._queue.put(unit, timeout=self._put_timeout_seconds)
+        except queue.Full as exc:
+            inc(WRITER_QUEUE_FULL)
+            raise WriteQueueFullError("write queue is full") from exc
+        inc(WRITER_QUEUE_DEPTH)
+        unit.done.wait()
+        if unit.error is not None:
+            raise unit.error
+        return unit.result
+
+    def stop(self, timeout: float | None = None) -> None:
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "batches": self._batches,
+                "units": self._units,
+                "max_batch_size": self._max_batch_size,
+                "mean_batch_size": round(self._units / self._batches, 3) if self._batches else 0.0,
+                "batch_retries": self._batch_retries,
+                "commit_ms_total": round(self._commit_ms_total, 3),
+            }
+
+    def _run(self) -> None:
+        if self._db_url is not None:
+            with use_database(self._db_url):
+                self._drain()
+        else:
+            self._drain()
+
+    def _drain(self) -> None:
+        while True:
+            unit = self._queue.get()
+            if unit is _STOP:
+                return
+            batch = [unit]
+            stop_requested = False
+            while len(batch) < self._batch_max:
+                try:
+                    pending = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if pending is _STOP:
+                    stop_requested = True
+                    break
+                batch.append(pending)
+
+            inc(WRITER_QUEUE_DEPTH, amount=-len(batch))
+            self._execute(batch)
+            if stop_requested:
+                return
+
+    def _execute(self, batch: list[_WorkUnit]) -> None:
+        try:
+            self._commit_group(batch)
+        except Exception as exc:
+            # Nothing from this batch was committed.  Re-run units one at a
+            # time so a single bad unit cannot fail its neighbours.
+            if len(batch) == 1:
+                unit = batch[0]
+                unit.result = None
+                if unit.error is None:
+                    unit.error = exc.__cause__ or exc
+            else:
+                with self._stats_lock:
+                    self._batch_retries += 1
+                for unit in batch:
+                    unit.result = None
+                    unit.error = None
+                    self._execute([unit])
+                return
+
+        for unit in batch:
+            unit.done.set()
+
+    def _commit_group(self, batch: list[_WorkUnit]) -> None:
+        started = perf_counter()
+        with write_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                with bind_write_connection(conn):
+                    for unit in batch:
+                        self._run_unit(conn, unit)
+                        if not conn.in_transaction:
+                            raise _BatchAborted("batch transaction was rolled back by SQLite")
+                try:
+                    conn.commit()
+                except sqlite3.Error as exc:
+                    raise _BatchAborted("batch commit failed") from exc
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            checkpoint_event_log_if_due(conn, active_pool_db_path())
+
+        with self._stats_lock:
+            self._batches += 1
+            self._units += len(batch)
+            self._max_batch_size = max(self._max_batch_size, len(batch))
+            self._commit_ms_total += (perf_counter() - started) * 1000
+
+    @staticmethod
+    def _run_unit(conn: sqlite3.Connection, unit: _WorkUnit) -> None:
+        try:
+            with savepoint(conn):
+                unit.result = unit.context.run(unit.fn)
+        except BaseException as exc:
+            unit.error = exc
+
+
+_WRITERS: dict[str, WriterService] = {}
+_WRITER_LOCK = threading.Lock()
+
+
+def _reset_writer_after_fork() -> None:
+    # Writer threads do not survive fork; the child starts its own lazily.
+    global _WRITERS, _WRITER_LOCK
+    _WRITERS = {}
+    _WRITER_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_writer_after_fork)
+
+
+def _get_writer() -> WriterService:
+    db_url = active_db_url()
+    writer = _WRITERS.get(db_url)
+    if writer is not None:
+        return writer
+    with _WRITER_LOCK:
+        writer = _WRITERS.get(db_url)
+        if writer is None:
+            settings = get_settings()
+            writer = WriterService(
+                batch_max=settings.write_batch_max,
+                queue_max=settings.write_queue_max,
+                put_timeout_seconds=settings.db_pool_timeout_seconds,
+                db_url=db_url,
+            )
+            _WRITERS[db_url] = writer
+        return writer
+
+
+def run_write(fn: Callable[[], T]) -> T:
+    """Execute a write work unit through the commit queue when it is enabled.
+
+    With ``CAPITAL_OS_WRITE_QUEUE=0`` the unit runs inline on the calling
+    thread and each ``transaction()`` commits independently, as before.
+    """
+    if not get_settings().write_queue_enabled:
+        return fn()
+    return _get_writer().submit(fn)
+
+
+def writer_stats() -> dict:
+    """Return queue depth and group-commit batch stats for the active database's writer."""
+    writer = _WRITERS.get(active_db_url())
+    if writer is not None:
+        stats = writer.stats()
+    else:
+        stats = {
+            "queue_depth": 0,
+            "batches": 0,
+            "units": 0,
+            "max_batch_size": 0,
+            "mean_batch_size": 0.0,
+            "batch_retries": 0,
+            "commit_ms_total": 0.0,
+        }
+    stats["enabled"] = get_settings().write_queue_enabled
+    stats["writers"] = len(_WRITERS)
+    return stats
+
+
+def shutdown_writer(timeout: float | None = 5.0) -> None:
+    """Stop every writer thread after it drains queued units."""
+    with _WRITER_LOCK:
+        writers = list(_WRITERS.values())
+        _WRITERS.clear()
+    for writer in writers:
+        writer.stop(timeout)
@@ -181,6 +181,7 @@ def approve_proposed_transaction(payload: dict) -> dict:
                 conn,
                 request_payload["source_system"],
                 request_payload["external_id"],
+                bypass_cache=True,
             )
             if not replay:
                 raise
@@ -0,0 +1,420 @@
+"""Cold-year ledger archival into per-year SQLite files.
+
+``archive_ledger_year`` moves one calendar year of transactions and postings
+out of the hot database into ``<archive dir>/<db name>-<year>.db``:
+
+1. every transaction of the year must sit in a locked accounting period;
+   transactions referenced by an approval proposal stay hot so the
+   ``approved_transaction_id`` foreign key keeps holding;
+2. the rows are copied into the archive file, and the archive's content
+   hash must equal the hash of the hot rows;
+3. one write unit re-hashes the hot rows under the write lock, keeps the
+   idempotency keys and a per-account, per-day opening-balance checkpoint
+   hot, records the archive as ``moving``, deletes the rows and marks the
+   archive ``archived``, all in one transaction.  The append-only delete
+   triggers only admit deletes of rows keyed under a ``moving`` archive, and
+   a ``moving`` row is only accepted when its counts match the keys and
+   checkpoints written before it; a move that would leave a ``moving`` row
+   behind fails.
+
+Archived days are frozen afterwards (``period_archived``).  Replays of
+archived keys are answered from ``ledger_archived_keys``, and balance
+verification adds ``ledger_archive_checkpoints`` to the hot postings, so
+neither needs the archive files.  Reads that return rows attach them:
+``archive_read_connection`` exposes every archive as an ``archive_<year>``
+schema, and transaction listing, external-id lookup and export page each
+schema on its own and merge the results.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+import hashlib
+import json
+from pathlib import Path
+import sqlite3
+from typing import Any, Iterator
+from urllib.parse import quote
+
+from capital_os.config import get_settings
+from capital_os.db.session import active_db_path, read_only_connection, transaction
+from capital_os.db.writer import run_write
+
+
+class LedgerArchiveError(ValueError):
+    pass
+
+
+TRANSACTION_COLUMNS = (
+    "transaction_id",
+    "source_system",
+    "external_id",
+    "transaction_date",
+    "description",
+    "correlation_id",
+    "input_hash",
+    "output_hash",
+    "response_payload",
+    "created_at",
+    "entity_id",
+    "is_adjusting_entry",
+    "adjusting_reason_code",
+)
+POSTING_COLUMNS = (
+    "posting_id",
+    "transaction_id",
+    "account_id",
+    "amount",
+    "currency",
+    "memo",
+    "created_at",
+    "amount_units",
+)
+
+_ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ledger_transactions (
+  transaction_id TEXT PRIMARY KEY,
+  source_system TEXT NOT NULL,
+  external_id TEXT NOT NULL,
+  transaction_date TEXT NOT NULL,
+  description TEXT NOT NULL,
+  correlation_id TEXT NOT NULL,
+  input_hash TEXT NOT NULL,
+  output_hash TEXT,
+  response_payload TEXT,
+  created_at TEXT NOT NULL,
+  entity_id TEXT NOT NULL,
+  is_adjusting_entry INTEGER NOT NULL,
+  adjusting_reason_code TEXT,
+  transaction_day INTEGER GENERATED ALWAYS AS (CAST(strftime('%Y%m%d', transaction_date) AS INTEGER)) VIRTUAL,
+  UNIQUE (source_system, external_id)
+);
+CREATE INDEX IF NOT EXISTS idx_ledger_transactions_day_id ON ledger_transactions (transaction_day, transaction_id);
+
+CREATE TABLE IF NOT EXISTS ledger_postings (
+  posting_id TEXT PRIMARY KEY,
+  transaction_id TEXT NOT NULL REFERENCES ledger_transactions(transaction_id),
+  account_id TEXT NOT NULL,
+  amount NUMERIC NOT NULL,
+  currency TEXT NOT NULL,
+  memo TEXT,
+  created_at TEXT NOT NULL,
+  amount_units INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ledger_postings_transaction_account ON ledger_postings (transaction_id, account_id);
+CREATE INDEX IF NOT EXISTS idx_ledger_postings_account_transaction ON ledger_postings (account_id, transaction_id);
+
+CREATE TABLE IF NOT EXISTS archive_manifest (
+  archive_year INTEGER PRIMARY KEY,
+  content_hash TEXT NOT NULL,
+  transaction_count INTEGER NOT NULL,
+  posting_count INTEGER NOT NULL,
+  created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_archive_transactions_no_update BEFORE UPDATE ON ledger_transactions
+BEGIN SELECT RAISE(ABORT, 'Archived ledger_transactions are immutable'); END;
+CREATE TRIGGER IF NOT EXISTS trg_archive_transactions_no_delete BEFORE DELETE ON ledger_transactions
+BEGIN SELECT RAISE(ABORT, 'Archived ledger_transactions are immutable'); END;
+CREATE TRIGGER IF NOT EXISTS trg_archive_postings_no_update BEFORE UPDATE ON ledger_postings
+BEGIN SELECT RAISE(ABORT, 'Archived ledger_postings are immutable'); END;
+CREATE TRIGGER IF NOT EXISTS trg_archive_postings_no_delete BEFORE DELETE ON ledger_postings
+BEGIN SELECT RAISE(ABORT, 'Archived ledger_postings are immutable'); END;
+"""
+
+_COPY_BATCH = 1000
+
+
+def _hot_selection(alias: str = "") -> str:
+    """Hot rows of one year that move; proposal-referenced transactions stay."""
+    prefix = f"{alias}." if alias else ""
+    return f"""
+      {prefix}transaction_day BETWEEN ? AND ?
+      AND {prefix}transaction_id NOT IN (
+        SELECT approved_transaction_id FROM approval_proposals WHERE approved_transaction_id IS NOT NULL
+      )
+    """
+
+
+_HOT_SELECTION = _hot_selection()
+
+
+def _year_bounds(year: int) -> tuple[int, int]:
+    if not 1900 <= year <= 9999:
+        raise LedgerArchiveError("year must be a four-digit calendar year")
+    return year * 10000 + 101, year * 10000 + 1231
+
+
+def default_archive_path(year: int, archive_dir: str | Path | None = None) -> Path:
+    hot_path = active_db_path()
+    directory = Path(archive_dir or get_settings().archive_dir or hot_path.parent / "archive")
+    return directory / f"{hot_path.stem}-{year}.db"
+
+
+def content_hash(conn, *, where: str = "1=1", params: tuple[Any, ...] = (), schema: str = "main") -> dict[str, Any]:
+    """SHA-256 over the selected transactions and their postings, in id order."""
+    digest = hashlib.sha256()
+    transactions = postings = 0
+    for row in conn.execute(
+        f"""
+        SELECT {', '.join(TRANSACTION_COLUMNS)} FROM {schema}.ledger_transactions
+        WHERE {where} ORDER BY transaction_id
+        """,
+        params,
+    ):
+        digest.update((json.dumps(["t", *row], separators=(",", ":")) + "\n").encode("utf-8"))
+        transactions += 1
+    for row in conn.execute(
+        f"""
+        SELECT {', '.join('p.' + column for column in POSTING_COLUMNS)} FROM {schema}.ledger_postings p
+        WHERE p.transaction_id IN (SELECT transaction_id FROM {schema}.ledger_transactions WHERE {where})
+        ORDER BY p.posting_id
+        """,
+        params,
+    ):
+        digest.update((json.dumps(["p", *row], separators=(",", ":")) + "\n").encode("utf-8"))
+        postings += 1
+    return {"content_hash": digest.hexdigest(), "transactions": transactions, "postings": postings}
+
+
+def _check_archivable(conn, year: int, bounds: tuple[int, int]) -> None:
+    if conn.execute("SELECT 1 FROM ledger_archives WHERE archive_year = ?", (year,)).fetchone():
+        raise LedgerArchiveError(f"year {year} is already archived")
+    unlocked = conn.execute(
+        f"""
+        SELECT DISTINCT strftime('%Y-%m', t.transaction_date) AS period_key, t.entity_id
+        FROM ledger_transactions t
+        WHERE {_hot_selection('t')}
+          AND NOT EXISTS (
+            SELECT 1 FROM accounting_periods p
+            WHERE p.period_key = strftime('%Y-%m', t.transaction_date)
+              AND p.entity_id = t.entity_id
+              AND p.status = 'locked'
+          )
+        ORDER BY period_key, t.entity_id
+        """,
+        bounds,
+    ).fetchall()
+    if unlocked:
+        periods = ", ".join(f"{row['period_key']} ({row['entity_id']})" for row in unlocked)
+        raise LedgerArchiveError(f"periods must be locked before archiving: {periods}")
+
+
+def _copy_rows(source, archive: sqlite3.Connection, bounds: tuple[int, int]) -> None:
+    for table, columns, select in (
+        (
+            "ledger_transactions",
+            TRANSACTION_COLUMNS,
+            f"SELECT {', '.join(TRANSACTION_COLUMNS)} FROM ledger_transactions WHERE {_HOT_SELECTION}",
+        ),
+        (
+            "ledger_postings",
+            POSTING_COLUMNS,
+            f"""
+            SELECT {', '.join('p.' + column for column in POSTING_COLUMNS)} FROM ledger_postings p
+            WHERE p.transaction_id IN (SELECT transaction_id FROM ledger_transactions WHERE {_HOT_SELECTION})
+            """,
+        ),
+    ):
+        cursor = source.execute(select, bounds)
+        insert = (
+            f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})"
+        )
+        while True:
+            rows = cursor.fetchmany(_COPY_BATCH)
+            if not rows:
+                break
+            archive.executemany(insert, [tuple(row) for row in rows])
+    archive.commit()
+
+
+def _move_rows(year: int, bounds: tuple[int, int], archive_path: Path, expected: dict[str, Any]) -> None:
+    with transaction() as conn:
+        current = content_hash(conn, where=_HOT_SELECTION, params=bounds)
+        if current != expected:
+            raise LedgerArchiveError(f"year {year} changed while it was being archived; re-run the archive")
+        # Keys and checkpoints reference the archive row, which the
+        # ledger_archives insert trigger only accepts once they match it.
+        conn.execute("PRAGMA defer_foreign_keys = ON")
+        conn.execute(
+            f"""
+            INSERT INTO ledger_archived_keys (source_system, external_id, transaction_id, archive_year, response_payload)
+            SELECT source_system, external_id, transaction_id, ?, response_payload
+            FROM ledger_transactions WHERE {_HOT_SELECTION}
+            """,
+            (year, *bounds),
+        )
+        conn.execute(
+            f"""
+            INSERT INTO ledger_archive_checkpoints (account_id, balance_date, archive_year, day_delta_units, posting_count)
+            SELECT p.account_id, date(t.transaction_date), ?, SUM(p.amount_units), COUNT(*)
+            FROM ledger_transactions t
+            JOIN ledger_postings p ON p.transaction_id = t.transaction_id
+            WHERE {_hot_selection('t')}
+            GROUP BY p.account_id, date(t.transaction_date)
+            """,
+            (year, *bounds),
+        )
+        conn.execute(
+            """
+            INSERT INTO ledger_archives (
+              archive_year, archive_path, first_day, last_day, transaction_count, posting_count, content_hash, status
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, 'moving')
+            """,
+            (year, str(archive_path), *bounds, expected["transactions"], expected["postings"], expected["content_hash"]),
+        )
+        moving = f"SELECT transaction_id FROM ledger_transactions WHERE {_HOT_SELECTION}"
+        conn.execute(f"DELETE FROM ledger_posting_fingerprints WHERE transaction_id IN ({moving})", bounds)
+        conn.execute(f"DELETE FROM ledger_postings WHERE transaction_id IN ({moving})", bounds)
+        conn.execute(f"DELETE FROM ledger_transactions WHERE {_HOT_SELECTION}", bounds)
+        conn.execute(
+            """
+            UPDATE ledger_archives
+            SET status = 'archived', archived_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now')
+            WHERE archive_year = ?
+            """,
+            (year,),
+        )
+        if conn.execute("SELECT 1 FROM ledger_archives WHERE status = 'moving'").fetchone():
+            raise LedgerArchiveError("an archive move is still marked 'moving'; nothing was archived")
+
+
+def archive_ledger_year(year: int, *, archive_dir: str | Path | None = None) -> dict[str, Any]:
+    """Move one locked calendar year into its archive file; returns a summary."""
+    bounds = _year_bounds(year)
+    archive_path = default_archive_path(year, archive_dir).resolve()
+
+    with read_only_connection() as conn:
+        _check_archivable(conn, year, bounds)
+        hot = content_hash(conn, where=_HOT_SELECTION, params=bounds)
+        retained = conn.execute(
+            "SELECT COUNT(*) FROM ledger_transactions WHERE transaction_day BETWEEN ? AND ?", bounds
+        ).fetchone()[0] - hot["transactions"]
+    if hot["transactions"] == 0:
+        raise LedgerArchiveError(f"year {year} has no transactions to archive")
+
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    archive = sqlite3.connect(archive_path)
+    try:
+        archive.executescript(_ARCHIVE_SCHEMA)
+        with read_only_connection() as conn:
+            _copy_rows(conn, archive, bounds)
+        copied = content_hash(archive)
+        if copied != hot:
+            raise LedgerArchiveError(
+                f"archive {archive_path} does not match the hot rows of {year} "
+                f"(hot {hot['content_hash']}, archive {copied['content_hash']})"
+            )
+
+        run_write(lambda: _move_rows(year, bounds, archive_path, hot))
+
+        archive.execute(
+            """
+            INSERT OR REPLACE INTO archive_manifest (archive_year, content_hash, transaction_count, posting_count)
+            VALUES (?, ?, ?, ?)
+            """,
+            (year, hot["content_hash"], hot["transactions"], hot["postings"]),
+        )
+        archive.commit()
+    finally:
+        archive.close()
+
+    return {
+        "status": "archived",
+        "year": year,
+        "archive_path": str(archive_path),
+        "transactions": hot["transactions"],
+        "postings": hot["postings"],
+        "retained": retained,
+        "content_hash": hot["content_hash"],
+    }
+
+
+def archived_years(conn) -> list[dict[str, Any]]:
+    rows = conn.execute(
+        """
+        SELECT archive_year, archive_path, transaction_count, posting_count, content_hash
+        FROM ledger_archives WHERE status = 'archived' ORDER BY archive_year
+        """
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def has_archives(conn) -> bool:
+    return conn.execute("SELECT 1 FROM ledger_archives WHERE status = 'archived' LIMIT 1").fetchone() is not None
+
+
+def _ro_uri(path: str | Path) -> str:
+    return f"file:{quote(str(Path(path).resolve()))}?mode=ro"
+
+
+@contextmanager
+def archive_read_connection() -> Iterator[tuple[sqlite3.Connection, list[str]]]:
+    """Dedicated read-only connection with every archive attached.
+
+    Yields ``(conn, schemas)`` where ``schemas`` lists ``main`` followed by
+    one ``archive_<year>`` schema per archived year.  A separate connection is used so pooled connections never carry
+    attachments.
+    """
+    conn = sqlite3.connect(_ro_uri(active_db_path()), uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    try:
+        years = archived_years(conn)
+        if len(years) + 2 > conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED):
+            raise LedgerArchiveError("too many archived years to attach at once")
+        schemas = ["main"]
+        for entry in years:
+            schema = f"archive_{entry['archive_year']}"
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (_ro_uri(entry["archive_path"]),))
+            schemas.append(schema)
+        yield conn, schemas
+    finally:
+        conn.close()
+
+
+def verify_ledger_archives() -> list[dict[str, Any]]:
+    """Re-hash every archive and check it against its hot checkpoint.
+
+    Returns one entry per mismatch; an empty list means every archive file
+    still holds exactly the rows that were moved.
+    """
+    mismatches: list[dict[str, Any]] = []
+    with archive_read_connection() as (conn, schemas):
+        for entry, schema in zip(archived_years(conn), schemas[1:]):
+            year = entry["archive_year"]
+            actual = content_hash(conn, schema=schema)
+            expected = {
+                "content_hash": entry["content_hash"],
+                "transactions": entry["transaction_count"],
+                "postings": entry["posting_count"],
+            }
+            if actual != expected:
+                mismatches.append({"year": year, "check": "content_hash", "expected": expected, "actual": actual})
+            rows = conn.execute(
+                f"""
+                SELECT account_id, balance_date, SUM(day_delta_units) AS units, SUM(posting_count) AS postings
+                FROM (
+                  SELECT p.account_id, date(t.transaction_date) AS balance_date,
+                         p.amount_units AS day_delta_units, 1 AS posting_count
+                  FROM {schema}.ledger_postings p
+                  JOIN {schema}.ledger_transactions t ON t.transaction_id = p.transaction_id
+                  UNION ALL
+                  SELECT account_id, balance_date, -day_delta_units, -posting_count
+                  FROM main.ledger_archive_checkpoints WHERE archive_year = ?
+                )
+                GROUP BY account_id, balance_date
+                HAVING units != 0 OR postings != 0
+                ORDER BY account_id, balance_date
+                """,
+                (year,),
+            ).fetchall()
+            for row in rows:
+                mismatches.append(
+                    {
+                        "year": year,
+                        "check": "checkpoint",
+                        "account_id": row["account_id"],
+                        "balance_date": row["balance_date"],
+                    }
+                )
+    return mismatches
@@ -0,0 +1,139 @@
+"""Materialized per-account ledger balances.
+
+``account_daily_balances`` holds one row per account and posting day with
+that day's net movement and the cumulative balance at the end of the day.
+``insert_transaction_bundle`` updates it in the same transaction as the
+postings, so it can never be observed out of step with the ledger.  A
+back-dated insert shifts the cumulative value of every later day, and the
+current balance of an account is its latest row.
+
+``verify_account_balances`` recomputes it from raw postings and
+``rebuild_account_balances`` regenerates it from scratch.
+"""
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from capital_os.domain.ledger.invariants import from_minor_units, to_minor_units
+
+
+def apply_posting_deltas(conn, *, transaction_date: str, postings: Iterable[dict[str, Any]]) -> None:
+    """Add a committed bundle's postings to the materialized balances."""
+    deltas: dict[str, int] = {}
+    for posting in postings:
+        deltas[posting["account_id"]] = deltas.get(posting["account_id"], 0) + to_minor_units(posting["amount"])
+
+    for account_id in sorted(deltas):
+        _apply_daily_delta(conn, account_id=account_id, transaction_date=transaction_date, units=deltas[account_id])
+
+
+def _apply_daily_delta(conn, *, account_id: str, transaction_date: str, units: int) -> None:
+    conn.execute(
+        """
+        INSERT INTO account_daily_balances (account_id, balance_date, day_delta_units, cumulative_units)
+        VALUES (
+          ?, date(?), ?,
+          ? + COALESCE((
+            SELECT prior.cumulative_units
+            FROM account_daily_balances prior
+            WHERE prior.account_id = ? AND prior.balance_date < date(?)
+            ORDER BY prior.balance_date DESC
+            LIMIT 1
+          ), 0)
+        )
+        ON CONFLICT(account_id, balance_date) DO UPDATE SET
+          day_delta_units = day_delta_units + excluded.day_delta_units,
+          cumulative_units = cumulative_units + excluded.day_delta_units
+        """,
+        (account_id, transaction_date, units, units, account_id, transaction_date),
+    )
+    # Back-dated posting: every later day's closing balance moves too.
+    conn.execute(
+        """
+        UPDATE account_daily_balances
+        SET cumulative_units = cumulative_units + ?
+        WHERE account_id = ? AND balance_date > date(?)
+        """,
+        (units, account_id, transaction_date),
+    )
+
+
+def _daily_totals_from_postings(conn) -> dict[str, dict[str, int]]:
+    daily: dict[str, dict[str, int]] = {}
+    cursor = conn.execute(
+        """
+        SELECT p.account_id, p.amount_units, date(t.transaction_date) AS posting_date
+        FROM ledger_postings p
+        JOIN ledger_transactions t ON t.transaction_id = p.transaction_id
+        """
+    )
+    for row in cursor:
+        days = daily.setdefault(row["account_id"], {})
+        days[row["posting_date"]] = days.get(row["posting_date"], 0) + row["amount_units"]
+    # Archived years contribute their per-day checkpoints instead of raw postings.
+    for row in conn.execute("SELECT account_id, balance_date, day_delta_units FROM ledger_archive_checkpoints"):
+        days = daily.setdefault(row["account_id"], {})
+        days[row["balance_date"]] = days.get(row["balance_date"], 0) + row["day_delta_units"]
+    return daily
+
+
+def _expected_rollups(conn) -> dict[tuple[str, str], tuple[int, int]]:
+    rollups: dict[tuple[str, str], tuple[int, int]] = {}
+    for account_id, days in _daily_totals_from_postings(conn).items():
+        cumulative = 0
+        for balance_date in sorted(days):
+            cumulative += days[balance_date]
+            rollups[(account_id, balance_date)] = (days[balance_date], cumulative)
+    return rollups
+
+
+def verify_account_balances(conn) -> list[dict[str, Any]]:
+    """Compare ``account_daily_balances`` with raw postings.
+
+    Returns one entry per mismatching day; an empty list means the rollup
+    is exact.
+    """
+    expected_rollups = _expected_rollups(conn)
+    actual_rollups = {
+        (row["account_id"], row["balance_date"]): (row["day_delta_units"], row["cumulative_units"])
+        for row in conn.execute(
+            "SELECT account_id, balance_date, day_delta_units, cumulative_units FROM account_daily_balances"
+        )
+    }
+
+    mismatches: list[dict[str, Any]] = []
+    for key in sorted(set(expected_rollups) | set(actual_rollups)):
+        want_rollup = expected_rollups.get(key)
+        have_rollup = actual_rollups.get(key)
+        if want_rollup == have_rollup:
+            continue
+        mismatches.append(
+            {
+                "table": "account_daily_balances",
+                "account_id": key[0],
+                "balance_date": key[1],
+                "expected": _serialize_rollup(want_rollup),
+                "actual": _serialize_rollup(have_rollup),
+            }
+        )
+    return mismatches
+
+
+def rebuild_account_balances(conn) -> int:
+    """Regenerate the daily rollup from raw postings; returns account count."""
+    rollups = _expected_rollups(conn)
+    conn.execute("DELETE FROM account_daily_balances")
+    conn.executemany(
+        """
+        INSERT INTO account_daily_balances (account_id, balance_date, day_delta_units, cumulative_units)
+        VALUES (?, ?, ?, ?)
+        """,
+        [(account_id, balance_date, *values) for (account_id, balance_date), values in sorted(rollups.items())],
+    )
+    return len({account_id for account_id, _ in rollups})
+
+
+def _serialize_rollup(values: tuple[int, int] | None) -> dict[str, str] | None:
+    if values is None:
+        return None
+    return {"day_delta": str(from_minor_units(values[0])), "cumulative": str(from_minor_units(values[1]))}
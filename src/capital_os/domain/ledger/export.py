@@ -0,0 +1,315 @@
+"""Streaming ledger export.
+
+Walks ``ledger_transactions`` in ``(transaction_day, transaction_id)`` order,
+which is the ``idx_ledger_transactions_day_id`` index order, joined to each
+transaction's postings.  Rows are pulled from one SQLite cursor in small
+``fetchmany`` batches and turned into text chunks by generators, so memory
+stays bounded by a single transaction no matter how large the ledger is, and
+the whole export reads one consistent WAL snapshot.  The export is paced by
+its client, so that snapshot lives on a dedicated read-only connection
+rather than a pooled reader, which would be withheld from tool reads for the
+length of the download.
+
+Every exported transaction carries a ``checkpoint`` token naming its position
+in that order.  Passing the token of the last transaction that was fully
+received as ``after`` resumes the export right after it.
+
+With entity sharding enabled the same query runs against every shard in
+parallel and the per-shard streams are merged on that order, so the output
+and its checkpoints are identical to an unsharded export of the same data.
+Archived years (see ``capital_os.domain.ledger.archive``) are read the same
+way: one cursor per attached archive, merged with the hot ledger.
+"""
+from __future__ import annotations
+
+from contextlib import ExitStack, contextmanager, nullcontext
+import csv
+from datetime import date
+from functools import partial
+import heapq
+import io
+import json
+from typing import Any, Iterable, Iterator
+
+from capital_os.db.session import (
+    entity_shard_ids,
+    fan_out_entities,
+    sharding_enabled,
+    use_entity_shard,
+)
+from capital_os.domain.entities import DEFAULT_ENTITY_ID
+from capital_os.domain.ledger.archive import archive_read_connection
+from capital_os.domain.ledger.invariants import from_minor_units
+from capital_os.domain.query.pagination import decode_cursor_payload, encode_cursor
+
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+CSV_COLUMNS = (
+    "transaction_id",
+    "source_system",
+    "external_id",
+    "transaction_date",
+    "description",
+    "entity_id",
+    "correlation_id",
+    "posting_id",
+    "account_id",
+    "amount",
+    "currency",
+    "memo",
+    "checkpoint",
+)
+_FETCH_BATCH = 500
+
+
+def encode_export_checkpoint(transaction_day: int, transaction_id: str) -> str:
+    return encode_cursor({"v": 1, "transaction_day": str(transaction_day), "transaction_id": transaction_id})
+
+
+def decode_export_checkpoint(token: str) -> tuple[int, str]:
+    payload = decode_cursor_payload(token, required_keys=("transaction_day", "transaction_id"))
+    try:
+        return int(payload["transaction_day"]), payload["transaction_id"]
+    except ValueError as exc:
+        raise ValueError("Invalid export checkpoint") from exc
+
+
+def _day_key(value: str | date, *, name: str) -> int:
+    try:
+        day = value if isinstance(value, date) else date.fromisoformat(value)
+    except ValueError as exc:
+        raise ValueError(f"{name} must be an ISO date (YYYY-MM-DD)") from exc
+    return day.year * 10000 + day.month * 100 + day.day
+
+
+def _export_query(
+    *,
+    date_from: str | date | None,
+    date_to: str | date | None,
+    entity_id: str | None,
+    after: str | None,
+    schema: str = "main",
+) -> tuple[str, tuple[Any, ...]]:
+    clauses: list[str] = []
+    params: list[Any] = []
+    if date_from is not None:
+        clauses.append("t.transaction_day >= ?")
+        params.append(_day_key(date_from, name="date_from"))
+    if date_to is not None:
+        clauses.append("t.transaction_day <= ?")
+        params.append(_day_key(date_to, name="date_to"))
+    if entity_id is not None:
+        clauses.append("t.entity_id = ?")
+        params.append(entity_id)
+    if after is not None:
+        clauses.append("(t.transaction_day, t.transaction_id) > (?, ?)")
+        params.extend(decode_export_checkpoint(after))
+    where_clause = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    sql = f"""
+        SELECT
+          t.transaction_day,
+          t.transaction_id,
+          t.source_system,
+          t.external_id,
+          t.transaction_date,
+          t.description,
+          t.entity_id,
+          t.correlation_id,
+          p.posting_id,
+          p.account_id,
+          p.amount_units,
+          p.currency,
+          p.memo
+        -- Pin the day index as the outer loop (CROSS JOIN fixes join order) so
+        -- rows stream in index order; only each transaction's postings are
+        -- sorted, never the whole result.
+        FROM {schema}.ledger_transactions t INDEXED BY idx_ledger_transactions_day_id
+        CROSS JOIN {schema}.ledger_postings p ON p.transaction_id = t.transaction_id
+        {where_clause}
+        ORDER BY t.transaction_day ASC, t.transaction_id ASC, p.account_id ASC, p.amount_units ASC, p.posting_id ASC
+        """
+    return sql, tuple(params)
+
+
+def iter_ledger_export(
+    conn,
+    *,
+    date_from: str | date | None = None,
+    date_to: str | date | None = None,
+    entity_id: str | None = None,
+    after: str | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Iterate one dict per transaction, postings included, in checkpoint order.
+
+    ``date_from``/``date_to`` are inclusive UTC calendar days.  Filters and the
+    checkpoint are validated eagerly (``ValueError``).
+    """
+    sql, params = _export_query(date_from=date_from, date_to=date_to, entity_id=entity_id, after=after)
+    return _iter_records(conn.execute(sql, params))
+
+
+def open_ledger_export(
+    *,
+    date_from: str | date | None = None,
+    date_to: str | date | None = None,
+    entity_id: str | None = None,
+    after: str | None = None,
+):
+    """Context manager yielding export records read through dedicated connections.
+
+    Arguments are validated before this returns (``ValueError``); one
+    read-only connection per database is opened on entry and closed on exit.
+    """
+    query = partial(_export_query, date_from=date_from, date_to=date_to, entity_id=entity_id, after=after)
+    query()
+    return _open_records(query, entity_id=entity_id)
+
+
+def _enter_sources(stack: ExitStack, query) -> list:
+    """Open the active database for reading; one deferred execute per schema.
+
+    ``archive_read_connection`` is a dedicated connection outside the pool,
+    with any archived years attached.
+    """
+    conn, schemas = stack.enter_context(archive_read_connection())
+    return [partial(conn.execute, *query(schema=schema)) for schema in schemas]
+
+
+@contextmanager
+def _open_records(query, *, entity_id: str | None) -> Iterator[Iterator[dict[str, Any]]]:
+    shard_ids: list[str | None] = [None]
+    if sharding_enabled():
+        shard_ids = entity_shard_ids()
+        if entity_id is not None:
+            shard_ids = [shard for shard in shard_ids if shard in (entity_id, DEFAULT_ENTITY_ID)]
+    with ExitStack() as stack:
+        sources = {}
+        for shard in shard_ids:
+            with use_entity_shard(shard) if shard is not None else nullcontext():
+                sources[shard] = _enter_sources(stack, query)
+        if shard_ids == [None]:
+            cursors = [execute() for execute in sources[None]]
+        else:
+            started = fan_out_entities(lambda shard: [execute() for execute in sources[shard]], shard_ids)
+            cursors = [cursor for _, shard_cursors in started for cursor in shard_cursors]
+        if len(cursors) == 1:
+            yield _iter_records(cursors[0])
+            return
+        yield heapq.merge(
+            *(_iter_records(cursor) for cursor in cursors),
+            key=lambda record: decode_export_checkpoint(record["checkpoint"]),
+        )
+
+
+def stream_ledger_export(
+    fmt: str,
+    *,
+    date_from: str | date | None = None,
+    date_to: str | date | None = None,
+    entity_id: str | None = None,
+    after: str | None = None,
+    header: bool = True,
+) -> Iterator[str]:
+    """Text chunks of a ledger export read through dedicated connections.
+
+    Arguments are validated before this returns, so callers can reject a
+    request before they start streaming; connections are opened on the first
+    chunk and closed when the stream is exhausted or closed.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {'|'.join(EXPORT_FORMATS)}")
+    export = open_ledger_export(date_from=date_from, date_to=date_to, entity_id=entity_id, after=after)
+
+    def stream() -> Iterator[str]:
+        with export as records:
+            yield from render_export(fmt, records, header=header)
+
+    return stream()
+
+
+def _iter_records(cursor) -> Iterator[dict[str, Any]]:
+    try:
+        current: dict[str, Any] | None = None
+        while True:
+            rows = cursor.fetchmany(_FETCH_BATCH)
+            if not rows:
+                break
+            for row in rows:
+                if current is None or current["transaction_id"] != row["transaction_id"]:
+                    if current is not None:
+                        yield current
+                    current = {
+                        "transaction_id": row["transaction_id"],
+                        "source_system": row["source_system"],
+                        "external_id": row["external_id"],
+                        "transaction_date": row["transaction_date"],
+                        "description": row["description"],
+                        "entity_id": row["entity_id"],
+                        "correlation_id": row["correlation_id"],
+                        "postings": [],
+                        "checkpoint": encode_export_checkpoint(row["transaction_day"], row["transaction_id"]),
+                    }
+                current["postings"].append(
+                    {
+                        "posting_id": row["posting_id"],
+                        "account_id": row["account_id"],
+                        "amount": str(from_minor_units(row["amount_units"])),
+                        "currency": row["currency"],
+                        "memo": row["memo"],
+                    }
+                )
+        if current is not None:
+            yield current
+    finally:
+        cursor.close()
+
+
+def iter_ndjson(records: Iterable[dict[str, Any]]) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(record, separators=(",", ":")) + "\n"
+
+
+def iter_csv(records: Iterable[dict[str, Any]], *, header: bool = True) -> Iterator[str]:
+    """One CSV line per posting; transaction fields repeat on each line."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    def drain() -> str:
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    if header:
+        writer.writerow(CSV_COLUMNS)
+        yield drain()
+    for record in records:
+        for posting in record["postings"]:
+            writer.writerow(
+                [
+                    record["transaction_id"],
+                    record["source_system"],
+                    record["external_id"],
+                    record["transaction_date"],
+                    record["description"],
+                    record["entity_id"],
+                    record["correlation_id"],
+                    posting["posting_id"],
+                    posting["account_id"],
+                    posting["amount"],
+                    posting["currency"],
+                    posting["memo"] or "",
+                    record["checkpoint"],
+                ]
+            )
+        yield drain()
+
+
+def render_export(fmt: str, records: Iterable[dict[str, Any]], *, header: bool = True) -> Iterator[str]:
+    if fmt == "ndjson":
+        return iter_ndjson(records)
+    if fmt == "csv":
+        return iter_csv(records, header=header)
+    raise ValueError(f"format must be one of {'|'.join(EXPORT_FORMATS)}")
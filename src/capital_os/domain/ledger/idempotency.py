@@ -1,12 +1,33 @@
 from __future__ import annotations
 
+from capital_os.domain.ledger.idempotency_cache import get_idempotency_cache
 from capital_os.domain.ledger.repository import fetch_transaction_by_external_id
 
 
-def resolve_transaction_idempotency(conn, source_system: str, external_id: str) -> dict | None:
-    row = fetch_transaction_by_external_id(conn, source_system, external_id)
+def resolve_transaction_idempotency(
+    conn, source_system: str, external_id: str, *, bypass_cache: bool = False
+) -> dict | None:
+    """Replay payload for a committed key, or ``None``.
+
+    Pass ``bypass_cache`` after a UNIQUE violation: the key is known to
+    exist, so a cache or Bloom filter that disagrees must not be trusted.
+    """
+    cache = None if bypass_cache else get_idempotency_cache()
+    if cache is None:
+        row = fetch_transaction_by_external_id(conn, source_system, external_id)
+    else:
+        row = cache.lookup(
+            source_system,
+            external_id,
+            lambda: fetch_transaction_by_external_id(conn, source_system, external_id),
+        )
     if not row:
         return None
+    return replay_response(row)
+
+
+def replay_response(row: dict) -> dict:
+    """Replay payload for an already-committed transaction row."""
     response = dict(row["response_payload"] or {})
     if response:
         response["status"] = "idempotent-replay"
@@ -0,0 +1,284 @@
+"""Process-local cache of committed transaction idempotency keys.
+
+Replays of a committed ``(source_system, external_id)`` are answered from a
+bounded LRU of parsed response payloads, and, when the optional Bloom filter
+is enabled, keys that were never committed are answered without a DB probe.
+
+Committed ``ledger_transactions`` rows are append-only except for the
+archive run (``domain/ledger/archive.py``), which deletes a locked year.  The
+table has no AUTOINCREMENT, so after that delete SQLite may hand the freed
+rowids to new rows below the highest rowid already synced.  The cache
+therefore starts over, rescanning every row and archived key, whenever
+``ledger_archives`` changes or the database file is replaced.  The cache learns about
+commits from every connection and every worker process through the pool's
+monitor connection (``capital_os.db.session.data_version``): whenever the token
+changes, rows above the highest rowid seen so far are read through that
+autocommit connection, which only ever sees committed data.  Two rules keep
+uncommitted state out of the cache:
+
+* a probed row is cached only if its rowid is at or below the highest
+  committed rowid the monitor has seen, so rows written by a transaction that
+  is still open (and may roll back) are never cached;
+* inserts add their keys to the Bloom filter eagerly, before commit.  A
+  rolled-back key only costs a false positive (one extra probe), while a
+  transaction that looks up a key it inserted itself still reaches the DB.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import math
+import os
+import threading
+from typing import Callable
+
+from capital_os.config import get_settings
+from capital_os.db.session import active_db_url, data_version, monitor_connection
+
+
+_BLOOM_ERROR_RATE = 0.01
+
+
+class _BloomFilter:
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.count = 0
+        self._size = max(64, math.ceil(-capacity * math.log(_BLOOM_ERROR_RATE) / math.log(2) ** 2))
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def _positions(self, h1: int, h2: int):
+        for i in range(self._hashes):
+            yield (h1 + i * h2) % self._size
+
+    def add(self, h1: int, h2: int) -> None:
+        for position in self._positions(h1, h2):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, hashes: tuple[int, int]) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(*hashes))
+
+
+class _ScalableBloomFilter:
+    """Chain of Bloom filters; a full filter is kept and a twice-larger one appended.
+
+    Keys are never removed and the filter is never rebuilt in place, so keys
+    added ahead of commit are not lost when the filter grows.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._filters = [_BloomFilter(capacity)]
+
+    @staticmethod
+    def _hashes(key: tuple[str, str]) -> tuple[int, int]:
+        digest = hashlib.blake2b("\x1f".join(key).encode("utf-8"), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+    def add(self, key: tuple[str, str]) -> None:
+        hashes = self._hashes(key)
+        if any(hashes in bloom for bloom in self._filters):
+            return
+        current = self._filters[-1]
+        if current.count >= current.capacity:
+            current = _BloomFilter(current.capacity * 2)
+            self._filters.append(current)
+        current.add(*hashes)
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        hashes = self._hashes(key)
+        return any(hashes in bloom for bloom in self._filters)
+
+    @property
+    def count(self) -> int:
+        return sum(bloom.count for bloom in self._filters)
+
+
+class IdempotencyCache:
+    """Bounded LRU of committed idempotency keys with an optional Bloom filter."""
+
+    def __init__(self, *, max_entries: int, bloom_capacity: int | None = None) -> None:
+        self._max_entries = max_entries
+        self._bloom_capacity = bloom_capacity
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str], dict] = OrderedDict()
+        self._bloom = _ScalableBloomFilter(bloom_capacity) if bloom_capacity else None
+        self._token: tuple[int, int, int] | None = None
+        self._committed_rowid = 0
+        self._archive_mark: tuple[int, int] | None = None
+        self._hits = 0
+        self._misses = 0
+        self._bloom_skips = 0
+        self._syncs = 0
+
+    def lookup(
+        self,
+        source_system: str,
+        external_id: str,
+        probe: Callable[[], dict | None],
+    ) -> dict | None:
+        """Return the committed row for a key, calling ``probe`` only when needed.
+
+        ``probe`` runs the DB lookup on the caller's connection and returns
+        ``None`` or a dict with ``rowid``, ``transaction_id`` and
+        ``response_payload``.  Returned dicts are shared; treat them as
+        read-only.
+        """
+        key = (source_system, external_id)
+        self._sync()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry
+            if self._bloom is not None and key not in self._bloom:
+                self._bloom_skips += 1
+                return None
+            self._misses += 1
+            token = self._token
+            committed_rowid = self._committed_rowid
+
+        row = probe()
+        if row is None or not row.get("response_payload") or row["rowid"] > committed_rowid:
+            return row
+        with self._lock:
+            if self._token == token:
+                self._entries[key] = row
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return row
+
+    def note_inserted(self, keys: list[tuple[str, str]]) -> None:
+        """Record keys being inserted by a not-yet-committed transaction."""
+        if self._bloom is None:
+            return
+        with self._lock:
+            for key in keys:
+                self._bloom.add(key)
+
+    def _sync(self) -> None:
+        token = data_version()
+        if token == self._token:
+            return
+        with self._sync_lock:
+            with self._lock:
+                if token == self._token:
+                    return
+                previous = self._token
+                tracking_keys = self._bloom is not None
+
+            with monitor_connection() as conn:
+                archive_mark = tuple(
+                    conn.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(status = 'archived'), 0) FROM ledger_archives"
+                    ).fetchone()
+                )
+                with self._lock:
+                    if previous is not None and token[:2] != previous[:2]:
+                        # Different pool or replaced file: nothing cached applies.
+                        self._entries.clear()
+                        self._bloom = (
+                            _ScalableBloomFilter(self._bloom_capacity) if self._bloom_capacity else None
+                        )
+                        self._committed_rowid = 0
+                    elif previous is not None and archive_mark != self._archive_mark:
+                        # Rows were deleted and their rowids may come back, so
+                        # rescan from the start.  The Bloom filter is kept:
+                        # archived keys stay committed, and it may hold keys
+                        # that open transactions are inserting.
+                        self._entries.clear()
+                        self._committed_rowid = 0
+                    after = self._committed_rowid
+
+                if tracking_keys:
+                    rows = conn.execute(
+                        """
+                        SELECT rowid, source_system, external_id
+                        FROM ledger_transactions
+                        WHERE rowid > ?
+                        ORDER BY rowid
+                        """,
+                        (after,),
+                    ).fetchall()
+                    latest = rows[-1]["rowid"] if rows else after
+                    if after == 0:
+                        # Archived keys never reappear above a rowid; load them once.
+                        rows += conn.execute(
+                            "SELECT source_system, external_id FROM ledger_archived_keys"
+                        ).fetchall()
+                else:
+                    rows = []
+                    latest = conn.execute(
+                        "SELECT COALESCE(MAX(rowid), 0) AS latest FROM ledger_transactions"
+                    ).fetchone()["latest"]
+
+            with self._lock:
+                if self._bloom is not None:
+                    for row in rows:
+                        self._bloom.add((row["source_system"], row["external_id"]))
+                self._committed_rowid = max(self._committed_rowid, int(latest))
+                self._archive_mark = archive_mark
+                self._token = token
+                self._syncs += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses + self._bloom_skips
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "bloom_skips": self._bloom_skips,
+                "hit_rate": round((self._hits + self._bloom_skips) / lookups, 4) if lookups else 0.0,
+                "bloom_keys": self._bloom.count if self._bloom is not None else None,
+                "syncs": self._syncs,
+                "committed_rowid": self._committed_rowid,
+            }
+
+
+_CACHES: dict[tuple, IdempotencyCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def _reset_caches_after_fork() -> None:
+    global _CACHES, _CACHES_LOCK
+    _CACHES = {}
+    _CACHES_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_caches_after_fork)
+
+
+def get_idempotency_cache() -> IdempotencyCache | None:
+    """Cache for the active database (see ``active_db_url``), or ``None`` when disabled."""
+    settings = get_settings()
+    if not settings.idempotency_cache_enabled:
+        return None
+    bloom_capacity = settings.idempotency_bloom_capacity if settings.idempotency_bloom_enabled else None
+    key = (active_db_url(), settings.idempotency_cache_size, bloom_capacity)
+    cache = _CACHES.get(key)
+    if cache is not None:
+        return cache
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = IdempotencyCache(max_entries=settings.idempotency_cache_size, bloom_capacity=bloom_capacity)
+            _CACHES[key] = cache
+        return cache
+
+
+def note_inserted_transaction_keys(keys: list[tuple[str, str]]) -> None:
+    """Tell the cache which keys an open transaction is inserting."""
+    cache = get_idempotency_cache()
+    if cache is not None:
+        cache.note_inserted(keys)
+
+
+def idempotency_cache_stats() -> dict | None:
+    cache = get_idempotency_cache()
+    return cache.stats() if cache is not None else None
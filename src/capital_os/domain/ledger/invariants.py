@@ -3,6 +3,7 @@ from __future__ import annotations
 from decimal import Decimal, ROUND_HALF_EVEN
 
 MONEY_QUANT = Decimal("0.0001")
+MINOR_UNITS_PER_UNIT = 10000
 
 
 class InvariantError(ValueError):
@@ -13,6 +14,15 @@ def normalize_amount(value: Decimal | str) -> Decimal:
     return Decimal(str(value)).quantize(MONEY_QUANT, rounding=ROUND_HALF_EVEN)
 
 
+def to_minor_units(value: Decimal | str) -> int:
+    """Convert an amount to an exact integer count of 1e-4 minor units."""
+    return int(normalize_amount(value).scaleb(4))
+
+
+def from_minor_units(units: int) -> Decimal:
+    return normalize_amount(Decimal(units).scaleb(-4))
+
+
 def ensure_balanced(postings: list[dict]) -> None:
     total = sum((normalize_amount(p["amount"]) for p in postings), Decimal("0.0000"))
     if total != Decimal("0.0000"):
@@ -0,0 +1,43 @@
+"""Integer minor-unit money columns.
+
+Postings, balance snapshots and obligations store every amount twice: the
+legacy NUMERIC column and an INTEGER count of 1e-4 minor units that all reads
+and aggregates use.  ``verify_minor_unit_columns`` proves the two agree, e.g.
+after the 0013 backfill on an existing database.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from capital_os.domain.ledger.invariants import from_minor_units, to_minor_units
+
+
+MINOR_UNIT_COLUMNS: tuple[tuple[str, str, str, str], ...] = (
+    # (table, key column, legacy decimal column, integer units column)
+    ("ledger_postings", "posting_id", "amount", "amount_units"),
+    ("balance_snapshots", "snapshot_id", "balance", "balance_units"),
+    ("obligations", "obligation_id", "expected_amount", "expected_amount_units"),
+)
+
+
+def verify_minor_unit_columns(conn) -> list[dict[str, Any]]:
+    """Return one entry per row whose units column disagrees with its decimal column."""
+    mismatches: list[dict[str, Any]] = []
+    for table, key_column, decimal_column, units_column in MINOR_UNIT_COLUMNS:
+        cursor = conn.execute(
+            f"SELECT {key_column} AS row_id, {decimal_column} AS amount, {units_column} AS units "
+            f"FROM {table} ORDER BY {key_column}"
+        )
+        for row in cursor:
+            expected = to_minor_units(row["amount"])
+            if row["units"] == expected:
+                continue
+            mismatches.append(
+                {
+                    "table": table,
+                    "row_id": row["row_id"],
+                    "expected": str(from_minor_units(expected)),
+                    "actual": None if row["units"] is None else str(from_minor_units(row["units"])),
+                }
+            )
+    return mismatches
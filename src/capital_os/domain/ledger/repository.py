@@ -1,30 +1,77 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
+from decimal import Decimal
 import json
 from typing import Any
 from uuid import uuid4
 
 from capital_os.domain.entities import DEFAULT_ENTITY_ID
-from capital_os.domain.ledger.invariants import normalize_amount
+from capital_os.domain.ledger.balances import apply_posting_deltas
+from capital_os.domain.ledger.idempotency_cache import note_inserted_transaction_keys
+from capital_os.domain.ledger.invariants import from_minor_units, normalize_amount, to_minor_units
+from capital_os.observability.tracing import traced
 
 
 def fetch_transaction_by_external_id(conn, source_system: str, external_id: str) -> dict | None:
+    # Archived transactions keep their key hot; rowid 0 marks them as long committed.
     row = conn.execute(
         """
-        SELECT transaction_id, response_payload
+        SELECT rowid AS rowid, transaction_id, response_payload
         FROM ledger_transactions
         WHERE source_system=? AND external_id=?
+        UNION ALL
+        SELECT 0, transaction_id, response_payload
+        FROM ledger_archived_keys
+        WHERE source_system=? AND external_id=?
+        LIMIT 1
         """,
-        (source_system, external_id),
+        (source_system, external_id, source_system, external_id),
     ).fetchone()
     if not row:
         return None
     response_payload = row["response_payload"]
     if response_payload:
         response_payload = json.loads(response_payload)
-    return {"transaction_id": str(row["transaction_id"]), "response_payload": response_payload}
+    return {
+        "rowid": row["rowid"],
+        "transaction_id": str(row["transaction_id"]),
+        "response_payload": response_payload,
+    }
 
 
+def fetch_transactions_by_external_ids(
+    conn, keys: list[tuple[str, str]]
+) -> dict[tuple[str, str], dict]:
+    """Batch form of ``fetch_transaction_by_external_id`` keyed by (source_system, external_id)."""
+    if not keys:
+        return {}
+    values = ",".join("(?, ?)" for _ in keys)
+    rows = conn.execute(
+        f"""
+        WITH batch_keys(source_system, external_id) AS (
+          VALUES {values}
+        )
+        SELECT t.source_system, t.external_id, t.transaction_id, t.response_payload
+        FROM batch_keys k
+        JOIN ledger_transactions t ON t.source_system = k.source_system AND t.external_id = k.external_id
+        UNION ALL
+        SELECT a.source_system, a.external_id, a.transaction_id, a.response_payload
+        FROM batch_keys k
+        JOIN ledger_archived_keys a ON a.source_system = k.source_system AND a.external_id = k.external_id
+        """,
+        tuple(value for key in keys for value in key),
+    ).fetchall()
+    return {
+        (row["source_system"], row["external_id"]): {
+            "transaction_id": str(row["transaction_id"]),
+            "response_payload": json.loads(row["response_payload"]) if row["response_payload"] else None,
+        }
+        for row in rows
+    }
+
+
+@traced("find_duplicate_risk_matches")
 def find_duplicate_risk_matches(
     conn,
     *,
@@ -34,7 +81,7 @@ def find_duplicate_risk_matches(
     """Find committed transactions that match on date + account_id + normalized amount."""
     match_keys = sorted(
         {
-            (posting["account_id"], str(normalize_amount(posting["amount"])))
+            (posting["account_id"], to_minor_units(posting["amount"]))
             for posting in postings
         },
         key=lambda item: (item[0], item[1]),
@@ -42,24 +89,24 @@ def find_duplicate_risk_matches(
     if not match_keys:
         return []
 
-    required_values = ",".join("(?, ?)" for _ in match_keys)
-    required_params: list[Any] = []
-    for account_id, amount in match_keys:
-        required_params.extend([account_id, amount])
-    key_count = len(match_keys)
+    # One primary-key seek into ledger_posting_fingerprints per key; a
+    # transaction matches when it carries every key.
+    key_lookup = """
+          SELECT transaction_id
+          FROM ledger_posting_fingerprints
+          WHERE transaction_day = (SELECT transaction_day FROM match_day) AND account_id = ? AND amount_units = ?
+    """
+    key_params: list[Any] = []
+    for account_id, amount_units in match_keys:
+        key_params.extend([account_id, amount_units])
 
     rows = conn.execute(
-        f"""        WITH required_keys(account_id, amount) AS (
-          VALUES {required_values}
+        f"""
+        WITH match_day(transaction_day) AS (
+          SELECT CAST(strftime('%Y%m%d', ?) AS INTEGER)
         ),
-        matched_transactions AS (
-          SELECT t.transaction_id
-          FROM ledger_transactions t
-          JOIN ledger_postings p ON p.transaction_id = t.transaction_id
-          JOIN required_keys rk ON rk.account_id = p.account_id AND rk.amount = p.amount
-          WHERE date(t.transaction_date) = date(?)
-          GROUP BY t.transaction_id
-          HAVING COUNT(DISTINCT rk.account_id || '|' || rk.amount) = ?
+        matched_transactions(transaction_id) AS (
+          {" INTERSECT ".join(key_lookup for _ in match_keys)}
         )
         SELECT
           t.transaction_id,
@@ -69,13 +116,69 @@ def find_duplicate_risk_matches(
           t.description,
           t.correlation_id,
           t.entity_id
+        FROM matched_transactions mt
+        JOIN ledger_transactions t ON t.transaction_id = mt.transaction_id
+        ORDER BY t.transaction_date ASC, t.transaction_id ASC
+        """,
+        (str(effective_date), *key_params),
+    ).fetchall()
+
+    return _with_postings(conn, rows)
+
+
+def find_duplicate_risk_candidates(
+    conn,
+    *,
+    posting_keys: list[tuple[Any, str, int]],
+) -> list[dict[str, Any]]:
+    """Committed transactions that could duplicate-risk match any of a batch.
+
+    ``posting_keys`` holds ``(effective_date, account_id, amount_units)``
+    triples.  A match must carry every key of its bundle, so one key per
+    bundle is enough.  Returns every transaction with a posting on one of
+    those keys, in the same shape as ``find_duplicate_risk_matches`` plus
+    its ``transaction_day`` key, so the caller can apply the all-keys match
+    rule per bundle in memory.  Each key is one primary-key seek into
+    ``ledger_posting_fingerprints``, so the cost follows the batch rather
+    than how much of the ledger shares its days and accounts.
+    """
+    if not posting_keys:
+        return []
+    key_values = ",".join("(CAST(strftime('%Y%m%d', ?) AS INTEGER), ?, ?)" for _ in posting_keys)
+    rows = conn.execute(
+        f"""
+        WITH batch_keys(transaction_day, account_id, amount_units) AS (
+          VALUES {key_values}
+        )
+        SELECT
+          t.transaction_id,
+          t.source_system,
+          t.external_id,
+          t.transaction_date,
+          t.description,
+          t.correlation_id,
+          t.entity_id,
+          t.transaction_day
         FROM ledger_transactions t
-        JOIN matched_transactions mt ON mt.transaction_id = t.transaction_id
+        WHERE t.transaction_id IN (
+          SELECT f.transaction_id
+          FROM batch_keys k
+          JOIN ledger_posting_fingerprints f
+            ON f.transaction_day = k.transaction_day
+           AND f.account_id = k.account_id
+           AND f.amount_units = k.amount_units
+        )
         ORDER BY t.transaction_date ASC, t.transaction_id ASC
         """,
-        tuple([*required_params, str(effective_date), key_count]),
+        tuple(value for day, account_id, units in posting_keys for value in (str(day), account_id, units)),
     ).fetchall()
+    candidates = _with_postings(conn, rows)
+    for candidate, row in zip(candidates, rows):
+        candidate["transaction_day"] = row["transaction_day"]
+    return candidates
+
 
+def _with_postings(conn, rows) -> list[dict[str, Any]]:
     if not rows:
         return []
 
@@ -84,10 +187,10 @@ def find_duplicate_risk_matches(
     placeholders = ",".join("?" for _ in tx_ids)
     posting_rows = conn.execute(
         f"""
-        SELECT posting_id, transaction_id, account_id, amount, currency, memo
+        SELECT posting_id, transaction_id, account_id, amount_units, currency, memo
         FROM ledger_postings
         WHERE transaction_id IN ({placeholders})
-        ORDER BY transaction_id ASC, account_id ASC, amount ASC, posting_id ASC
+        ORDER BY transaction_id ASC, account_id ASC, amount_units ASC, posting_id ASC
         """,
         tuple(tx_ids),
     ).fetchall()
@@ -96,7 +199,7 @@ def find_duplicate_risk_matches(
             {
                 "posting_id": posting["posting_id"],
                 "account_id": posting["account_id"],
-                "amount": str(normalize_amount(posting["amount"])),
+                "amount": str(from_minor_units(posting["amount_units"])),
                 "currency": posting["currency"],
                 "memo": posting["memo"],
             }
@@ -120,49 +223,96 @@ def find_duplicate_risk_matches(
     return result
 
 
-def insert_transaction_bundle(conn, payload: dict[str, Any]) -> tuple[str, list[str]]:
+def prepare_transaction_bundle(payload: dict[str, Any]) -> dict[str, Any]:
+    """Order postings canonically and assign transaction and posting ids."""
     postings = sorted(payload["postings"], key=lambda p: (p["account_id"], str(p["amount"]), p.get("memo") or ""))
-    tx_id = str(uuid4())
-    conn.execute(
+    return {
+        **payload,
+        "transaction_id": str(uuid4()),
+        "postings": [{**p, "posting_id": str(uuid4())} for p in postings],
+    }
+
+
+def insert_transaction_bundles(conn, bundles: list[dict[str, Any]]) -> None:
+    """Insert prepared bundles with one ``executemany`` per table.
+
+    Each bundle comes from ``prepare_transaction_bundle``; an optional
+    ``response_payload``/``output_hash`` pair is stored with the row.
+    Materialized balances receive one delta application per UTC day.
+    """
+    note_inserted_transaction_keys([(bundle["source_system"], bundle["external_id"]) for bundle in bundles])
+    conn.executemany(
         """
         INSERT INTO ledger_transactions (
             transaction_id, source_system, external_id, transaction_date, description, correlation_id, input_hash, entity_id,
-            is_adjusting_entry, adjusting_reason_code
-        ) VALUES (?,?,?,?,?,?,?,?,?,?)
+            is_adjusting_entry, adjusting_reason_code, response_payload, output_hash
+        ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)
         """,
-        (
-            tx_id,
-            payload["source_system"],
-            payload["external_id"],
-            payload["date"],
-            payload["description"],
-            payload["correlation_id"],
-            payload["input_hash"],
-            payload.get("entity_id", DEFAULT_ENTITY_ID),
-            1 if payload.get("is_adjusting_entry", False) else 0,
-            payload.get("adjusting_reason_code"),
-        ),
-    )
-    posting_ids: list[str] = []
-    for p in postings:
-        posting_id = str(uuid4())
-        conn.execute(
-            """
-            INSERT INTO ledger_postings (posting_id, transaction_id, account_id, amount, currency, memo)
-            VALUES (?,?,?,?,?,?)
-            """,
+        [
             (
-                posting_id,
-                tx_id,
-                p["account_id"],
-                str(normalize_amount(p["amount"])),
-                p["currency"],
-                p.get("memo"),
-            ),
-        )
-        posting_ids.append(posting_id)
+                bundle["transaction_id"],
+                bundle["source_system"],
+                bundle["external_id"],
+                bundle["date"],
+                bundle["description"],
+                bundle["correlation_id"],
+                bundle["input_hash"],
+                bundle.get("entity_id", DEFAULT_ENTITY_ID),
+                1 if bundle.get("is_adjusting_entry", False) else 0,
+                bundle.get("adjusting_reason_code"),
+                (
+                    json.dumps(bundle["response_payload"], separators=(",", ":"))
+                    if bundle.get("response_payload") is not None
+                    else None
+                ),
+                bundle.get("output_hash"),
+            )
+            for bundle in bundles
+        ],
+    )
+    posting_rows = []
+    postings_by_day: dict[str, list[dict[str, Any]]] = {}
+    for bundle in bundles:
+        for p in bundle["postings"]:
+            amount = normalize_amount(p["amount"])
+            posting_rows.append(
+                (
+                    p["posting_id"],
+                    bundle["transaction_id"],
+                    p["account_id"],
+                    str(amount),
+                    to_minor_units(amount),
+                    p["currency"],
+                    p.get("memo"),
+                )
+            )
+        postings_by_day.setdefault(_utc_day(bundle["date"]), []).extend(bundle["postings"])
+    conn.executemany(
+        """
+        INSERT INTO ledger_postings (posting_id, transaction_id, account_id, amount, amount_units, currency, memo)
+        VALUES (?,?,?,?,?,?,?)
+        """,
+        posting_rows,
+    )
+
+    for day in sorted(postings_by_day):
+        apply_posting_deltas(conn, transaction_date=day, postings=postings_by_day[day])
 
-    return tx_id, posting_ids
+
+def _utc_day(value: Any) -> str:
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.date().isoformat()
+
+
+def insert_transaction_bundle(conn, payload: dict[str, Any]) -> tuple[str, list[str]]:
+    bundle = prepare_transaction_bundle(payload)
+    insert_transaction_bundles(conn, [bundle])
+    return bundle["transaction_id"], [p["posting_id"] for p in bundle["postings"]]
 
 
 def save_transaction_response(conn, transaction_id: str, response: dict, output_hash: str) -> None:
@@ -177,6 +327,7 @@ def save_transaction_response(conn, transaction_id: str, response: dict, output_
 
 
 def upsert_balance_snapshot(conn, payload: dict[str, Any]) -> tuple[str, str]:
+    balance = normalize_amount(payload["balance"])
     existing = conn.execute(
         "SELECT snapshot_id FROM balance_snapshots WHERE account_id=? AND snapshot_date=?",
         (payload["account_id"], str(payload["snapshot_date"])),
@@ -186,11 +337,13 @@ def upsert_balance_snapshot(conn, payload: dict[str, Any]) -> tuple[str, str]:
         conn.execute(
             """
             UPDATE balance_snapshots
-            SET balance=?, currency=?, source_artifact_id=?, source_system=?, entity_id=?, updated_at=CURRENT_TIMESTAMP
+            SET balance=?, balance_units=?, currency=?, source_artifact_id=?, source_system=?, entity_id=?,
+                updated_at=CURRENT_TIMESTAMP
             WHERE snapshot_id=?
             """,
             (
-                str(normalize_amount(payload["balance"])),
+                str(balance),
+                to_minor_units(balance),
                 payload["currency"],
                 payload.get("source_artifact_id"),
                 payload["source_system"],
@@ -204,15 +357,17 @@ def upsert_balance_snapshot(conn, payload: dict[str, Any]) -> tuple[str, str]:
     conn.execute(
         """
         INSERT INTO balance_snapshots (
-            snapshot_id, source_system, account_id, snapshot_date, balance, currency, source_artifact_id, entity_id
-        ) VALUES (?,?,?,?,?,?,?,?)
+            snapshot_id, source_system, account_id, snapshot_date, balance, balance_units, currency, source_artifact_id,
+            entity_id
+        ) VALUES (?,?,?,?,?,?,?,?,?)
         """,
         (
             snapshot_id,
             payload["source_system"],
             payload["account_id"],
             str(payload["snapshot_date"]),
-            str(normalize_amount(payload["balance"])),
+            str(balance),
+            to_minor_units(balance),
             payload["currency"],
             payload.get("source_artifact_id"),
             payload.get("entity_id", DEFAULT_ENTITY_ID),
@@ -223,6 +378,7 @@ def upsert_balance_snapshot(conn, payload: dict[str, Any]) -> tuple[str, str]:
 
 def upsert_obligation(conn, payload: dict[str, Any]) -> tuple[str, str, bool]:
     active_flag = 1 if payload.get("active", True) else 0
+    expected_amount = normalize_amount(payload["expected_amount"])
     existing = conn.execute(
         "SELECT obligation_id FROM obligations WHERE source_system=? AND name=? AND account_id=?",
         (payload["source_system"], payload["name"], payload["account_id"]),
@@ -232,12 +388,14 @@ def upsert_obligation(conn, payload: dict[str, Any]) -> tuple[str, str, bool]:
         conn.execute(
             """
             UPDATE obligations
-            SET cadence=?, expected_amount=?, variability_flag=?, next_due_date=?, metadata=?, entity_id=?, active=?, updated_at=CURRENT_TIMESTAMP
+            SET cadence=?, expected_amount=?, expected_amount_units=?, variability_flag=?, next_due_date=?, metadata=?,
+                entity_id=?, active=?, updated_at=CURRENT_TIMESTAMP
             WHERE obligation_id=?
             """,
             (
                 payload["cadence"],
-                str(normalize_amount(payload["expected_amount"])),
+                str(expected_amount),
+                to_minor_units(expected_amount),
                 1 if payload.get("variability_flag", False) else 0,
                 str(payload["next_due_date"]),
                 json.dumps(payload.get("metadata", {}), separators=(",", ":")),
@@ -252,9 +410,9 @@ def upsert_obligation(conn, payload: dict[str, Any]) -> tuple[str, str, bool]:
     conn.execute(
         """
         INSERT INTO obligations (
-            obligation_id, source_system, name, account_id, cadence, expected_amount,
+            obligation_id, source_system, name, account_id, cadence, expected_amount, expected_amount_units,
             variability_flag, next_due_date, metadata, active, entity_id
-        ) VALUES (?,?,?,?,?,?,?,?,?,?,?)
+        ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)
         """,
         (
             obligation_id,
@@ -262,7 +420,8 @@ def upsert_obligation(conn, payload: dict[str, Any]) -> tuple[str, str, bool]:
             payload["name"],
             payload["account_id"],
             payload["cadence"],
-            str(normalize_amount(payload["expected_amount"])),
+            str(expected_amount),
+            to_minor_units(expected_amount),
             1 if payload.get("variability_flag", False) else 0,
             str(payload["next_due_date"]),
             json.dumps(payload.get("metadata", {}), separators=(",", ":")),
@@ -441,16 +600,11 @@ def list_accounts_subtree(conn, root_account_id: str | None = None) -> list[dict
     if root_account_id:
         rows = conn.execute(
             """
-            WITH RECURSIVE subtree AS (
-                SELECT a.*, 0 AS depth FROM accounts a WHERE a.account_id=?
-                UNION ALL
-                SELECT c.*, s.depth + 1
-                FROM accounts c
-                JOIN subtree s ON c.parent_account_id = s.account_id
-            )
-            SELECT account_id, code, name, account_type, parent_account_id, metadata, depth
-            FROM subtree
-            ORDER BY depth, code, account_id
+            SELECT a.account_id, a.code, a.name, a.account_type, a.parent_account_id, a.metadata, c.depth
+            FROM account_closure c
+            JOIN accounts a ON a.account_id = c.descendant_id
+            WHERE c.ancestor_id = ?
+            ORDER BY c.depth, a.code, a.account_id
             """,
             (root_account_id,),
         ).fetchall()
@@ -517,38 +671,76 @@ def list_accounts_page(conn, *, limit: int, cursor: dict[str, str] | None) -> li
     return result
 
 
-def fetch_account_tree_rows(conn, root_account_id: str | None) -> list[dict[str, Any]]:
+def fetch_account_tree_rows(
+    conn, root_account_id: str | None, *, as_of_date: str | None = None
+) -> list[dict[str, Any]]:
+    """Tree rows in ``(code, account_id)`` order, optionally with ledger balances.
+
+    With ``as_of_date`` each row also carries its own ledger balance and the
+    sum over its subtree.  Both come from the same statement: one seek into
+    ``account_daily_balances`` per account, then one grouped join of those
+    balances through ``account_closure`` onto every ancestor.
+    """
     if root_account_id:
-        rows = conn.execute(
-            """
-            WITH RECURSIVE subtree AS (
-                SELECT account_id, code, name, account_type, parent_account_id, metadata
-                FROM accounts
-                WHERE account_id = ?
-                UNION ALL
-                SELECT c.account_id, c.code, c.name, c.account_type, c.parent_account_id, c.metadata
-                FROM accounts c
-                JOIN subtree s ON c.parent_account_id = s.account_id
-            )
-            SELECT account_id, code, name, account_type, parent_account_id, metadata
-            FROM subtree
-            ORDER BY code, account_id
-            """,
-            (root_account_id,),
-        ).fetchall()
+        scope_sql = """
+            SELECT a.account_id, a.code, a.name, a.account_type, a.parent_account_id, a.metadata
+            FROM account_closure c
+            JOIN accounts a ON a.account_id = c.descendant_id
+            WHERE c.ancestor_id = ?
+        """
+        params: tuple[Any, ...] = (root_account_id,)
     else:
-        rows = conn.execute(
-            """
+        scope_sql = """
             SELECT account_id, code, name, account_type, parent_account_id, metadata
             FROM accounts
-            ORDER BY code, account_id
-            """
+        """
+        params = ()
+
+    if as_of_date is None:
+        rows = conn.execute(f"{scope_sql} ORDER BY code, account_id", params).fetchall()
+    else:
+        rows = conn.execute(
+            f"""
+            WITH scope AS MATERIALIZED ({scope_sql}),
+            own AS MATERIALIZED (
+                SELECT
+                  s.account_id,
+                  COALESCE(
+                    (
+                      SELECT r.cumulative_units
+                      FROM account_daily_balances r
+                      WHERE r.account_id = s.account_id AND r.balance_date <= date(?)
+                      ORDER BY r.balance_date DESC
+                      LIMIT 1
+                    ),
+                    0
+                  ) AS units
+                FROM scope s
+            ),
+            rolled AS (
+                SELECT c.ancestor_id AS account_id, SUM(o.units) AS units
+                FROM own o
+                -- CROSS JOIN pins the loop order: walk the scope's closure
+                -- rows by descendant rather than the whole closure table.
+                CROSS JOIN account_closure c ON c.descendant_id = o.account_id
+                GROUP BY c.ancestor_id
+            )
+            SELECT s.*, o.units AS balance_units, r.units AS rolled_up_units
+            FROM scope s
+            JOIN own o ON o.account_id = s.account_id
+            JOIN rolled r ON r.account_id = s.account_id
+            ORDER BY s.code, s.account_id
+            """,
+            (*params, as_of_date),
         ).fetchall()
 
     result: list[dict[str, Any]] = []
     for row in rows:
         entry = dict(row)
         entry["metadata"] = json.loads(entry["metadata"]) if entry.get("metadata") else {}
+        if as_of_date is not None:
+            entry["balance"] = from_minor_units(entry.pop("balance_units"))
+            entry["rolled_up_balance"] = from_minor_units(entry.pop("rolled_up_units"))
         result.append(entry)
     return result
 
@@ -557,15 +749,18 @@ def fetch_account_balance_context(conn, *, account_id: str, as_of_date: str) ->
     row = conn.execute(
         """
         WITH ledger_total AS (
-            SELECT COALESCE(SUM(p.amount), 0) AS ledger_balance
-            FROM ledger_postings p
-            JOIN ledger_transactions t ON t.transaction_id = p.transaction_id
-            WHERE p.account_id = ? AND date(t.transaction_date) <= date(?)
+            -- Closing cumulative balance of the latest posting day at or
+            -- before as_of_date: a primary-key seek on the daily rollup.
+            SELECT r.cumulative_units AS ledger_units
+            FROM account_daily_balances r
+            WHERE r.account_id = ? AND r.balance_date <= date(?)
+            ORDER BY r.balance_date DESC
+            LIMIT 1
         ),
         latest_snapshot AS (
-            SELECT s.balance AS snapshot_balance, s.snapshot_date
+            SELECT s.balance_units AS snapshot_units, s.snapshot_date
             FROM balance_snapshots s
-            WHERE s.account_id = ? AND date(s.snapshot_date) <= date(?)
+            WHERE s.account_id = ? AND s.snapshot_date <= date(?)
             ORDER BY s.snapshot_date DESC, s.snapshot_id DESC
             LIMIT 1
         )
@@ -574,8 +769,8 @@ def fetch_account_balance_context(conn, *, account_id: str, as_of_date: str) ->
           a.code,
           a.name,
           a.account_type,
-          (SELECT ledger_balance FROM ledger_total) AS ledger_balance,
-          ls.snapshot_balance,
+          (SELECT ledger_units FROM ledger_total) AS ledger_units,
+          ls.snapshot_units,
           ls.snapshot_date
         FROM accounts a
         LEFT JOIN latest_snapshot ls ON 1=1
@@ -585,7 +780,11 @@ def fetch_account_balance_context(conn, *, account_id: str, as_of_date: str) ->
     ).fetchone()
     if not row:
         return None
-    return dict(row)
+    entry = dict(row)
+    entry["ledger_balance"] = from_minor_units(entry.pop("ledger_units") or 0)
+    snapshot_units = entry.pop("snapshot_units")
+    entry["snapshot_balance"] = from_minor_units(snapshot_units) if snapshot_units is not None else None
+    return entry
 
 
 def fetch_account_balances_as_of(
@@ -594,26 +793,31 @@ def fetch_account_balances_as_of(
     rows = conn.execute(
         """
         WITH ledger_totals AS (
-            SELECT p.account_id, COALESCE(SUM(p.amount), 0) AS ledger_balance
-            FROM ledger_postings p
-            JOIN ledger_transactions t ON t.transaction_id = p.transaction_id
-            WHERE date(t.transaction_date) <= date(?)
-            GROUP BY p.account_id
+            SELECT
+              a.account_id,
+              (
+                SELECT r.cumulative_units
+                FROM account_daily_balances r
+                WHERE r.account_id = a.account_id AND r.balance_date <= date(?)
+                ORDER BY r.balance_date DESC
+                LIMIT 1
+              ) AS ledger_units
+            FROM accounts a
         ),
         snapshots_ranked AS (
             SELECT
               s.account_id,
-              s.balance,
+              s.balance_units,
               s.snapshot_date,
               ROW_NUMBER() OVER (
                 PARTITION BY s.account_id
                 ORDER BY s.snapshot_date DESC, s.snapshot_id DESC
               ) AS rn
             FROM balance_snapshots s
-            WHERE date(s.snapshot_date) <= date(?)
+            WHERE s.snapshot_date <= date(?)
         ),
         latest_snapshots AS (
-            SELECT account_id, balance AS snapshot_balance, snapshot_date
+            SELECT account_id, balance_units AS snapshot_units, snapshot_date
             FROM snapshots_ranked
             WHERE rn = 1
         )
@@ -622,8 +826,8 @@ def fetch_account_balances_as_of(
           a.code,
           a.name,
           a.account_type,
-          COALESCE(lt.ledger_balance, 0) AS ledger_balance,
-          ls.snapshot_balance,
+          lt.ledger_units,
+          ls.snapshot_units,
           ls.snapshot_date
         FROM accounts a
         LEFT JOIN ledger_totals lt ON lt.account_id = a.account_id
@@ -636,9 +840,9 @@ def fetch_account_balances_as_of(
     result: list[dict[str, Any]] = []
     for row in rows:
         entry = dict(row)
-        ledger_balance = normalize_amount(entry["ledger_balance"])
+        ledger_balance = from_minor_units(entry["ledger_units"] or 0)
         snapshot_balance = (
-            normalize_amount(entry["snapshot_balance"]) if entry["snapshot_balance"] is not None else None
+            from_minor_units(entry["snapshot_units"]) if entry["snapshot_units"] is not None else None
         )
 
         if source_policy == "ledger_only":
@@ -673,42 +877,81 @@ def fetch_account_balances_as_of(
     return result
 
 
-def list_transactions_page(conn, *, limit: int, cursor: dict[str, str] | None) -> list[dict[str, Any]]:
+def fetch_account_daily_balances(
+    conn, *, account_id: str, start_date: str, end_date: str
+) -> tuple[Decimal, list[dict[str, Any]]]:
+    """Return the opening ledger balance before *start_date* and the daily
+    rollup rows (movement and closing balance) within the range."""
+    opening = conn.execute(
+        """
+        SELECT r.cumulative_units
+        FROM account_daily_balances r
+        WHERE r.account_id = ? AND r.balance_date < date(?)
+        ORDER BY r.balance_date DESC
+        LIMIT 1
+        """,
+        (account_id, start_date),
+    ).fetchone()
+    rows = conn.execute(
+        """
+        SELECT r.balance_date, r.day_delta_units, r.cumulative_units
+        FROM account_daily_balances r
+        WHERE r.account_id = ? AND r.balance_date BETWEEN date(?) AND date(?)
+        ORDER BY r.balance_date
+        """,
+        (account_id, start_date, end_date),
+    ).fetchall()
+    return (
+        from_minor_units(opening["cumulative_units"] if opening else 0),
+        [
+            {
+                "balance_date": row["balance_date"],
+                "day_delta": from_minor_units(row["day_delta_units"]),
+                "balance": from_minor_units(row["cumulative_units"]),
+            }
+            for row in rows
+        ],
+    )
+
+
+def list_transactions_page(
+    conn, *, limit: int, cursor: dict[str, str] | None, schema: str = "main"
+) -> list[dict[str, Any]]:
+    # The page is cut from idx_ledger_transactions_date_desc_id before postings
+    # are aggregated, so a page costs O(limit) instead of sorting the ledger.
     where_clause = ""
     params: tuple[Any, ...]
     if cursor:
-        where_clause = "WHERE (t.transaction_date < ? OR (t.transaction_date = ? AND t.transaction_id > ?))"
+        where_clause = "WHERE t.transaction_date <= ? AND (t.transaction_date < ? OR t.transaction_id > ?)"
         params = (cursor["transaction_date"], cursor["transaction_date"], cursor["transaction_id"], limit + 1)
     else:
         params = (limit + 1,)
 
     rows = conn.execute(
         f"""
+        WITH page AS MATERIALIZED (
+          SELECT
+            t.transaction_id,
+            t.source_system,
+            t.external_id,
+            t.transaction_date,
+            t.description,
+            t.correlation_id,
+            t.entity_id,
+            t.created_at
+          FROM {schema}.ledger_transactions t
+          {where_clause}
+          ORDER BY t.transaction_date DESC, t.transaction_id ASC
+          LIMIT ?
+        )
         SELECT
-          t.transaction_id,
-          t.source_system,
-          t.external_id,
-          t.transaction_date,
-          t.description,
-          t.correlation_id,
-          t.entity_id,
-          t.created_at,
+          page.*,
           COUNT(p.posting_id) AS posting_count,
-          COALESCE(SUM(ABS(p.amount)), 0) AS gross_posting_amount
-        FROM ledger_transactions t
-        LEFT JOIN ledger_postings p ON p.transaction_id = t.transaction_id
-        {where_clause}
-        GROUP BY
-          t.transaction_id,
-          t.source_system,
-          t.external_id,
-          t.transaction_date,
-          t.description,
-          t.correlation_id,
-          t.entity_id,
-          t.created_at
-        ORDER BY t.transaction_date DESC, t.transaction_id ASC
-        LIMIT ?
+          COALESCE(SUM(ABS(p.amount_units)), 0) AS gross_posting_units
+        FROM page
+        LEFT JOIN {schema}.ledger_postings p ON p.transaction_id = page.transaction_id
+        GROUP BY page.transaction_id
+        ORDER BY page.transaction_date DESC, page.transaction_id ASC
         """,
         params,
     ).fetchall()
@@ -724,7 +967,7 @@ def list_transactions_page(conn, *, limit: int, cursor: dict[str, str] | None) -
             "entity_id": row["entity_id"],
             "created_at": row["created_at"],
             "posting_count": int(row["posting_count"]),
-            "gross_posting_amount": normalize_amount(row["gross_posting_amount"]),
+            "gross_posting_amount": from_minor_units(row["gross_posting_units"]),
             "currency": "USD",
         }
         for row in rows
@@ -732,10 +975,10 @@ def list_transactions_page(conn, *, limit: int, cursor: dict[str, str] | None) -
 
 
 def fetch_transaction_with_postings_by_external_id(
-    conn, *, source_system: str, external_id: str
+    conn, *, source_system: str, external_id: str, schema: str = "main"
 ) -> dict[str, Any] | None:
     tx_row = conn.execute(
-        """
+        f"""
         SELECT
           transaction_id,
           source_system,
@@ -745,7 +988,7 @@ def fetch_transaction_with_postings_by_external_id(
           correlation_id,
           entity_id,
           created_at
-        FROM ledger_transactions
+        FROM {schema}.ledger_transactions
         WHERE source_system=? AND external_id=?
         """,
         (source_system, external_id),
@@ -754,17 +997,17 @@ def fetch_transaction_with_postings_by_external_id(
         return None
 
     posting_rows = conn.execute(
-        """
+        f"""
         SELECT
           p.posting_id,
           p.account_id,
           a.code AS account_code,
           a.name AS account_name,
-          p.amount,
+          p.amount_units,
           p.currency,
           p.memo
-        FROM ledger_postings p
-        JOIN accounts a ON a.account_id = p.account_id
+        FROM {schema}.ledger_postings p
+        JOIN main.accounts a ON a.account_id = p.account_id
         WHERE p.transaction_id=?
         ORDER BY a.code ASC, p.posting_id ASC
         """,
@@ -776,7 +1019,7 @@ def fetch_transaction_with_postings_by_external_id(
             "account_id": row["account_id"],
             "account_code": row["account_code"],
             "account_name": row["account_name"],
-            "amount": normalize_amount(row["amount"]),
+            "amount": from_minor_units(row["amount_units"]),
             "currency": row["currency"],
             "memo": row["memo"],
         }
@@ -820,7 +1063,7 @@ def list_obligations_page(
           name,
           account_id,
           cadence,
-          expected_amount,
+          expected_amount_units,
           variability_flag,
           next_due_date,
           metadata,
@@ -844,7 +1087,7 @@ def list_obligations_page(
                 "name": row["name"],
                 "account_id": row["account_id"],
                 "cadence": row["cadence"],
-                "expected_amount": normalize_amount(row["expected_amount"]),
+                "expected_amount": from_minor_units(row["expected_amount_units"]),
                 "variability_flag": bool(row["variability_flag"]),
                 "next_due_date": row["next_due_date"],
                 "metadata": json.loads(row["metadata"]) if row["metadata"] else {},
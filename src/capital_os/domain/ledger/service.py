@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from time import perf_counter
 import sqlite3
 from datetime import datetime, timezone
@@ -11,23 +12,30 @@ from capital_os.domain.approval.repository import (
     persist_proposal_result,
 )
 from capital_os.domain.entities import DEFAULT_ENTITY_ID
-from capital_os.domain.periods.service import enforce_period_write_constraints
-from capital_os.domain.policy.service import evaluate_transaction_policy
+from capital_os.domain.periods.service import enforce_period_write_constraints, fetch_period_statuses
+from capital_os.domain.policy.service import evaluate_transaction_policy, load_active_policy_rules
 from capital_os.db.session import transaction
-from capital_os.domain.ledger.idempotency import resolve_transaction_idempotency
-from capital_os.domain.ledger.invariants import InvariantError, ensure_balanced, normalize_amount
+from capital_os.domain.ledger.idempotency import replay_response, resolve_transaction_idempotency
+from capital_os.domain.ledger.invariants import InvariantError, ensure_balanced, normalize_amount, to_minor_units
 from capital_os.domain.ledger.repository import (
+    fetch_transactions_by_external_ids,
+    find_duplicate_risk_candidates,
     find_duplicate_risk_matches,
     insert_transaction_bundle,
+    insert_transaction_bundles,
+    prepare_transaction_bundle,
     save_transaction_response,
     upsert_balance_snapshot,
     upsert_obligation,
     fulfill_obligation as _repo_fulfill_obligation,
 )
-from capital_os.observability.event_log import log_event
+from capital_os.observability.event_log import build_event_row, insert_event_rows, log_event
 from capital_os.observability.hashing import payload_hash
+from capital_os.observability.tracing import span, traced
 
 
+# Batches repeat a handful of dates thousands of times.
+@lru_cache(maxsize=4096)
 def _as_utc_iso(value: object) -> str:
     if isinstance(value, datetime):
         dt = value
@@ -134,9 +142,70 @@ def _proposal_response_payload(
     return response
 
 
+def _propose_bundle(
+    conn,
+    *,
+    tx_payload: dict,
+    input_hash: str,
+    impact_amount,
+    policy_decision,
+    duplicate_matches: list[dict],
+) -> dict:
+    """Create (or reuse) the approval proposal for a gated bundle and return its response."""
+    proposal = fetch_proposal_by_source_external(
+        conn,
+        tool_name="record_transaction_bundle",
+        source_system=tx_payload["source_system"],
+        external_id=tx_payload["external_id"],
+    )
+    if not proposal:
+        proposal_id = insert_proposal(
+            conn,
+            tool_name="record_transaction_bundle",
+            source_system=tx_payload["source_system"],
+            external_id=tx_payload["external_id"],
+            correlation_id=tx_payload["correlation_id"],
+            input_hash=input_hash,
+            policy_threshold_amount=str(policy_decision.threshold_amount),
+            impact_amount=str(impact_amount),
+            request_payload=tx_payload,
+            entity_id=tx_payload.get("entity_id"),
+            matched_rule_id=policy_decision.matched_rule_id,
+            required_approvals=policy_decision.required_approvals,
+        )
+        proposal = fetch_proposal_by_source_external(
+            conn,
+            tool_name="record_transaction_bundle",
+            source_system=tx_payload["source_system"],
+            external_id=tx_payload["external_id"],
+        )
+        if not proposal:
+            raise InvariantError(f"proposal {proposal_id} was not persisted")
+
+    duplicate_context = None
+    if duplicate_matches:
+        duplicate_context = _duplicate_risk_context(
+            tx_payload=tx_payload,
+            duplicate_matches=duplicate_matches,
+        )
+
+    response = _proposal_response_payload(proposal, duplicate_context=duplicate_context)
+    if not proposal.get("response_payload"):
+        persist_proposal_result(
+            conn,
+            proposal_id=proposal["proposal_id"],
+            status="proposed",
+            response_payload=response,
+            output_hash=response["output_hash"],
+        )
+    return response
+
+
+@traced("record_transaction_bundle")
 def record_transaction_bundle(payload: dict) -> dict:
     started = perf_counter()
-    input_hash = payload_hash(payload)
+    with span("payload_hash"):
+        input_hash = payload_hash(payload)
 
     if any(p["currency"] != "USD" for p in payload["postings"]):
         raise InvariantError("Only USD is supported in phase 1")
@@ -145,7 +214,8 @@ def record_transaction_bundle(payload: dict) -> dict:
 
     try:
         with transaction() as conn:
-            replay = resolve_transaction_idempotency(conn, payload["source_system"], payload["external_id"])
+            with span("resolve_idempotency"):
+                replay = resolve_transaction_idempotency(conn, payload["source_system"], payload["external_id"])
             if replay:
                 output_hash = replay.get("output_hash") or payload_hash(replay)
                 log_event(
@@ -178,53 +248,14 @@ def record_transaction_bundle(payload: dict) -> dict:
             duplicate_approval_required = bool(duplicate_matches)
 
             if policy_decision.approval_required or duplicate_approval_required:
-                proposal = fetch_proposal_by_source_external(
+                response = _propose_bundle(
                     conn,
-                    tool_name="record_transaction_bundle",
-                    source_system=payload["source_system"],
-                    external_id=payload["external_id"],
+                    tx_payload=tx_payload,
+                    input_hash=input_hash,
+                    impact_amount=impact_amount,
+                    policy_decision=policy_decision,
+                    duplicate_matches=duplicate_matches,
                 )
-                if not proposal:
-                    proposal_id = insert_proposal(
-                        conn,
-                        tool_name="record_transaction_bundle",
-                        source_system=payload["source_system"],
-                        external_id=payload["external_id"],
-                        correlation_id=payload["correlation_id"],
-                        input_hash=input_hash,
-                        policy_threshold_amount=str(policy_decision.threshold_amount),
-                        impact_amount=str(impact_amount),
-                        request_payload=tx_payload,
-                        entity_id=tx_payload.get("entity_id"),
-                        matched_rule_id=policy_decision.matched_rule_id,
-                        required_approvals=policy_decision.required_approvals,
-                    )
-                    proposal = fetch_proposal_by_source_external(
-                        conn,
-                        tool_name="record_transaction_bundle",
-                        source_system=payload["source_system"],
-                        external_id=payload["external_id"],
-                    )
-                    if not proposal:
-                        raise InvariantError(f"proposal {proposal_id} was not persisted")
-
-                duplicate_context = None
-                if duplicate_approval_required:
-                    duplicate_context = _duplicate_risk_context(
-                        tx_payload=tx_payload,
-                        duplicate_matches=duplicate_matches,
-                    )
-
-                response = _proposal_response_payload(proposal, duplicate_context=duplicate_context)
-                if not proposal.get("response_payload"):
-                    persist_proposal_result(
-                        conn,
-                        proposal_id=proposal["proposal_id"],
-                        status="proposed",
-                        response_payload=response,
-                        output_hash=response["output_hash"],
-                    )
-
                 log_event(
                     conn,
                     tool_name="record_transaction_bundle",
@@ -237,7 +268,8 @@ def record_transaction_bundle(payload: dict) -> dict:
                 return response
 
             tx_payload["input_hash"] = input_hash
-            transaction_id, posting_ids = insert_transaction_bundle(conn, tx_payload)
+            with span("insert_transaction_bundle", postings=len(tx_payload["postings"])):
+                transaction_id, posting_ids = insert_transaction_bundle(conn, tx_payload)
             response = {
                 "status": "committed",
                 "transaction_id": transaction_id,
@@ -259,7 +291,9 @@ def record_transaction_bundle(payload: dict) -> dict:
             return response
     except sqlite3.IntegrityError:
         with transaction() as conn:
-            replay = resolve_transaction_idempotency(conn, payload["source_system"], payload["external_id"])
+            replay = resolve_transaction_idempotency(
+                conn, payload["source_system"], payload["external_id"], bypass_cache=True
+            )
             if replay:
                 output_hash = replay.get("output_hash") or payload_hash(replay)
                 replay["status"] = "idempotent-replay"
@@ -319,6 +353,265 @@ def record_transaction_bundle(payload: dict) -> dict:
             return response
 
 
+def _utc_day_key(value: object) -> int:
+    return int(_as_utc_iso(value)[:10].replace("-", ""))
+
+
+class _DuplicateRiskIndex:
+    """In-memory form of ``find_duplicate_risk_matches`` for one batch.
+
+    Seeded with every committed candidate sharing a posting key with the
+    batch and extended as batch items commit, so item N sees items 0..N-1
+    exactly as sequential single-bundle calls would.  Entries are indexed by
+    each ``(day, account_id, amount_units)`` key they carry, so a lookup
+    touches only transactions sharing the bundle's first key instead of the
+    whole day.  Committed batch items are kept as prepared bundles and only
+    turned into match payloads when something matches them.
+    """
+
+    def __init__(self, candidates: list[dict]) -> None:
+        self._by_key: dict[tuple[int, str, int], list[tuple[set[tuple[str, int]], dict]]] = {}
+        for candidate in candidates:
+            self._add(candidate["transaction_day"], candidate)
+
+    def _add(self, day: int, entry: dict) -> None:
+        keys = {(posting["account_id"], to_minor_units(posting["amount"])) for posting in entry["postings"]}
+        for account_id, units in keys:
+            self._by_key.setdefault((day, account_id, units), []).append((keys, entry))
+
+    def add_committed(self, bundle: dict) -> None:
+        self._add(_utc_day_key(bundle["date"]), bundle)
+
+    @staticmethod
+    def _as_match(entry: dict) -> dict:
+        if "match_reason" in entry:
+            return entry
+        return {
+            "match_reason": "same_account_date_amount",
+            "transaction_id": entry["transaction_id"],
+            "source_system": entry["source_system"],
+            "external_id": entry["external_id"],
+            "date": entry["date"],
+            "description": entry["description"],
+            "correlation_id": entry["correlation_id"],
+            "entity_id": entry.get("entity_id", DEFAULT_ENTITY_ID),
+            "postings": [
+                {
+                    "posting_id": posting["posting_id"],
+                    "account_id": posting["account_id"],
+                    "amount": str(normalize_amount(posting["amount"])),
+                    "currency": posting["currency"],
+                    "memo": posting.get("memo"),
+                }
+                for posting in entry["postings"]
+            ],
+        }
+
+    def matches(self, tx_payload: dict) -> list[dict]:
+        required = {(posting["account_id"], to_minor_units(posting["amount"])) for posting in tx_payload["postings"]}
+        if not required:
+            return []
+        account_id, units = min(required)
+        return [
+            self._as_match(entry)
+            for keys, entry in self._by_key.get((_utc_day_key(tx_payload["date"]), account_id, units), [])
+            if required <= keys
+        ]
+
+
+def _check_bundles(bundles: list[dict]) -> None:
+    for index, bundle in enumerate(bundles):
+        try:
+            if any(p["currency"] != "USD" for p in bundle["postings"]):
+                raise InvariantError("Only USD is supported in phase 1")
+            ensure_balanced(bundle["postings"])
+        except InvariantError as exc:
+            raise InvariantError(f"bundles[{index}]: {exc}") from exc
+
+
+def _commit_bundles(
+    conn,
+    bundles: list[dict],
+    item_input_hashes: list[str],
+    *,
+    tool_name: str,
+    started: float,
+) -> tuple[list[dict], dict[str, int]]:
+    """Replay, propose or insert each bundle; return per-item responses and status counts.
+
+    Idempotency, period, policy-rule and duplicate-risk lookups run once for
+    the whole batch, committed bundles are inserted with ``executemany`` and
+    the per-item events are written together at the end.
+    """
+    committed = fetch_transactions_by_external_ids(
+        conn, sorted({(bundle["source_system"], bundle["external_id"]) for bundle in bundles})
+    )
+    periods = fetch_period_statuses(conn, bundles)
+    rules = load_active_policy_rules(conn)
+    # Velocity rules count committed rows, so pending inserts must be
+    # visible before each evaluation.
+    has_velocity_rules = any(rule.velocity_limit_count is not None for rule in rules)
+    duplicates = _DuplicateRiskIndex(
+        find_duplicate_risk_candidates(
+            conn,
+            posting_keys=sorted(
+                {
+                    (_as_utc_iso(bundle["date"]), posting["account_id"], to_minor_units(posting["amount"]))
+                    for bundle in bundles
+                    if bundle["postings"]
+                    for posting in bundle["postings"][:1]
+                }
+            ),
+        )
+    )
+
+    pending: list[dict] = []
+    results: list[dict] = []
+    events: list[tuple] = []
+    counts: dict[str, int] = {}
+    for index, (bundle, item_input_hash) in enumerate(zip(bundles, item_input_hashes)):
+        key = (bundle["source_system"], bundle["external_id"])
+        if key in committed:
+            response = replay_response(committed[key])
+            response["output_hash"] = response.get("output_hash") or payload_hash(response)
+        else:
+            tx_payload = dict(bundle)
+            tx_payload.setdefault("entity_id", DEFAULT_ENTITY_ID)
+            try:
+                force_approval = enforce_period_write_constraints(conn, tx_payload, periods=periods)
+            except InvariantError as exc:
+                raise InvariantError(f"bundles[{index}]: {exc}") from exc
+            if has_velocity_rules and pending:
+                insert_transaction_bundles(conn, pending)
+                pending = []
+            impact_amount = transaction_impact_amount(bundle["postings"])
+            policy_decision = evaluate_transaction_policy(
+                conn,
+                payload=tx_payload,
+                impact_amount=impact_amount,
+                tool_name="record_transaction_bundle",
+                force_approval=force_approval,
+                rules=rules,
+            )
+            duplicate_matches = duplicates.matches(tx_payload)
+            if policy_decision.approval_required or duplicate_matches:
+                response = _propose_bundle(
+                    conn,
+                    tx_payload=tx_payload,
+                    input_hash=item_input_hash,
+                    impact_amount=impact_amount,
+                    policy_decision=policy_decision,
+                    duplicate_matches=duplicate_matches,
+                )
+            else:
+                prepared = prepare_transaction_bundle({**tx_payload, "input_hash": item_input_hash})
+                response = {
+                    "status": "committed",
+                    "transaction_id": prepared["transaction_id"],
+                    "posting_ids": [posting["posting_id"] for posting in prepared["postings"]],
+                    "correlation_id": bundle["correlation_id"],
+                }
+                response["output_hash"] = payload_hash(response)
+                prepared["response_payload"] = response
+                prepared["output_hash"] = response["output_hash"]
+                pending.append(prepared)
+                committed[key] = {"transaction_id": prepared["transaction_id"], "response_payload": response}
+                duplicates.add_committed(prepared)
+
+        counts[response["status"]] = counts.get(response["status"], 0) + 1
+        results.append(response)
+        events.append(
+            build_event_row(
+                tool_name=tool_name,
+                correlation_id=bundle["correlation_id"],
+                input_hash=item_input_hash,
+                output_hash=response["output_hash"],
+                duration_ms=int((perf_counter() - started) * 1000),
+                status="ok",
+            )
+        )
+
+    if pending:
+        insert_transaction_bundles(conn, pending)
+    insert_event_rows(conn, events)
+    return results, counts
+
+
+def _batch_response(results: list[dict], counts: dict[str, int], correlation_id: str) -> dict:
+    response = {
+        "status": "ok",
+        "results": results,
+        "committed_count": counts.get("committed", 0),
+        "proposed_count": counts.get("proposed", 0),
+        "replayed_count": counts.get("idempotent-replay", 0),
+        "correlation_id": correlation_id,
+    }
+    response["output_hash"] = payload_hash(response)
+    return response
+
+
+def record_transaction_bundles(payload: dict) -> dict:
+    """Record many bundles in one transaction with per-item results.
+
+    Each item gets the same outcome, response and output hash that a
+    sequence of ``record_transaction_bundle`` calls would produce, but
+    idempotency, period and duplicate-risk lookups are loaded once for the
+    whole batch and committed bundles are inserted with ``executemany``.
+    Any invariant or period violation rejects the entire batch.
+    """
+    started = perf_counter()
+    input_hash = payload_hash(payload)
+    bundles = payload["bundles"]
+    _check_bundles(bundles)
+    item_input_hashes = [payload_hash(bundle) for bundle in bundles]
+
+    with transaction() as conn:
+        results, counts = _commit_bundles(
+            conn, bundles, item_input_hashes, tool_name="record_transaction_bundles", started=started
+        )
+        response = _batch_response(results, counts, payload["correlation_id"])
+        log_event(
+            conn,
+            tool_name="record_transaction_bundles",
+            correlation_id=payload["correlation_id"],
+            input_hash=input_hash,
+            output_hash=response["output_hash"],
+            duration_ms=int((perf_counter() - started) * 1000),
+            status="ok",
+        )
+        return response
+
+
+def import_transaction_bundles(bundles: list[dict], *, correlation_id: str) -> dict:
+    """Commit one chunk of a statement import; the response matches ``record_transaction_bundles``.
+
+    The chunk goes straight to the bulk path, skipping the tool layer's
+    request validation and whole-payload hash.  Bundles come from
+    ``statement_import.iter_statement_bundles`` and are already well formed.
+    Items are still checked, replayed, gated and logged exactly as in a
+    ``record_transaction_bundles`` batch.  The chunk's own event hashes the
+    per-item input hashes instead of re-encoding every bundle.
+    """
+    started = perf_counter()
+    _check_bundles(bundles)
+    item_input_hashes = [payload_hash(bundle) for bundle in bundles]
+    input_hash = payload_hash({"correlation_id": correlation_id, "input_hashes": item_input_hashes})
+
+    with transaction() as conn:
+        results, counts = _commit_bundles(conn, bundles, item_input_hashes, tool_name="ledger_import", started=started)
+        response = _batch_response(results, counts, correlation_id)
+        log_event(
+            conn,
+            tool_name="ledger_import",
+            correlation_id=correlation_id,
+            input_hash=input_hash,
+            output_hash=response["output_hash"],
+            duration_ms=int((perf_counter() - started) * 1000),
+            status="ok",
+        )
+        return response
+
+
 def record_balance_snapshot(payload: dict) -> dict:
     started = perf_counter()
     input_hash = payload_hash(payload)
@@ -0,0 +1,325 @@
+"""Streaming bank statement import (CSV/OFX) into transaction bundles.
+
+A declarative mapping file (YAML or JSON) says how statement rows become
+two-posting bundles: which column holds the date, amount, description and
+bank reference, which account the statement belongs to and which offset
+account each row posts against.  Files are read incrementally, so memory is
+bounded by one chunk of bundles regardless of statement size.
+
+Rows without a bank reference get a derived ``external_id``: a hash of the
+statement account, day, amount and description plus an occurrence counter
+for identical rows earlier in the same file.  Re-importing the same file, or
+resuming an interrupted import, therefore replays already committed rows
+through the normal ``(source_system, external_id)`` idempotency path.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+import csv
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+import hashlib
+from pathlib import Path
+import re
+from typing import Any
+
+import yaml
+
+from capital_os.domain.ledger.invariants import MONEY_QUANT
+
+
+STATEMENT_FORMATS = ("csv", "ofx")
+# Chunks bypass record_transaction_bundles, so they are not held to its
+# batch limit; this bounds the memory and lock time of one commit.
+MAX_IMPORT_CHUNK_SIZE = 10_000
+_AMOUNT_NOISE = re.compile(r"[\s,$]")
+_OFX_TOKEN = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+_OFX_READ_SIZE = 64 * 1024
+
+
+class StatementImportError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class CounterAccountRule:
+    contains: str
+    counter_account_id: str
+
+
+@dataclass(frozen=True)
+class StatementMapping:
+    format: str
+    source_system: str
+    account_id: str
+    counter_account_id: str
+    entity_id: str | None = None
+    currency: str = "USD"
+    date_column: str | None = None
+    date_format: str | None = None
+    amount_column: str | None = None
+    debit_column: str | None = None
+    credit_column: str | None = None
+    description_columns: tuple[str, ...] = ()
+    external_id_column: str | None = None
+    negate_amount: bool = False
+    delimiter: str = ","
+    encoding: str = "utf-8-sig"
+    rules: tuple[CounterAccountRule, ...] = ()
+
+
+@dataclass(frozen=True)
+class StatementRow:
+    line: int
+    day: date
+    amount: Decimal
+    description: str
+    reference: str | None
+
+
+def _require_str(payload: dict[str, Any], key: str, *, required: bool = True) -> str | None:
+    value = payload.get(key)
+    if value is None and not required:
+        return None
+    if not isinstance(value, str) or not value:
+        raise StatementImportError(f"{key} is required and must be a non-empty string")
+    return value
+
+
+def parse_statement_mapping(payload: Any) -> StatementMapping:
+    if not isinstance(payload, dict):
+        raise StatementImportError("mapping must be an object")
+    if payload.get("version") != 1:
+        raise StatementImportError("version is required and must be 1")
+    fmt = payload.get("format")
+    if fmt not in STATEMENT_FORMATS:
+        raise StatementImportError(f"format must be one of: {', '.join(STATEMENT_FORMATS)}")
+
+    rules = []
+    raw_rules = payload.get("rules", [])
+    if not isinstance(raw_rules, list):
+        raise StatementImportError("rules must be a list when present")
+    for idx, rule in enumerate(raw_rules):
+        if (
+            not isinstance(rule, dict)
+            or not isinstance(rule.get("contains"), str)
+            or not rule["contains"]
+            or not isinstance(rule.get("counter_account_id"), str)
+        ):
+            raise StatementImportError(f"rules[{idx}] must contain string contains/counter_account_id")
+        rules.append(CounterAccountRule(rule["contains"].casefold(), rule["counter_account_id"]))
+
+    options: dict[str, Any] = {}
+    if fmt == "csv":
+        columns = payload.get("columns")
+        if not isinstance(columns, dict):
+            raise StatementImportError("columns is required for csv statements")
+        options["date_column"] = _require_str(columns, "date")
+        options["amount_column"] = _require_str(columns, "amount", required=False)
+        options["debit_column"] = _require_str(columns, "debit", required=False)
+        options["credit_column"] = _require_str(columns, "credit", required=False)
+        if options["amount_column"] is None and options["debit_column"] is None and options["credit_column"] is None:
+            raise StatementImportError("columns must map amount, or debit and/or credit")
+        description = columns.get("description", ())
+        if isinstance(description, str):
+            description = (description,)
+        if not isinstance(description, (list, tuple)) or any(not isinstance(c, str) for c in description):
+            raise StatementImportError("columns.description must be a string or list of strings")
+        options["description_columns"] = tuple(description)
+        options["external_id_column"] = _require_str(columns, "external_id", required=False)
+        options["date_format"] = _require_str(payload, "date_format", required=False)
+        delimiter = payload.get("delimiter", ",")
+        if not isinstance(delimiter, str) or len(delimiter) != 1:
+            raise StatementImportError("delimiter must be a single character")
+        options["delimiter"] = delimiter
+        options["encoding"] = _require_str(payload, "encoding", required=False) or "utf-8-sig"
+
+    negate_amount = payload.get("negate_amount", False)
+    if not isinstance(negate_amount, bool):
+        raise StatementImportError("negate_amount must be boolean when present")
+
+    return StatementMapping(
+        format=fmt,
+        source_system=_require_str(payload, "source_system"),
+        account_id=_require_str(payload, "account_id"),
+        counter_account_id=_require_str(payload, "counter_account_id"),
+        entity_id=_require_str(payload, "entity_id", required=False),
+        currency=_require_str(payload, "currency", required=False) or "USD",
+        negate_amount=negate_amount,
+        rules=tuple(rules),
+        **options,
+    )
+
+
+def load_statement_mapping(path: str | Path) -> StatementMapping:
+    """Load a mapping file; JSON is accepted since it is valid YAML."""
+    try:
+        parsed = yaml.safe_load(Path(path).read_text(encoding="utf-8"))
+    except yaml.YAMLError as exc:
+        raise StatementImportError(f"mapping file is not valid YAML/JSON: {exc}") from exc
+    return parse_statement_mapping(parsed)
+
+
+def _parse_amount(raw: str, *, line: int) -> Decimal:
+    text = _AMOUNT_NOISE.sub("", raw)
+    negative = text.startswith("(") and text.endswith(")")
+    if negative:
+        text = text[1:-1]
+    try:
+        amount = Decimal(text) if text else Decimal(0)
+    except InvalidOperation as exc:
+        raise StatementImportError(f"line {line}: invalid amount {raw!r}") from exc
+    if not amount.is_finite() or amount != amount.quantize(MONEY_QUANT):
+        raise StatementImportError(f"line {line}: amount {raw!r} is finer than {MONEY_QUANT}")
+    return -amount if negative else amount
+
+
+def _parse_day(raw: str, date_format: str | None, *, line: int) -> date:
+    try:
+        if date_format:
+            return datetime.strptime(raw.strip(), date_format).date()
+        return date.fromisoformat(raw.strip()[:10])
+    except ValueError as exc:
+        raise StatementImportError(f"line {line}: invalid date {raw!r}") from exc
+
+
+def _iter_csv_rows(path: Path, mapping: StatementMapping) -> Iterator[StatementRow]:
+    with path.open(encoding=mapping.encoding, newline="") as handle:
+        reader = csv.DictReader(handle, delimiter=mapping.delimiter)
+        wanted = [
+            column
+            for column in (
+                mapping.date_column,
+                mapping.amount_column,
+                mapping.debit_column,
+                mapping.credit_column,
+                mapping.external_id_column,
+                *mapping.description_columns,
+            )
+            if column is not None
+        ]
+        missing = [column for column in wanted if column not in (reader.fieldnames or ())]
+        if missing:
+            raise StatementImportError(f"statement is missing mapped columns: {', '.join(missing)}")
+
+        for row in reader:
+            line = reader.line_num
+            if mapping.amount_column is not None:
+                amount = _parse_amount(row[mapping.amount_column] or "", line=line)
+            else:
+                amount = Decimal(0)
+                if mapping.credit_column is not None:
+                    amount += _parse_amount(row[mapping.credit_column] or "", line=line)
+                if mapping.debit_column is not None:
+                    amount -= abs(_parse_amount(row[mapping.debit_column] or "", line=line))
+            reference = (row[mapping.external_id_column] or "").strip() if mapping.external_id_column else ""
+            yield StatementRow(
+                line=line,
+                day=_parse_day(row[mapping.date_column] or "", mapping.date_format, line=line),
+                amount=amount,
+                description=" ".join(
+                    value for value in ((row[column] or "").strip() for column in mapping.description_columns) if value
+                ),
+                reference=reference or None,
+            )
+
+
+def _iter_ofx_transactions(path: Path) -> Iterator[tuple[int, dict[str, str]]]:
+    """Yield ``(ordinal, fields)`` per ``<STMTTRN>`` block, reading in fixed-size blocks.
+
+    Handles both SGML OFX (unclosed leaf tags) and XML OFX.
+    """
+    index = 0
+    current: dict[str, str] | None = None
+    pending = ""
+    with path.open(encoding="utf-8", errors="replace") as handle:
+        while True:
+            block = handle.read(_OFX_READ_SIZE)
+            text = pending + block
+            # Keep a possibly incomplete trailing token for the next block.
+            cut = text.rfind("<") if block else len(text)
+            pending, text = text[cut:], text[:cut]
+            for closing, tag, value in _OFX_TOKEN.findall(text):
+                tag = tag.upper()
+                if tag == "STMTTRN":
+                    if closing and current is not None:
+                        index += 1
+                        yield index, current
+                        current = None
+                    elif not closing:
+                        current = {}
+                elif current is not None and not closing:
+                    current[tag] = value.strip()
+            if not block:
+                break
+
+
+def _iter_ofx_rows(path: Path) -> Iterator[StatementRow]:
+    for ordinal, fields in _iter_ofx_transactions(path):
+        if "DTPOSTED" not in fields or "TRNAMT" not in fields:
+            raise StatementImportError(f"transaction {ordinal}: DTPOSTED and TRNAMT are required")
+        yield StatementRow(
+            line=ordinal,
+            day=_parse_day(fields["DTPOSTED"][:8], "%Y%m%d", line=ordinal),
+            amount=_parse_amount(fields["TRNAMT"], line=ordinal),
+            description=" ".join(v for v in (fields.get("NAME", ""), fields.get("MEMO", "")) if v),
+            reference=fields.get("FITID") or None,
+        )
+
+
+def iter_statement_rows(path: str | Path, mapping: StatementMapping) -> Iterator[StatementRow]:
+    path = Path(path)
+    if mapping.format == "ofx":
+        return _iter_ofx_rows(path)
+    return _iter_csv_rows(path, mapping)
+
+
+def _counter_account(mapping: StatementMapping, description: str) -> str:
+    folded = description.casefold()
+    for rule in mapping.rules:
+        if rule.contains in folded:
+            return rule.counter_account_id
+    return mapping.counter_account_id
+
+
+def iter_statement_bundles(
+    rows: Iterable[StatementRow],
+    mapping: StatementMapping,
+    *,
+    correlation_id: str,
+) -> Iterator[tuple[StatementRow, dict | None]]:
+    """Pair each row with its bundle, or ``None`` for zero-amount rows."""
+    occurrences: dict[str, int] = {}
+    for row in rows:
+        amount = (-row.amount if mapping.negate_amount else row.amount).quantize(MONEY_QUANT)
+        if row.reference is not None:
+            external_id = row.reference
+        else:
+            key = "\x1f".join((mapping.account_id, row.day.isoformat(), str(amount), row.description))
+            occurrence = occurrences.get(key, 0)
+            occurrences[key] = occurrence + 1
+            digest = hashlib.sha256(f"{key}\x1f{occurrence}".encode("utf-8")).hexdigest()
+            external_id = f"derived:{digest[:32]}"
+        if not amount:
+            yield row, None
+            continue
+
+        bundle = {
+            "source_system": mapping.source_system,
+            "external_id": external_id,
+            "date": f"{row.day.isoformat()}T00:00:00Z",
+            "description": row.description,
+            "postings": [
+                {"account_id": mapping.account_id, "amount": str(amount), "currency": mapping.currency},
+                {
+                    "account_id": _counter_account(mapping, row.description),
+                    "amount": str(-amount),
+                    "currency": mapping.currency,
+                },
+            ],
+            "correlation_id": f"{correlation_id}:{row.line}",
+        }
+        if mapping.entity_id is not None:
+            bundle["entity_id"] = mapping.entity_id
+        yield row, bundle
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from functools import lru_cache
 from time import perf_counter
 from uuid import uuid4
 
@@ -10,6 +11,7 @@ from capital_os.observability.event_log import log_event
 from capital_os.observability.hashing import payload_hash
 
 
+@lru_cache(maxsize=4096)
 def _period_key_for_tx_date(tx_date: str) -> str:
     normalized = tx_date.replace("Z", "+00:00")
     parsed = datetime.fromisoformat(normalized)
@@ -89,15 +91,45 @@ def _upsert_period_status(
     return updated
 
 
-def enforce_period_write_constraints(conn, payload: dict) -> bool:
+def fetch_period_statuses(conn, payloads: list[dict]) -> dict[tuple[str, str], str]:
+    """Load period statuses for a batch, keyed by (period_key, entity_id)."""
+    keys = sorted(
+        {
+            (_period_key_for_tx_date(str(payload["date"])), payload.get("entity_id", DEFAULT_ENTITY_ID))
+            for payload in payloads
+        }
+    )
+    if not keys:
+        return {}
+    values = ",".join("(?, ?)" for _ in keys)
+    rows = conn.execute(
+        f"""
+        WITH batch_periods(period_key, entity_id) AS (
+          VALUES {values}
+        )
+        SELECT p.period_key, p.entity_id, p.status
+        FROM batch_periods b
+        JOIN accounting_periods p ON p.period_key = b.period_key AND p.entity_id = b.entity_id
+        """,
+        tuple(value for key in keys for value in key),
+    ).fetchall()
+    return {(row["period_key"], row["entity_id"]): row["status"] for row in rows}
+
+
+def enforce_period_write_constraints(
+    conn,
+    payload: dict,
+    *,
+    periods: dict[tuple[str, str], str] | None = None,
+) -> bool:
     period_key = _period_key_for_tx_date(str(payload["date"]))
     entity_id = payload.get("entity_id", DEFAULT_ENTITY_ID)
-    row = _fetch_period(conn, period_key=period_key, entity_id=entity_id)
-    if not row:
-        return False
-
-    status = row["status"]
-    if status == "open":
+    if periods is not None:
+        status = periods.get((period_key, entity_id))
+    else:
+        row = _fetch_period(conn, period_key=period_key, entity_id=entity_id)
+        status = row["status"] if row else None
+    if status is None or status == "open":
         return False
 
     if status == "closed":
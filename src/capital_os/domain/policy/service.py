@@ -4,9 +4,12 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
+from capital_os.config import get_settings
+from capital_os.db.session import active_db_url, catalog_connection
 from capital_os.domain.approval.policy import load_approval_policy
 from capital_os.domain.entities import DEFAULT_ENTITY_ID
 from capital_os.domain.ledger.invariants import normalize_amount
+from capital_os.observability.tracing import traced
 
 
 @dataclass(frozen=True)
@@ -43,7 +46,15 @@ def _parse_dt(value: str | datetime) -> datetime:
     return dt.astimezone(timezone.utc)
 
 
-def _load_active_rules(conn) -> list[PolicyRule]:
+def load_active_policy_rules(conn) -> list[PolicyRule]:
+    if active_db_url() != get_settings().db_url:
+        # Policy rules are global; entity shards read them from the catalog.
+        with catalog_connection() as catalog:
+            return _load_active_policy_rules(catalog)
+    return _load_active_policy_rules(conn)
+
+
+def _load_active_policy_rules(conn) -> list[PolicyRule]:
     rows = conn.execute(
         """
         SELECT
@@ -97,8 +108,8 @@ def _velocity_match(conn, *, rule: PolicyRule, payload: dict) -> bool:
         FROM ledger_transactions
         WHERE source_system = ?
           AND entity_id = ?
-          AND datetime(transaction_date) >= datetime(?)
-          AND datetime(transaction_date) <= datetime(?)
+          AND transaction_epoch >= CAST(strftime('%s', ?) AS INTEGER)
+          AND transaction_epoch <= CAST(strftime('%s', ?) AS INTEGER)
         """,
         (
             payload["source_system"],
@@ -135,6 +146,7 @@ def _rule_matches(conn, *, rule: PolicyRule, payload: dict, tool_name: str) -> b
     return _velocity_match(conn, rule=rule, payload=payload)
 
 
+@traced("evaluate_transaction_policy")
 def evaluate_transaction_policy(
     conn,
     *,
@@ -142,6 +154,7 @@ def evaluate_transaction_policy(
     impact_amount: Decimal,
     tool_name: str,
     force_approval: bool = False,
+    rules: list[PolicyRule] | None = None,
 ) -> PolicyDecision:
     fallback = load_approval_policy()
     selected_threshold = fallback.threshold_amount
@@ -149,7 +162,7 @@ def evaluate_transaction_policy(
     matched_rule_id: str | None = None
     selected_rule: PolicyRule | None = None
 
-    for rule in _load_active_rules(conn):
+    for rule in rules if rules is not None else load_active_policy_rules(conn):
         if _rule_matches(conn, rule=rule, payload=payload, tool_name=tool_name):
             selected_threshold = rule.threshold_amount
             required_approvals = rule.required_approvals
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+from calendar import monthrange
+from datetime import date, timedelta
+from typing import Any, Callable
+
 from capital_os.config import get_settings
-from capital_os.db.session import read_only_connection
+from capital_os.db.session import fan_out_entities, read_only_connection, sharding_enabled
+from capital_os.domain.ledger.archive import archive_read_connection, has_archives
 from capital_os.domain.ledger.repository import (
     fetch_proposal_with_decisions,
     fetch_transaction_with_postings_by_external_id,
     fetch_account_balances_as_of,
+    fetch_account_daily_balances,
+    fetch_accounts_for_ids,
     fetch_account_tree_rows,
     list_obligations_page,
     list_policy_rules,
@@ -15,6 +22,43 @@ from capital_os.domain.ledger.repository import (
 )
 from capital_os.domain.query.pagination import decode_cursor, decode_cursor_payload, encode_cursor
 
+Rows = list[dict[str, Any]]
+
+
+def _by_code(rows: Rows) -> None:
+    rows.sort(key=lambda row: (row["code"], row["account_id"]))
+
+
+def _newest_first(date_key: str, id_key: str) -> Callable[[Rows], None]:
+    def order(rows: Rows) -> None:
+        # Two stable sorts: date descending, ties by id ascending.
+        rows.sort(key=lambda row: row[id_key])
+        rows.sort(key=lambda row: row[date_key], reverse=True)
+
+    return order
+
+
+def _read_rows(fetch: Callable[[Any], Rows], order: Callable[[Rows], None], *, limit: int | None = None) -> Rows:
+    """``fetch(conn)`` against the active database, or every entity shard.
+
+    With entity sharding on, these reads take no ``entity_id``, so they fan
+    out across all shards and the rows are re-sorted with *order*, the
+    statement's own ``ORDER BY``.  The merge then matches an unsharded read
+    and keyset cursors carry over unchanged; *limit* trims the merged rows
+    to what one database would have returned.
+    """
+    if not sharding_enabled():
+        with read_only_connection() as conn:
+            return fetch(conn)
+
+    def read(_entity_id: str) -> Rows:
+        with read_only_connection() as conn:
+            return fetch(conn)
+
+    rows = [row for _, shard_rows in fan_out_entities(read) for row in shard_rows]
+    order(rows)
+    return rows if limit is None else rows[:limit]
+
 
 def query_accounts_page(*, limit: int, cursor: str | None) -> dict:
     cursor_keys: dict[str, str] | None = None
@@ -22,8 +66,9 @@ def query_accounts_page(*, limit: int, cursor: str | None) -> dict:
         cursor_payload = decode_cursor(cursor)
         cursor_keys = {"code": cursor_payload["code"], "account_id": cursor_payload["account_id"]}
 
-    with read_only_connection() as conn:
-        rows = list_accounts_page(conn, limit=limit, cursor=cursor_keys)
+    rows = _read_rows(
+        lambda conn: list_accounts_page(conn, limit=limit, cursor=cursor_keys), _by_code, limit=limit + 1
+    )
 
     next_cursor: str | None = None
     if len(rows) > limit:
@@ -34,21 +79,32 @@ def query_accounts_page(*, limit: int, cursor: str | None) -> dict:
     return {"accounts": rows, "next_cursor": next_cursor}
 
 
-def query_account_tree(root_account_id: str | None) -> dict:
-    with read_only_connection() as conn:
-        rows = fetch_account_tree_rows(conn, root_account_id)
+def query_account_tree(root_account_id: str | None, *, as_of_date: str | None = None) -> dict:
+    def fetch(conn) -> Rows:
+        return fetch_account_tree_rows(conn, root_account_id, as_of_date=as_of_date)
+
+    if root_account_id:
+        # Routed to the shard holding the root, which holds its whole subtree.
+        with read_only_connection() as conn:
+            rows = fetch(conn)
+    else:
+        rows = _read_rows(fetch, _by_code)
 
     nodes: dict[str, dict] = {}
     for row in rows:
-        nodes[row["account_id"]] = {
+        node = {
             "account_id": row["account_id"],
             "code": row["code"],
             "name": row["name"],
             "account_type": row["account_type"],
             "parent_account_id": row["parent_account_id"],
             "metadata": row["metadata"],
-            "children": [],
         }
+        if as_of_date is not None:
+            node["balance"] = row["balance"]
+            node["rolled_up_balance"] = row["rolled_up_balance"]
+        node["children"] = []
+        nodes[row["account_id"]] = node
 
     roots: list[dict] = []
     for row in rows:
@@ -64,11 +120,64 @@ def query_account_tree(root_account_id: str | None) -> dict:
 
 def query_account_balances(*, as_of_date: str, source_policy: str | None) -> dict:
     resolved_policy = source_policy or get_settings().balance_source_policy
-    with read_only_connection() as conn:
-        rows = fetch_account_balances_as_of(conn, as_of_date=as_of_date, source_policy=resolved_policy)
+    rows = _read_rows(
+        lambda conn: fetch_account_balances_as_of(conn, as_of_date=as_of_date, source_policy=resolved_policy),
+        _by_code,
+    )
     return {"as_of_date": as_of_date, "source_policy": resolved_policy, "balances": rows}
 
 
+def _series_point_dates(start: date, end: date, interval: str) -> list[date]:
+    """Closing date of each interval in [start, end]; the last point is *end*."""
+    points: list[date] = []
+    cursor = start
+    while cursor <= end:
+        if interval == "day":
+            close = cursor
+        elif interval == "week":
+            close = cursor + timedelta(days=6)
+        else:
+            close = cursor.replace(day=monthrange(cursor.year, cursor.month)[1])
+        close = min(close, end)
+        points.append(close)
+        cursor = close + timedelta(days=1)
+    return points
+
+
+def query_account_balance_series(*, account_id: str, start_date: date, end_date: date, interval: str) -> dict:
+    with read_only_connection() as conn:
+        found = fetch_accounts_for_ids(conn, [account_id])
+        opening, rows = fetch_account_daily_balances(
+            conn,
+            account_id=account_id,
+            start_date=start_date.isoformat(),
+            end_date=end_date.isoformat(),
+        )
+
+    result = {
+        "status": "ok" if found else "account_not_found",
+        "account_id": account_id,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "interval": interval,
+        "opening_balance": opening,
+        "points": [],
+    }
+    if not found:
+        return result
+
+    balance = opening
+    index = 0
+    for point_date in _series_point_dates(start_date, end_date, interval):
+        previous = balance
+        point_key = point_date.isoformat()
+        while index < len(rows) and rows[index]["balance_date"] <= point_key:
+            balance = rows[index]["balance"]
+            index += 1
+        result["points"].append({"date": point_key, "balance": balance, "movement": balance - previous})
+    return result
+
+
 def query_transactions_page(*, limit: int, cursor: str | None) -> dict:
     cursor_keys: dict[str, str] | None = None
     if cursor:
@@ -80,8 +189,11 @@ def query_transactions_page(*, limit: int, cursor: str | None) -> dict:
             "transaction_id": cursor_payload["transaction_id"],
         }
 
-    with read_only_connection() as conn:
-        rows = list_transactions_page(conn, limit=limit, cursor=cursor_keys)
+    rows = _read_rows(
+        lambda conn: _transactions_page(conn, limit=limit, cursor=cursor_keys),
+        _newest_first("transaction_date", "transaction_id"),
+        limit=limit + 1,
+    )
 
     next_cursor: str | None = None
     if len(rows) > limit:
@@ -93,12 +205,52 @@ def query_transactions_page(*, limit: int, cursor: str | None) -> dict:
     return {"transactions": rows, "next_cursor": next_cursor}
 
 
+def _transactions_page(conn, *, limit: int, cursor: dict[str, str] | None) -> Rows:
+    """One keyset page from the hot ledger plus every archived year.
+
+    Each schema is paged on its own, so the hot table keeps its
+    ``(transaction_date DESC, transaction_id)`` index, and the per-schema
+    pages are merged like shard pages.
+    """
+    if not has_archives(conn):
+        return list_transactions_page(conn, limit=limit, cursor=cursor)
+    with archive_read_connection() as (archive_conn, schemas):
+        rows = [
+            row
+            for schema in schemas
+            for row in list_transactions_page(archive_conn, limit=limit, cursor=cursor, schema=schema)
+        ]
+    _newest_first("transaction_date", "transaction_id")(rows)
+    return rows[: limit + 1]
+
+
 def query_transaction_by_external_id(*, source_system: str, external_id: str) -> dict:
+    if not sharding_enabled():
+        return {"transaction": _transaction_by_external_id(source_system, external_id)}
+    found = fan_out_entities(lambda _entity_id: _transaction_by_external_id(source_system, external_id))
+    return {"transaction": next((transaction for _, transaction in found if transaction is not None), None)}
+
+
+def _transaction_by_external_id(source_system: str, external_id: str) -> dict | None:
     with read_only_connection() as conn:
         transaction = fetch_transaction_with_postings_by_external_id(
             conn, source_system=source_system, external_id=external_id
         )
-    return {"transaction": transaction}
+        archived = None
+        if transaction is None:
+            archived = conn.execute(
+                "SELECT archive_year FROM ledger_archived_keys WHERE source_system=? AND external_id=?",
+                (source_system, external_id),
+            ).fetchone()
+    if archived is not None:
+        with archive_read_connection() as (conn, _schemas):
+            transaction = fetch_transaction_with_postings_by_external_id(
+                conn,
+                source_system=source_system,
+                external_id=external_id,
+                schema=f"archive_{archived['archive_year']}",
+            )
+    return transaction
 
 
 def query_obligations_page(*, limit: int, cursor: str | None, active_only: bool) -> dict:
@@ -110,8 +262,11 @@ def query_obligations_page(*, limit: int, cursor: str | None, active_only: bool)
             "obligation_id": cursor_payload["obligation_id"],
         }
 
-    with read_only_connection() as conn:
-        rows = list_obligations_page(conn, limit=limit, cursor=cursor_keys, active_only=active_only)
+    rows = _read_rows(
+        lambda conn: list_obligations_page(conn, limit=limit, cursor=cursor_keys, active_only=active_only),
+        lambda rows: rows.sort(key=lambda row: (row["next_due_date"], row["obligation_id"])),
+        limit=limit + 1,
+    )
 
     next_cursor: str | None = None
     if len(rows) > limit:
@@ -129,8 +284,11 @@ def query_proposals_page(*, limit: int, cursor: str | None, status: str | None)
         cursor_payload = decode_cursor_payload(cursor, required_keys=("created_at", "proposal_id"))
         cursor_keys = {"created_at": cursor_payload["created_at"], "proposal_id": cursor_payload["proposal_id"]}
 
-    with read_only_connection() as conn:
-        rows = list_proposals_page(conn, limit=limit, cursor=cursor_keys, status=status)
+    rows = _read_rows(
+        lambda conn: list_proposals_page(conn, limit=limit, cursor=cursor_keys, status=status),
+        _newest_first("created_at", "proposal_id"),
+        limit=limit + 1,
+    )
 
     next_cursor: str | None = None
     if len(rows) > limit:
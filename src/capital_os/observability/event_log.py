@@ -3,11 +3,30 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from uuid import uuid4
 
+from capital_os.db.event_log_store import event_log_table
+from capital_os.observability.tracing import traced
 from capital_os.security.context import get_request_security_context
 
 
-def log_event(
-    conn,
+EVENT_LOG_COLUMNS = (
+    "event_id",
+    "tool_name",
+    "correlation_id",
+    "input_hash",
+    "output_hash",
+    "event_timestamp",
+    "duration_ms",
+    "status",
+    "error_code",
+    "error_message",
+    "actor_id",
+    "authn_method",
+    "authorization_result",
+    "violation_code",
+)
+
+
+def build_event_row(
     *,
     tool_name: str,
     correlation_id: str,
@@ -21,7 +40,8 @@ def log_event(
     authn_method: str | None = None,
     authorization_result: str | None = None,
     violation_code: str | None = None,
-) -> None:
+) -> tuple:
+    """Resolve one ``event_log`` row (in ``EVENT_LOG_COLUMNS`` order) on the calling thread."""
     request_context = get_request_security_context()
     effective_actor_id = actor_id if actor_id is not None else (
         request_context.actor_id if request_context else None
@@ -34,29 +54,69 @@ def log_event(
         if authorization_result is not None
         else (request_context.authorization_result if request_context else None)
     )
+    return (
+        str(uuid4()),
+        tool_name,
+        correlation_id,
+        input_hash,
+        output_hash,
+        datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        duration_ms,
+        status,
+        error_code,
+        error_message,
+        effective_actor_id,
+        effective_authn_method,
+        effective_authorization_result,
+        violation_code,
+    )
+
 
+def insert_event_rows(conn, rows: list[tuple], *, chunk_size: int = 64) -> None:
+    """Insert prepared rows as multi-row statements; rows already present are skipped."""
+    placeholders = f"({','.join('?' for _ in EVENT_LOG_COLUMNS)})"
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start : start + chunk_size]
+        conn.execute(
+            f"INSERT INTO {event_log_table()} ({', '.join(EVENT_LOG_COLUMNS)}) "
+            f"VALUES {','.join(placeholders for _ in chunk)} ON CONFLICT (event_id) DO NOTHING",
+            [value for row in chunk for value in row],
+        )
+
+
+@traced("log_event")
+def log_event(
+    conn,
+    *,
+    tool_name: str,
+    correlation_id: str,
+    input_hash: str,
+    output_hash: str,
+    duration_ms: int,
+    status: str,
+    error_code: str | None = None,
+    error_message: str | None = None,
+    actor_id: str | None = None,
+    authn_method: str | None = None,
+    authorization_result: str | None = None,
+    violation_code: str | None = None,
+) -> None:
+    row = build_event_row(
+        tool_name=tool_name,
+        correlation_id=correlation_id,
+        input_hash=input_hash,
+        output_hash=output_hash,
+        duration_ms=duration_ms,
+        status=status,
+        error_code=error_code,
+        error_message=error_message,
+        actor_id=actor_id,
+        authn_method=authn_method,
+        authorization_result=authorization_result,
+        violation_code=violation_code,
+    )
     conn.execute(
-        """
-        INSERT INTO event_log (
-            event_id, tool_name, correlation_id, input_hash, output_hash,
-            event_timestamp, duration_ms, status, error_code, error_message,
-            actor_id, authn_method, authorization_result, violation_code
-        ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-        """,
-        (
-            str(uuid4()),
-            tool_name,
-            correlation_id,
-            input_hash,
-            output_hash,
-            datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
-            duration_ms,
-            status,
-            error_code,
-            error_message,
-            effective_actor_id,
-            effective_authn_method,
-            effective_authorization_result,
-            violation_code,
-        ),
+        f"INSERT INTO {event_log_table()} ({', '.join(EVENT_LOG_COLUMNS)}) "
+        f"VALUES ({','.join('?' for _ in EVENT_LOG_COLUMNS)})",
+        row,
     )
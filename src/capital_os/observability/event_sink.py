@@ -0,0 +1,338 @@
+"""Buffered event-log sink for events that do not fail closed.
+
+Successful read tools, and the best-effort error events of ``execute_tool``
+and the HTTP auth layer, do not need their ``event_log`` row to be durable
+before the response is returned.  With ``CAPITAL_OS_EVENT_LOG_ASYNC=1`` those
+rows are built on the request thread (event id, timestamp and security
+context are fixed there) and appended to a bounded in-memory buffer.  A
+background thread writes the buffer as multi-row inserts through the writer
+queue once ``CAPITAL_OS_EVENT_LOG_BATCH_MAX`` rows are waiting or every
+``CAPITAL_OS_EVENT_LOG_FLUSH_MS``, so pure reads no longer take the SQLite
+write lock and an fsync per call.
+
+When the buffer is full the caller writes its row synchronously instead, so
+bursts slow down rather than drop audit rows.  Failed flushes are retried on
+the next tick.  On shutdown the buffer is flushed; rows that still cannot be
+written go to a new JSONL spill file ``<spill path>.<pid>-<token>``, renamed
+into place only once complete.  The next sink in any process replays every
+spill file before its first flush (``event_id`` conflicts are skipped).
+Workers sharing a database also share the spill directory, so a file is
+first claimed by renaming it to ``...replaying-<pid>-<token>``; the rename
+succeeds for exactly one worker.  A claim whose process has died is taken
+over, as is a staging file whose writer died before publishing it; a
+failed replay releases its claim for the next sink.
+
+Write tools are unaffected: they log inside their own transaction and fail
+closed when the row cannot be written.
+"""
+from __future__ import annotations
+
+import atexit
+from collections import deque
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any
+from uuid import uuid4
+
+from capital_os.config import get_settings
+from capital_os.db.session import active_db_path, active_db_url, transaction, use_database
+from capital_os.db.writer import run_write
+from capital_os.observability.event_log import build_event_row, insert_event_rows, log_event
+
+
+def _write_rows(batch: list[tuple[str, tuple]]) -> None:
+    """Insert ``(db_url, row)`` pairs, one writer unit per database."""
+    by_db: dict[str, list[tuple]] = {}
+    for db_url, row in batch:
+        by_db.setdefault(db_url, []).append(row)
+    for db_url, rows in by_db.items():
+        def _insert(rows: list[tuple] = rows) -> None:
+            with transaction() as conn:
+                insert_event_rows(conn, rows)
+
+        with use_database(db_url):
+            run_write(_insert)
+
+
+def _process_alive(pid: int) -> bool:
+    if os.name != "posix":
+        # Signal 0 is not a liveness probe elsewhere; never steal a claim.
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class EventLogSink:
+    """Bounded buffer of prepared event rows drained by one flush thread."""
+
+    def __init__(
+        self,
+        *,
+        capacity: int,
+        batch_max: int,
+        flush_interval_seconds: float,
+        spill_path: Path,
+    ) -> None:
+        self._capacity = capacity
+        self._batch_max = batch_max
+        self._flush_interval_seconds = flush_interval_seconds
+        self._spill_path = spill_path
+        self._buffer: deque[tuple[str, tuple]] = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self._buffered = 0
+        self._flushed = 0
+        self._flushes = 0
+        self._sync_fallbacks = 0
+        self._flush_errors = 0
+        self._spilled = 0
+        self._replayed = 0
+
+    def submit(self, db_url: str, row: tuple) -> bool:
+        """Buffer *row*; False means the buffer is full or stopped and the caller must write it."""
+        with self._cond:
+            if self._stopping or len(self._buffer) >= self._capacity:
+                self._sync_fallbacks += 1
+                return False
+            self._buffer.append((db_url, row))
+            self._buffered += 1
+            if len(self._buffer) >= self._batch_max:
+                self._cond.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="capital-os-event-log", daemon=True)
+                self._thread.start()
+        return True
+
+    def flush(self) -> bool:
+        """Write every buffered row now; False when a batch failed and was kept."""
+        with self._flush_lock:
+            while True:
+                with self._cond:
+                    if not self._buffer:
+                        return True
+                    batch = [self._buffer.popleft() for _ in range(min(len(self._buffer), self._batch_max))]
+                try:
+                    _write_rows(batch)
+                except Exception:
+                    with self._cond:
+                        self._buffer.extendleft(reversed(batch))
+                        self._flush_errors += 1
+                    return False
+                with self._cond:
+                    self._flushed += len(batch)
+                    self._flushes += 1
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop the flush thread, flush what is left and spill anything unwritable."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        if not self.flush():
+            self._spill()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "buffer_depth": len(self._buffer),
+                "capacity": self._capacity,
+                "buffered": self._buffered,
+                "flushed": self._flushed,
+                "flushes": self._flushes,
+                "sync_fallbacks": self._sync_fallbacks,
+                "flush_errors": self._flush_errors,
+                "spilled": self._spilled,
+                "replayed": self._replayed,
+            }
+
+    def _run(self) -> None:
+        self._replay_spill()
+        while True:
+            with self._cond:
+                if not self._stopping and len(self._buffer) < self._batch_max:
+                    self._cond.wait(self._flush_interval_seconds)
+                if self._stopping:
+                    return
+            self.flush()
+
+    def _spill(self) -> None:
+        with self._cond:
+            pending = list(self._buffer)
+            self._buffer.clear()
+        if not pending:
+            return
+        self._spill_path.parent.mkdir(parents=True, exist_ok=True)
+        spill_file = self._spill_file(f"{os.getpid()}-{uuid4().hex}")
+        staging = spill_file.with_name(f"{spill_file.name}.tmp")
+        with staging.open("w", encoding="utf-8") as handle:
+            for db_url, row in pending:
+                handle.write(json.dumps({"db_url": db_url, "row": list(row)}, separators=(",", ":")) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+        # Replaying workers only see complete files.
+        os.replace(staging, spill_file)
+        with self._cond:
+            self._spilled += len(pending)
+
+    def _spill_file(self, suffix: str) -> Path:
+        return self._spill_path.with_name(f"{self._spill_path.name}.{suffix}")
+
+    def _claim_spills(self) -> list[Path]:
+        """Rename every replayable spill file to a name owned by this process."""
+        prefix = f"{self._spill_path.name}."
+        # The bare spill path is the single file written by older versions.
+        candidates = [self._spill_path, *sorted(self._spill_path.parent.glob(f"{prefix}*"))]
+        claimed = []
+        for candidate in candidates:
+            suffix = candidate.name[len(prefix) :]
+            if suffix.endswith(".tmp") or suffix.startswith("replaying-"):
+                # Still being written or replayed, unless its process died.
+                owner = suffix.removeprefix("replaying-").split("-")[0]
+                if not owner.isdigit() or _process_alive(int(owner)):
+                    continue
+            target = self._spill_file(f"replaying-{os.getpid()}-{uuid4().hex}")
+            try:
+                candidate.rename(target)
+            except FileNotFoundError:
+                # Absent, or another worker claimed it first.
+                continue
+            claimed.append(target)
+        return claimed
+
+    def _replay_spill(self) -> None:
+        with self._flush_lock:
+            claimed = self._claim_spills()
+            for index, path in enumerate(claimed):
+                try:
+                    lines = path.read_text(encoding="utf-8").splitlines()
+                    # A torn last line from a crash mid-spill is skipped.
+                    records = []
+                    for line in lines:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        records.append((record["db_url"], tuple(record["row"])))
+                    for start in range(0, len(records), self._batch_max):
+                        _write_rows(records[start : start + self._batch_max])
+                except Exception:
+                    # Hand the unreplayed files back for the next sink.
+                    for unreplayed in claimed[index:]:
+                        unreplayed.rename(self._spill_file(f"{os.getpid()}-{uuid4().hex}"))
+                    with self._cond:
+                        self._flush_errors += 1
+                    return
+                path.unlink(missing_ok=True)
+                with self._cond:
+                    self._replayed += len(records)
+
+
+_SINK: EventLogSink | None = None
+_SINK_LOCK = threading.Lock()
+
+
+def _reset_sink_after_fork() -> None:
+    # The flush thread does not survive fork; rows buffered before the fork
+    # belong to the parent.
+    global _SINK, _SINK_LOCK
+    _SINK = None
+    _SINK_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_sink_after_fork)
+
+
+def default_spill_path() -> Path:
+    settings = get_settings()
+    if settings.event_log_spill_path:
+        return Path(settings.event_log_spill_path)
+    with use_database(settings.db_url):
+        db_path = active_db_path()
+    return db_path.with_name(f"{db_path.name}.event-spill.jsonl")
+
+
+def _get_sink() -> EventLogSink:
+    global _SINK
+    sink = _SINK
+    if sink is not None:
+        return sink
+    with _SINK_LOCK:
+        if _SINK is None:
+            settings = get_settings()
+            _SINK = EventLogSink(
+                capacity=settings.event_log_buffer_size,
+                batch_max=settings.event_log_batch_max,
+                flush_interval_seconds=settings.event_log_flush_ms / 1000,
+                spill_path=default_spill_path(),
+            )
+        return _SINK
+
+
+def buffer_event(**kwargs: Any) -> bool:
+    """Queue an ``event_log`` row when the async sink is enabled.
+
+    Takes the keyword arguments of ``log_event``.  Returns False when the
+    caller must write the row itself (sink disabled, full or shut down).
+    """
+    if not get_settings().event_log_async:
+        return False
+    return _get_sink().submit(active_db_url(), build_event_row(**kwargs))
+
+
+def record_event(**kwargs: Any) -> None:
+    """Log a read-path event: buffered when enabled, otherwise in its own transaction."""
+    if buffer_event(**kwargs):
+        return
+    with transaction() as conn:
+        log_event(conn, **kwargs)
+
+
+def flush_event_log() -> bool:
+    """Write buffered rows now; returns False if some could not be written yet."""
+    sink = _SINK
+    return sink.flush() if sink is not None else True
+
+
+def event_sink_stats() -> dict:
+    sink = _SINK
+    if sink is not None:
+        stats = sink.stats()
+    else:
+        stats = {
+            "buffer_depth": 0,
+            "capacity": get_settings().event_log_buffer_size,
+            "buffered": 0,
+            "flushed": 0,
+            "flushes": 0,
+            "sync_fallbacks": 0,
+            "flush_errors": 0,
+            "spilled": 0,
+            "replayed": 0,
+        }
+    stats["enabled"] = get_settings().event_log_async
+    return stats
+
+
+def shutdown_event_sink(timeout: float | None = 5.0) -> None:
+    """Flush and stop the sink; unwritable rows go to the spill file."""
+    global _SINK
+    with _SINK_LOCK:
+        sink = _SINK
+        _SINK = None
+    if sink is not None:
+        sink.stop(timeout)
+
+
+atexit.register(shutdown_event_sink)
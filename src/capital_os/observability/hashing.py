@@ -1,3 +1,22 @@
+"""Canonical JSON and the payload hashes built on it.
+
+The canonical form is ``json.dumps(_normalize(payload), separators=(",",
+":"), sort_keys=True)``: keys sorted, Decimals quantized to four places,
+datetimes in UTC with a ``Z`` suffix, ASCII-only output.  ``_normalize``
+stays the reference definition, but the hot path no longer builds the
+normalized copy: one reused C encoder sorts keys itself and converts
+Decimals and dates through its ``default`` hook as it meets them, so the
+payload is walked once.
+
+``payload_hash`` feeds SHA-256 directly.  When a top-level value is a list
+of more than ``_STREAM_ROWS`` rows (``list_transactions``,
+``get_account_balances`` and the other list outputs), that list is encoded
+and hashed ``_STREAM_ROWS`` rows at a time, so the whole document is never
+held as one string.  Output is byte-identical to the reference for
+every payload the reference accepts.  The only difference is that Decimals
+and dates inside tuples, which ``_normalize`` never reached and
+``json.dumps`` rejected, now encode like everywhere else.
+"""
 from __future__ import annotations
 
 import hashlib
@@ -7,6 +26,20 @@ from decimal import Decimal, ROUND_HALF_EVEN
 
 MONEY_QUANT = Decimal("0.0001")
 
+# Top-level lists longer than this are hashed this many rows at a time.
+_STREAM_ROWS = 512
+
+
+def _decimal_text(value: Decimal) -> str:
+    return str(value.quantize(MONEY_QUANT, rounding=ROUND_HALF_EVEN))
+
+
+def _datetime_text(value: datetime) -> str:
+    dt = value.astimezone(timezone.utc).replace(tzinfo=timezone.utc)
+    # Truncate to microseconds by reconstruction.
+    dt = dt.replace(microsecond=dt.microsecond)
+    return dt.isoformat().replace("+00:00", "Z")
+
 
 def _normalize(obj):
     if isinstance(obj, dict):
@@ -14,20 +47,70 @@ def _normalize(obj):
     if isinstance(obj, list):
         return [_normalize(x) for x in obj]
     if isinstance(obj, Decimal):
-        return str(obj.quantize(MONEY_QUANT, rounding=ROUND_HALF_EVEN))
+        return _decimal_text(obj)
     if isinstance(obj, datetime):
-        dt = obj.astimezone(timezone.utc).replace(tzinfo=timezone.utc)
-        # Truncate to microseconds by reconstruction.
-        dt = dt.replace(microsecond=dt.microsecond)
-        return dt.isoformat().replace("+00:00", "Z")
+        return _datetime_text(obj)
     if isinstance(obj, date):
         return obj.isoformat()
     return obj
 
 
+def _reference_json(obj) -> str:
+    return json.dumps(_normalize(obj), separators=(",", ":"), sort_keys=True)
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return _decimal_text(obj)
+    if isinstance(obj, datetime):
+        return _datetime_text(obj)
+    if isinstance(obj, date):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
+# _normalize recursed without a cycle check too, so a cycle still ends in
+# RecursionError.
+_ENCODER = json.JSONEncoder(separators=(",", ":"), sort_keys=True, default=_default, check_circular=False)
+_encode = _ENCODER.encode
+_encode_str = json.encoder.encode_basestring_ascii
+
+
 def canonical_json(payload: dict) -> str:
-    return json.dumps(_normalize(payload), separators=(",", ":"), sort_keys=True)
+    return _encode(payload)
+
+
+def _is_long_list(value) -> bool:
+    return value.__class__ is list and len(value) > _STREAM_ROWS
 
 
 def payload_hash(payload: dict) -> str:
-    return hashlib.sha256(canonical_json(payload).encode("utf-8")).hexdigest()
+    hasher = hashlib.sha256()
+    if payload.__class__ is not dict or not any(_is_long_list(value) for value in payload.values()):
+        hasher.update(_encode(payload).encode("utf-8"))
+        return hasher.hexdigest()
+    try:
+        keys = sorted(payload)
+        prefixes = [_encode_str(key) + ":" for key in keys]
+    except TypeError:
+        # Non-string keys: let the encoder sort, convert or reject them.
+        hasher.update(_encode(payload).encode("utf-8"))
+        return hasher.hexdigest()
+
+    separator = "{"
+    for key, prefix in zip(keys, prefixes):
+        value = payload[key]
+        if not _is_long_list(value):
+            hasher.update((separator + prefix + _encode(value)).encode("utf-8"))
+        else:
+            hasher.update((separator + prefix + "[").encode("utf-8"))
+            for start in range(0, len(value), _STREAM_ROWS):
+                # Each slice encodes as "[...]"; hash it without the brackets.
+                chunk = memoryview(_encode(value[start : start + _STREAM_ROWS]).encode("utf-8"))
+                if start:
+                    hasher.update(b",")
+                hasher.update(chunk[1:-1])
+            hasher.update(b"]")
+        separator = ","
+    hasher.update(b"}")
+    return hasher.hexdigest()
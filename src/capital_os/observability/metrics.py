@@ -0,0 +1,379 @@
+"""Prometheus metrics for tool latency, SQLite contention and queue depth.
+
+Values are kept per process.  Without ``CAPITAL_OS_METRICS_DIR`` they live
+in memory and ``GET /metrics`` reports the serving process only.  With it,
+every process appends its series to its own memory-mapped file
+``<dir>/metrics-<pid>.db`` and a scrape sums the files of all processes, so
+any uvicorn worker can answer for the whole server.  Each file has a single
+writer, so no cross-process locking is needed; readers only see entries whose
+offset has been published in the file header.
+
+Counters and histograms of exited processes keep counting towards the totals
+(clear the directory before starting the server); gauges are only summed
+over live processes.
+
+Histograms store per-bucket counts and are made cumulative when rendered.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+import json
+import mmap
+import os
+from pathlib import Path
+import re
+import struct
+import threading
+from typing import Iterator
+
+from capital_os.config import get_settings
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@dataclass(frozen=True)
+class Metric:
+    name: str
+    kind: str
+    help: str
+    labels: tuple[str, ...] = ()
+
+
+TOOL_DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+TOOL_DURATION = Metric(
+    "capital_os_tool_duration_seconds",
+    "histogram",
+    "Tool call latency by tool, status and authorization result.",
+    ("tool", "status", "authorization_result"),
+)
+SQLITE_BUSY_ERRORS = Metric(
+    "capital_os_sqlite_busy_errors_total",
+    "counter",
+    "Tool calls that failed with SQLITE_BUSY or SQLITE_LOCKED after the busy timeout.",
+    ("tool",),
+)
+POOL_WAITS = Metric(
+    "capital_os_db_pool_waits_total",
+    "counter",
+    "Connection checkouts that had to wait for a free pooled connection.",
+    ("role",),
+)
+POOL_WAIT_SECONDS = Metric(
+    "capital_os_db_pool_wait_seconds_total",
+    "counter",
+    "Time spent waiting for a pooled connection.",
+    ("role",),
+)
+POOL_TIMEOUTS = Metric(
+    "capital_os_db_pool_timeouts_total",
+    "counter",
+    "Connection checkouts that gave up waiting.",
+    ("role",),
+)
+WRITER_QUEUE_DEPTH = Metric(
+    "capital_os_writer_queue_depth",
+    "gauge",
+    "Write units queued for a writer thread.",
+)
+WRITER_QUEUE_FULL = Metric(
+    "capital_os_writer_queue_full_total",
+    "counter",
+    "Writes rejected because the writer queue stayed full.",
+)
+LANE_QUEUE_DEPTH = Metric(
+    "capital_os_lane_queue_depth",
+    "gauge",
+    "Tool calls admitted to an execution lane and waiting for a worker.",
+    ("lane",),
+)
+LANE_REJECTED = Metric(
+    "capital_os_lane_rejected_total",
+    "counter",
+    "Tool calls rejected because their execution lane was saturated.",
+    ("lane",),
+)
+
+METRICS = (
+    TOOL_DURATION,
+    SQLITE_BUSY_ERRORS,
+    POOL_WAITS,
+    POOL_WAIT_SECONDS,
+    POOL_TIMEOUTS,
+    WRITER_QUEUE_DEPTH,
+    WRITER_QUEUE_FULL,
+    LANE_QUEUE_DEPTH,
+    LANE_REJECTED,
+)
+_BY_NAME = {metric.name: metric for metric in METRICS}
+_LE_BOUNDS = tuple(repr(bound) for bound in TOOL_DURATION_BUCKETS) + ("+Inf",)
+
+
+# --- per-process value stores -----------------------------------------------
+
+_HEADER = struct.Struct("<I4x")
+_KEY_LENGTH = struct.Struct("<I")
+_VALUE = struct.Struct("<d")
+_INITIAL_FILE_SIZE = 64 * 1024
+_FILE_PATTERN = re.compile(r"^metrics-(\d+)\.db$")
+
+
+def _read_entries(buf, used: int) -> Iterator[tuple[str, int, float]]:
+    """Yield ``(key, value_offset, value)`` for the published part of a metrics file."""
+    pos = _HEADER.size
+    while pos + _KEY_LENGTH.size <= used:
+        (length,) = _KEY_LENGTH.unpack_from(buf, pos)
+        value_pos = pos + (_KEY_LENGTH.size + length + 7) // 8 * 8
+        if value_pos + _VALUE.size > used:
+            return
+        key = bytes(buf[pos + _KEY_LENGTH.size : pos + _KEY_LENGTH.size + length]).decode("utf-8")
+        yield key, value_pos, _VALUE.unpack_from(buf, value_pos)[0]
+        pos = value_pos + _VALUE.size
+
+
+class _MemoryValues:
+    def __init__(self) -> None:
+        self._values: dict[str, float] = {}
+
+    def add(self, key: str, amount: float) -> None:
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def items(self) -> list[tuple[str, float]]:
+        return list(self._values.items())
+
+    def close(self) -> None:
+        pass
+
+
+class _MmapValues:
+    """Append-only key/value file written by one process and read by all.
+
+    Layout: a header holding the number of published bytes, then entries of
+    a key length, the UTF-8 key padded to 8 bytes and a float64 value.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < _INITIAL_FILE_SIZE:
+                os.ftruncate(fd, _INITIAL_FILE_SIZE)
+            self._mm = mmap.mmap(fd, os.fstat(fd).st_size)
+        finally:
+            os.close(fd)
+        used = _HEADER.unpack_from(self._mm, 0)[0] or _HEADER.size
+        self._used = used
+        self._positions = {key: pos for key, pos, _ in _read_entries(self._mm, used)}
+
+    def add(self, key: str, amount: float) -> None:
+        pos = self._positions.get(key)
+        if pos is None:
+            pos = self._append(key)
+        _VALUE.pack_into(self._mm, pos, _VALUE.unpack_from(self._mm, pos)[0] + amount)
+
+    def _append(self, key: str) -> int:
+        encoded = key.encode("utf-8")
+        pos = self._used + (_KEY_LENGTH.size + len(encoded) + 7) // 8 * 8
+        end = pos + _VALUE.size
+        if end > len(self._mm):
+            self._grow(end)
+        _KEY_LENGTH.pack_into(self._mm, self._used, len(encoded))
+        self._mm[self._used + _KEY_LENGTH.size : self._used + _KEY_LENGTH.size + len(encoded)] = encoded
+        _VALUE.pack_into(self._mm, pos, 0.0)
+        # Publish the entry only once it is complete.
+        _HEADER.pack_into(self._mm, 0, end)
+        self._used = end
+        self._positions[key] = pos
+        return pos
+
+    def _grow(self, needed: int) -> None:
+        size = len(self._mm)
+        while size < needed:
+            size *= 2
+        self._mm.close()
+        fd = os.open(self._path, os.O_RDWR)
+        try:
+            os.ftruncate(fd, size)
+            self._mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+    def items(self) -> list[tuple[str, float]]:
+        return [(key, value) for key, _, value in _read_entries(self._mm, self._used)]
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+def _read_metrics_file(path: Path) -> list[tuple[str, float]]:
+    data = path.read_bytes()
+    if len(data) < _HEADER.size:
+        return []
+    used = min(_HEADER.unpack_from(data, 0)[0], len(data))
+    return [(key, value) for key, _, value in _read_entries(data, used)]
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+_STORE: _MemoryValues | _MmapValues | None = None
+_LOCK = threading.Lock()
+
+
+def _reset_metrics_after_fork() -> None:
+    # The child counts into its own store; the parent keeps its values.
+    global _STORE, _LOCK
+    _STORE = None
+    _LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_metrics_after_fork)
+
+
+def _store() -> _MemoryValues | _MmapValues:
+    """Return this process's store; call with ``_LOCK`` held."""
+    global _STORE
+    if _STORE is None:
+        metrics_dir = get_settings().metrics_dir
+        if metrics_dir is None:
+            _STORE = _MemoryValues()
+        else:
+            Path(metrics_dir).mkdir(parents=True, exist_ok=True)
+            _STORE = _MmapValues(Path(metrics_dir) / f"metrics-{os.getpid()}.db")
+    return _STORE
+
+
+@lru_cache(maxsize=8192)
+def _key(name: str, labels: tuple[str, ...]) -> str:
+    return json.dumps([name, list(labels)], separators=(",", ":"))
+
+
+# --- recording ----------------------------------------------------------------
+
+
+def metrics_enabled() -> bool:
+    return get_settings().metrics_enabled
+
+
+def inc(metric: Metric, *labels: str, amount: float = 1.0) -> None:
+    """Add *amount* to a counter or gauge; gauges also take negative amounts."""
+    if not get_settings().metrics_enabled:
+        return
+    key = _key(metric.name, labels)
+    with _LOCK:
+        _store().add(key, amount)
+
+
+def observe(metric: Metric, value: float, *labels: str) -> None:
+    """Record one histogram observation of *value* seconds."""
+    if not get_settings().metrics_enabled:
+        return
+    le = _LE_BOUNDS[bisect_left(TOOL_DURATION_BUCKETS, value)]
+    bucket_key = _key(f"{metric.name}_bucket", labels + (le,))
+    sum_key = _key(f"{metric.name}_sum", labels)
+    count_key = _key(f"{metric.name}_count", labels)
+    with _LOCK:
+        store = _store()
+        store.add(bucket_key, 1.0)
+        store.add(sum_key, value)
+        store.add(count_key, 1.0)
+
+
+def reset_metrics() -> None:
+    """Drop this process's store so the next value reopens it from settings."""
+    global _STORE
+    with _LOCK:
+        if _STORE is not None:
+            _STORE.close()
+        _STORE = None
+
+
+# --- exposition ---------------------------------------------------------------
+
+
+def _base_metric(series_name: str) -> Metric | None:
+    metric = _BY_NAME.get(series_name)
+    if metric is not None:
+        return metric
+    for suffix in ("_bucket", "_sum", "_count"):
+        if series_name.endswith(suffix):
+            return _BY_NAME.get(series_name[: -len(suffix)])
+    return None
+
+
+def _collect() -> dict[tuple[str, tuple[str, ...]], float]:
+    with _LOCK:
+        own = _store().items()
+    sources: list[tuple[bool, list[tuple[str, float]]]] = [(True, own)]
+    metrics_dir = get_settings().metrics_dir
+    if metrics_dir is not None:
+        for path in sorted(Path(metrics_dir).glob("metrics-*.db")):
+            match = _FILE_PATTERN.match(path.name)
+            if match is None or int(match.group(1)) == os.getpid():
+                continue
+            try:
+                sources.append((_pid_alive(int(match.group(1))), _read_metrics_file(path)))
+            except OSError:
+                continue
+
+    totals: dict[tuple[str, tuple[str, ...]], float] = {}
+    for alive, items in sources:
+        for key, value in items:
+            name, labels = json.loads(key)
+            metric = _base_metric(name)
+            if metric is None or (metric.kind == "gauge" and not alive):
+                continue
+            series = (name, tuple(labels))
+            totals[series] = totals.get(series, 0.0) + value
+    return totals
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_series(name: str, label_names: tuple[str, ...], labels: tuple[str, ...], value: float) -> str:
+    rendered = repr(int(value)) if float(value).is_integer() else repr(value)
+    if not label_names:
+        return f"{name} {rendered}"
+    pairs = ",".join(f'{label}="{_escape(label_value)}"' for label, label_value in zip(label_names, labels))
+    return f"{name}{{{pairs}}} {rendered}"
+
+
+def render_metrics() -> str:
+    """Render every metric in the Prometheus text exposition format."""
+    totals = _collect()
+    lines: list[str] = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if metric.kind == "histogram":
+            label_sets = sorted(labels for name, labels in totals if name == f"{metric.name}_count")
+            for labels in label_sets:
+                cumulative = 0.0
+                for le in _LE_BOUNDS:
+                    cumulative += totals.get((f"{metric.name}_bucket", labels + (le,)), 0.0)
+                    lines.append(
+                        _format_series(f"{metric.name}_bucket", metric.labels + ("le",), labels + (le,), cumulative)
+                    )
+                for suffix in ("_sum", "_count"):
+                    value = totals.get((f"{metric.name}{suffix}", labels), 0.0)
+                    lines.append(_format_series(f"{metric.name}{suffix}", metric.labels, labels, value))
+            continue
+        series = sorted((labels, value) for (name, labels), value in totals.items() if name == metric.name)
+        if not series and not metric.labels:
+            series = [((), 0.0)]
+        for labels, value in series:
+            lines.append(_format_series(metric.name, metric.labels, labels, value))
+    return "\n".join(lines) + "\n"
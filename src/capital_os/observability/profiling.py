@@ -0,0 +1,242 @@
+"""Opt-in cProfile capture of individual tool calls.
+
+A call to ``execute_tool`` is profiled when one of these holds:
+
+- ``CAPITAL_OS_PROFILE=1`` is set;
+- it wins the ``CAPITAL_OS_PROFILE_SAMPLE_RATE`` draw (``0.01`` profiles
+  about 1% of calls);
+- the caller asked for it through ``profile_requested()``. The HTTP
+  ``x-capital-profile: 1`` header and ``capital-os tool call --profile``
+  do this.
+
+Profiling is best-effort.  One call per process is profiled at a time: a
+call that finds another capture running, or a profiler it cannot enable
+(another profiling tool, a debugger, or coverage holding the hook), runs
+unprofiled.
+
+Write tools run their handler on the writer thread.  From Python 3.12
+cProfile hooks every thread of the process, so the request's profiler
+already sees that unit.  On 3.11 it only sees the thread that enabled it,
+so ``on_writer_thread`` profiles the unit with a second profiler and both
+are merged into one dump.  The group commit itself is not attributed to the
+call.
+
+Each profile is a standard pstats file,
+``<CAPITAL_OS_PROFILE_DIR>/<started ms>-<tool>-<correlation_id>.prof``
+(default directory ``<db file>.profiles``), readable with
+``python -m pstats`` or ``capital-os profile``.  After each dump the
+oldest files beyond ``CAPITAL_OS_PROFILE_MAX_FILES`` are removed.  When
+profiling is off, a call costs one ContextVar lookup and a cached settings
+read.
+"""
+from __future__ import annotations
+
+import cProfile
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+import os
+import pstats
+from pathlib import Path
+import random
+import re
+import sys
+import threading
+import time
+from typing import Any, Callable, Iterator, TypeVar
+
+from capital_os.config import get_settings
+from capital_os.db.session import active_db_path, use_database
+
+
+T = TypeVar("T")
+
+PROFILE_SUFFIX = ".prof"
+SORT_KEYS = ("cumulative", "tottime", "calls")
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9._-]")
+# cProfile is built on sys.monitoring from 3.12: one active profiler per
+# process, and it covers every thread.
+_PROCESS_WIDE = sys.version_info >= (3, 12)
+
+
+class _Capture:
+    __slots__ = ("tool_name", "correlation_id", "profiles", "lock")
+
+    def __init__(self, tool_name: str, correlation_id: str) -> None:
+        self.tool_name = tool_name
+        self.correlation_id = correlation_id
+        self.profiles: list[cProfile.Profile] = []
+        self.lock = threading.Lock()
+
+    def add(self, profiler: cProfile.Profile) -> None:
+        with self.lock:
+            self.profiles.append(profiler)
+
+
+# Held while a capture runs; contenders skip profiling instead of waiting.
+_PROFILE_LOCK = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    global _PROFILE_LOCK
+    _PROFILE_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+_REQUESTED: ContextVar[bool] = ContextVar("capital_os_profile_requested", default=False)
+_ACTIVE: ContextVar[_Capture | None] = ContextVar("capital_os_profile_capture", default=None)
+
+
+@contextmanager
+def profile_requested() -> Iterator[None]:
+    """Profile every tool call made in this context, whatever the sample rate."""
+    token = _REQUESTED.set(True)
+    try:
+        yield
+    finally:
+        _REQUESTED.reset(token)
+
+
+def _selected() -> bool:
+    if _REQUESTED.get():
+        return True
+    settings = get_settings()
+    if settings.profile_enabled:
+        return True
+    return settings.profile_sample_rate > 0 and random.random() < settings.profile_sample_rate
+
+
+@contextmanager
+def profile_call(tool_name: str, correlation_id: str) -> Iterator[None]:
+    """Profile the enclosed call if it is selected and dump it on exit."""
+    if _ACTIVE.get() is not None or not _selected() or not _PROFILE_LOCK.acquire(blocking=False):
+        yield
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiling tool owns the hook.
+        _PROFILE_LOCK.release()
+        yield
+        return
+    capture = _Capture(tool_name, correlation_id)
+    token = _ACTIVE.set(capture)
+    started = time.time()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _PROFILE_LOCK.release()
+        _ACTIVE.reset(token)
+        capture.add(profiler)
+        _dump(capture, started)
+
+
+def on_writer_thread(fn: Callable[[], T]) -> Callable[[], T]:
+    """Wrap a writer unit so its share of a profiled call is captured too."""
+    capture = _ACTIVE.get()
+    if capture is None or _PROCESS_WIDE:
+        return fn
+
+    def run() -> T:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return fn()
+        try:
+            return fn()
+        finally:
+            profiler.disable()
+            capture.add(profiler)
+
+    return run
+
+
+# --- storage --------------------------------------------------------------------
+
+def profile_output_dir() -> Path:
+    settings = get_settings()
+    if settings.profile_dir:
+        return Path(settings.profile_dir)
+    with use_database(settings.db_url):
+        db_path = active_db_path()
+    return db_path.with_name(f"{db_path.name}.profiles")
+
+
+def _dump(capture: _Capture, started: float) -> None:
+    settings = get_settings()
+    name = "-".join(
+        (
+            f"{int(started * 1000):013d}",
+            _UNSAFE_NAME.sub("_", capture.tool_name),
+            _UNSAFE_NAME.sub("_", capture.correlation_id),
+        )
+    )
+    try:
+        directory = profile_output_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        with capture.lock:
+            stats = pstats.Stats(*capture.profiles)
+        stats.dump_stats(directory / f"{name}{PROFILE_SUFFIX}")
+        for stale in sorted(directory.glob(f"*{PROFILE_SUFFIX}"))[: -settings.profile_max_files]:
+            stale.unlink(missing_ok=True)
+    except OSError:
+        # Profiling must never fail the profiled request.
+        pass
+
+
+def _describe(path: Path) -> dict[str, Any]:
+    started_ms, tool_name, correlation_id = path.stem.split("-", 2)
+    stats = pstats.Stats(str(path))
+    return {
+        "file": path.name,
+        "captured_at": datetime.fromtimestamp(int(started_ms) / 1000, timezone.utc).isoformat().replace("+00:00", "Z"),
+        "tool": tool_name,
+        "correlation_id": correlation_id,
+        "total_seconds": round(stats.total_tt, 6),
+        "function_calls": stats.total_calls,
+    }
+
+
+def list_profiles(directory: Path | None = None) -> list[dict[str, Any]]:
+    """Captured profiles, newest first."""
+    root = directory or profile_output_dir()
+    if not root.is_dir():
+        return []
+    return [_describe(path) for path in sorted(root.glob(f"*{PROFILE_SUFFIX}"), reverse=True)]
+
+
+def find_profile(key: str, directory: Path | None = None) -> Path | None:
+    """Newest profile whose file name or correlation id is *key*."""
+    root = directory or profile_output_dir()
+    if not root.is_dir():
+        return None
+    for path in sorted(root.glob(f"*{PROFILE_SUFFIX}"), reverse=True):
+        if key in (path.name, path.stem.split("-", 2)[-1]):
+            return path
+    return None
+
+
+def summarize_profile(path: Path, *, sort: str = "cumulative", limit: int = 20) -> dict[str, Any]:
+    """The profile's header plus its top *limit* functions by *sort*."""
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of {'|'.join(SORT_KEYS)}")
+    stats = pstats.Stats(str(path))
+    stats.sort_stats(sort)
+    functions = []
+    for func in stats.fcn_list[:limit]:  # type: ignore[attr-defined]
+        primitive_calls, calls, tottime, cumtime, _ = stats.stats[func]  # type: ignore[attr-defined]
+        functions.append(
+            {
+                "function": pstats.func_std_string(func),
+                "calls": calls,
+                "primitive_calls": primitive_calls,
+                "tottime_seconds": round(tottime, 6),
+                "cumtime_seconds": round(cumtime, 6),
+            }
+        )
+    return {**_describe(path), "sort": sort, "functions": functions}
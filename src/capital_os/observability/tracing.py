@@ -0,0 +1,243 @@
+"""Per-request phase spans exported as JSON lines or OTLP/JSON.
+
+With ``CAPITAL_OS_TRACE=1``, ``execute_tool`` opens a root span per call
+and the phases below it (input hashing, validation, policy evaluation,
+duplicate matching, SQL writes, event logging) open child spans.  When the
+root span ends, the finished trace is appended to ``CAPITAL_OS_TRACE_PATH``
+(default ``<db file>.traces.jsonl``):
+
+- ``jsonl``: one object per span with its trace and parent ids, the tool's
+  ``correlation_id``, start time and duration;
+- ``otlp``: one OTLP/JSON ``resourceSpans`` export request per trace, the
+  format OpenTelemetry collectors and trace viewers read from files.
+
+The active span is a ContextVar, so spans opened on the writer thread nest
+under the request that queued the unit.  Outside a trace, ``span()``
+returns a shared no-op after one ContextVar lookup, so instrumented code
+costs next to nothing when tracing is off.
+"""
+from __future__ import annotations
+
+from contextvars import ContextVar
+from functools import wraps
+import json
+import os
+from pathlib import Path
+import threading
+from time import perf_counter_ns, time_ns
+from typing import Any, Callable, TypeVar
+
+from capital_os.config import get_settings
+from capital_os.db.session import active_db_path, use_database
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+SERVICE_NAME = "capital-os"
+
+
+class _Trace:
+    __slots__ = ("trace_id", "correlation_id", "wall_ns", "perf_ns", "spans")
+
+    def __init__(self, correlation_id: str) -> None:
+        self.trace_id = os.urandom(16).hex()
+        self.correlation_id = correlation_id
+        self.wall_ns = time_ns()
+        self.perf_ns = perf_counter_ns()
+        self.spans: list[Span] = []
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, trace: _Trace, parent_id: str | None, name: str, attributes: dict[str, Any]) -> None:
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = perf_counter_ns()
+        self.end_ns = self.start_ns
+        self.error: str | None = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+_CURRENT: ContextVar[Span | None] = ContextVar("capital_os_span", default=None)
+
+
+class _NoopSpan:
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _SpanScope:
+    __slots__ = ("_trace", "_parent", "_name", "_attributes", "_span", "_token")
+
+    def __init__(self, trace: _Trace, parent: Span | None, name: str, attributes: dict[str, Any]) -> None:
+        self._trace = trace
+        self._parent = parent
+        self._name = name
+        self._attributes = attributes
+
+    def __enter__(self) -> Span:
+        parent_id = self._parent.span_id if self._parent is not None else None
+        self._span = Span(self._trace, parent_id, self._name, self._attributes)
+        self._token = _CURRENT.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        span = self._span
+        span.end_ns = perf_counter_ns()
+        if exc_type is not None:
+            span.error = exc_type.__name__
+        _CURRENT.reset(self._token)
+        self._trace.spans.append(span)
+        if span.parent_id is None:
+            _export(self._trace)
+        return False
+
+
+def start_trace(name: str, *, correlation_id: str, **attributes: Any) -> _SpanScope | _NoopSpan:
+    """Open the root span of a request, or a child span if a trace is already active."""
+    parent = _CURRENT.get()
+    if parent is not None:
+        return _SpanScope(parent.trace, parent, name, attributes)
+    if not get_settings().trace_enabled:
+        return _NOOP
+    attributes["correlation_id"] = correlation_id
+    return _SpanScope(_Trace(correlation_id), None, name, attributes)
+
+
+def span(name: str, **attributes: Any) -> _SpanScope | _NoopSpan:
+    """Open a child span of the active span; a no-op outside a trace."""
+    parent = _CURRENT.get()
+    if parent is None:
+        return _NOOP
+    return _SpanScope(parent.trace, parent, name, attributes)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Run the decorated function inside ``span(name)``."""
+
+    def decorator(fn: F) -> F:
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            parent = _CURRENT.get()
+            if parent is None:
+                return fn(*args, **kwargs)
+            with _SpanScope(parent.trace, parent, name, {}):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+# --- export ---------------------------------------------------------------------
+
+_EXPORT_LOCK = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    global _EXPORT_LOCK
+    _EXPORT_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def trace_output_path() -> Path:
+    settings = get_settings()
+    if settings.trace_path:
+        return Path(settings.trace_path)
+    with use_database(settings.db_url):
+        db_path = active_db_path()
+    return db_path.with_name(f"{db_path.name}.traces.jsonl")
+
+
+def _unix_ns(trace: _Trace, perf_ns: int) -> int:
+    return trace.wall_ns + (perf_ns - trace.perf_ns)
+
+
+def _jsonl_records(trace: _Trace) -> list[dict]:
+    return [
+        {
+            "trace_id": trace.trace_id,
+            "span_id": entry.span_id,
+            "parent_span_id": entry.parent_id,
+            "name": entry.name,
+            "correlation_id": trace.correlation_id,
+            "start_unix_nano": _unix_ns(trace, entry.start_ns),
+            "duration_ms": round((entry.end_ns - entry.start_ns) / 1_000_000, 3),
+            "error": entry.error,
+            "attributes": entry.attributes,
+        }
+        for entry in sorted(trace.spans, key=lambda item: item.start_ns)
+    ]
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def _otlp_record(trace: _Trace) -> dict:
+    spans = []
+    for entry in sorted(trace.spans, key=lambda item: item.start_ns):
+        record = {
+            "traceId": trace.trace_id,
+            "spanId": entry.span_id,
+            "name": entry.name,
+            "kind": 1,
+            "startTimeUnixNano": str(_unix_ns(trace, entry.start_ns)),
+            "endTimeUnixNano": str(_unix_ns(trace, entry.end_ns)),
+            "attributes": _otlp_attributes({"correlation_id": trace.correlation_id, **entry.attributes}),
+            "status": {"code": 2, "message": entry.error} if entry.error else {"code": 1},
+        }
+        if entry.parent_id is not None:
+            record["parentSpanId"] = entry.parent_id
+        spans.append(record)
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+                "scopeSpans": [{"scope": {"name": "capital_os"}, "spans": spans}],
+            }
+        ]
+    }
+
+
+def _export(trace: _Trace) -> None:
+    settings = get_settings()
+    records = [_otlp_record(trace)] if settings.trace_format == "otlp" else _jsonl_records(trace)
+    data = "".join(json.dumps(record, separators=(",", ":"), default=str) + "\n" for record in records)
+    try:
+        path = trace_output_path()
+        with _EXPORT_LOCK:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("a", encoding="utf-8") as handle:
+                handle.write(data)
+    except OSError:
+        # Tracing must never fail the traced request.
+        pass
@@ -0,0 +1,331 @@
+"""Dataset-size sweep over every registered tool.
+
+``run_scaling_sweep`` generates a synthetic ledger (``db/synthetic.py``) at
+each requested size, then times ``repeats`` calls of every tool in
+``TOOL_HANDLERS`` through ``execute_tool``.  The run records the median and
+p95 per tool and size.  For each pair of adjacent sizes it also records the
+growth exponent ``log(t2 / t1) / log(n2 / n1)``: 0 is flat, 1 is linear.
+``find_superlinear`` flags a tool whose exponent exceeds the limit once its
+median is above a noise floor.
+
+Every tool needs an entry in ``BENCHMARK_PAYLOADS``, so a new tool cannot
+silently drop out of the sweep.  A builder gets the ledger, the iteration
+number and the outputs of earlier calls at the same size (the config
+approval reuses the proposals created by ``propose_config_change``).
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import json
+import math
+import os
+from pathlib import Path
+import statistics
+import time
+from typing import Any, Callable, Iterable
+
+from capital_os.db.synthetic import SyntheticLedger, SyntheticLedgerSpec, generate_synthetic_ledger
+from capital_os.runtime.execute_tool import TOOL_HANDLERS, execute_tool
+
+
+PayloadBuilder = Callable[[SyntheticLedger, int, dict[str, list[dict]]], dict]
+
+BENCHMARK_ACTOR_ID = "scaling-benchmark"
+DEFAULT_REPEATS = 5
+DEFAULT_MAX_EXPONENT = 1.2
+DEFAULT_MIN_MS = 1.0
+
+
+def _day(ledger: SyntheticLedger, offset: int) -> str:
+    return (ledger.spec.start_date + timedelta(days=offset % ledger.spec.days)).isoformat()
+
+
+def _bundle(ledger: SyntheticLedger, i: int, prefix: str) -> dict:
+    debit = ledger.account_ids[i % len(ledger.account_ids)]
+    credit = ledger.account_ids[(i + 1) % len(ledger.account_ids)]
+    return {
+        "source_system": "benchmark",
+        "external_id": f"{prefix}-{i}",
+        "date": f"{_day(ledger, i * 7)}T09:00:00Z",
+        "description": "benchmark",
+        "postings": [
+            {"account_id": debit, "amount": "12.3400", "currency": "USD"},
+            {"account_id": credit, "amount": "-12.3400", "currency": "USD"},
+        ],
+        "correlation_id": f"corr-bench-{prefix}-{i}",
+    }
+
+
+def _posture(i: int) -> dict:
+    return {
+        "liquidity": "250000.0000",
+        "fixed_burn": "12000.0000",
+        "variable_burn": f"{3000 + i}.0000",
+        "minimum_reserve": "60000.0000",
+        "volatility_buffer": "5000.0000",
+    }
+
+
+BENCHMARK_PAYLOADS: dict[str, PayloadBuilder] = {
+    "create_account": lambda ledger, i, _: {
+        "code": f"9-bench-{i:04d}",
+        "name": f"Benchmark {i}",
+        "account_type": "asset",
+        "parent_account_id": ledger.root_account_ids[0],
+    },
+    "record_transaction_bundle": lambda ledger, i, _: _bundle(ledger, i, "single"),
+    "record_transaction_bundles": lambda ledger, i, _: {
+        "bundles": [_bundle(ledger, i * 10 + j, "batch") for j in range(10)],
+    },
+    "record_balance_snapshot": lambda ledger, i, _: {
+        "source_system": "benchmark",
+        "account_id": ledger.account_ids[i % len(ledger.account_ids)],
+        "snapshot_date": _day(ledger, i + 3),
+        "balance": "100.0000",
+        "currency": "USD",
+    },
+    "create_or_update_obligation": lambda ledger, i, _: {
+        "source_system": "benchmark",
+        "name": f"Benchmark obligation {i}",
+        "account_id": ledger.account_ids[i % len(ledger.account_ids)],
+        "cadence": "monthly",
+        "expected_amount": "45.0000",
+        "next_due_date": _day(ledger, i),
+    },
+    "fulfill_obligation": lambda ledger, i, _: {
+        "obligation_id": ledger.obligation_ids[i % len(ledger.obligation_ids)],
+    },
+    "compute_capital_posture": lambda ledger, i, _: _posture(i),
+    "compute_consolidated_posture": lambda ledger, i, _: {
+        "entity_ids": ["entity-a", "entity-b"],
+        "entities": [{"entity_id": "entity-a", **_posture(i)}, {"entity_id": "entity-b", **_posture(i + 1)}],
+    },
+    "simulate_spend": lambda ledger, i, _: {
+        "starting_liquidity": "250000.0000",
+        "start_date": _day(ledger, 0),
+        "horizon_periods": 12,
+        "spends": [
+            {
+                "spend_id": "rent",
+                "amount": "2000.0000",
+                "type": "recurring",
+                "start_date": _day(ledger, 0),
+                "cadence": "monthly",
+                "occurrences": 12,
+            },
+            {"spend_id": f"once-{i}", "amount": "900.0000", "type": "one_time", "spend_date": _day(ledger, 40)},
+        ],
+    },
+    "analyze_debt": lambda ledger, i, _: {
+        "liabilities": [
+            {"liability_id": "card", "current_balance": "4200.0000", "apr": "0.2399", "minimum_payment": "120.0000"},
+            {"liability_id": "auto", "current_balance": "18000.0000", "apr": "0.0650", "minimum_payment": "410.0000"},
+        ],
+        "optional_payoff_amount": f"{1000 + i}.0000",
+    },
+    "approve_proposed_transaction": lambda ledger, i, _: {
+        "proposal_id": ledger.pending_proposal_ids[(2 * i) % len(ledger.pending_proposal_ids)],
+        "approver_id": "bench-approver",
+    },
+    "reject_proposed_transaction": lambda ledger, i, _: {
+        "proposal_id": ledger.pending_proposal_ids[(2 * i + 1) % len(ledger.pending_proposal_ids)],
+        "approver_id": "bench-approver",
+        "reason": "benchmark",
+    },
+    "list_accounts": lambda ledger, i, _: {"limit": 100},
+    "get_account_tree": lambda ledger, i, _: {
+        "root_account_id": ledger.root_account_ids[i % len(ledger.root_account_ids)],
+        "as_of_date": ledger.end_date.isoformat(),
+    },
+    "get_account_balances": lambda ledger, i, _: {
+        "as_of_date": ledger.end_date.isoformat(),
+        "source_policy": "best_available",
+    },
+    "get_account_balance_series": lambda ledger, i, _: {
+        "account_id": ledger.account_ids[i % len(ledger.account_ids)],
+        "start_date": _day(ledger, 0),
+        "end_date": _day(ledger, 89),
+    },
+    "list_transactions": lambda ledger, i, _: {"limit": 100},
+    "get_transaction_by_external_id": lambda ledger, i, _: dict(
+        zip(("source_system", "external_id"), ledger.transaction_keys[(i * 7919) % len(ledger.transaction_keys)])
+    ),
+    "list_obligations": lambda ledger, i, _: {"limit": 100, "active_only": True},
+    "list_proposals": lambda ledger, i, _: {"limit": 100},
+    "get_proposal": lambda ledger, i, _: {
+        "proposal_id": ledger.pending_proposal_ids[i % len(ledger.pending_proposal_ids)],
+    },
+    "get_config": lambda ledger, i, _: {},
+    "propose_config_change": lambda ledger, i, _: {
+        "source_system": "benchmark",
+        "external_id": f"config-{i}",
+        "scope": "runtime_settings",
+        "change_payload": {"balance_source_policy": "best_available"},
+    },
+    "approve_config_change": lambda ledger, i, outputs: {
+        "proposal_id": outputs["propose_config_change"][i]["proposal_id"],
+        "approver_id": "bench-approver",
+    },
+    "reconcile_account": lambda ledger, i, _: {
+        "account_id": ledger.account_ids[i % len(ledger.account_ids)],
+        "as_of_date": ledger.end_date.isoformat(),
+        "method": "best_available",
+    },
+    "update_account_metadata": lambda ledger, i, _: {
+        "account_id": ledger.account_ids[i % len(ledger.account_ids)],
+        "metadata": {"benchmark": i},
+    },
+    "update_account_profile": lambda ledger, i, _: {
+        "account_id": ledger.account_ids[i % len(ledger.account_ids)],
+        "source_system": "benchmark",
+        "external_id": f"profile-{i}",
+        "display_name": f"Benchmark account {i}",
+    },
+    # Periods after the generated year, so closing them never blocks the
+    # dated writes above.
+    "close_period": lambda ledger, i, _: {"period_key": f"{ledger.end_date.year + 1 + i}-01"},
+    "lock_period": lambda ledger, i, _: {"period_key": f"{ledger.end_date.year + 1 + i}-01"},
+}
+
+
+def _p95(samples: list[float]) -> float:
+    if len(samples) < 2:
+        return samples[0]
+    return statistics.quantiles(samples, n=20, method="inclusive")[-1]
+
+
+def measure_tools(ledger: SyntheticLedger, *, repeats: int = DEFAULT_REPEATS, size_label: str = "") -> dict[str, dict]:
+    """Time *repeats* calls of every tool against the active database."""
+    missing = set(TOOL_HANDLERS) - set(BENCHMARK_PAYLOADS)
+    if missing:
+        raise ValueError(f"no benchmark payload for tools: {sorted(missing)}")
+
+    outputs: dict[str, list[dict]] = {}
+    measured: dict[str, dict] = {}
+    for tool_name in TOOL_HANDLERS:
+        timings: list[float] = []
+        outputs[tool_name] = []
+        for i in range(repeats):
+            payload = {
+                **BENCHMARK_PAYLOADS[tool_name](ledger, i, outputs),
+                "correlation_id": f"corr-bench-{size_label}{tool_name}-{i}",
+            }
+            started = time.perf_counter()
+            result = execute_tool(
+                tool_name,
+                payload,
+                actor_id=BENCHMARK_ACTOR_ID,
+                authn_method="trusted_cli",
+                authorization_result="bypassed_trusted_channel",
+            )
+            timings.append((time.perf_counter() - started) * 1000)
+            if not result.success:
+                raise RuntimeError(f"{tool_name} failed during benchmark: {result.payload}")
+            outputs[tool_name].append(result.payload)
+        measured[tool_name] = {
+            "median_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(_p95(timings), 3),
+        }
+    return measured
+
+
+def _exponent(size_a: int, time_a: float, size_b: int, time_b: float) -> float | None:
+    if size_b <= size_a or time_a <= 0 or time_b <= 0:
+        return None
+    return round(math.log(time_b / time_a) / math.log(size_b / size_a), 3)
+
+
+def find_superlinear(
+    run: dict,
+    *,
+    max_exponent: float = DEFAULT_MAX_EXPONENT,
+    min_ms: float = DEFAULT_MIN_MS,
+) -> list[dict]:
+    """Tools whose median grows faster than ``n ** max_exponent`` between adjacent sizes.
+
+    Steps whose larger median is below *min_ms* are ignored: timer noise
+    dominates sub-millisecond calls.
+    """
+    sizes = [entry["transactions"] for entry in run["sizes"]]
+    flagged = []
+    for tool_name, series in run["tools"].items():
+        medians = series["median_ms"]
+        for index in range(1, len(sizes)):
+            exponent = _exponent(sizes[index - 1], medians[index - 1], sizes[index], medians[index])
+            if exponent is not None and exponent > max_exponent and medians[index] >= min_ms:
+                flagged.append(
+                    {
+                        "tool": tool_name,
+                        "from_transactions": sizes[index - 1],
+                        "to_transactions": sizes[index],
+                        "exponent": exponent,
+                        "median_ms": [medians[index - 1], medians[index]],
+                    }
+                )
+    return flagged
+
+
+def run_scaling_sweep(
+    sizes: Iterable[int],
+    *,
+    prepare_database: Callable[[int], None],
+    seed: int = 22,
+    repeats: int = DEFAULT_REPEATS,
+    max_exponent: float = DEFAULT_MAX_EXPONENT,
+    min_ms: float = DEFAULT_MIN_MS,
+) -> dict:
+    """Benchmark every tool at each size; *prepare_database* empties the database for a size."""
+    ordered = sorted(set(sizes))
+    if not ordered:
+        raise ValueError("at least one size is required")
+    if repeats < 1:
+        raise ValueError("repeats must be >= 1")
+
+    run: dict[str, Any] = {
+        "recorded_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "seed": seed,
+        "repeats": repeats,
+        "max_exponent": max_exponent,
+        "min_ms": min_ms,
+        "sizes": [],
+        "tools": {tool_name: {"median_ms": [], "p95_ms": [], "exponents": []} for tool_name in TOOL_HANDLERS},
+    }
+    for size in ordered:
+        prepare_database(size)
+        started = time.perf_counter()
+        ledger = generate_synthetic_ledger(SyntheticLedgerSpec.for_transactions(size, seed=seed))
+        run["sizes"].append(
+            {
+                "transactions": size,
+                "postings": ledger.posting_count,
+                "accounts": len(ledger.account_ids) + len(ledger.root_account_ids),
+                "generate_seconds": round(time.perf_counter() - started, 3),
+            }
+        )
+        for tool_name, result in measure_tools(ledger, repeats=repeats, size_label=f"{size}-").items():
+            series = run["tools"][tool_name]
+            series["median_ms"].append(result["median_ms"])
+            series["p95_ms"].append(result["p95_ms"])
+
+    for series in run["tools"].values():
+        medians = series["median_ms"]
+        series["exponents"] = [
+            _exponent(ordered[index - 1], medians[index - 1], ordered[index], medians[index])
+            for index in range(1, len(ordered))
+        ]
+    run["superlinear"] = find_superlinear(run, max_exponent=max_exponent, min_ms=min_ms)
+    return run
+
+
+def append_history(path: str | Path, run: dict) -> list[dict]:
+    """Append *run* to the JSON history at *path* and return every recorded run."""
+    history_path = Path(path)
+    runs: list[dict] = []
+    if history_path.exists():
+        runs = json.loads(history_path.read_text(encoding="utf-8"))["runs"]
+    runs.append(run)
+    history_path.parent.mkdir(parents=True, exist_ok=True)
+    staged = history_path.with_name(f"{history_path.name}.tmp")
+    staged.write_text(json.dumps({"runs": runs}, indent=2) + "\n", encoding="utf-8")
+    os.replace(staged, history_path)
+    return runs
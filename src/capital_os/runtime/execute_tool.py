@@ -9,21 +9,39 @@ Invariants preserved through this path:
 - Schema validation (Pydantic)
 - Deterministic input/output hashing
 - Event logging with fail-closed write semantics
-- DB transaction boundaries
+- DB transaction boundaries (write tools go through the writer queue)
 - Append-only and balanced-posting protections
+- Entity shard routing when ``CAPITAL_OS_DB_SHARD_DIR`` is set
 """
 
 from __future__ import annotations
 
 import re
 from dataclasses import dataclass
+import sqlite3
 from time import perf_counter
+from typing import Any, Callable
 
 from pydantic import ValidationError
 
-from capital_os.db.session import transaction
+from capital_os.db.session import (
+    PoolTimeoutError,
+    enter_entity_shard,
+    exit_entity_shard,
+    fan_out_entities,
+    read_only_connection,
+    sharding_enabled,
+    transaction,
+)
+from capital_os.db.slow_query_log import query_scope
+from capital_os.db.writer import WriteQueueFullError, run_write
+from capital_os.domain.entities import DEFAULT_ENTITY_ID
 from capital_os.observability.event_log import log_event
+from capital_os.observability.event_sink import buffer_event
 from capital_os.observability.hashing import payload_hash
+from capital_os.observability.metrics import SQLITE_BUSY_ERRORS, TOOL_DURATION, inc, observe
+from capital_os.observability.profiling import on_writer_thread, profile_call
+from capital_os.observability.tracing import span, start_trace
 from capital_os.security.context import (
     RequestSecurityContext,
     clear_request_security_context,
@@ -39,6 +57,7 @@ from capital_os.tools import (
     create_account,
     create_or_update_obligation,
     fulfill_obligation,
+    get_account_balance_series,
     get_account_balances,
     get_account_tree,
     get_config,
@@ -53,6 +72,7 @@ from capital_os.tools import (
     reconcile_account,
     record_balance_snapshot,
     record_transaction_bundle,
+    record_transaction_bundles,
     reject_proposed_transaction,
     simulate_spend,
     update_account_metadata,
@@ -66,6 +86,7 @@ WRITE_TOOLS = {
     "update_account_metadata",
     "update_account_profile",
     "record_transaction_bundle",
+    "record_transaction_bundles",
     "record_balance_snapshot",
     "create_or_update_obligation",
     "fulfill_obligation",
@@ -80,6 +101,7 @@ WRITE_TOOLS = {
 TOOL_HANDLERS = {
     "create_account": create_account.handle,
     "record_transaction_bundle": record_transaction_bundle.handle,
+    "record_transaction_bundles": record_transaction_bundles.handle,
     "record_balance_snapshot": record_balance_snapshot.handle,
     "create_or_update_obligation": create_or_update_obligation.handle,
     "fulfill_obligation": fulfill_obligation.handle,
@@ -92,6 +114,7 @@ TOOL_HANDLERS = {
     "list_accounts": list_accounts.handle,
     "get_account_tree": get_account_tree.handle,
     "get_account_balances": get_account_balances.handle,
+    "get_account_balance_series": get_account_balance_series.handle,
     "list_transactions": list_transactions.handle,
     "get_transaction_by_external_id": get_transaction_by_external_id.handle,
     "list_obligations": list_obligations.handle,
@@ -107,6 +130,20 @@ TOOL_HANDLERS = {
     "lock_period": lock_period.handle,
 }
 
+# Tools that name an existing row instead of an entity are routed to the
+# shard holding that row: tool -> (table, id column, payload key).
+ROW_ROUTED_TOOLS = {
+    "approve_proposed_transaction": ("approval_proposals", "proposal_id", "proposal_id"),
+    "reject_proposed_transaction": ("approval_proposals", "proposal_id", "proposal_id"),
+    "get_proposal": ("approval_proposals", "proposal_id", "proposal_id"),
+    "fulfill_obligation": ("obligations", "obligation_id", "obligation_id"),
+    "get_account_tree": ("accounts", "account_id", "root_account_id"),
+    "get_account_balance_series": ("accounts", "account_id", "account_id"),
+    "reconcile_account": ("accounts", "account_id", "account_id"),
+    "update_account_metadata": ("accounts", "account_id", "account_id"),
+    "update_account_profile": ("accounts", "account_id", "account_id"),
+}
+
 
 @dataclass(frozen=True)
 class ToolResult:
@@ -114,7 +151,7 @@ class ToolResult:
 
     success: bool
     payload: dict
-    status: str  # "ok", "unknown_tool", "validation_error", "error", "event_log_failure"
+    status: str  # "ok", "unknown_tool", "validation_error", "error", "overloaded", "event_log_failure"
 
 
 def tool_names() -> list[str]:
@@ -135,6 +172,55 @@ def _extract_correlation_id(payload: dict) -> str:
     return raw_value
 
 
+def _route_entity_id(tool_name: str, payload: dict) -> str | None:
+    """Entity whose shard serves this call; ``None`` keeps the catalog.
+
+    Only consulted when entity sharding is enabled.  Calls without an
+    ``entity_id`` that name an existing row are routed by looking the row up
+    across all shards in parallel; anything else stays on the catalog, which
+    is also the default entity's shard.  Reads that span entities
+    (``list_accounts``, ``list_transactions`` and the like) fan out across
+    shards themselves in ``domain.query.service``.
+    """
+    entity_id = payload.get("entity_id")
+    if tool_name == "record_transaction_bundles" and isinstance(payload.get("bundles"), list):
+        entity_id = None
+        for index, bundle in enumerate(payload["bundles"]):
+            if not isinstance(bundle, dict):
+                continue
+            bundle_entity_id = bundle.get("entity_id", DEFAULT_ENTITY_ID)
+            if entity_id is None:
+                entity_id = bundle_entity_id
+            elif bundle_entity_id != entity_id:
+                raise ValidationError.from_exception_data(
+                    "RecordTransactionBundlesIn",
+                    [
+                        {
+                            "type": "value_error",
+                            "loc": ("bundles", index, "entity_id"),
+                            "input": bundle_entity_id,
+                            "ctx": {
+                                "error": ValueError("bundles must share one entity_id when entity sharding is enabled")
+                            },
+                        }
+                    ],
+                )
+    if isinstance(entity_id, str):
+        return entity_id
+
+    lookup = ROW_ROUTED_TOOLS.get(tool_name)
+    row_id = payload.get(lookup[2]) if lookup is not None else None
+    if not isinstance(row_id, str):
+        return None
+    table, column, _ = lookup
+
+    def holds_row(_entity_id: str) -> bool:
+        with read_only_connection() as conn:
+            return conn.execute(f"SELECT 1 FROM {table} WHERE {column} = ?", (row_id,)).fetchone() is not None
+
+    return next((entity_id for entity_id, found in fan_out_entities(holds_row) if found), None)
+
+
 def _sanitize_validation_errors(errors: list[dict]) -> list[dict]:
     def _safe_ctx_value(value):
         if isinstance(value, (str, int, float, bool)) or value is None:
@@ -163,15 +249,29 @@ def _try_log_event(*, fail_closed: bool, **kwargs) -> bool:
 
     Returns True on success or non-fatal failure.
     Returns False when *fail_closed* is True and logging fails.
+    Non-fail-closed events go through the buffered sink when it is enabled.
     """
-    try:
+    if not fail_closed and buffer_event(**kwargs):
+        return True
+
+    def _log() -> None:
         with transaction() as conn:
             log_event(conn, **kwargs)
+
+    try:
+        run_write(_log)
         return True
     except Exception:
         return not fail_closed
 
 
+def _is_busy_error(exc: Exception) -> bool:
+    if not isinstance(exc, sqlite3.OperationalError):
+        return False
+    message = str(exc).lower()
+    return "database is locked" in message or "database is busy" in message or "table is locked" in message
+
+
 def execute_tool(
     tool_name: str,
     payload: dict,
@@ -189,6 +289,9 @@ def execute_tool(
     - Pydantic schema validation error handling
     - Event logging for tool-level errors
     - Fail-closed write semantics
+    - Latency metrics per tool, status and authorization result
+    - Opt-in cProfile capture (``observability/profiling.py``)
+    - Slow-statement attribution (``db/slow_query_log.py``)
     """
     handler = TOOL_HANDLERS.get(tool_name)
     if not handler:
@@ -199,7 +302,45 @@ def execute_tool(
         )
 
     started = perf_counter()
-    input_hash = payload_hash(payload)
+    trace_correlation_id = payload.get("correlation_id")
+    call_key = _correlation_key(trace_correlation_id)
+    with start_trace(
+        "execute_tool",
+        correlation_id=trace_correlation_id if isinstance(trace_correlation_id, str) else "unknown",
+        tool=tool_name,
+    ) as root_span, profile_call(tool_name, call_key), query_scope(tool_name, call_key):
+        result = _execute_handler(
+            tool_name,
+            handler,
+            payload,
+            started=started,
+            actor_id=actor_id,
+            authn_method=authn_method,
+            authorization_result=authorization_result,
+        )
+        root_span.set_attribute("status", result.status)
+    observe(TOOL_DURATION, perf_counter() - started, tool_name, result.status, authorization_result)
+    return result
+
+
+def _correlation_key(raw_value: object) -> str:
+    if isinstance(raw_value, str) and CORRELATION_ID_PATTERN.match(raw_value):
+        return raw_value
+    return "unknown"
+
+
+def _execute_handler(
+    tool_name: str,
+    handler: Callable[[dict], Any],
+    payload: dict,
+    *,
+    started: float,
+    actor_id: str,
+    authn_method: str,
+    authorization_result: str,
+) -> ToolResult:
+    with span("payload_hash"):
+        input_hash = payload_hash(payload)
     correlation_id = payload.get("correlation_id", "unknown")
 
     # --- Correlation ID validation ---
@@ -251,11 +392,25 @@ def execute_tool(
             authorization_result=authorization_result,
         )
     )
+    shard_token = None
     try:
-        result = handler(payload)
+        if sharding_enabled():
+            entity_id = _route_entity_id(tool_name, payload)
+            if entity_id is not None:
+                shard_token = enter_entity_shard(entity_id)
+        if _is_write_tool(tool_name):
+            # Write tools run on their database's writer thread and share
+            # its group commit; the call returns once the batch is durable.
+            with span("run_write"):
+                result = run_write(on_writer_thread(lambda: handler(payload)))
+        else:
+            with span("handler"):
+                result = handler(payload)
+        with span("serialize_output"):
+            output = result.model_dump(mode="json")
         return ToolResult(
             success=True,
-            payload=result.model_dump(mode="json"),
+            payload=output,
             status="ok",
         )
     except ValidationError as exc:
@@ -289,7 +444,33 @@ def execute_tool(
             payload=error_payload,
             status="validation_error",
         )
+    except (WriteQueueFullError, PoolTimeoutError) as exc:
+        # Backpressure from the DB layer: nothing was committed, so the
+        # caller may safely retry.  Logging is best-effort here because the
+        # event log shares the saturated resource.
+        error_payload = {"error": "overloaded", "message": str(exc)}
+        _try_log_event(
+            fail_closed=False,
+            tool_name=tool_name,
+            correlation_id=correlation_id,
+            input_hash=input_hash,
+            output_hash=payload_hash(error_payload),
+            duration_ms=int((perf_counter() - started) * 1000),
+            status="overloaded",
+            error_code="overloaded",
+            error_message="overloaded",
+            actor_id=actor_id,
+            authn_method=authn_method,
+            authorization_result=authorization_result,
+        )
+        return ToolResult(
+            success=False,
+            payload=error_payload,
+            status="overloaded",
+        )
     except Exception as exc:
+        if _is_busy_error(exc):
+            inc(SQLITE_BUSY_ERRORS, tool_name)
         error_payload = {"error": "tool_execution_error", "message": str(exc)}
         output_hash = payload_hash(error_payload)
         logged = _try_log_event(
@@ -318,4 +499,6 @@ def execute_tool(
             status="error",
         )
     finally:
+        if shard_token is not None:
+            exit_entity_shard(shard_token)
         clear_request_security_context(context_token)
@@ -4,7 +4,15 @@ from datetime import date, datetime
 from decimal import Decimal
 from typing import Literal
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    SerializerFunctionWrapHandler,
+    field_validator,
+    model_serializer,
+    model_validator,
+)
 
 from capital_os.domain.entities import DEFAULT_ENTITY_ID
 from capital_os.domain.ledger.invariants import normalize_amount
@@ -109,6 +117,28 @@ class RecordTransactionBundleOut(BaseModel):
     output_hash: str
 
 
+MAX_TRANSACTION_BUNDLES_PER_BATCH = 1000
+
+
+class RecordTransactionBundlesIn(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    bundles: list[RecordTransactionBundleIn] = Field(min_length=1, max_length=MAX_TRANSACTION_BUNDLES_PER_BATCH)
+    correlation_id: str
+
+
+class RecordTransactionBundlesOut(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    status: Literal["ok"]
+    results: list[RecordTransactionBundleOut]
+    committed_count: int
+    proposed_count: int
+    replayed_count: int
+    correlation_id: str
+    output_hash: str
+
+
 class ApproveProposedTransactionIn(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -648,16 +678,32 @@ class ListAccountsOut(BaseModel):
     output_hash: str
 
 
+def _omit_unset(data: dict, *fields: str) -> dict:
+    # as_of_date reads add these fields; without one the payload (and its
+    # output_hash) stays the one emitted before they existed.
+    for field in fields:
+        if data.get(field) is None:
+            data.pop(field, None)
+    return data
+
+
 class TreeAccountNode(AccountNode):
     model_config = ConfigDict(extra="forbid")
 
+    balance: Decimal | None = None
+    rolled_up_balance: Decimal | None = None
     children: list["TreeAccountNode"] = Field(default_factory=list)
 
+    @model_serializer(mode="wrap")
+    def _omit_unset_balances(self, handler: SerializerFunctionWrapHandler) -> dict:
+        return _omit_unset(handler(self), "balance", "rolled_up_balance")
+
 
 class GetAccountTreeIn(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     root_account_id: str | None = None
+    as_of_date: date | None = None
     correlation_id: str
 
 
@@ -665,10 +711,15 @@ class GetAccountTreeOut(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     root_account_id: str | None = None
+    as_of_date: date | None = None
     accounts: list[TreeAccountNode]
     correlation_id: str
     output_hash: str
 
+    @model_serializer(mode="wrap")
+    def _omit_unset_as_of_date(self, handler: SerializerFunctionWrapHandler) -> dict:
+        return _omit_unset(handler(self), "as_of_date")
+
 
 class GetAccountBalancesIn(BaseModel):
     model_config = ConfigDict(extra="forbid")
@@ -703,6 +754,46 @@ class GetAccountBalancesOut(BaseModel):
     output_hash: str
 
 
+class GetAccountBalanceSeriesIn(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    account_id: str
+    start_date: date
+    end_date: date
+    interval: Literal["day", "week", "month"] = "day"
+    correlation_id: str
+
+    @model_validator(mode="after")
+    def _validate_range(self) -> "GetAccountBalanceSeriesIn":
+        if self.end_date < self.start_date:
+            raise ValueError("end_date must be on or after start_date")
+        if (self.end_date - self.start_date).days > 3660:
+            raise ValueError("date range must not exceed 3660 days")
+        return self
+
+
+class AccountBalanceSeriesPoint(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    date: date
+    balance: Decimal
+    movement: Decimal
+
+
+class GetAccountBalanceSeriesOut(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    status: Literal["ok", "account_not_found"]
+    account_id: str
+    start_date: date
+    end_date: date
+    interval: Literal["day", "week", "month"]
+    opening_balance: Decimal
+    points: list[AccountBalanceSeriesPoint]
+    correlation_id: str
+    output_hash: str
+
+
 class ListTransactionsIn(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -2,9 +2,8 @@ from __future__ import annotations
 
 from time import perf_counter
 
-from capital_os.db.session import transaction
 from capital_os.domain.posture.consolidation import compute_consolidated_posture as consolidate
-from capital_os.observability.event_log import log_event
+from capital_os.observability.event_sink import record_event
 from capital_os.observability.hashing import payload_hash
 from capital_os.schemas.tools import ComputeConsolidatedPostureIn, ComputeConsolidatedPostureOut
 
@@ -31,15 +30,13 @@ def handle(payload: dict) -> ComputeConsolidatedPostureOut:
     }
     response_payload["output_hash"] = payload_hash(response_payload)
 
-    with transaction() as conn:
-        log_event(
-            conn,
-            tool_name="compute_consolidated_posture",
-            correlation_id=req.correlation_id,
-            input_hash=input_hash,
-            output_hash=response_payload["output_hash"],
-            duration_ms=int((perf_counter() - started) * 1000),
-            status="ok",
-        )
+    record_event(
+        tool_name="compute_consolidated_posture",
+        correlation_id=req.correlation_id,
+        input_hash=input_hash,
+        output_hash=response_payload["output_hash"],
+        duration_ms=int((perf_counter() - started) * 1000),
+        status="ok",
+    )
 
     return ComputeConsolidatedPostureOut.model_validate(response_payload)
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from time import perf_counter
+
+from capital_os.domain.query.service import query_account_balance_series
+from capital_os.observability.event_sink import record_event
+from capital_os.observability.hashing import payload_hash
+from capital_os.schemas.tools import GetAccountBalanceSeriesIn, GetAccountBalanceSeriesOut
+
+
+def handle(payload: dict) -> GetAccountBalanceSeriesOut:
+    started = perf_counter()
+    req = GetAccountBalanceSeriesIn.model_validate(payload)
+    input_hash = payload_hash(req.model_dump(mode="json"))
+
+    series = query_account_balance_series(
+        account_id=req.account_id,
+        start_date=req.start_date,
+        end_date=req.end_date,
+        interval=req.interval,
+    )
+    response_payload = {
+        **series,
+        "correlation_id": req.correlation_id,
+    }
+    response_payload["output_hash"] = payload_hash(response_payload)
+
+    record_event(
+        tool_name="get_account_balance_series",
+        correlation_id=req.correlation_id,
+        input_hash=input_hash,
+        output_hash=response_payload["output_hash"],
+        duration_ms=int((perf_counter() - started) * 1000),
+        status="ok",
+    )
+
+    return GetAccountBalanceSeriesOut.model_validate(response_payload)
@@ -2,9 +2,8 @@ from __future__ import annotations
 
 from time import perf_counter
 
-from capital_os.db.session import transaction
 from capital_os.domain.query.service import query_account_tree
-from capital_os.observability.event_log import log_event
+from capital_os.observability.event_sink import record_event
 from capital_os.observability.hashing import payload_hash
 from capital_os.schemas.tools import GetAccountTreeIn, GetAccountTreeOut
 
@@ -14,24 +13,29 @@ def handle(payload: dict) -> GetAccountTreeOut:
     req = GetAccountTreeIn.model_validate(payload)
     input_hash = payload_hash(req.model_dump(mode="json"))
 
-    tree = query_account_tree(req.root_account_id)
-    response_payload = {
-        "root_account_id": tree["root_account_id"],
-        "accounts": tree["accounts"],
-        "correlation_id": req.correlation_id,
-    }
-    response_payload["output_hash"] = payload_hash(response_payload)
-
-    with transaction() as conn:
-        log_event(
-            conn,
-            tool_name="get_account_tree",
-            correlation_id=req.correlation_id,
-            input_hash=input_hash,
-            output_hash=response_payload["output_hash"],
-            duration_ms=int((perf_counter() - started) * 1000),
-            status="ok",
-        )
-
-    return GetAccountTreeOut.model_validate(response_payload)
+    as_of_date = req.as_of_date.isoformat() if req.as_of_date else None
+    tree = query_account_tree(req.root_account_id, as_of_date=as_of_date)
+    response = GetAccountTreeOut.model_validate(
+        {
+            "root_account_id": tree["root_account_id"],
+            "as_of_date": as_of_date,
+            "accounts": tree["accounts"],
+            "correlation_id": req.correlation_id,
+            "output_hash": "",
+        }
+    )
+    # Hash the body as emitted; without as_of_date it leaves out the
+    # as_of_date and balance keys, matching the pre-rollup hash.
+    output_hash = payload_hash(response.model_dump(mode="json", exclude={"output_hash"}))
+
+    record_event(
+        tool_name="get_account_tree",
+        correlation_id=req.correlation_id,
+        input_hash=input_hash,
+        output_hash=output_hash,
+        duration_ms=int((perf_counter() - started) * 1000),
+        status="ok",
+    )
+
+    return response.model_copy(update={"output_hash": output_hash})
 
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+from capital_os.domain.ledger.service import record_transaction_bundles
+from capital_os.schemas.tools import RecordTransactionBundlesIn, RecordTransactionBundlesOut
+
+
+def handle(payload: dict) -> RecordTransactionBundlesOut:
+    req = RecordTransactionBundlesIn.model_validate(payload)
+    out = record_transaction_bundles(req.model_dump())
+    return RecordTransactionBundlesOut.model_validate(out)
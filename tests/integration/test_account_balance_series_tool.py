@@ -0,0 +1,151 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from capital_os.api.app import app
+from capital_os.db.session import transaction
+from capital_os.domain.ledger.repository import create_account
+from capital_os.domain.ledger.service import record_transaction_bundle
+from tests.support.auth import AUTH_HEADERS
+
+
+def _seed_ledger() -> dict[str, str]:
+    with transaction() as conn:
+        cash = create_account(conn, {"code": "1000", "name": "Cash", "account_type": "asset"})
+        income = create_account(conn, {"code": "4000", "name": "Income", "account_type": "income"})
+
+    for external_id, day, amount in [
+        ("series-1", "2026-01-02", "100.0000"),
+        ("series-2", "2026-01-05", "25.5000"),
+        ("series-3", "2026-02-03", "10.0000"),
+        # Back-dated after later days already exist.
+        ("series-4", "2025-12-30", "1.0000"),
+    ]:
+        record_transaction_bundle(
+            {
+                "source_system": "pytest",
+                "external_id": external_id,
+                "date": f"{day}T00:00:00Z",
+                "description": "series",
+                "postings": [
+                    {"account_id": cash, "amount": amount, "currency": "USD"},
+                    {"account_id": income, "amount": f"-{amount}", "currency": "USD"},
+                ],
+                "correlation_id": f"corr-{external_id}",
+            }
+        )
+    return {"cash": cash, "income": income}
+
+
+def test_daily_series_carries_balances_forward(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    accounts = _seed_ledger()
+    client = TestClient(app, headers=AUTH_HEADERS)
+    payload = {
+        "account_id": accounts["cash"],
+        "start_date": "2026-01-01",
+        "end_date": "2026-01-06",
+        "correlation_id": "corr-series-day",
+    }
+    response = client.post("/tools/get_account_balance_series", json=payload)
+    assert response.status_code == 200
+    body = response.json()
+
+    assert body["status"] == "ok"
+    assert body["interval"] == "day"
+    assert body["opening_balance"] == "1.0000"
+    assert [(p["date"], p["balance"], p["movement"]) for p in body["points"]] == [
+        ("2026-01-01", "1.0000", "0.0000"),
+        ("2026-01-02", "101.0000", "100.0000"),
+        ("2026-01-03", "101.0000", "0.0000"),
+        ("2026-01-04", "101.0000", "0.0000"),
+        ("2026-01-05", "126.5000", "25.5000"),
+        ("2026-01-06", "126.5000", "0.0000"),
+    ]
+
+    replay = client.post("/tools/get_account_balance_series", json=payload).json()
+    assert replay["output_hash"] == body["output_hash"]
+
+
+def test_monthly_series_closes_each_month_and_matches_as_of_balances(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    accounts = _seed_ledger()
+    client = TestClient(app, headers=AUTH_HEADERS)
+    body = client.post(
+        "/tools/get_account_balance_series",
+        json={
+            "account_id": accounts["income"],
+            "start_date": "2025-12-15",
+            "end_date": "2026-02-10",
+            "interval": "month",
+            "correlation_id": "corr-series-month",
+        },
+    ).json()
+
+    assert [(p["date"], p["balance"]) for p in body["points"]] == [
+        ("2025-12-31", "-1.0000"),
+        ("2026-01-31", "-126.5000"),
+        ("2026-02-10", "-136.5000"),
+    ]
+
+    for point in body["points"]:
+        balances = client.post(
+            "/tools/get_account_balances",
+            json={"as_of_date": point["date"], "source_policy": "ledger_only", "correlation_id": "corr-series-asof"},
+        ).json()["balances"]
+        by_id = {row["account_id"]: row for row in balances}
+        assert by_id[accounts["income"]]["ledger_balance"] == point["balance"]
+
+
+def test_weekly_series_and_unknown_account(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    accounts = _seed_ledger()
+    client = TestClient(app, headers=AUTH_HEADERS)
+    weekly = client.post(
+        "/tools/get_account_balance_series",
+        json={
+            "account_id": accounts["cash"],
+            "start_date": "2026-01-01",
+            "end_date": "2026-01-10",
+            "interval": "week",
+            "correlation_id": "corr-series-week",
+        },
+    ).json()
+    assert [(p["date"], p["balance"]) for p in weekly["points"]] == [
+        ("2026-01-07", "126.5000"),
+        ("2026-01-10", "126.5000"),
+    ]
+
+    missing = client.post(
+        "/tools/get_account_balance_series",
+        json={
+            "account_id": "missing",
+            "start_date": "2026-01-01",
+            "end_date": "2026-01-02",
+            "correlation_id": "corr-series-missing",
+        },
+    ).json()
+    assert missing["status"] == "account_not_found"
+    assert missing["points"] == []
+
+
+def test_series_rejects_inverted_range(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    client = TestClient(app, headers=AUTH_HEADERS)
+    response = client.post(
+        "/tools/get_account_balance_series",
+        json={
+            "account_id": "any",
+            "start_date": "2026-02-01",
+            "end_date": "2026-01-01",
+            "correlation_id": "corr-series-invalid",
+        },
+    )
+    assert response.status_code == 422
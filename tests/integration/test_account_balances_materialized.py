@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from pathlib import Path
+import shutil
+import sqlite3
+
+import pytest
+from typer.testing import CliRunner
+
+from capital_os.cli.main import app as cli_app
+from capital_os.config import get_settings
+from capital_os.db.migrations import apply_pending_migrations
+from capital_os.db.session import read_only_connection, transaction
+from capital_os.domain.approval.service import approve_proposed_transaction
+from capital_os.domain.ledger.balances import rebuild_account_balances, verify_account_balances
+from capital_os.domain.ledger.repository import (
+    create_account,
+    fetch_account_balance_context,
+    fetch_account_balances_as_of,
+)
+from capital_os.domain.ledger.service import record_transaction_bundle
+
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+
+def _seed_accounts() -> tuple[str, str]:
+    with transaction() as conn:
+        cash = create_account(conn, {"code": "1000", "name": "Cash", "account_type": "asset"})
+        income = create_account(conn, {"code": "4000", "name": "Income", "account_type": "income"})
+    return cash, income
+
+
+def _record(cash: str, income: str, external_id: str, date: str, amount: str) -> dict:
+    return record_transaction_bundle(
+        {
+            "source_system": "pytest",
+            "external_id": external_id,
+            "date": date,
+            "description": "materialized balance",
+            "postings": [
+                {"account_id": cash, "amount": amount, "currency": "USD"},
+                {"account_id": income, "amount": f"-{amount}", "currency": "USD"},
+            ],
+            "correlation_id": f"corr-{external_id}",
+        }
+    )
+
+
+def _materialized(account_id: str) -> sqlite3.Row:
+    """Current balance: the account's latest daily rollup row."""
+    with transaction() as conn:
+        return conn.execute(
+            """
+            SELECT balance_date, cumulative_units FROM account_daily_balances
+            WHERE account_id=? ORDER BY balance_date DESC LIMIT 1
+            """,
+            (account_id,),
+        ).fetchone()
+
+
+def test_insert_maintains_exact_balance_and_latest_posting_date(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, income = _seed_accounts()
+    _record(cash, income, "mat-1", "2026-01-10T00:00:00Z", "0.1000")
+    _record(cash, income, "mat-2", "2026-01-20T00:00:00Z", "0.2000")
+    _record(cash, income, "mat-3", "2026-01-05T00:00:00Z", "0.0001")
+
+    row = _materialized(cash)
+    assert row["cumulative_units"] == 3001
+    assert row["balance_date"] == "2026-01-20"
+    assert _materialized(income)["cumulative_units"] == -3001
+
+    with read_only_connection() as conn:
+        assert verify_account_balances(conn) == []
+
+
+def test_approval_commit_path_updates_balances(db_available, monkeypatch):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    monkeypatch.setenv("CAPITAL_OS_APPROVAL_THRESHOLD_AMOUNT", "100.0000")
+    get_settings.cache_clear()
+    try:
+        cash, income = _seed_accounts()
+        proposed = _record(cash, income, "mat-approval", "2026-01-10T00:00:00Z", "250.0000")
+        assert proposed["status"] == "proposed"
+        assert _materialized(cash) is None
+
+        committed = approve_proposed_transaction(
+            {"proposal_id": proposed["proposal_id"], "reason": "ok", "correlation_id": "corr-mat-approve"}
+        )
+        assert committed["status"] == "committed"
+    finally:
+        get_settings.cache_clear()
+
+    assert _materialized(cash)["cumulative_units"] == 2_500_000
+    with read_only_connection() as conn:
+        assert verify_account_balances(conn) == []
+
+
+def test_back_dated_insert_shifts_later_daily_rollups(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, income = _seed_accounts()
+    _record(cash, income, "roll-1", "2026-01-10T00:00:00Z", "10.0000")
+    _record(cash, income, "roll-2", "2026-01-20T00:00:00Z", "5.0000")
+    _record(cash, income, "roll-3", "2026-01-10T12:00:00Z", "1.0000")
+    _record(cash, income, "roll-4", "2026-01-01T00:00:00Z", "0.5000")
+
+    with transaction() as conn:
+        rows = [
+            (row["balance_date"], row["day_delta_units"], row["cumulative_units"])
+            for row in conn.execute(
+                """
+                SELECT balance_date, day_delta_units, cumulative_units
+                FROM account_daily_balances WHERE account_id=? ORDER BY balance_date
+                """,
+                (cash,),
+            )
+        ]
+        assert verify_account_balances(conn) == []
+    assert rows == [
+        ("2026-01-01", 5000, 5000),
+        ("2026-01-10", 110000, 115000),
+        ("2026-01-20", 50000, 165000),
+    ]
+
+
+def test_as_of_reads_seek_daily_rollups(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, income = _seed_accounts()
+    _record(cash, income, "mat-a", "2026-01-10T00:00:00Z", "10.0000")
+    _record(cash, income, "mat-b", "2026-02-10T00:00:00Z", "5.0000")
+
+    with read_only_connection() as conn:
+        current = {row["account_id"]: row for row in fetch_account_balances_as_of(
+            conn, as_of_date="2026-03-01", source_policy="ledger_only"
+        )}
+        earlier = {row["account_id"]: row for row in fetch_account_balances_as_of(
+            conn, as_of_date="2026-01-31", source_policy="ledger_only"
+        )}
+        before_any = {row["account_id"]: row for row in fetch_account_balances_as_of(
+            conn, as_of_date="2025-12-31", source_policy="ledger_only"
+        )}
+        context_current = fetch_account_balance_context(conn, account_id=cash, as_of_date="2026-03-01")
+        context_earlier = fetch_account_balance_context(conn, account_id=cash, as_of_date="2026-01-31")
+
+    assert current[cash]["ledger_balance"] == Decimal("15.0000")
+    assert current[income]["ledger_balance"] == Decimal("-15.0000")
+    assert earlier[cash]["ledger_balance"] == Decimal("10.0000")
+    assert before_any[cash]["ledger_balance"] == Decimal("0.0000")
+    assert context_current["ledger_balance"] == Decimal("15.0000")
+    assert context_earlier["ledger_balance"] == Decimal("10.0000")
+
+
+def test_verify_detects_drift_and_rebuild_repairs_it(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, income = _seed_accounts()
+    _record(cash, income, "mat-drift", "2026-01-10T00:00:00Z", "42.0000")
+
+    with transaction() as conn:
+        conn.execute("UPDATE account_daily_balances SET cumulative_units=410000 WHERE account_id=?", (cash,))
+        conn.execute("UPDATE account_daily_balances SET cumulative_units=0 WHERE account_id=?", (income,))
+        mismatches = verify_account_balances(conn)
+    assert sorted(m["account_id"] for m in mismatches) == sorted([cash, income])
+    assert {m["table"] for m in mismatches} == {"account_daily_balances"}
+    drifted = next(m for m in mismatches if m["account_id"] == cash)
+    assert drifted["expected"]["cumulative"] == "42.0000"
+    assert drifted["actual"]["cumulative"] == "41.0000"
+
+    runner = CliRunner()
+    failed = runner.invoke(cli_app, ["ledger", "verify-balances"])
+    assert failed.exit_code == 1
+
+    rebuilt = runner.invoke(cli_app, ["ledger", "rebuild-balances"])
+    assert rebuilt.exit_code == 0, rebuilt.output
+    assert '"accounts": 2' in rebuilt.stdout
+
+    verified = runner.invoke(cli_app, ["ledger", "verify-balances"])
+    assert verified.exit_code == 0
+    assert _materialized(cash)["cumulative_units"] == 420_000
+
+
+def test_rebuild_drops_rows_for_accounts_without_postings(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, _ = _seed_accounts()
+    with transaction() as conn:
+        conn.execute(
+            "INSERT INTO account_daily_balances (account_id, balance_date, day_delta_units, cumulative_units) VALUES (?,?,?,?)",
+            (cash, "2026-01-01", 10000, 10000),
+        )
+        assert len(verify_account_balances(conn)) == 1
+        assert rebuild_account_balances(conn) == 0
+        assert verify_account_balances(conn) == []
+
+
+def test_migration_backfills_balances_from_existing_postings(tmp_path: Path):
+    legacy_dir = tmp_path / "migrations"
+    legacy_dir.mkdir()
+    for path in MIGRATIONS_DIR.glob("*.sql"):
+        if path.name < "0011_":
+            shutil.copy(path, legacy_dir / path.name)
+
+    db_path = tmp_path / "backfill.db"
+    apply_pending_migrations(db_path, legacy_dir)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute(
+            "INSERT INTO accounts (account_id, code, name, account_type) VALUES ('a1','1000','Cash','asset')"
+        )
+        conn.execute(
+            "INSERT INTO accounts (account_id, code, name, account_type) VALUES ('a2','4000','Income','income')"
+        )
+        for i, (date, amount) in enumerate([("2026-01-02", "0.1000"), ("2026-03-04", "0.2001")]):
+            conn.execute(
+                """
+                INSERT INTO ledger_transactions (
+                  transaction_id, source_system, external_id, transaction_date, description, correlation_id, input_hash
+                ) VALUES (?, 'legacy', ?, ?, 'legacy', 'corr-legacy', 'hash')
+                """,
+                (f"t{i}", f"legacy-{i}", f"{date}T00:00:00Z"),
+            )
+            conn.execute(
+                "INSERT INTO ledger_postings (posting_id, transaction_id, account_id, amount, currency) VALUES (?,?,?,?,'USD')",
+                (f"p{i}a", f"t{i}", "a1", amount),
+            )
+            conn.execute(
+                "INSERT INTO ledger_postings (posting_id, transaction_id, account_id, amount, currency) VALUES (?,?,?,?,'USD')",
+                (f"p{i}b", f"t{i}", "a2", f"-{amount}"),
+            )
+        conn.commit()
+
+        for path in MIGRATIONS_DIR.glob("*.sql"):
+            if path.name >= "0011_":
+                shutil.copy(path, legacy_dir / path.name)
+        conn.close()
+        apply_pending_migrations(db_path, legacy_dir)
+
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        rollups = [
+            tuple(row)
+            for row in conn.execute(
+                """
+                SELECT balance_date, day_delta_units, cumulative_units
+                FROM account_daily_balances WHERE account_id='a1' ORDER BY balance_date
+                """
+            )
+        ]
+        assert rollups == [("2026-01-02", 1000, 1000), ("2026-03-04", 2001, 3001)]
+        assert verify_account_balances(conn) == []
+        # 0020 drops the unread account_balances table; its rollback
+        # rebuilds it from the daily rollup.
+        assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'account_balances'").fetchone() is None
+        conn.executescript((MIGRATIONS_DIR / "0020_drop_account_balances.rollback.sql").read_text())
+        rows = {
+            row["account_id"]: dict(row)
+            for row in conn.execute("SELECT account_id, balance, posting_count, max_posting_date FROM account_balances")
+        }
+        assert rows["a1"] == {"account_id": "a1", "balance": "0.3001", "posting_count": 2, "max_posting_date": "2026-03-04"}
+        assert rows["a2"]["balance"] == "-0.3001"
+    finally:
+        conn.close()
@@ -27,3 +27,63 @@ def test_account_subtree_and_cycle_rejection(db_available):
     with pytest.raises(Exception):
         with transaction() as conn:
             conn.execute("UPDATE accounts SET parent_account_id=? WHERE account_id=?", (child, root))
+
+
+def _expected_closure(conn) -> set[tuple[str, str, int]]:
+    parents = {row["account_id"]: row["parent_account_id"] for row in conn.execute("SELECT * FROM accounts")}
+    expected = set()
+    for account_id in parents:
+        ancestor, depth = account_id, 0
+        while ancestor is not None:
+            expected.add((ancestor, account_id, depth))
+            ancestor, depth = parents[ancestor], depth + 1
+    return expected
+
+
+def _closure(conn) -> set[tuple[str, str, int]]:
+    return {tuple(row) for row in conn.execute("SELECT ancestor_id, descendant_id, depth FROM account_closure")}
+
+
+def test_account_closure_tracks_inserts_and_subtree_moves(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    with transaction() as conn:
+        assets = create_account(conn, {"code": "1000", "name": "Assets", "account_type": "asset"})
+        bank = create_account(conn, {"code": "1100", "name": "Bank", "account_type": "asset", "parent_account_id": assets})
+        checking = create_account(
+            conn, {"code": "1110", "name": "Checking", "account_type": "asset", "parent_account_id": bank}
+        )
+        invest = create_account(conn, {"code": "1200", "name": "Invest", "account_type": "asset", "parent_account_id": assets})
+        assert _closure(conn) == _expected_closure(conn)
+
+    with transaction() as conn:
+        # Move Bank (with Checking) under Invest, then detach Invest entirely.
+        conn.execute("UPDATE accounts SET parent_account_id=? WHERE account_id=?", (invest, bank))
+        assert _closure(conn) == _expected_closure(conn)
+        assert [(r["code"], r["depth"]) for r in list_accounts_subtree(conn, invest)] == [
+            ("1200", 0),
+            ("1100", 1),
+            ("1110", 2),
+        ]
+        conn.execute("UPDATE accounts SET parent_account_id=NULL WHERE account_id=?", (invest,))
+        assert _closure(conn) == _expected_closure(conn)
+        assert [r["code"] for r in list_accounts_subtree(conn, assets)] == ["1000"]
+
+    # Parenting under a descendant is a cycle, detected by one closure lookup.
+    with pytest.raises(Exception, match="Account cycle detected"):
+        with transaction() as conn:
+            conn.execute("UPDATE accounts SET parent_account_id=? WHERE account_id=?", (checking, invest))
+    with pytest.raises(Exception, match="Account cycle detected"):
+        with transaction() as conn:
+            conn.execute("UPDATE accounts SET parent_account_id=? WHERE account_id=?", (bank, bank))
+
+    with transaction() as conn:
+        assert _closure(conn) == _expected_closure(conn)
+        plan = " ".join(
+            row["detail"]
+            for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT descendant_id FROM account_closure WHERE ancestor_id = ?", (invest,)
+            )
+        )
+    assert "USING PRIMARY KEY (ancestor_id=?)" in plan
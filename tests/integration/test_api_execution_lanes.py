@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from capital_os.api.app import app
+from capital_os.api.lanes import ExecutionLane, LaneSaturatedError, shutdown_lanes
+from capital_os.config import get_settings
+from capital_os.db.writer import WriteQueueFullError
+from capital_os.runtime.execute_tool import TOOL_HANDLERS
+from tests.support.auth import AUTH_HEADERS
+
+
+@pytest.fixture
+def small_lanes(monkeypatch):
+    monkeypatch.setenv("CAPITAL_OS_API_READ_WORKERS", "1")
+    monkeypatch.setenv("CAPITAL_OS_API_LANE_QUEUE_MAX", "1")
+    monkeypatch.setenv("CAPITAL_OS_API_RETRY_AFTER_SECONDS", "3")
+    get_settings.cache_clear()
+    shutdown_lanes()
+    yield
+    shutdown_lanes()
+    get_settings.cache_clear()
+
+
+def test_lane_rejects_beyond_capacity_and_records_waits():
+    lane = ExecutionLane("test", workers=1, queue_max=1)
+    gate = threading.Event()
+    try:
+        first = lane.submit(lambda: gate.wait(5))
+        second = lane.submit(lambda: "queued")
+        with pytest.raises(LaneSaturatedError):
+            lane.submit(lambda: "rejected")
+
+        stats = lane.stats()
+        assert stats["in_flight"] == 2
+        assert stats["queue_depth"] == 1
+        assert stats["running"] == 1
+        assert stats["rejected"] == 1
+
+        gate.set()
+        assert first.result(timeout=5) is True
+        assert second.result(timeout=5) == "queued"
+        stats = lane.stats()
+        assert stats["in_flight"] == 0
+        assert stats["queue_depth"] == 0
+        assert stats["completed"] == 2
+        assert stats["wait_ms_max"] > 0
+    finally:
+        gate.set()
+        lane.shutdown()
+
+
+def test_saturated_read_lane_returns_429_while_health_stays_responsive(db_available, small_lanes, monkeypatch):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    entered = threading.Event()
+    gate = threading.Event()
+    list_accounts = TOOL_HANDLERS["list_accounts"]
+
+    def _blocking_list_accounts(payload):
+        entered.set()
+        gate.wait(5)
+        return list_accounts(payload)
+
+    monkeypatch.setitem(TOOL_HANDLERS, "list_accounts", _blocking_list_accounts)
+
+    async def _scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=AUTH_HEADERS) as client:
+            blocked = [
+                asyncio.create_task(client.post("/tools/list_accounts", json={"correlation_id": f"corr-lane-{i}"}))
+                for i in range(2)
+            ]
+            while not entered.is_set():
+                await asyncio.sleep(0.005)
+            await asyncio.sleep(0.02)
+
+            rejected = await client.post("/tools/list_accounts", json={"correlation_id": "corr-lane-rejected"})
+            health = await asyncio.wait_for(client.get("/health"), timeout=2)
+            queues = await client.get("/health/queues")
+
+            gate.set()
+            completed = await asyncio.gather(*blocked)
+            return rejected, health, queues, completed
+
+    try:
+        rejected, health, queues, completed = asyncio.run(_scenario())
+    finally:
+        gate.set()
+
+    assert rejected.status_code == 429
+    assert rejected.headers["retry-after"] == "3"
+    assert rejected.json()["detail"] == {"error": "too_many_requests", "lane": "read"}
+    assert health.status_code == 200
+    read_lane = queues.json()["lanes"]["read"]
+    assert read_lane["in_flight"] == 2
+    assert read_lane["queue_depth"] == 1
+    assert read_lane["rejected"] == 1
+    assert [response.status_code for response in completed] == [200, 200]
+
+
+def test_db_backpressure_maps_to_503_with_retry_after(db_available, small_lanes, monkeypatch):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    def _full_queue(payload):
+        raise WriteQueueFullError("write queue is full")
+
+    monkeypatch.setitem(TOOL_HANDLERS, "create_account", _full_queue)
+
+    client = TestClient(app, headers=AUTH_HEADERS)
+    response = client.post(
+        "/tools/create_account",
+        json={"code": "9999", "name": "Overloaded", "account_type": "asset", "correlation_id": "corr-overloaded"},
+    )
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
+    assert response.json()["detail"]["error"] == "overloaded"
+
+
+def test_queue_health_reports_lane_writer_and_pool_stats(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    client = TestClient(app, headers=AUTH_HEADERS)
+    client.post("/tools/list_accounts", json={"correlation_id": "corr-lane-stats"})
+    body = client.get("/health/queues").json()
+
+    assert set(body) == {"lanes", "writer", "event_log", "db_pool"}
+    assert set(body["lanes"]) == {"read", "write"}
+    assert body["lanes"]["read"]["submitted"] >= 1
+    assert "queue_depth" in body["writer"]
+    assert body["event_log"]["enabled"] is False
+    assert set(body["db_pool"]) == {"reader", "writer"}
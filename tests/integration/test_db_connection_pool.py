@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import sqlite3
+import threading
+
+import pytest
+
+from capital_os.config import get_settings
+from capital_os.db.session import (
+    ConnectionPool,
+    PoolTimeoutError,
+    close_connection_pools,
+    connection_pool_stats,
+    read_only_connection,
+    transaction,
+)
+from capital_os.db.testing import reset_test_database
+
+
+def test_pool_reuses_configured_connections_and_reports_hits(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    for _ in range(5):
+        with transaction() as conn:
+            conn.execute("SELECT 1").fetchone()
+        with read_only_connection() as conn:
+            conn.execute("SELECT 1").fetchone()
+
+    stats = connection_pool_stats()
+    assert stats["writer"]["checkouts"] == 5
+    assert stats["writer"]["misses"] == 1
+    assert stats["writer"]["hits"] == 4
+    assert stats["writer"]["hit_rate"] == 0.8
+    assert stats["reader"]["open"] == 1
+    assert stats["reader"]["in_use"] == 0
+
+    with transaction() as conn:
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA query_only").fetchone()[0] == 0
+    with read_only_connection() as conn:
+        assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+
+
+def test_pooled_reader_stays_read_only_after_reuse(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    with read_only_connection() as conn:
+        conn.execute("SELECT COUNT(*) FROM accounts").fetchone()
+
+    with pytest.raises(sqlite3.OperationalError):
+        with read_only_connection() as conn:
+            conn.execute(
+                "INSERT INTO accounts (account_id, code, name, account_type) VALUES (?, ?, ?, ?)",
+                ("pool-ro", "pool-ro", "Pool RO", "asset"),
+            )
+
+
+def test_checkout_resets_state_left_by_previous_user(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    with pytest.raises(RuntimeError):
+        with transaction() as conn:
+            conn.row_factory = None
+            conn.execute(
+                "INSERT INTO accounts (account_id, code, name, account_type) VALUES (?, ?, ?, ?)",
+                ("pool-rollback", "pool-rollback", "Pool Rollback", "asset"),
+            )
+            raise RuntimeError("abort")
+
+    with transaction() as conn:
+        assert not conn.in_transaction
+        row = conn.execute("SELECT COUNT(*) AS c FROM accounts WHERE account_id='pool-rollback'").fetchone()
+        assert row["c"] == 0
+
+
+def test_pool_discards_connections_when_database_file_is_replaced(monkeypatch, tmp_path: Path):
+    db_path = tmp_path / "pool-replaced.db"
+    monkeypatch.setenv("CAPITAL_OS_DB_URL", f"sqlite:///{db_path}")
+    get_settings.cache_clear()
+    try:
+        reset_test_database()
+        with transaction() as conn:
+            conn.execute(
+                "INSERT INTO accounts (account_id, code, name, account_type) VALUES (?, ?, ?, ?)",
+                ("pool-old", "pool-old", "Old File", "asset"),
+            )
+
+        # Replace the file behind the pool's back (no close_connection_pools call).
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE accounts (account_id TEXT PRIMARY KEY)")
+        conn.commit()
+        conn.close()
+
+        with read_only_connection() as conn:
+            rows = conn.execute("SELECT account_id FROM accounts").fetchall()
+        assert rows == []
+    finally:
+        close_connection_pools()
+        get_settings.cache_clear()
+
+
+def test_pool_bounds_concurrent_checkouts_and_records_waits(tmp_path: Path):
+    pool = ConnectionPool(str(tmp_path / "pool-bounded.db"), readers=2, writers=1, timeout_seconds=5.0)
+    in_use = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def _work(_: int) -> None:
+        nonlocal in_use, peak
+        with pool.reader() as conn:
+            with lock:
+                in_use += 1
+                peak = max(peak, in_use)
+            conn.execute("SELECT 1").fetchone()
+            threading.Event().wait(0.01)
+            with lock:
+                in_use -= 1
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(_work, range(32)))
+
+        stats = pool.stats()["reader"]
+        assert peak <= 2
+        assert stats["open"] <= 2
+        assert stats["checkouts"] == 32
+        assert stats["waits"] > 0
+        assert stats["wait_ms_max"] > 0
+    finally:
+        pool.close()
+
+
+def test_pool_raises_timeout_when_exhausted(tmp_path: Path):
+    pool = ConnectionPool(str(tmp_path / "pool-timeout.db"), readers=1, writers=1, timeout_seconds=0.05)
+    try:
+        with pool.writer():
+            with pytest.raises(PoolTimeoutError):
+                with pool.writer():
+                    pass
+        assert pool.stats()["writer"]["timeouts"] == 1
+    finally:
+        pool.close()
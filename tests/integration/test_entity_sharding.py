@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+from pathlib import Path
+import sqlite3
+import threading
+
+import pytest
+
+from capital_os.config import get_settings
+from capital_os.db.session import (
+    active_db_url,
+    close_connection_pools,
+    entity_shard_ids,
+    fan_out_entities,
+    read_only_connection,
+    shard_db_url,
+    transaction,
+    use_entity_shard,
+)
+from capital_os.db.writer import run_write, shutdown_writer, writer_stats
+from capital_os.domain.ledger.export import stream_ledger_export
+from capital_os.runtime.execute_tool import execute_tool
+
+
+@pytest.fixture
+def sharded(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("CAPITAL_OS_DB_SHARD_DIR", str(tmp_path / "shards"))
+    get_settings.cache_clear()
+    with transaction() as conn:
+        conn.execute("INSERT INTO entities (entity_id, code, name, metadata) VALUES ('entity-ops', 'OPS', 'Ops', '{}')")
+        conn.execute("INSERT INTO entities (entity_id, code, name, metadata) VALUES ('entity-idle', 'IDLE', 'Idle', '{}')")
+    yield
+    shutdown_writer()
+    close_connection_pools()
+    get_settings.cache_clear()
+
+
+def _tool(tool_name: str, payload: dict):
+    return execute_tool(
+        tool_name,
+        payload,
+        actor_id="actor-shard",
+        authn_method="header_token",
+        authorization_result="allowed",
+    )
+
+
+def _account(code: str, entity_id: str) -> str:
+    result = _tool(
+        "create_account",
+        {"code": code, "name": f"Shard {code}", "account_type": "asset", "entity_id": entity_id, "correlation_id": f"c-{code}"},
+    )
+    assert result.success, result.payload
+    return result.payload["account_id"]
+
+
+def _bundle(external_id: str, day: int, entity_id: str, debit: str, credit: str) -> dict:
+    return {
+        "source_system": "shard",
+        "external_id": external_id,
+        "date": f"2026-02-{day:02d}T00:00:00Z",
+        "description": external_id,
+        "entity_id": entity_id,
+        "postings": [
+            {"account_id": debit, "amount": "5.0000", "currency": "USD"},
+            {"account_id": credit, "amount": "-5.0000", "currency": "USD"},
+        ],
+        "correlation_id": f"corr-{external_id}",
+    }
+
+
+def _external_ids(db_url: str) -> list[str]:
+    conn = sqlite3.connect(db_url.removeprefix("sqlite:///"))
+    try:
+        return [row[0] for row in conn.execute("SELECT external_id FROM ledger_transactions ORDER BY external_id")]
+    finally:
+        conn.close()
+
+
+def test_entities_write_to_their_own_shard_and_reads_fan_out(db_available, sharded):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    ops = (_account("1000", "entity-ops"), _account("4000", "entity-ops"))
+    default = (_account("1000", "entity-default"), _account("4000", "entity-default"))
+    assert _tool("record_transaction_bundle", _bundle("ops-1", 3, "entity-ops", *ops)).success
+    assert _tool("record_transaction_bundle", _bundle("def-1", 2, "entity-default", *default)).success
+    batch = _tool(
+        "record_transaction_bundles",
+        {"bundles": [_bundle("ops-2", 1, "entity-ops", *ops), _bundle("ops-3", 4, "entity-ops", *ops)], "correlation_id": "b"},
+    )
+    assert batch.success, batch.payload
+
+    catalog_url = get_settings().db_url
+    assert shard_db_url("entity-ops") != catalog_url
+    assert _external_ids(shard_db_url("entity-ops")) == ["ops-1", "ops-2", "ops-3"]
+    assert _external_ids(catalog_url) == ["def-1"]
+    # Shards are created on first write only.
+    assert entity_shard_ids() == ["entity-default", "entity-ops"]
+    assert not Path(shard_db_url("entity-idle").removeprefix("sqlite:///")).exists()
+    assert writer_stats()["writers"] == 2
+
+    # Calls naming an existing row are routed to the shard that holds it.
+    updated = _tool("update_account_metadata", {"account_id": ops[0], "metadata": {"k": 1}, "correlation_id": "c-meta"})
+    assert updated.success, updated.payload
+    with use_entity_shard("entity-ops"), read_only_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM event_log WHERE correlation_id='c-meta'").fetchone()[0] == 1
+
+    # Cross-shard reads merge in the same order an unsharded export uses.
+    exported = [json.loads(line) for line in "".join(stream_ledger_export("ndjson")).splitlines()]
+    assert [r["external_id"] for r in exported] == ["ops-2", "def-1", "ops-1", "ops-3"]
+    resumed = "".join(stream_ledger_export("ndjson", after=exported[1]["checkpoint"]))
+    assert [json.loads(line)["external_id"] for line in resumed.splitlines()] == ["ops-1", "ops-3"]
+    only_ops = "".join(stream_ledger_export("ndjson", entity_id="entity-ops"))
+    assert len(only_ops.splitlines()) == 3
+
+    def _count(_entity_id: str) -> int:
+        with read_only_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM ledger_transactions").fetchone()[0]
+
+    counts = fan_out_entities(_count)
+    assert counts == [("entity-default", 1), ("entity-ops", 3)]
+    # Fan-outs share one executor; a nested fan-out runs inline on its worker.
+    workers = set()
+
+    def _nested(_entity_id: str) -> list[tuple[str, int]]:
+        workers.add(threading.current_thread().name)
+        return fan_out_entities(_count)
+
+    for _ in range(3):
+        assert fan_out_entities(_nested) == [("entity-default", counts), ("entity-ops", counts)]
+    assert all(name.startswith("capital-os-fan-out") for name in workers)
+    assert len(workers) <= get_settings().db_pool_readers
+
+    mixed = _tool(
+        "record_transaction_bundles",
+        {"bundles": [_bundle("m-1", 5, "entity-ops", *ops), _bundle("m-2", 5, "entity-default", *default)], "correlation_id": "m"},
+    )
+    assert mixed.status == "validation_error"
+    [detail] = mixed.payload["details"]
+    assert list(detail["loc"]) == ["bundles", 1, "entity_id"]
+    assert "share one entity_id" in detail["msg"]
+    unknown = _tool("record_transaction_bundle", _bundle("u-1", 5, "entity-missing", *ops))
+    assert unknown.status == "error"
+    assert "does not exist" in unknown.payload["message"]
+
+
+def test_independent_shards_do_not_share_a_writer(db_available, sharded):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    _account("1000", "entity-ops")
+    started = threading.Event()
+    gate = threading.Event()
+
+    def _blocking_unit() -> str:
+        started.set()
+        gate.wait(5)
+        return active_db_url()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        catalog_write = executor.submit(run_write, _blocking_unit)
+        try:
+            assert started.wait(5)
+            # The catalog writer is busy; the ops shard still commits.
+            with use_entity_shard("entity-ops"):
+                assert run_write(active_db_url) == shard_db_url("entity-ops")
+                assert _account("2000", "entity-ops")
+            assert not catalog_write.done()
+        finally:
+            gate.set()
+        assert catalog_write.result(timeout=5) == get_settings().db_url
+
+
+def test_reads_without_an_entity_id_merge_every_shard(db_available, sharded):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    ops = (_account("1000", "entity-ops"), _account("4000", "entity-ops"))
+    default = (_account("1500", "entity-default"), _account("4500", "entity-default"))
+    for external_id, day, entity_id, accounts in [
+        ("ops-1", 3, "entity-ops", ops),
+        ("def-1", 2, "entity-default", default),
+        ("ops-2", 1, "entity-ops", ops),
+        ("def-2", 4, "entity-default", default),
+    ]:
+        assert _tool("record_transaction_bundle", _bundle(external_id, day, entity_id, *accounts)).success
+    for entity_id, (account_id, _), due in [("entity-ops", ops, "2026-03-05"), ("entity-default", default, "2026-03-01")]:
+        created = _tool(
+            "create_or_update_obligation",
+            {
+                "source_system": "shard",
+                "name": f"Rent {entity_id}",
+                "account_id": account_id,
+                "cadence": "monthly",
+                "expected_amount": "10.0000",
+                "next_due_date": due,
+                "entity_id": entity_id,
+                "correlation_id": f"c-ob-{entity_id}",
+            },
+        )
+        assert created.success, created.payload
+
+    accounts = _tool("list_accounts", {"limit": 3, "correlation_id": "c-la"}).payload
+    assert [a["code"] for a in accounts["accounts"]] == ["1000", "1500", "4000"]
+    rest = _tool("list_accounts", {"cursor": accounts["next_cursor"], "correlation_id": "c-la2"}).payload
+    assert [a["code"] for a in rest["accounts"]] == ["4500"]
+    assert rest["next_cursor"] is None
+
+    pages: list[str] = []
+    cursor = None
+    while True:
+        payload = {"limit": 3, "correlation_id": "c-lt"} | ({"cursor": cursor} if cursor else {})
+        page = _tool("list_transactions", payload).payload
+        pages.extend(item["external_id"] for item in page["transactions"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == ["def-2", "ops-1", "def-1", "ops-2"]
+
+    balances = _tool("get_account_balances", {"as_of_date": "2026-02-28", "correlation_id": "c-gb"}).payload
+    assert [(row["code"], row["balance"]) for row in balances["balances"]] == [
+        ("1000", "10.0000"),
+        ("1500", "10.0000"),
+        ("4000", "-10.0000"),
+        ("4500", "-10.0000"),
+    ]
+    tree = _tool("get_account_tree", {"correlation_id": "c-tree"}).payload
+    assert [node["code"] for node in tree["accounts"]] == ["1000", "1500", "4000", "4500"]
+    subtree = _tool("get_account_tree", {"root_account_id": ops[1], "correlation_id": "c-sub"}).payload
+    assert [node["account_id"] for node in subtree["accounts"]] == [ops[1]]
+
+    obligations = _tool("list_obligations", {"correlation_id": "c-lo"}).payload
+    assert [o["entity_id"] for o in obligations["obligations"]] == ["entity-default", "entity-ops"]
+    found = _tool("get_transaction_by_external_id", {"source_system": "shard", "external_id": "ops-2", "correlation_id": "c-x"})
+    assert found.payload["transaction"]["entity_id"] == "entity-ops"
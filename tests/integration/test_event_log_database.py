@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import sqlite3
+
+import pytest
+from typer.testing import CliRunner
+
+from capital_os.cli.main import app as cli_app
+from capital_os.config import get_settings
+from capital_os.db.event_log_store import EventLogSchemaError
+from capital_os.db.session import active_db_path, close_connection_pools, read_only_connection
+from capital_os.db.writer import shutdown_writer
+from capital_os.runtime.execute_tool import execute_tool
+
+
+@pytest.fixture
+def events_db(tmp_path: Path, monkeypatch) -> Path:
+    path = tmp_path / "events.db"
+    monkeypatch.setenv("CAPITAL_OS_EVENT_LOG_DB_URL", f"sqlite:///{path}")
+    monkeypatch.setenv("CAPITAL_OS_EVENT_LOG_SYNCHRONOUS", "OFF")
+    get_settings.cache_clear()
+    # Connections opened before the setting changed have nothing attached.
+    shutdown_writer()
+    close_connection_pools()
+    yield path
+    shutdown_writer()
+    close_connection_pools()
+    get_settings.cache_clear()
+
+
+def _tool(tool_name: str, payload: dict):
+    return execute_tool(
+        tool_name,
+        payload,
+        actor_id="actor-audit",
+        authn_method="header_token",
+        authorization_result="allowed",
+    )
+
+
+def _audit_rows(path: Path) -> list[tuple]:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT tool_name, correlation_id, status FROM event_log ORDER BY tool_name").fetchall()
+    finally:
+        conn.close()
+
+
+def test_events_are_written_to_the_attached_event_log_file(db_available, events_db: Path):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    created = _tool("create_account", {"code": "1000", "name": "Cash", "account_type": "asset", "correlation_id": "c-w"})
+    assert created.success, created.payload
+    assert _tool("list_accounts", {"limit": 5, "correlation_id": "c-r"}).success
+
+    assert _audit_rows(events_db) == [("create_account", "c-w", "ok"), ("list_accounts", "c-r", "ok")]
+    with read_only_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM main.event_log").fetchone()[0] == 0
+        # The audit file is tuned independently of the ledger file.
+        assert conn.execute("PRAGMA audit.synchronous").fetchone()[0] == 0
+        assert conn.execute("PRAGMA main.synchronous").fetchone()[0] == 2
+        assert conn.execute("PRAGMA audit.journal_mode").fetchone()[0] == "wal"
+
+
+def test_write_tools_fail_closed_across_both_files(db_available, events_db: Path):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    assert _tool("list_accounts", {"limit": 5, "correlation_id": "c-init"}).success
+    conn = sqlite3.connect(events_db)
+    try:
+        conn.execute(
+            """
+            CREATE TRIGGER reject_account_events BEFORE INSERT ON event_log
+            WHEN NEW.tool_name = 'create_account'
+            BEGIN SELECT RAISE(ABORT, 'audit unavailable'); END
+            """
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    result = _tool("create_account", {"code": "1000", "name": "Cash", "account_type": "asset", "correlation_id": "c-w"})
+    assert result.status == "event_log_failure"
+    with read_only_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0] == 0
+
+
+def _schema_sql(path: Path) -> dict[str, str]:
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute("SELECT name, sql FROM sqlite_master WHERE tbl_name='event_log' AND sql IS NOT NULL").fetchall()
+    finally:
+        conn.close()
+    return dict(rows)
+
+
+def test_audit_schema_is_derived_from_the_migrated_ledger(db_available, events_db: Path):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    # An audit file missing objects added by later migrations gets them.
+    ledger_schema = _schema_sql(active_db_path())
+    conn = sqlite3.connect(events_db)
+    try:
+        conn.execute(ledger_schema["event_log"])
+    finally:
+        conn.close()
+
+    assert _tool("list_accounts", {"limit": 5, "correlation_id": "c-r"}).success
+    assert _schema_sql(events_db) == ledger_schema
+    assert {"idx_event_log_security_dimensions", "trg_event_log_append_only_delete"} <= set(ledger_schema)
+
+
+def test_audit_file_with_drifted_columns_fails_on_connect(db_available, events_db: Path):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    conn = sqlite3.connect(events_db)
+    try:
+        conn.execute("CREATE TABLE event_log (event_id TEXT PRIMARY KEY, tool_name TEXT NOT NULL)")
+    finally:
+        conn.close()
+
+    with pytest.raises(EventLogSchemaError, match="does not match the migrated schema"):
+        with read_only_connection():
+            pass
+
+
+def test_copy_events_to_audit_copies_inline_rows_once(db_available, events_db: Path, monkeypatch):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    monkeypatch.delenv("CAPITAL_OS_EVENT_LOG_DB_URL")
+    get_settings.cache_clear()
+    shutdown_writer()
+    close_connection_pools()
+    assert _tool("list_accounts", {"limit": 5, "correlation_id": "c-before"}).success
+    result = CliRunner().invoke(cli_app, ["ledger", "copy-events-to-audit"])
+    assert result.exit_code == 1
+    assert "CAPITAL_OS_EVENT_LOG_DB_URL is not set" in result.output
+
+    monkeypatch.setenv("CAPITAL_OS_EVENT_LOG_DB_URL", f"sqlite:///{events_db}")
+    get_settings.cache_clear()
+    shutdown_writer()
+    close_connection_pools()
+    assert _tool("list_accounts", {"limit": 5, "correlation_id": "c-after"}).success
+
+    for copied in (1, 0):
+        result = CliRunner().invoke(cli_app, ["ledger", "copy-events-to-audit"])
+        assert result.exit_code == 0, result.output
+        assert json.loads(result.stdout) == {"status": "ok", "copied": copied}
+    assert _audit_rows(events_db) == [("list_accounts", "c-after", "ok"), ("list_accounts", "c-before", "ok")]
+    with read_only_connection() as conn:
+        assert [row[0] for row in conn.execute("SELECT correlation_id FROM main.event_log")] == ["c-before"]
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from capital_os.config import get_settings
+from capital_os.db.session import read_only_connection
+from capital_os.observability import event_sink
+from capital_os.observability.event_sink import event_sink_stats, flush_event_log, shutdown_event_sink
+from capital_os.runtime.execute_tool import execute_tool
+
+
+@pytest.fixture
+def async_event_log(tmp_path: Path, monkeypatch):
+    def configure(**env: str) -> Path:
+        spill = tmp_path / "events.spill.jsonl"
+        monkeypatch.setenv("CAPITAL_OS_EVENT_LOG_ASYNC", "1")
+        monkeypatch.setenv("CAPITAL_OS_EVENT_LOG_SPILL_PATH", str(spill))
+        for key, value in env.items():
+            monkeypatch.setenv(f"CAPITAL_OS_EVENT_LOG_{key}", value)
+        get_settings.cache_clear()
+        return spill
+
+    yield configure
+    shutdown_event_sink()
+    get_settings.cache_clear()
+
+
+def _list_accounts(correlation_id: str):
+    result = execute_tool(
+        "list_accounts",
+        {"limit": 5, "correlation_id": correlation_id},
+        actor_id="actor-sink",
+        authn_method="header_token",
+        authorization_result="allowed",
+    )
+    assert result.success, result.payload
+    return result
+
+
+def _events(tool_name: str) -> list[tuple]:
+    with read_only_connection() as conn:
+        rows = conn.execute(
+            "SELECT correlation_id, status, actor_id FROM event_log WHERE tool_name=? ORDER BY correlation_id",
+            (tool_name,),
+        ).fetchall()
+    return [tuple(row) for row in rows]
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_read_events_are_buffered_and_flushed_in_batches(db_available, async_event_log):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    async_event_log(BATCH_MAX="4", FLUSH_MS="60000")
+    for i in range(3):
+        _list_accounts(f"c-read-{i}")
+    assert _events("list_accounts") == []
+    assert event_sink_stats()["buffer_depth"] == 3
+
+    # The fourth row fills a batch and wakes the flush thread.
+    _list_accounts("c-read-3")
+    _wait_for(lambda: event_sink_stats()["flushed"] == 4)
+    assert _events("list_accounts") == [(f"c-read-{i}", "ok", "actor-sink") for i in range(4)]
+    assert event_sink_stats()["flushes"] == 1
+
+    # Write tools still log synchronously in their own transaction.
+    created = execute_tool(
+        "create_account",
+        {"code": "1000", "name": "Cash", "account_type": "asset", "correlation_id": "c-write"},
+        actor_id="actor-sink",
+        authn_method="header_token",
+        authorization_result="allowed",
+    )
+    assert created.success, created.payload
+    assert _events("create_account") == [("c-write", "ok", "actor-sink")]
+
+    _list_accounts("c-read-4")
+    assert flush_event_log() is True
+    assert len(_events("list_accounts")) == 5
+
+
+def test_full_buffer_falls_back_to_a_synchronous_write(db_available, async_event_log):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    async_event_log(BUFFER_SIZE="1", FLUSH_MS="60000")
+    _list_accounts("c-full-0")
+    _list_accounts("c-full-1")
+    assert _events("list_accounts") == [("c-full-1", "ok", "actor-sink")]
+    assert event_sink_stats()["sync_fallbacks"] == 1
+
+
+def test_unwritable_rows_spill_on_shutdown_and_replay(db_available, async_event_log, monkeypatch):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    spill = async_event_log(FLUSH_MS="60000")
+    real_write_rows = event_sink._write_rows
+
+    def failing_write_rows(batch):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(event_sink, "_write_rows", failing_write_rows)
+    _list_accounts("c-spill-0")
+    _list_accounts("c-spill-1")
+    shutdown_event_sink()
+    [spill_file] = spill.parent.glob(f"{spill.name}.*")
+    assert spill_file.name.startswith(f"{spill.name}.{os.getpid()}-")
+    assert [json.loads(line)["row"][2] for line in spill_file.read_text().splitlines()] == ["c-spill-0", "c-spill-1"]
+    assert _events("list_accounts") == []
+
+    # The next sink replays the spill file before its first flush.
+    monkeypatch.setattr(event_sink, "_write_rows", real_write_rows)
+    _list_accounts("c-spill-2")
+    _wait_for(lambda: event_sink_stats()["replayed"] == 2)
+    assert list(spill.parent.glob(f"{spill.name}*")) == []
+    assert flush_event_log() is True
+    assert [row[0] for row in _events("list_accounts")] == ["c-spill-0", "c-spill-1", "c-spill-2"]
+
+
+def _spill_record(correlation_id: str) -> str:
+    return json.dumps({"db_url": "sqlite:///unused.db", "row": ["event", "tool", correlation_id]}) + "\n"
+
+
+def test_workers_sharing_a_spill_directory_replay_each_file_once(tmp_path: Path, monkeypatch):
+    spill = tmp_path / "events.spill.jsonl"
+    written: list[str] = []
+    write_lock = threading.Lock()
+
+    def recording_write_rows(batch):
+        time.sleep(0.005)
+        with write_lock:
+            written.extend(row[2] for _db_url, row in batch)
+
+    monkeypatch.setattr(event_sink, "_write_rows", recording_write_rows)
+    dead = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    dead_pid = int(dead.stdout)
+    # The single file written by older versions, files spilled by other
+    # workers, a claim and a staging file left by a dead worker, and a
+    # claim and a staging file still held by a live one.
+    spill.write_text(_spill_record("legacy"), encoding="utf-8")
+    for index in range(20):
+        (tmp_path / f"{spill.name}.4242-{index:032x}").write_text(_spill_record(f"worker-{index}"), encoding="utf-8")
+    (tmp_path / f"{spill.name}.replaying-{dead_pid}-a").write_text(_spill_record("dead-claim"), encoding="utf-8")
+    (tmp_path / f"{spill.name}.{dead_pid}-b.tmp").write_text(_spill_record("dead-staging"), encoding="utf-8")
+    live_claim = tmp_path / f"{spill.name}.replaying-{os.getpid()}-c"
+    live_claim.write_text(_spill_record("live-claim"), encoding="utf-8")
+    live_staging = tmp_path / f"{spill.name}.{os.getpid()}-d.tmp"
+    live_staging.write_text(_spill_record("live-staging"), encoding="utf-8")
+
+    sinks = [
+        event_sink.EventLogSink(capacity=10, batch_max=10, flush_interval_seconds=60, spill_path=spill)
+        for _ in range(4)
+    ]
+    threads = [threading.Thread(target=sink._replay_spill) for sink in sinks]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    expected = ["dead-claim", "dead-staging", "legacy", *(f"worker-{index}" for index in range(20))]
+    assert sorted(written) == sorted(expected)
+    assert sum(sink.stats()["replayed"] for sink in sinks) == len(expected)
+    assert sorted(tmp_path.iterdir()) == sorted([live_claim, live_staging])
+
+
+def test_failed_replay_releases_its_claim(tmp_path: Path, monkeypatch):
+    spill = tmp_path / "events.spill.jsonl"
+    (tmp_path / f"{spill.name}.4242-a").write_text(_spill_record("kept"), encoding="utf-8")
+
+    def failing_write_rows(batch):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(event_sink, "_write_rows", failing_write_rows)
+    sink = event_sink.EventLogSink(capacity=10, batch_max=10, flush_interval_seconds=60, spill_path=spill)
+    sink._replay_spill()
+    [released] = tmp_path.iterdir()
+    assert not released.name.startswith(f"{spill.name}.replaying-")
+    assert released.read_text(encoding="utf-8") == _spill_record("kept")
+    assert sink.stats()["flush_errors"] == 1
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from capital_os.config import get_settings
+from capital_os.db.session import read_only_connection, transaction
+from capital_os.domain.ledger.idempotency import resolve_transaction_idempotency
+from capital_os.domain.ledger.archive import archive_ledger_year
+from capital_os.domain.ledger.idempotency_cache import IdempotencyCache, get_idempotency_cache, idempotency_cache_stats
+from capital_os.domain.ledger.repository import create_account
+from capital_os.domain.ledger.service import record_transaction_bundle
+from capital_os.runtime.execute_tool import execute_tool
+
+
+@pytest.fixture
+def bloom_enabled(monkeypatch):
+    monkeypatch.setenv("CAPITAL_OS_IDEMPOTENCY_BLOOM", "1")
+    monkeypatch.setenv("CAPITAL_OS_IDEMPOTENCY_BLOOM_CAPACITY", "4")
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+def _seed_accounts() -> tuple[str, str]:
+    with transaction() as conn:
+        cash = create_account(conn, {"code": "1000", "name": "Cash", "account_type": "asset"})
+        income = create_account(conn, {"code": "4000", "name": "Income", "account_type": "income"})
+    return cash, income
+
+
+def _bundle(cash: str, income: str, external_id: str, amount: str = "10.0000") -> dict:
+    return {
+        "source_system": "agent-loop",
+        "external_id": external_id,
+        "date": "2026-01-10T12:00:00Z",
+        "description": "cache",
+        "postings": [
+            {"account_id": cash, "amount": amount, "currency": "USD"},
+            {"account_id": income, "amount": f"-{amount}", "currency": "USD"},
+        ],
+        "correlation_id": f"corr-{external_id}",
+    }
+
+
+def _external_connection() -> sqlite3.Connection:
+    # A connection outside the pool stands in for another worker process.
+    conn = sqlite3.connect(get_settings().db_url.removeprefix("sqlite:///"))
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def test_replays_are_served_from_the_cache(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, income = _seed_accounts()
+    committed = record_transaction_bundle(_bundle(cash, income, "cache-1"))
+
+    before = idempotency_cache_stats()
+    replays = [record_transaction_bundle(_bundle(cash, income, "cache-1")) for _ in range(3)]
+    assert {r["output_hash"] for r in replays} == {committed["output_hash"]}
+    assert all(r["status"] == "idempotent-replay" for r in replays)
+    after = idempotency_cache_stats()
+    # The first replay probes the DB; the rest are cache hits.
+    assert after["entries"] == 1
+    assert (after["misses"] - before["misses"], after["hits"] - before["hits"]) == (1, 2)
+
+    # Cached payloads are not mutated by callers.
+    assert get_idempotency_cache().lookup("agent-loop", "cache-1", lambda: None)["response_payload"]["status"] == "committed"
+
+
+def test_uncommitted_rows_are_never_cached(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, income = _seed_accounts()
+    with pytest.raises(RuntimeError):
+        with transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO ledger_transactions (
+                  transaction_id, source_system, external_id, transaction_date, description,
+                  correlation_id, input_hash, response_payload, output_hash
+                ) VALUES ('tx-rolled-back', 'agent-loop', 'cache-rb', '2026-01-10T00:00:00Z', 'x', 'c', 'h',
+                          '{"status":"committed","transaction_id":"tx-rolled-back"}', 'o')
+                """
+            )
+            assert resolve_transaction_idempotency(conn, "agent-loop", "cache-rb")["transaction_id"] == "tx-rolled-back"
+            raise RuntimeError("roll back")
+
+    assert idempotency_cache_stats()["entries"] == 0
+    with read_only_connection() as conn:
+        assert resolve_transaction_idempotency(conn, "agent-loop", "cache-rb") is None
+    assert record_transaction_bundle(_bundle(cash, income, "cache-rb"))["status"] == "committed"
+
+
+def test_commits_from_other_processes_are_seen_through_data_version(db_available, bloom_enabled):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, income = _seed_accounts()
+    for i in range(6):
+        record_transaction_bundle(_bundle(cash, income, f"cache-local-{i}", amount=f"{i + 1}.0000"))
+
+    # Every fresh key so far was answered by the filter without a probe.
+    assert idempotency_cache_stats()["bloom_skips"] == 6
+    with read_only_connection() as conn:
+        assert resolve_transaction_idempotency(conn, "agent-loop", "cache-remote") is None
+    assert idempotency_cache_stats()["bloom_skips"] == 7
+
+    other = _external_connection()
+    try:
+        other.execute(
+            """
+            INSERT INTO ledger_transactions (
+              transaction_id, source_system, external_id, transaction_date, description,
+              correlation_id, input_hash, response_payload, output_hash
+            ) VALUES ('tx-other', 'agent-loop', 'cache-remote', '2026-01-11T00:00:00Z', 'x', 'c', 'h',
+                      '{"status":"committed","transaction_id":"tx-other","output_hash":"o"}', 'o')
+            """
+        )
+        other.commit()
+    finally:
+        other.close()
+
+    replay = record_transaction_bundle(_bundle(cash, income, "cache-remote"))
+    assert replay == {"status": "idempotent-replay", "transaction_id": "tx-other", "output_hash": "o"}
+
+    stats = idempotency_cache_stats()
+    # The filter grew past its initial capacity of 4 without dropping keys.
+    assert stats["bloom_keys"] == 7
+    for i in range(6):
+        assert record_transaction_bundle(_bundle(cash, income, f"cache-local-{i}", amount=f"{i + 1}.0000"))[
+            "status"
+        ] == "idempotent-replay"
+
+
+def test_cache_can_be_disabled(db_available, monkeypatch):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    monkeypatch.setenv("CAPITAL_OS_IDEMPOTENCY_CACHE", "0")
+    get_settings.cache_clear()
+    try:
+        cash, income = _seed_accounts()
+        record_transaction_bundle(_bundle(cash, income, "cache-off"))
+        assert record_transaction_bundle(_bundle(cash, income, "cache-off"))["status"] == "idempotent-replay"
+        assert get_idempotency_cache() is None
+        assert idempotency_cache_stats() is None
+    finally:
+        get_settings.cache_clear()
+
+
+def _lock_period(period_key: str) -> None:
+    result = execute_tool(
+        "lock_period",
+        {"period_key": period_key, "correlation_id": f"corr-lock-{period_key}"},
+        actor_id="actor-cache",
+        authn_method="header_token",
+        authorization_result="allowed",
+    )
+    assert result.success, result.payload
+
+
+def test_rowids_reused_after_an_archive_are_resynced(db_available, bloom_enabled, tmp_path):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, income = _seed_accounts()
+    record_transaction_bundle(_bundle(cash, income, "cache-kept"))
+    # The archived year holds the highest rowid.
+    old = {**_bundle(cash, income, "cache-archived", amount="2.0000"), "date": "2024-01-05T12:00:00Z"}
+    record_transaction_bundle(old)
+    with read_only_connection() as conn:
+        assert resolve_transaction_idempotency(conn, "agent-loop", "cache-reused") is None
+    synced_past = idempotency_cache_stats()["committed_rowid"]
+
+    _lock_period("2024-01")
+    archive_ledger_year(2024, archive_dir=tmp_path)
+
+    other = _external_connection()
+    try:
+        other.execute(
+            """
+            INSERT INTO ledger_transactions (
+              transaction_id, source_system, external_id, transaction_date, description,
+              correlation_id, input_hash, response_payload, output_hash
+            ) VALUES ('tx-reused', 'agent-loop', 'cache-reused', '2026-01-11T00:00:00Z', 'x', 'c', 'h',
+                      '{"status":"committed","transaction_id":"tx-reused","output_hash":"o"}', 'o')
+            """
+        )
+        other.commit()
+        reused_rowid = other.execute(
+            "SELECT rowid FROM ledger_transactions WHERE external_id = 'cache-reused'"
+        ).fetchone()[0]
+    finally:
+        other.close()
+    assert reused_rowid <= synced_past
+
+    with read_only_connection() as conn:
+        assert resolve_transaction_idempotency(conn, "agent-loop", "cache-reused")["transaction_id"] == "tx-reused"
+    replay = record_transaction_bundle(_bundle(cash, income, "cache-reused"))
+    assert replay == {"status": "idempotent-replay", "transaction_id": "tx-reused", "output_hash": "o"}
+    assert record_transaction_bundle(old)["status"] == "idempotent-replay"
+
+
+def test_unique_violation_replays_even_when_the_cache_misses_the_key(db_available, monkeypatch):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, income = _seed_accounts()
+    committed = record_transaction_bundle(_bundle(cash, income, "cache-stale"))
+    # A cache that wrongly believes the key was never committed.
+    monkeypatch.setattr(IdempotencyCache, "lookup", lambda self, source_system, external_id, probe: None)
+
+    # A different amount keeps duplicate-risk matching out of the way, so the
+    # insert reaches the UNIQUE constraint.
+    replay = record_transaction_bundle(_bundle(cash, income, "cache-stale", amount="11.0000"))
+    assert replay["status"] == "idempotent-replay"
+    assert replay["output_hash"] == committed["output_hash"]
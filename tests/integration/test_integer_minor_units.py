@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from pathlib import Path
+import shutil
+import sqlite3
+
+import pytest
+from typer.testing import CliRunner
+
+from capital_os.cli.main import app as cli_app
+from capital_os.config import get_settings
+from capital_os.db.migrations import apply_pending_migrations
+from capital_os.db.session import read_only_connection, transaction
+from capital_os.domain.ledger.minor_units import verify_minor_unit_columns
+from capital_os.domain.ledger.repository import (
+    create_account,
+    fetch_transaction_with_postings_by_external_id,
+    find_duplicate_risk_matches,
+    list_transactions_page,
+    upsert_balance_snapshot,
+    upsert_obligation,
+)
+from capital_os.domain.ledger.service import record_transaction_bundle
+
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+
+def _seed_accounts() -> tuple[str, str]:
+    with transaction() as conn:
+        cash = create_account(conn, {"code": "1000", "name": "Cash", "account_type": "asset"})
+        income = create_account(conn, {"code": "4000", "name": "Income", "account_type": "income"})
+    return cash, income
+
+
+def _record(cash: str, income: str, external_id: str, amount: str) -> dict:
+    return record_transaction_bundle(
+        {
+            "source_system": "pytest",
+            "external_id": external_id,
+            "date": "2026-01-10T00:00:00Z",
+            "description": "minor units",
+            "postings": [
+                {"account_id": cash, "amount": amount, "currency": "USD"},
+                {"account_id": income, "amount": f"-{amount}", "currency": "USD"},
+            ],
+            "correlation_id": f"corr-{external_id}",
+        }
+    )
+
+
+def test_writes_store_exact_minor_units_and_reads_convert_once(db_available, monkeypatch):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    monkeypatch.setenv("CAPITAL_OS_APPROVAL_THRESHOLD_AMOUNT", "1000000000000.0000")
+    get_settings.cache_clear()
+    try:
+        cash, income = _seed_accounts()
+        # Large enough that REAL arithmetic on the decimal column loses the 1e-4 digit.
+        assert _record(cash, income, "units-1", "123456789012.3457")["status"] == "committed"
+    finally:
+        get_settings.cache_clear()
+
+    with transaction() as conn:
+        units = sorted(row["amount_units"] for row in conn.execute("SELECT amount_units FROM ledger_postings"))
+        page = list_transactions_page(conn, limit=10, cursor=None)
+        detail = fetch_transaction_with_postings_by_external_id(
+            conn, source_system="pytest", external_id="units-1"
+        )
+        matches = find_duplicate_risk_matches(
+            conn,
+            effective_date="2026-01-10",
+            postings=[{"account_id": cash, "amount": "123456789012.3457"}],
+        )
+        assert verify_minor_unit_columns(conn) == []
+
+    assert units == [-1234567890123457, 1234567890123457]
+    assert page[0]["gross_posting_amount"] == Decimal("246913578024.6914")
+    assert {p["amount"] for p in detail["postings"]} == {
+        Decimal("123456789012.3457"),
+        Decimal("-123456789012.3457"),
+    }
+    assert [m["external_id"] for m in matches] == ["units-1"]
+    assert sorted(p["amount"] for p in matches[0]["postings"]) == ["-123456789012.3457", "123456789012.3457"]
+
+
+def test_snapshot_and_obligation_upserts_keep_units_in_step(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, _ = _seed_accounts()
+    snapshot = {
+        "source_system": "pytest",
+        "account_id": cash,
+        "snapshot_date": "2026-01-31",
+        "balance": "10.1000",
+        "currency": "USD",
+    }
+    obligation = {
+        "source_system": "pytest",
+        "name": "Rent",
+        "account_id": cash,
+        "cadence": "monthly",
+        "expected_amount": "1200.0001",
+        "next_due_date": "2026-02-01",
+    }
+    with transaction() as conn:
+        upsert_balance_snapshot(conn, snapshot)
+        upsert_balance_snapshot(conn, {**snapshot, "balance": "20.2000"})
+        upsert_obligation(conn, obligation)
+        upsert_obligation(conn, {**obligation, "expected_amount": "1300.0002"})
+        snapshot_units = conn.execute("SELECT balance_units FROM balance_snapshots").fetchone()[0]
+        obligation_units = conn.execute("SELECT expected_amount_units FROM obligations").fetchone()[0]
+        assert verify_minor_unit_columns(conn) == []
+
+    assert snapshot_units == 202000
+    assert obligation_units == 13000002
+
+
+def test_guard_triggers_reject_missing_or_divergent_units(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, income = _seed_accounts()
+    _record(cash, income, "units-guard", "5.0000")
+    with transaction() as conn:
+        tx_id = conn.execute("SELECT transaction_id FROM ledger_transactions").fetchone()[0]
+
+    with pytest.raises(sqlite3.IntegrityError, match="amount_units"):
+        with transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO ledger_postings (posting_id, transaction_id, account_id, amount, currency)
+                VALUES ('raw-1', ?, ?, '1.0000', 'USD')
+                """,
+                (tx_id, cash),
+            )
+    with pytest.raises(sqlite3.IntegrityError, match="balance_units"):
+        with transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO balance_snapshots (
+                  snapshot_id, source_system, account_id, snapshot_date, balance, balance_units, currency
+                ) VALUES ('s1', 'pytest', ?, '2026-01-31', '1.0000', 20000, 'USD')
+                """,
+                (cash,),
+            )
+
+
+def test_verify_amounts_cli_reports_divergent_rows(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, _ = _seed_accounts()
+    with transaction() as conn:
+        snapshot_id, _ = upsert_balance_snapshot(
+            conn,
+            {
+                "source_system": "pytest",
+                "account_id": cash,
+                "snapshot_date": "2026-01-31",
+                "balance": "3.0000",
+                "currency": "USD",
+            },
+        )
+
+    runner = CliRunner()
+    assert runner.invoke(cli_app, ["ledger", "verify-amounts"]).exit_code == 0
+
+    with transaction() as conn:
+        conn.execute("DROP TRIGGER trg_balance_snapshots_balance_units_update")
+        conn.execute("UPDATE balance_snapshots SET balance_units = 1 WHERE snapshot_id=?", (snapshot_id,))
+    with read_only_connection() as conn:
+        assert verify_minor_unit_columns(conn) == [
+            {"table": "balance_snapshots", "row_id": snapshot_id, "expected": "3.0000", "actual": "0.0001"}
+        ]
+    failed = runner.invoke(cli_app, ["ledger", "verify-amounts"])
+    assert failed.exit_code == 1
+
+
+def test_migration_backfills_units_and_keeps_postings_append_only(tmp_path: Path):
+    legacy_dir = tmp_path / "migrations"
+    legacy_dir.mkdir()
+    for path in MIGRATIONS_DIR.glob("*.sql"):
+        if path.name < "0013_":
+            shutil.copy(path, legacy_dir / path.name)
+
+    db_path = tmp_path / "backfill.db"
+    apply_pending_migrations(db_path, legacy_dir)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("INSERT INTO accounts (account_id, code, name, account_type) VALUES ('a1','1000','Cash','asset')")
+        conn.execute(
+            """
+            INSERT INTO ledger_transactions (
+              transaction_id, source_system, external_id, transaction_date, description, correlation_id, input_hash
+            ) VALUES ('t1', 'legacy', 'legacy-1', '2026-01-02T00:00:00Z', 'legacy', 'corr-legacy', 'hash')
+            """
+        )
+        conn.execute(
+            "INSERT INTO ledger_postings (posting_id, transaction_id, account_id, amount, currency) VALUES ('p1','t1','a1','-0.1001','USD')"
+        )
+        conn.execute(
+            """
+            INSERT INTO balance_snapshots (snapshot_id, source_system, account_id, snapshot_date, balance, currency)
+            VALUES ('s1', 'legacy', 'a1', '2026-01-31', '99.9900', 'USD')
+            """
+        )
+        conn.execute(
+            """
+            INSERT INTO obligations (obligation_id, source_system, name, account_id, cadence, expected_amount, next_due_date)
+            VALUES ('o1', 'legacy', 'Rent', 'a1', 'monthly', '1500', '2026-02-01')
+            """
+        )
+        conn.commit()
+        conn.close()
+
+        for path in MIGRATIONS_DIR.glob("0013_*.sql"):
+            shutil.copy(path, legacy_dir / path.name)
+        apply_pending_migrations(db_path, legacy_dir)
+
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        assert conn.execute("SELECT amount_units FROM ledger_postings").fetchone()[0] == -1001
+        assert conn.execute("SELECT balance_units FROM balance_snapshots").fetchone()[0] == 999900
+        assert conn.execute("SELECT expected_amount_units FROM obligations").fetchone()[0] == 15000000
+        assert verify_minor_unit_columns(conn) == []
+        with pytest.raises(sqlite3.IntegrityError, match="Append-only"):
+            conn.execute("UPDATE ledger_postings SET memo='x' WHERE posting_id='p1'")
+    finally:
+        conn.close()
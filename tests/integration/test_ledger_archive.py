@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import sqlite3
+
+import pytest
+from typer.testing import CliRunner
+
+from capital_os.cli.main import app as cli_app
+from capital_os.db.session import read_only_connection, transaction
+from capital_os.domain.ledger.archive import LedgerArchiveError, archive_ledger_year, content_hash
+from capital_os.domain.ledger.balances import verify_account_balances
+from capital_os.domain.ledger.export import stream_ledger_export
+from capital_os.domain.ledger.repository import create_account
+from capital_os.runtime.execute_tool import execute_tool
+
+
+def _tool(tool_name: str, payload: dict):
+    return execute_tool(
+        tool_name,
+        payload,
+        actor_id="actor-archive",
+        authn_method="header_token",
+        authorization_result="allowed",
+    )
+
+
+def _bundle(external_id: str, day: str, cash: str, income: str, amount: str = "10.0000") -> dict:
+    return {
+        "source_system": "archive",
+        "external_id": external_id,
+        "date": f"{day}T12:00:00Z",
+        "description": external_id,
+        "postings": [
+            {"account_id": cash, "amount": amount, "currency": "USD"},
+            {"account_id": income, "amount": f"-{amount}", "currency": "USD"},
+        ],
+        "correlation_id": f"corr-{external_id}",
+    }
+
+
+def _seed_ledger() -> tuple[str, str]:
+    with transaction() as conn:
+        cash = create_account(conn, {"code": "1000", "name": "Cash", "account_type": "asset"})
+        income = create_account(conn, {"code": "4000", "name": "Income", "account_type": "income"})
+    for index, (external_id, day) in enumerate(
+        (("a-1", "2024-01-05"), ("a-2", "2024-03-09"), ("a-3", "2024-03-09"), ("b-1", "2025-02-01"))
+    ):
+        result = _tool("record_transaction_bundle", _bundle(external_id, day, cash, income, f"{index + 1}.0000"))
+        assert result.payload["status"] == "committed", result.payload
+    return cash, income
+
+
+def _lock(period_key: str) -> None:
+    result = _tool("lock_period", {"period_key": period_key, "correlation_id": f"corr-lock-{period_key}"})
+    assert result.success, result.payload
+
+
+def test_archiving_a_locked_year_moves_rows_and_keeps_them_readable(db_available, tmp_path: Path):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, income = _seed_ledger()
+    _lock("2024-01")
+    with pytest.raises(LedgerArchiveError, match=r"must be locked before archiving: 2024-03 \(entity-default\)"):
+        archive_ledger_year(2024, archive_dir=tmp_path)
+    _lock("2024-03")
+
+    before = [json.loads(line) for line in "".join(stream_ledger_export("ndjson")).splitlines()]
+    runner = CliRunner()
+    result = runner.invoke(cli_app, ["ledger", "archive", "--year", "2024", "--archive-dir", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    summary = json.loads(result.stdout)
+    assert (summary["transactions"], summary["postings"], summary["retained"]) == (3, 6, 0)
+
+    archive = sqlite3.connect(summary["archive_path"])
+    try:
+        assert content_hash(archive)["content_hash"] == summary["content_hash"]
+    finally:
+        archive.close()
+    with read_only_connection() as conn:
+        hot = [row[0] for row in conn.execute("SELECT external_id FROM ledger_transactions")]
+        assert hot == ["b-1"]
+        # Materialized balances still match: archived days count via checkpoints.
+        assert verify_account_balances(conn) == []
+
+    # Exports and lookups read through to the archive in the same order.
+    after = [json.loads(line) for line in "".join(stream_ledger_export("ndjson")).splitlines()]
+    assert after == before
+    resumed = "".join(stream_ledger_export("ndjson", after=before[1]["checkpoint"]))
+    assert [json.loads(line) for line in resumed.splitlines()] == before[2:]
+    lookup = _tool(
+        "get_transaction_by_external_id",
+        {"source_system": "archive", "external_id": before[1]["external_id"], "correlation_id": "c-get"},
+    )
+    assert lookup.payload["transaction"]["transaction_id"] == before[1]["transaction_id"]
+    assert len(lookup.payload["transaction"]["postings"]) == 2
+
+    # Archived keys still replay; archived days accept no new rows.
+    replay = _tool("record_transaction_bundle", _bundle("a-1", "2024-01-05", cash, income, "1.0000"))
+    assert replay.payload["status"] == "idempotent-replay"
+    with pytest.raises(sqlite3.IntegrityError, match="period_archived"):
+        with transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO ledger_transactions (
+                  transaction_id, source_system, external_id, transaction_date, description, correlation_id, input_hash
+                ) VALUES ('tx-late', 'archive', 'late', '2024-06-01T00:00:00Z', 'late', 'c', 'h')
+                """
+            )
+    with pytest.raises(sqlite3.IntegrityError, match="Append-only"):
+        with transaction() as conn:
+            conn.execute("DELETE FROM ledger_transactions WHERE external_id = 'b-1'")
+
+    assert runner.invoke(cli_app, ["ledger", "verify-archives"]).exit_code == 0
+    assert runner.invoke(cli_app, ["ledger", "archive", "--year", "2024"]).exit_code == 1
+
+
+def test_list_transactions_pages_across_an_archived_year(db_available, tmp_path: Path):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    _seed_ledger()
+    _lock("2024-01")
+    _lock("2024-03")
+
+    def listed(limit: int) -> list[dict]:
+        pages, cursor = [], None
+        while True:
+            payload = {"limit": limit, "correlation_id": "c-list"}
+            if cursor:
+                payload["cursor"] = cursor
+            result = _tool("list_transactions", payload)
+            assert result.success, result.payload
+            pages.extend(result.payload["transactions"])
+            cursor = result.payload["next_cursor"]
+            if cursor is None:
+                return pages
+
+    before = listed(10)
+    archive_ledger_year(2024, archive_dir=tmp_path)
+
+    assert [row["external_id"] for row in before][::3] == ["b-1", "a-1"]
+    assert len(before) == 4
+    assert listed(10) == before
+    # A page of two ends inside the archived year and resumes from it.
+    assert listed(2) == before
+    assert listed(1) == before
+
+
+def test_verify_archives_detects_a_tampered_archive(db_available, tmp_path: Path):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    _seed_ledger()
+    _lock("2024-01")
+    _lock("2024-03")
+    summary = archive_ledger_year(2024, archive_dir=tmp_path)
+
+    archive = sqlite3.connect(summary["archive_path"])
+    try:
+        archive.execute("DROP TRIGGER trg_archive_postings_no_update")
+        archive.execute("UPDATE ledger_postings SET amount_units = amount_units + 1 WHERE amount_units > 0")
+        archive.commit()
+    finally:
+        archive.close()
+
+    result = CliRunner().invoke(cli_app, ["ledger", "verify-archives"])
+    assert result.exit_code == 1
+    checks = {entry["check"] for entry in json.loads(result.stderr)["mismatches"]}
+    assert checks == {"content_hash", "checkpoint"}
+
+
+def test_forged_moving_archive_rows_cannot_open_deletes(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    _seed_ledger()
+    _lock("2024-01")
+    _lock("2024-03")
+    forged = """
+        INSERT INTO ledger_archives (
+          archive_year, archive_path, first_day, last_day, transaction_count, posting_count, content_hash, status
+        ) VALUES (2024, 'forged.db', ?, ?, ?, ?, 'forged', 'moving')
+    """
+    attempts = [
+        # A wide day range, then a correctly bounded but empty move.
+        ((19000101, 99991231, 0, 0), False),
+        ((20240101, 20241231, 0, 0), False),
+        # Keys for the year but no opening-balance checkpoints.
+        ((20240101, 20241231, 3, 6), True),
+    ]
+    for params, with_keys in attempts:
+        with pytest.raises(sqlite3.IntegrityError, match="must be recorded by a ledger archive move"):
+            with transaction() as conn:
+                conn.execute("PRAGMA defer_foreign_keys = ON")
+                if with_keys:
+                    conn.execute(
+                        """
+                        INSERT INTO ledger_archived_keys (source_system, external_id, transaction_id, archive_year)
+                        SELECT source_system, external_id, transaction_id, 2024 FROM ledger_transactions
+                        WHERE transaction_day BETWEEN 20240101 AND 20241231
+                        """
+                    )
+                conn.execute(forged, params)
+
+    for table in ("ledger_postings", "ledger_transactions"):
+        with pytest.raises(sqlite3.IntegrityError, match="Append-only"):
+            with transaction() as conn:
+                conn.execute(f"DELETE FROM {table}")
+    with read_only_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM ledger_transactions").fetchone()[0] == 4
+        assert conn.execute("SELECT COUNT(*) FROM ledger_archives").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM ledger_archived_keys").fetchone()[0] == 0
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from typer.testing import CliRunner
+
+from capital_os.api.app import app
+from capital_os.cli import ledger as ledger_cli
+from capital_os.cli.main import app as cli_app
+from capital_os.db.session import connection_pool_stats, read_only_connection, transaction
+from capital_os.domain.ledger import export as ledger_export
+from capital_os.domain.ledger.export import CSV_COLUMNS, _export_query
+from capital_os.domain.ledger.repository import create_account
+from capital_os.domain.ledger.service import record_transaction_bundles
+from tests.support.auth import AUTH_HEADERS, READ_ONLY_AUTH_HEADERS
+
+
+def _seed_ledger() -> tuple[str, str]:
+    with transaction() as conn:
+        conn.execute(
+            "INSERT INTO entities (entity_id, code, name, metadata) VALUES ('entity-ops', 'OPS', 'Ops', '{}')"
+        )
+        cash = create_account(conn, {"code": "1000", "name": "Cash", "account_type": "asset"})
+        income = create_account(conn, {"code": "4000", "name": "Income", "account_type": "income"})
+
+    bundles = []
+    for i in range(6):
+        bundles.append(
+            {
+                "source_system": "export",
+                "external_id": f"exp-{i}",
+                "date": f"2026-01-{10 + i:02d}T12:00:00Z",
+                "description": f"export, \"row\" {i}",
+                "entity_id": "entity-ops" if i == 3 else "entity-default",
+                "postings": [
+                    {"account_id": cash, "amount": f"{i + 1}.2500", "currency": "USD", "memo": "line\nbreak" if i == 0 else None},
+                    {"account_id": income, "amount": f"-{i + 1}.2500", "currency": "USD"},
+                ],
+                "correlation_id": f"corr-exp-{i}",
+            }
+        )
+    result = record_transaction_bundles({"bundles": bundles, "correlation_id": "corr-exp-seed"})
+    assert result["committed_count"] == 6
+    return cash, income
+
+
+def _ndjson(text: str) -> list[dict]:
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def test_http_export_streams_filters_and_resumes(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    _seed_ledger()
+    client = TestClient(app, headers=READ_ONLY_AUTH_HEADERS)
+
+    response = client.get("/exports/ledger", params={"correlation_id": "corr-export"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = _ndjson(response.text)
+    assert [r["external_id"] for r in records] == [f"exp-{i}" for i in range(6)]
+    assert sorted(p["amount"] for p in records[0]["postings"]) == ["-1.2500", "1.2500"]
+
+    # Resume after the second record yields exactly the remainder.
+    rest = _ndjson(
+        client.get(
+            "/exports/ledger", params={"correlation_id": "corr-export-resume", "after": records[1]["checkpoint"]}
+        ).text
+    )
+    assert rest == records[2:]
+
+    filtered = _ndjson(
+        client.get(
+            "/exports/ledger",
+            params={"correlation_id": "corr-export-filter", "date_from": "2026-01-12", "date_to": "2026-01-13"},
+        ).text
+    )
+    assert [r["external_id"] for r in filtered] == ["exp-2", "exp-3"]
+    by_entity = _ndjson(
+        client.get("/exports/ledger", params={"correlation_id": "corr-export-entity", "entity_id": "entity-ops"}).text
+    )
+    assert [r["external_id"] for r in by_entity] == ["exp-3"]
+
+    with read_only_connection() as conn:
+        events = conn.execute(
+            "SELECT status, actor_id FROM event_log WHERE tool_name='export_ledger' ORDER BY event_timestamp"
+        ).fetchall()
+    assert [tuple(e) for e in events] == [("ok", "actor-reader")] * 4
+
+
+def test_http_export_csv_and_rejections(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    _seed_ledger()
+    client = TestClient(app, headers=AUTH_HEADERS)
+
+    response = client.get("/exports/ledger", params={"correlation_id": "corr-export-csv", "format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert tuple(rows[0].keys()) == CSV_COLUMNS
+    assert len(rows) == 12
+    assert rows[0]["description"] == 'export, "row" 0'
+    assert {row["memo"] for row in rows if row["external_id"] == "exp-0"} == {"", "line\nbreak"}
+
+    assert TestClient(app).get("/exports/ledger", params={"correlation_id": "c"}).status_code == 401
+    bad_format = client.get("/exports/ledger", params={"correlation_id": "c", "format": "xml"})
+    assert bad_format.status_code == 422
+    bad_checkpoint = client.get("/exports/ledger", params={"correlation_id": "c", "after": "not-a-token"})
+    assert bad_checkpoint.status_code == 422
+    assert client.get("/exports/ledger", params={"correlation_id": "c", "date_from": "01/02/2026"}).status_code == 422
+
+
+def test_paused_export_stream_holds_no_pooled_reader(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    _seed_ledger()
+    stream = ledger_export.stream_ledger_export("ndjson")
+    first = json.loads(next(stream))
+    assert first["external_id"] == "exp-0"
+
+    # A slow client keeps the stream open between chunks; tool reads and
+    # writes must not wait on it for a pooled connection.
+    assert connection_pool_stats()["reader"]["in_use"] == 0
+    with transaction() as conn:
+        conn.execute("UPDATE accounts SET name = 'Cash on hand' WHERE code = '1000'")
+    rest = [json.loads(chunk) for chunk in stream]
+    assert [r["external_id"] for r in rest] == [f"exp-{i}" for i in range(1, 6)]
+
+
+def test_export_walks_the_day_index_without_sorting_the_whole_ledger(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    for filters in ({}, {"entity_id": "entity-ops"}, {"date_from": "2026-01-01", "after": None}):
+        sql, params = _export_query(
+            date_from=filters.get("date_from"), date_to=None, entity_id=filters.get("entity_id"), after=None
+        )
+        with read_only_connection() as conn:
+            plan = [row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        assert "idx_ledger_transactions_day_id" in plan[0]
+        assert "USE TEMP B-TREE FOR ORDER BY" not in plan
+
+
+def test_cli_export_resumes_from_checkpoint_file(db_available, tmp_path: Path, monkeypatch):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    _seed_ledger()
+    runner = CliRunner()
+    full_path = tmp_path / "full.csv"
+    result = runner.invoke(cli_app, ["ledger", "export", "--format", "csv", "--output", str(full_path)])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.stdout)["transactions"] == 6
+
+    # First run dies after writing three transactions; the checkpoint holds two.
+    monkeypatch.setattr(ledger_cli, "_EXPORT_CHECKPOINT_EVERY", 2)
+    real_iter_records = ledger_export._iter_records
+
+    def failing_iter_records(cursor):
+        for index, record in enumerate(real_iter_records(cursor)):
+            if index == 3:
+                raise RuntimeError("connection lost")
+            yield record
+
+    monkeypatch.setattr(ledger_export, "_iter_records", failing_iter_records)
+    out_path = tmp_path / "resumed.csv"
+    ckpt_path = tmp_path / "resumed.ckpt"
+    args = ["ledger", "export", "--format", "csv", "--output", str(out_path), "--checkpoint-file", str(ckpt_path)]
+    crashed = runner.invoke(cli_app, args)
+    assert crashed.exit_code != 0
+    saved = json.loads(ckpt_path.read_text())
+    assert (saved["transactions"], saved["complete"]) == (2, False)
+    assert out_path.stat().st_size > saved["output_bytes"]
+
+    monkeypatch.setattr(ledger_export, "_iter_records", real_iter_records)
+    resumed = runner.invoke(cli_app, args)
+    assert resumed.exit_code == 0, resumed.output
+    assert out_path.read_text() == full_path.read_text()
+    assert json.loads(ckpt_path.read_text())["complete"] is True
+
+    changed = runner.invoke(cli_app, [*args[:-2], "--checkpoint-file", str(ckpt_path), "--entity-id", "entity-ops"])
+    assert changed.exit_code == 1
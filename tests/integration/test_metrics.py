@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import multiprocessing
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from capital_os.api.app import app
+from capital_os.config import get_settings
+from capital_os.observability.metrics import (
+    LANE_QUEUE_DEPTH,
+    SQLITE_BUSY_ERRORS,
+    inc,
+    render_metrics,
+    reset_metrics,
+)
+from tests.support.auth import AUTH_HEADERS
+
+
+@pytest.fixture
+def fresh_metrics(monkeypatch):
+    def configure(**env: str) -> None:
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        get_settings.cache_clear()
+        reset_metrics()
+
+    configure()
+    yield configure
+    reset_metrics()
+    get_settings.cache_clear()
+
+
+def _samples(text: str) -> dict[str, float]:
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            series, value = line.rsplit(" ", 1)
+            samples[series] = float(value)
+    return samples
+
+
+def test_metrics_endpoint_exposes_tool_latency_histograms(db_available, fresh_metrics):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    client = TestClient(app, headers=AUTH_HEADERS)
+    for i in range(3):
+        assert client.post("/tools/list_accounts", json={"correlation_id": f"corr-metrics-{i}"}).status_code == 200
+    assert TestClient(app).post("/tools/list_accounts", json={"correlation_id": "corr-anon"}).status_code == 401
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE capital_os_tool_duration_seconds histogram" in response.text
+    samples = _samples(response.text)
+
+    ok = 'tool="list_accounts",status="ok",authorization_result="allowed"'
+    assert samples[f"capital_os_tool_duration_seconds_count{{{ok}}}"] == 3
+    assert samples[f'capital_os_tool_duration_seconds_bucket{{{ok},le="+Inf"}}'] == 3
+    buckets = [value for series, value in samples.items() if series.startswith(f"capital_os_tool_duration_seconds_bucket{{{ok}")]
+    assert buckets == sorted(buckets)
+    denied = 'tool="list_accounts",status="auth_error",authorization_result="denied"'
+    assert samples[f"capital_os_tool_duration_seconds_count{{{denied}}}"] == 1
+    assert samples['capital_os_lane_queue_depth{lane="read"}'] == 0
+    assert samples["capital_os_writer_queue_full_total"] == 0
+
+
+def test_metrics_endpoint_can_be_disabled(fresh_metrics):
+    fresh_metrics(CAPITAL_OS_METRICS="0")
+    assert TestClient(app).get("/metrics").status_code == 404
+
+
+def _record_in_worker() -> None:
+    inc(SQLITE_BUSY_ERRORS, "record_transaction_bundle", amount=2)
+    inc(LANE_QUEUE_DEPTH, "write", amount=5)
+
+
+def test_metrics_are_summed_across_worker_processes(fresh_metrics, tmp_path: Path):
+    fresh_metrics(CAPITAL_OS_METRICS_DIR=str(tmp_path))
+    inc(SQLITE_BUSY_ERRORS, "record_transaction_bundle")
+    inc(LANE_QUEUE_DEPTH, "write")
+
+    worker = multiprocessing.get_context("fork").Process(target=_record_in_worker)
+    worker.start()
+    worker.join(10)
+    assert worker.exitcode == 0
+    assert len(list(tmp_path.glob("metrics-*.db"))) == 2
+
+    samples = _samples(render_metrics())
+    # Counters of exited workers still count; their gauges do not.
+    assert samples['capital_os_sqlite_busy_errors_total{tool="record_transaction_bundle"}'] == 3
+    assert samples['capital_os_lane_queue_depth{lane="write"}'] == 1
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from pathlib import Path
+import shutil
+import sqlite3
+
+import pytest
+
+from capital_os.db.migrations import apply_pending_migrations
+from capital_os.db.session import transaction
+from capital_os.domain.ledger.repository import create_account, find_duplicate_risk_matches
+from capital_os.domain.ledger.service import record_transaction_bundle, record_transaction_bundles
+
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+
+def _seed_accounts() -> tuple[str, str, str]:
+    with transaction() as conn:
+        cash = create_account(conn, {"code": "1000", "name": "Cash", "account_type": "asset"})
+        card = create_account(conn, {"code": "2000", "name": "Card", "account_type": "liability"})
+        income = create_account(conn, {"code": "4000", "name": "Income", "account_type": "income"})
+    return cash, card, income
+
+
+def _bundle(postings: list[tuple[str, str]], external_id: str, date: str = "2026-01-10T23:30:00+00:00") -> dict:
+    return {
+        "source_system": "pytest",
+        "external_id": external_id,
+        "date": date,
+        "description": "fingerprints",
+        "postings": [{"account_id": a, "amount": amount, "currency": "USD"} for a, amount in postings],
+        "correlation_id": f"corr-{external_id}",
+    }
+
+
+def test_fingerprints_track_every_insert_path(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, card, income = _seed_accounts()
+    record_transaction_bundle(_bundle([(cash, "5.0000"), (income, "-5.0000")], "fp-single"))
+    record_transaction_bundles(
+        {
+            "bundles": [_bundle([(cash, "2.0000"), (card, "1.0000"), (income, "-3.0000")], "fp-batch", "2026-01-11T01:00:00+02:00")],
+            "correlation_id": "corr-fp-batch",
+        }
+    )
+
+    with transaction() as conn:
+        rows = conn.execute(
+            """
+            SELECT f.transaction_day, f.account_id, f.amount_units, t.external_id
+            FROM ledger_posting_fingerprints f
+            JOIN ledger_transactions t ON t.transaction_id = f.transaction_id
+            ORDER BY t.external_id, f.amount_units
+            """
+        ).fetchall()
+    assert [tuple(row) for row in rows] == [
+        (20260110, income, -30000, "fp-batch"),
+        (20260110, card, 10000, "fp-batch"),
+        (20260110, cash, 20000, "fp-batch"),
+        (20260110, income, -50000, "fp-single"),
+        (20260110, cash, 50000, "fp-single"),
+    ]
+
+
+def test_match_requires_every_posting_key_on_the_same_day(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, card, income = _seed_accounts()
+    record_transaction_bundle(_bundle([(cash, "2.0000"), (card, "1.0000"), (income, "-3.0000")], "fp-three"))
+    record_transaction_bundle(_bundle([(cash, "2.0000"), (income, "-2.0000")], "fp-two"))
+
+    def matches(postings: list[tuple[str, str]], date: str = "2026-01-10") -> list[str]:
+        with transaction() as conn:
+            found = find_duplicate_risk_matches(
+                conn,
+                effective_date=date,
+                postings=[{"account_id": a, "amount": amount} for a, amount in postings],
+            )
+        return sorted(m["external_id"] for m in found)
+
+    assert matches([(cash, "2.0000")]) == ["fp-three", "fp-two"]
+    assert matches([(cash, "2.0000"), (income, "-3.0000")]) == ["fp-three"]
+    assert matches([(cash, "2.0000"), (income, "-2.0000")]) == ["fp-two"]
+    assert matches([(cash, "2.0000"), (card, "1.0000"), (income, "-2.0000")]) == []
+    assert matches([(cash, "2.0000")], date="2026-01-11") == []
+
+
+def test_migration_backfills_existing_postings(tmp_path: Path):
+    legacy_dir = tmp_path / "migrations"
+    legacy_dir.mkdir()
+    for path in MIGRATIONS_DIR.glob("*.sql"):
+        if path.name < "0015_":
+            shutil.copy(path, legacy_dir / path.name)
+
+    db_path = tmp_path / "fingerprints.db"
+    apply_pending_migrations(db_path, legacy_dir)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("INSERT INTO accounts (account_id, code, name, account_type) VALUES ('a1','1000','Cash','asset')")
+        conn.execute(
+            """
+            INSERT INTO ledger_transactions (
+              transaction_id, source_system, external_id, transaction_date, description, correlation_id, input_hash
+            ) VALUES ('t1', 'legacy', 'legacy-1', '2025-12-31T23:59:59Z', 'legacy', 'corr-legacy', 'hash')
+            """
+        )
+        conn.execute(
+            """
+            INSERT INTO ledger_postings (posting_id, transaction_id, account_id, amount, amount_units, currency)
+            VALUES ('p1', 't1', 'a1', '1.5000', 15000, 'USD')
+            """
+        )
+        conn.commit()
+        conn.close()
+
+        for path in MIGRATIONS_DIR.glob("0015_*.sql"):
+            shutil.copy(path, legacy_dir / path.name)
+        apply_pending_migrations(db_path, legacy_dir)
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT * FROM ledger_posting_fingerprints").fetchall() == [(20251231, "a1", 15000, "t1")]
+    finally:
+        conn.close()
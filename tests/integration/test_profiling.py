@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import cProfile
+import json
+from pathlib import Path
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from typer.testing import CliRunner
+
+from capital_os.api.app import app
+from capital_os.cli.main import app as cli_app
+from capital_os.config import get_settings
+from capital_os.db.session import transaction
+from capital_os.domain.ledger.repository import create_account
+from capital_os.observability import profiling as profiling_module
+from capital_os.observability.profiling import list_profiles, profile_call, profile_requested
+from tests.support.auth import AUTH_HEADERS
+
+
+@pytest.fixture
+def profiling(tmp_path: Path, monkeypatch):
+    def configure(**env: str) -> Path:
+        directory = tmp_path / "profiles"
+        monkeypatch.setenv("CAPITAL_OS_PROFILE_DIR", str(directory))
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        get_settings.cache_clear()
+        return directory
+
+    yield configure
+    get_settings.cache_clear()
+
+
+def _bundle(cash: str, income: str, index: int) -> dict:
+    return {
+        "source_system": "profile",
+        "external_id": f"p-{index}",
+        "date": "2026-01-05T12:00:00Z",
+        "description": "profiled",
+        "postings": [
+            {"account_id": cash, "amount": "10.0000", "currency": "USD"},
+            {"account_id": income, "amount": "-10.0000", "currency": "USD"},
+        ],
+        "correlation_id": f"corr-profile-{index}",
+    }
+
+
+def test_header_profiles_one_write_call_including_the_writer_thread(db_available, profiling):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    directory = profiling()
+    with transaction() as conn:
+        cash = create_account(conn, {"code": "1000", "name": "Cash", "account_type": "asset"})
+        income = create_account(conn, {"code": "4000", "name": "Income", "account_type": "income"})
+    client = TestClient(app, headers=AUTH_HEADERS)
+
+    assert client.post("/tools/record_transaction_bundle", json=_bundle(cash, income, 1)).status_code == 200
+    assert list_profiles(directory) == []
+    response = client.post(
+        "/tools/record_transaction_bundle",
+        json=_bundle(cash, income, 2),
+        headers={"x-capital-profile": "1"},
+    )
+    assert response.status_code == 200
+
+    [profile] = list_profiles(directory)
+    assert profile["tool"] == "record_transaction_bundle"
+    assert profile["correlation_id"] == "corr-profile-2"
+    assert profile["total_seconds"] > 0
+
+    result = CliRunner().invoke(cli_app, ["profile", "show", "corr-profile-2", "--limit", "400"])
+    assert result.exit_code == 0, result.output
+    functions = [row["function"] for row in json.loads(result.output)["functions"]]
+    # The handler ran on the writer thread; its frames are merged in.
+    assert any("service.py" in name and "(record_transaction_bundle)" in name for name in functions)
+    assert any("(_execute_handler)" in name for name in functions)
+
+
+def test_sampled_profiles_are_bounded_and_listed_by_the_cli(db_available, profiling):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    directory = profiling(CAPITAL_OS_PROFILE_SAMPLE_RATE="1", CAPITAL_OS_PROFILE_MAX_FILES="2")
+    client = TestClient(app, headers=AUTH_HEADERS)
+    for index in range(4):
+        assert client.post("/tools/list_accounts", json={"correlation_id": f"corr-sampled-{index}"}).status_code == 200
+
+    assert len(list(directory.glob("*.prof"))) == 2
+    result = CliRunner().invoke(cli_app, ["profile", "list"])
+    assert result.exit_code == 0, result.output
+    listed = json.loads(result.output)
+    assert listed["count"] == 2
+    assert {profile["correlation_id"] for profile in listed["profiles"]} <= {"corr-sampled-2", "corr-sampled-3"}
+    assert CliRunner().invoke(cli_app, ["profile", "show", "corr-sampled-0"]).exit_code == 1
+
+
+def test_cli_profile_flag_captures_a_single_call(db_available, profiling):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    directory = profiling()
+    runner = CliRunner()
+    payload = json.dumps({"correlation_id": "corr-cli-profile"})
+    assert runner.invoke(cli_app, ["tool", "call", "list_accounts", "--json", payload]).exit_code == 0
+    assert not directory.exists()
+    assert runner.invoke(cli_app, ["tool", "call", "list_accounts", "--profile", "--json", payload]).exit_code == 0
+    assert [profile["correlation_id"] for profile in list_profiles(directory)] == ["corr-cli-profile"]
+
+
+def test_overlapping_profiled_calls_run_unprofiled(db_available, profiling):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    directory = profiling()
+    with transaction() as conn:
+        cash = create_account(conn, {"code": "1000", "name": "Cash", "account_type": "asset"})
+        income = create_account(conn, {"code": "4000", "name": "Income", "account_type": "income"})
+    client = TestClient(app, headers=AUTH_HEADERS)
+    entered = threading.Event()
+    release = threading.Event()
+
+    def hold_capture() -> None:
+        with profile_requested(), profile_call("list_accounts", "corr-holder"):
+            entered.set()
+            release.wait(timeout=10)
+
+    holder = threading.Thread(target=hold_capture)
+    holder.start()
+    try:
+        assert entered.wait(timeout=10)
+        read = client.post(
+            "/tools/list_accounts", json={"correlation_id": "corr-overlap-read"}, headers={"x-capital-profile": "1"}
+        )
+        write = client.post(
+            "/tools/record_transaction_bundle", json=_bundle(cash, income, 3), headers={"x-capital-profile": "1"}
+        )
+    finally:
+        release.set()
+        holder.join()
+    assert read.status_code == 200
+    assert write.status_code == 200
+    assert [profile["correlation_id"] for profile in list_profiles(directory)] == ["corr-holder"]
+
+    # Once the capture ends the next profiled write is captured again.
+    write = client.post(
+        "/tools/record_transaction_bundle", json=_bundle(cash, income, 4), headers={"x-capital-profile": "1"}
+    )
+    assert write.status_code == 200
+    assert {profile["correlation_id"] for profile in list_profiles(directory)} == {"corr-holder", "corr-profile-4"}
+
+
+@pytest.mark.parametrize("process_wide", [False, True])
+def test_profiled_write_survives_a_profiler_that_cannot_enable(db_available, profiling, monkeypatch, process_wide):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    class _Busy(cProfile.Profile):
+        def enable(self, *args, **kwargs):
+            raise ValueError("Another profiling tool is already active")
+
+    directory = profiling()
+    monkeypatch.setattr(profiling_module, "_PROCESS_WIDE", process_wide)
+    with transaction() as conn:
+        cash = create_account(conn, {"code": "1000", "name": "Cash", "account_type": "asset"})
+        income = create_account(conn, {"code": "4000", "name": "Income", "account_type": "income"})
+    client = TestClient(app, headers=AUTH_HEADERS)
+
+    monkeypatch.setattr(profiling_module.cProfile, "Profile", _Busy)
+    response = client.post(
+        "/tools/record_transaction_bundle", json=_bundle(cash, income, 5), headers={"x-capital-profile": "1"}
+    )
+    assert response.status_code == 200
+    assert list_profiles(directory) == []
+
+    # With the hook free again, a write is captured (by one profiler on 3.12+).
+    monkeypatch.undo()
+    directory = profiling()
+    monkeypatch.setattr(profiling_module, "_PROCESS_WIDE", process_wide)
+    response = client.post(
+        "/tools/record_transaction_bundle", json=_bundle(cash, income, 6), headers={"x-capital-profile": "1"}
+    )
+    assert response.status_code == 200
+    assert [profile["correlation_id"] for profile in list_profiles(directory)] == ["corr-profile-6"]
@@ -6,6 +6,7 @@ from tests.support.auth import AUTH_HEADERS
 from capital_os.db.session import transaction
 from capital_os.domain.ledger.repository import create_account
 from capital_os.domain.ledger.service import record_balance_snapshot, record_transaction_bundle
+from capital_os.observability.hashing import payload_hash
 
 
 def _seed_accounts() -> dict[str, str]:
@@ -99,6 +100,73 @@ def test_get_account_tree_returns_deterministic_hierarchy(db_available):
     assert repeat.json()["accounts"] == response.json()["accounts"]
 
 
+def test_get_account_tree_rolls_up_ledger_balances_as_of_date(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    client = TestClient(app, headers=AUTH_HEADERS)
+    ids = _seed_accounts()
+    with transaction() as conn:
+        checking = create_account(
+            conn, {"code": "1110", "name": "Checking", "account_type": "asset", "parent_account_id": ids["cash"]}
+        )
+    for external_id, day, account, amount in (
+        ("roll-1", "2026-01-05", checking, "100.0000"),
+        ("roll-2", "2026-01-06", ids["cash"], "20.5000"),
+        ("roll-3", "2026-01-07", ids["brokerage"], "300.0000"),
+        ("roll-4", "2026-02-01", checking, "7.0000"),
+    ):
+        record_transaction_bundle(
+            {
+                "source_system": "pytest",
+                "external_id": external_id,
+                "date": f"{day}T00:00:00Z",
+                "description": "rollup",
+                "postings": [
+                    {"account_id": account, "amount": amount, "currency": "USD"},
+                    {"account_id": ids["equity"], "amount": f"-{amount}", "currency": "USD"},
+                ],
+                "correlation_id": f"corr-{external_id}",
+            }
+        )
+
+    def balances(nodes, out=None):
+        out = {} if out is None else out
+        for node in nodes:
+            out[node["code"]] = (node["balance"], node["rolled_up_balance"])
+            balances(node["children"], out)
+        return out
+
+    body = client.post(
+        "/tools/get_account_tree",
+        json={"as_of_date": "2026-01-31", "correlation_id": "corr-tree-rollup"},
+    ).json()
+    assert body["as_of_date"] == "2026-01-31"
+    assert balances(body["accounts"]) == {
+        "1000": ("0.0000", "420.5000"),
+        "1100": ("20.5000", "120.5000"),
+        "1110": ("100.0000", "100.0000"),
+        "1200": ("300.0000", "300.0000"),
+        "3000": ("-420.5000", "-420.5000"),
+    }
+
+    subtree = client.post(
+        "/tools/get_account_tree",
+        json={"root_account_id": ids["cash"], "as_of_date": "2026-02-01", "correlation_id": "corr-tree-rollup-2"},
+    ).json()
+    assert balances(subtree["accounts"]) == {"1100": ("20.5000", "127.5000"), "1110": ("107.0000", "107.0000")}
+
+    # Without as_of_date the tree stays structure-only.
+    plain = client.post("/tools/get_account_tree", json={"correlation_id": "corr-tree-plain"}).json()
+    assert "as_of_date" not in plain
+    assert "balance" not in plain["accounts"][0]
+    assert "rolled_up_balance" not in plain["accounts"][0]
+
+    # output_hash covers the emitted body.
+    for emitted in (body, subtree, plain):
+        assert payload_hash({k: v for k, v in emitted.items() if k != "output_hash"}) == emitted["output_hash"]
+
+
 def test_get_account_balances_source_policy_deterministic(db_available):
     if not db_available:
         pytest.skip("database unavailable")
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+
+from capital_os.api.app import app
+from capital_os.db.session import transaction
+from capital_os.domain.ledger.balances import verify_account_balances
+from capital_os.domain.ledger.repository import create_account
+from capital_os.domain.ledger.service import record_transaction_bundle
+from capital_os.observability.hashing import payload_hash
+from tests.support.auth import AUTH_HEADERS
+
+
+def _seed_accounts() -> tuple[str, str]:
+    with transaction() as conn:
+        cash = create_account(conn, {"code": "1000", "name": "Cash", "account_type": "asset"})
+        income = create_account(conn, {"code": "4000", "name": "Income", "account_type": "income"})
+    return cash, income
+
+
+def _bundle(cash: str, income: str, external_id: str, *, amount: str = "10.0000", day: str = "2026-01-10") -> dict:
+    return {
+        "source_system": "bank-feed",
+        "external_id": external_id,
+        "date": f"{day}T12:00:00Z",
+        "description": f"import {external_id}",
+        "postings": [
+            {"account_id": cash, "amount": amount, "currency": "USD"},
+            {"account_id": income, "amount": f"-{amount}", "currency": "USD"},
+        ],
+        "correlation_id": f"corr-{external_id}",
+    }
+
+
+def _counts() -> dict[str, int]:
+    with transaction() as conn:
+        return {
+            table: conn.execute(f"SELECT COUNT(*) AS c FROM {table}").fetchone()["c"]
+            for table in ("ledger_transactions", "ledger_postings", "approval_proposals")
+        }
+
+
+def test_batch_commits_every_item_with_per_item_hashes(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, income = _seed_accounts()
+    client = TestClient(app, headers=AUTH_HEADERS)
+    bundles = [_bundle(cash, income, f"bulk-{i}", amount=f"{i + 1}.0000") for i in range(20)]
+    response = client.post(
+        "/tools/record_transaction_bundles",
+        json={"bundles": bundles, "correlation_id": "corr-bulk"},
+    )
+    assert response.status_code == 200
+    body = response.json()
+
+    assert body["committed_count"] == 20
+    assert body["proposed_count"] == 0
+    assert [item["correlation_id"] for item in body["results"]] == [b["correlation_id"] for b in bundles]
+    for item in body["results"]:
+        assert item["status"] == "committed"
+        assert item["output_hash"] == payload_hash(
+            {key: item[key] for key in ("status", "transaction_id", "posting_ids", "correlation_id")}
+        )
+    assert _counts() == {"ledger_transactions": 20, "ledger_postings": 40, "approval_proposals": 0}
+
+    with transaction() as conn:
+        assert verify_account_balances(conn) == []
+        events = conn.execute(
+            "SELECT correlation_id FROM event_log WHERE tool_name='record_transaction_bundles'"
+        ).fetchall()
+    assert len(events) == 21
+
+    # Each item replays through the single-bundle tool with the same hash.
+    replay = record_transaction_bundle(bundles[3])
+    assert replay["status"] == "idempotent-replay"
+    assert replay["output_hash"] == body["results"][3]["output_hash"]
+
+    again = client.post(
+        "/tools/record_transaction_bundles",
+        json={"bundles": bundles, "correlation_id": "corr-bulk-again"},
+    ).json()
+    assert again["replayed_count"] == 20
+    assert [item["output_hash"] for item in again["results"]] == [item["output_hash"] for item in body["results"]]
+
+
+def test_batch_items_see_earlier_items_like_sequential_calls(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, income = _seed_accounts()
+    earlier = record_transaction_bundle(_bundle(cash, income, "bulk-existing", amount="7.0000", day="2026-01-09"))
+    assert earlier["status"] == "committed"
+
+    client = TestClient(app, headers=AUTH_HEADERS)
+    body = client.post(
+        "/tools/record_transaction_bundles",
+        json={
+            "bundles": [
+                _bundle(cash, income, "bulk-existing", amount="7.0000", day="2026-01-09"),
+                _bundle(cash, income, "bulk-a", amount="5.0000"),
+                _bundle(cash, income, "bulk-a", amount="5.0000"),
+                # Same day/accounts/amounts as bulk-a under a new external id.
+                _bundle(cash, income, "bulk-b", amount="5.0000"),
+                # Same as the pre-existing transaction.
+                _bundle(cash, income, "bulk-c", amount="7.0000", day="2026-01-09"),
+            ],
+            "correlation_id": "corr-bulk-seq",
+        },
+    ).json()
+
+    statuses = [item["status"] for item in body["results"]]
+    assert statuses == ["idempotent-replay", "committed", "idempotent-replay", "proposed", "proposed"]
+    assert body["results"][0]["output_hash"] == earlier["output_hash"]
+    assert body["results"][2]["transaction_id"] == body["results"][1]["transaction_id"]
+    assert [m["external_id"] for m in body["results"][3]["matched_transactions"]] == ["bulk-a"]
+    assert body["results"][3]["matched_transactions"][0]["postings"][0]["posting_id"] in body["results"][1]["posting_ids"]
+    assert [m["external_id"] for m in body["results"][4]["matched_transactions"]] == ["bulk-existing"]
+    assert (body["committed_count"], body["proposed_count"], body["replayed_count"]) == (1, 2, 2)
+
+    # The proposal is the same one the single-bundle tool would have created.
+    single = record_transaction_bundle(_bundle(cash, income, "bulk-b", amount="5.0000"))
+    assert single["proposal_id"] == body["results"][3]["proposal_id"]
+    assert single["output_hash"] == body["results"][3]["output_hash"]
+
+
+def test_velocity_rules_see_items_committed_earlier_in_the_batch(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, income = _seed_accounts()
+    with transaction() as conn:
+        conn.execute(
+            """
+            INSERT INTO policy_rules (
+              rule_id, priority, tool_name, velocity_limit_count, velocity_window_seconds,
+              threshold_amount, required_approvals, active
+            ) VALUES ('rule-bulk-velocity', 1, 'record_transaction_bundle', 1, 86400, '9999.0000', 1, 1)
+            """
+        )
+
+    client = TestClient(app, headers=AUTH_HEADERS)
+    body = client.post(
+        "/tools/record_transaction_bundles",
+        json={
+            "bundles": [
+                _bundle(cash, income, "bulk-v1", amount="1.0000"),
+                _bundle(cash, income, "bulk-v2", amount="2.0000"),
+            ],
+            "correlation_id": "corr-bulk-velocity",
+        },
+    ).json()
+    assert [item["status"] for item in body["results"]] == ["committed", "proposed"]
+    assert body["results"][1]["matched_rule_id"] == "rule-bulk-velocity"
+
+
+def test_invalid_item_rejects_whole_batch_before_writing(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, income = _seed_accounts()
+    client = TestClient(app, headers=AUTH_HEADERS)
+    unbalanced = _bundle(cash, income, "bulk-bad")
+    unbalanced["postings"][1]["amount"] = "-9.0000"
+    response = client.post(
+        "/tools/record_transaction_bundles",
+        json={"bundles": [_bundle(cash, income, "bulk-ok"), unbalanced], "correlation_id": "corr-bulk-bad"},
+    )
+    assert response.status_code == 400
+    assert "bundles[1]" in response.json()["detail"]["message"]
+
+    with transaction() as conn:
+        conn.execute(
+            """
+            INSERT INTO accounting_periods (period_id, period_key, entity_id, status, correlation_id)
+            VALUES ('period-bulk', '2026-02', 'entity-default', 'locked', 'corr-lock')
+            """
+        )
+    locked = client.post(
+        "/tools/record_transaction_bundles",
+        json={
+            "bundles": [_bundle(cash, income, "bulk-jan"), _bundle(cash, income, "bulk-feb", day="2026-02-02")],
+            "correlation_id": "corr-bulk-locked",
+        },
+    )
+    assert locked.status_code == 400
+    assert "bundles[1]: period_locked" in locked.json()["detail"]["message"]
+    assert _counts() == {"ledger_transactions": 0, "ledger_postings": 0, "approval_proposals": 0}
+
+    empty = client.post("/tools/record_transaction_bundles", json={"bundles": [], "correlation_id": "corr-bulk-empty"})
+    assert empty.status_code == 422
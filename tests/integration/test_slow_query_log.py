@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+from typer.testing import CliRunner
+
+from capital_os.api.app import app
+from capital_os.cli.main import app as cli_app
+from capital_os.config import get_settings
+from capital_os.db.session import close_connection_pools, read_only_connection, transaction
+from capital_os.db.slow_query_log import normalize_sql, read_slow_queries
+from capital_os.domain.ledger.repository import create_account
+from tests.support.auth import AUTH_HEADERS
+
+
+@pytest.fixture
+def slow_query_log(tmp_path: Path, monkeypatch):
+    def configure(**env: str) -> Path:
+        path = tmp_path / "slow.jsonl"
+        monkeypatch.setenv("CAPITAL_OS_SLOW_QUERY_LOG", str(path))
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        get_settings.cache_clear()
+        # Connections pick their class when opened.
+        close_connection_pools()
+        return path
+
+    yield configure
+    monkeypatch.delenv("CAPITAL_OS_SLOW_QUERY_MS", raising=False)
+    get_settings.cache_clear()
+    close_connection_pools()
+
+
+def test_normalize_sql_replaces_literals_and_shortens_lists():
+    sql = """
+        SELECT * FROM t  -- comment
+        WHERE a IN (?, ?, ?) AND b = 'it''s' AND c > 12.5 AND d = ?1
+    """
+    assert normalize_sql(sql) == "SELECT * FROM t WHERE a IN (?, ...) AND b = ? AND c > ? AND d = ?1"
+    assert normalize_sql("INSERT INTO t (a, b) VALUES (?, ?), (?, ?), (?, ?)") == "INSERT INTO t (a, b) VALUES (?, ...), ..."
+    assert normalize_sql("SAVEPOINT sp_17") == normalize_sql("SAVEPOINT sp_4")
+
+
+def test_statements_of_a_tool_call_are_attributed_to_it(db_available, slow_query_log):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    path = slow_query_log(CAPITAL_OS_SLOW_QUERY_MS="0")
+    with transaction() as conn:
+        for index in range(3):
+            create_account(conn, {"code": f"100{index}", "name": f"Cash {index}", "account_type": "asset"})
+    client = TestClient(app, headers=AUTH_HEADERS)
+    response = client.post("/tools/list_accounts", json={"correlation_id": "corr-slow-1"})
+    assert response.status_code == 200
+
+    records = [record for record in read_slow_queries(path) if record["correlation_id"] == "corr-slow-1"]
+    assert records and all(record["tool"] == "list_accounts" for record in records)
+    account_reads = [record for record in records if "FROM accounts" in record["sql"]]
+    assert account_reads
+    assert max(record["rows"] for record in account_reads) == 3
+    assert all("'" not in record["sql"] for record in records)
+    unattributed = [record for record in read_slow_queries(path) if record["tool"] is None]
+    assert any(record["sql"].startswith("INSERT INTO accounts") and record["rows"] == 1 for record in unattributed)
+
+
+def test_disabled_log_uses_plain_connections(db_available, slow_query_log):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    path = slow_query_log()
+    with read_only_connection() as conn:
+        assert type(conn) is sqlite3.Connection
+        conn.execute("SELECT 1").fetchall()
+    assert not path.exists()
+
+
+def test_log_rotates_and_top_aggregates_rotated_files(db_available, slow_query_log):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    path = slow_query_log(
+        CAPITAL_OS_SLOW_QUERY_MS="0",
+        CAPITAL_OS_SLOW_QUERY_LOG_MAX_BYTES="4096",
+        CAPITAL_OS_SLOW_QUERY_LOG_BACKUPS="2",
+    )
+    with read_only_connection() as conn:
+        for value in range(200):
+            conn.execute("SELECT ? + 1", (value,)).fetchone()
+        conn.execute("SELECT count(*) FROM accounts").fetchone()
+
+    files = sorted(path.parent.glob("slow.jsonl*"))
+    assert [item.name for item in files] == ["slow.jsonl", "slow.jsonl.1", "slow.jsonl.2"]
+    assert all(item.stat().st_size <= 4096 for item in files)
+
+    result = CliRunner().invoke(cli_app, ["slow-queries", "top", "--sort", "count", "--limit", "1"])
+    assert result.exit_code == 0, result.output
+    output = json.loads(result.output)
+    assert output["log"] == str(path)
+    [top] = output["queries"]
+    assert top["sql"] == "SELECT ? + ?"
+    kept = [record for record in read_slow_queries(path) if record["query_id"] == top["query_id"]]
+    assert top["count"] == len(kept) < 200
+
+    result = CliRunner().invoke(cli_app, ["slow-queries", "top", "--sort", "median"])
+    assert result.exit_code == 1
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from capital_os.cli.main import app as cli_app
+from capital_os.db.session import read_only_connection, transaction
+from capital_os.domain.ledger import statement_import
+from capital_os.domain.ledger.repository import create_account
+from capital_os.domain.ledger.statement_import import (
+    StatementImportError,
+    iter_statement_bundles,
+    iter_statement_rows,
+    parse_statement_mapping,
+)
+
+
+def _seed_accounts() -> dict[str, str]:
+    with transaction() as conn:
+        return {
+            "cash": create_account(conn, {"code": "1000", "name": "Checking", "account_type": "asset"}),
+            "income": create_account(conn, {"code": "4000", "name": "Income", "account_type": "income"}),
+            "payroll": create_account(conn, {"code": "4100", "name": "Payroll", "account_type": "income"}),
+            "expense": create_account(conn, {"code": "5000", "name": "Spend", "account_type": "expense"}),
+        }
+
+
+def _csv_mapping(accounts: dict[str, str]) -> dict:
+    return {
+        "version": 1,
+        "format": "csv",
+        "source_system": "bank:checking",
+        "account_id": accounts["cash"],
+        "counter_account_id": accounts["expense"],
+        "date_format": "%m/%d/%Y",
+        "columns": {"date": "Posted", "debit": "Debit", "credit": "Credit", "description": ["Payee", "Memo"]},
+        "rules": [{"contains": "payroll", "counter_account_id": accounts["payroll"]}],
+    }
+
+
+def _write(tmp_path: Path, name: str, content: str) -> str:
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    return str(path)
+
+
+def _transactions() -> list[dict]:
+    with read_only_connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT t.external_id, t.transaction_date, t.description, p.account_id, p.amount_units
+            FROM ledger_transactions t JOIN ledger_postings p ON p.transaction_id = t.transaction_id
+            WHERE p.amount_units > 0
+            ORDER BY t.transaction_date, t.external_id
+            """
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def test_csv_rows_map_to_bundles_with_stable_derived_ids(db_available, tmp_path: Path):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    accounts = _seed_accounts()
+    mapping = parse_statement_mapping(_csv_mapping(accounts))
+    statement = _write(
+        tmp_path,
+        "checking.csv",
+        "Posted,Payee,Memo,Debit,Credit\n"
+        "01/02/2026,ACME PAYROLL,Jan,,\"1,500.00\"\n"
+        "01/03/2026,Coffee,,4.50,\n"
+        "01/03/2026,Coffee,,4.50,\n"
+        "01/04/2026,Fee reversal,,,\n",
+    )
+
+    pairs = list(iter_statement_bundles(iter_statement_rows(statement, mapping), mapping, correlation_id="imp"))
+    bundles = [bundle for _row, bundle in pairs if bundle is not None]
+    assert [row.line for row, bundle in pairs if bundle is None] == [5]
+    assert [b["postings"] for b in bundles[:2]] == [
+        [
+            {"account_id": accounts["cash"], "amount": "1500.0000", "currency": "USD"},
+            {"account_id": accounts["payroll"], "amount": "-1500.0000", "currency": "USD"},
+        ],
+        [
+            {"account_id": accounts["cash"], "amount": "-4.5000", "currency": "USD"},
+            {"account_id": accounts["expense"], "amount": "4.5000", "currency": "USD"},
+        ],
+    ]
+    assert bundles[0]["description"] == "ACME PAYROLL Jan"
+    assert bundles[0]["date"] == "2026-01-02T00:00:00Z"
+    assert bundles[0]["correlation_id"] == "imp:2"
+    # Identical rows get distinct, reproducible ids.
+    assert bundles[1]["external_id"] != bundles[2]["external_id"]
+    again = list(iter_statement_bundles(iter_statement_rows(statement, mapping), mapping, correlation_id="other"))
+    assert [b["external_id"] for _row, b in again if b] == [b["external_id"] for b in bundles]
+
+    bad = _write(tmp_path, "bad.csv", "Posted,Payee,Memo,Debit,Credit\n01/02/2026,x,,1.00001,\n")
+    with pytest.raises(StatementImportError, match="line 2"):
+        list(iter_statement_rows(bad, mapping))
+    with pytest.raises(StatementImportError, match="columns must map amount"):
+        parse_statement_mapping({**_csv_mapping(accounts), "columns": {"date": "Posted"}})
+
+
+def test_ofx_statement_uses_fitid_and_reads_sgml(db_available, tmp_path: Path):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    accounts = _seed_accounts()
+    mapping_path = _write(
+        tmp_path,
+        "ofx.json",
+        json.dumps(
+            {
+                "version": 1,
+                "format": "ofx",
+                "source_system": "bank:ofx",
+                "account_id": accounts["cash"],
+                "counter_account_id": accounts["income"],
+            }
+        ),
+    )
+    statement = _write(
+        tmp_path,
+        "statement.ofx",
+        "OFXHEADER:100\nDATA:OFXSGML\n\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>\n"
+        "<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20260105120000[-5:EST]<TRNAMT>25.00<FITID>F-1<NAME>Refund</STMTTRN>\n"
+        "<STMTTRN>\n<TRNTYPE>DEBIT\n<DTPOSTED>20260106\n<TRNAMT>-10.25\n<FITID>F-2\n<NAME>Shop\n<MEMO>card\n</STMTTRN>\n"
+        "</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n",
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(cli_app, ["ledger", "import", statement, "--mapping", mapping_path])
+    assert result.exit_code == 0, result.output
+    summary = json.loads(result.stdout)
+    assert (summary["rows"], summary["committed"], summary["complete"]) == (2, 2, True)
+    assert [(t["external_id"], t["description"]) for t in _transactions()] == [("F-1", "Refund"), ("F-2", "Shop card")]
+
+    replay = json.loads(runner.invoke(cli_app, ["ledger", "import", statement, "--mapping", mapping_path]).stdout)
+    assert (replay["committed"], replay["replayed"]) == (0, 2)
+
+
+def test_cli_import_commits_per_chunk_and_resumes(db_available, tmp_path: Path, monkeypatch):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    accounts = _seed_accounts()
+    mapping_path = _write(tmp_path, "checking.yaml", json.dumps(_csv_mapping(accounts)))
+    lines = ["Posted,Payee,Memo,Debit,Credit"]
+    lines += [f"01/{day % 28 + 1:02d}/2026,Shop {day},,{day + 1}.00," for day in range(10)]
+    statement = _write(tmp_path, "checking.csv", "\n".join(lines) + "\n")
+    ckpt = str(tmp_path / "checking.ckpt")
+    args = ["ledger", "import", statement, "--mapping", mapping_path, "--chunk-size", "3", "--checkpoint-file", ckpt]
+
+    # First run fails on the eighth row, after two committed chunks.
+    real_iter_rows = statement_import.iter_statement_rows
+
+    def failing_iter_rows(path, mapping):
+        for index, row in enumerate(real_iter_rows(path, mapping)):
+            if index == 7:
+                raise StatementImportError(f"line {row.line}: disk went away")
+            yield row
+
+    monkeypatch.setattr(statement_import, "iter_statement_rows", failing_iter_rows)
+    runner = CliRunner()
+    failed = runner.invoke(cli_app, args)
+    assert failed.exit_code == 1
+    assert "line 9: disk went away" in failed.stderr
+    progress = [json.loads(line) for line in failed.stderr.splitlines() if line.startswith('{"event"')]
+    assert [p["rows"] for p in progress] == [3, 6]
+    assert all(p["rows_per_sec"] > 0 for p in progress)
+    assert json.loads(Path(ckpt).read_text())["rows"] == 6
+    assert len(_transactions()) == 6
+
+    # The resumed run only submits the rows after the checkpoint.
+    monkeypatch.setattr(statement_import, "iter_statement_rows", real_iter_rows)
+    resumed = runner.invoke(cli_app, args)
+    assert resumed.exit_code == 0, resumed.output
+    summary = json.loads(resumed.stdout)
+    assert (summary["rows"], summary["chunks"], summary["committed"], summary["replayed"]) == (10, 4, 10, 0)
+    assert len(_transactions()) == 10
+    assert json.loads(runner.invoke(cli_app, args).stdout)["status"] == "complete"
+
+    # Without a checkpoint the whole file replays idempotently.
+    replay = runner.invoke(cli_app, args[:-2])
+    assert (json.loads(replay.stdout)["committed"], json.loads(replay.stdout)["replayed"]) == (0, 10)
+
+    # A changed statement is refused against the old checkpoint.
+    Path(statement).write_text("\n".join(lines[:5]) + "\n", encoding="utf-8")
+    assert runner.invoke(cli_app, args).exit_code == 1
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from capital_os.config import get_settings
+from capital_os.db.session import transaction
+from capital_os.domain.ledger.repository import create_account
+from capital_os.runtime.execute_tool import execute_tool
+
+
+@pytest.fixture
+def tracing(tmp_path: Path, monkeypatch):
+    def configure(**env: str) -> Path:
+        path = tmp_path / "traces.jsonl"
+        monkeypatch.setenv("CAPITAL_OS_TRACE_PATH", str(path))
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        get_settings.cache_clear()
+        return path
+
+    yield configure
+    get_settings.cache_clear()
+
+
+def _tool(tool_name: str, payload: dict):
+    result = execute_tool(
+        tool_name,
+        payload,
+        actor_id="actor-trace",
+        authn_method="header_token",
+        authorization_result="allowed",
+    )
+    assert result.success, result.payload
+    return result
+
+
+def _record_bundle() -> None:
+    with transaction() as conn:
+        cash = create_account(conn, {"code": "1000", "name": "Cash", "account_type": "asset"})
+        income = create_account(conn, {"code": "4000", "name": "Income", "account_type": "income"})
+    _tool(
+        "record_transaction_bundle",
+        {
+            "source_system": "trace",
+            "external_id": "t-1",
+            "date": "2026-01-05T12:00:00Z",
+            "description": "traced",
+            "postings": [
+                {"account_id": cash, "amount": "10.0000", "currency": "USD"},
+                {"account_id": income, "amount": "-10.0000", "currency": "USD"},
+            ],
+            "correlation_id": "corr-trace",
+        },
+    )
+
+
+def test_write_tool_phases_are_exported_as_json_lines(db_available, tracing):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    path = tracing(CAPITAL_OS_TRACE="1")
+    _record_bundle()
+
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    assert {span["trace_id"] for span in spans} == {spans[0]["trace_id"]}
+    assert {span["correlation_id"] for span in spans} == {"corr-trace"}
+    by_name = {span["name"]: span for span in spans}
+    assert set(by_name) >= {
+        "execute_tool",
+        "payload_hash",
+        "run_write",
+        "validate_input",
+        "record_transaction_bundle",
+        "resolve_idempotency",
+        "evaluate_transaction_policy",
+        "find_duplicate_risk_matches",
+        "insert_transaction_bundle",
+        "log_event",
+        "validate_output",
+        "serialize_output",
+    }
+
+    root = spans[0]
+    assert root["name"] == "execute_tool" and root["parent_span_id"] is None
+    assert root["attributes"] == {"tool": "record_transaction_bundle", "correlation_id": "corr-trace", "status": "ok"}
+    # Spans opened on the writer thread nest under the request's run_write span.
+    assert by_name["record_transaction_bundle"]["parent_span_id"] == by_name["run_write"]["span_id"]
+    for name in ("evaluate_transaction_policy", "find_duplicate_risk_matches", "log_event"):
+        assert by_name[name]["parent_span_id"] == by_name["record_transaction_bundle"]["span_id"]
+    assert by_name["insert_transaction_bundle"]["attributes"] == {"postings": 2}
+    assert all(span["duration_ms"] <= root["duration_ms"] for span in spans)
+
+
+def test_otlp_export_writes_one_resource_spans_request_per_trace(db_available, tracing):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    path = tracing(CAPITAL_OS_TRACE="1", CAPITAL_OS_TRACE_FORMAT="otlp")
+    _tool("list_accounts", {"limit": 5, "correlation_id": "corr-otlp-1"})
+    _tool("list_accounts", {"limit": 5, "correlation_id": "corr-otlp-2"})
+
+    exports = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(exports) == 2
+    resource_spans = exports[0]["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"] == [{"key": "service.name", "value": {"stringValue": "capital-os"}}]
+    spans = resource_spans["scopeSpans"][0]["spans"]
+    root, children = spans[0], spans[1:]
+    assert root["name"] == "execute_tool" and "parentSpanId" not in root
+    assert {"key": "correlation_id", "value": {"stringValue": "corr-otlp-1"}} in root["attributes"]
+    assert len(root["traceId"]) == 32 and len(root["spanId"]) == 16
+    span_ids = {span["spanId"] for span in spans}
+    assert children and all(span["parentSpanId"] in span_ids for span in children)
+    assert all(int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"]) for span in spans)
+
+
+def test_nothing_is_exported_when_tracing_is_disabled(db_available, tracing):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    path = tracing()
+    _tool("list_accounts", {"limit": 5, "correlation_id": "corr-untraced"})
+    assert not path.exists()
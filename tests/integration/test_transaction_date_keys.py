@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from pathlib import Path
+import shutil
+import sqlite3
+
+import pytest
+
+from capital_os.db.migrations import apply_pending_migrations
+from capital_os.db.session import transaction
+from capital_os.domain.ledger.repository import (
+    create_account,
+    fetch_account_balance_context,
+    find_duplicate_risk_matches,
+)
+from capital_os.domain.ledger.service import record_transaction_bundle
+from capital_os.domain.policy.service import evaluate_transaction_policy
+
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+
+def _seed() -> tuple[str, str]:
+    with transaction() as conn:
+        cash = create_account(conn, {"code": "1000", "name": "Cash", "account_type": "asset"})
+        income = create_account(conn, {"code": "4000", "name": "Income", "account_type": "income"})
+        conn.execute(
+            """
+            INSERT INTO policy_rules (
+              rule_id, priority, tool_name, velocity_limit_count, velocity_window_seconds,
+              threshold_amount, required_approvals, active
+            ) VALUES ('rule-velocity-keys', 1, 'record_transaction_bundle', 5, 86400, '9999.0000', 1, 1)
+            """
+        )
+    return cash, income
+
+
+def _bundle(cash: str, income: str, external_id: str, date: str, amount: str = "3.0000") -> dict:
+    return {
+        "source_system": "pytest",
+        "external_id": external_id,
+        "date": date,
+        "description": "date keys",
+        "postings": [
+            {"account_id": cash, "amount": amount, "currency": "USD"},
+            {"account_id": income, "amount": f"-{amount}", "currency": "USD"},
+        ],
+        "correlation_id": f"corr-{external_id}",
+    }
+
+
+def _query_plans(conn, statements: list[str], table: str) -> list[str]:
+    plans = []
+    for sql in statements:
+        if table not in sql or not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            continue
+        plans.append(" | ".join(row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")))
+    return plans
+
+
+def test_generated_keys_normalize_to_utc(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, income = _seed()
+    record_transaction_bundle(_bundle(cash, income, "keys-z", "2026-01-10T23:30:00Z"))
+    record_transaction_bundle(_bundle(cash, income, "keys-offset", "2026-01-11T01:00:00+05:00", amount="4.0000"))
+
+    with transaction() as conn:
+        rows = {
+            row["external_id"]: (row["transaction_day"], row["transaction_epoch"])
+            for row in conn.execute("SELECT external_id, transaction_day, transaction_epoch FROM ledger_transactions")
+        }
+    assert rows == {
+        "keys-z": (20260110, 1768087800),
+        "keys-offset": (20260110, 1768075200),
+    }
+
+
+def test_hot_queries_range_scan_date_key_indexes(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    cash, income = _seed()
+    for i in range(3):
+        record_transaction_bundle(_bundle(cash, income, f"keys-{i}", f"2026-01-1{i}T09:00:00Z"))
+
+    statements: list[str] = []
+    with transaction() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            matches = find_duplicate_risk_matches(
+                conn,
+                effective_date="2026-01-11T18:00:00Z",
+                postings=[{"account_id": cash, "amount": "3.0000"}],
+            )
+            decision = evaluate_transaction_policy(
+                conn,
+                payload=_bundle(cash, income, "keys-probe", "2026-01-12T10:00:00Z"),
+                impact_amount=Decimal("3.0000"),
+                tool_name="record_transaction_bundle",
+            )
+            fetch_account_balance_context(conn, account_id=cash, as_of_date="2026-01-31")
+        finally:
+            conn.set_trace_callback(None)
+
+        transaction_plans = _query_plans(conn, statements, "transaction_day")
+        velocity_plans = _query_plans(conn, statements, "transaction_epoch")
+        snapshot_plans = _query_plans(conn, statements, "balance_snapshots")
+
+    assert [m["external_id"] for m in matches] == ["keys-1"]
+    assert decision.matched_rule_id is None
+
+    # Duplicate-risk matching seeks the day-keyed posting fingerprint table.
+    assert transaction_plans and all(
+        "SEARCH ledger_posting_fingerprints USING PRIMARY KEY (transaction_day=? AND account_id=? AND amount_units=?)"
+        in plan
+        for plan in transaction_plans
+    )
+    assert velocity_plans and all(
+        "idx_ledger_transactions_source_entity_epoch (source_system=? AND entity_id=? AND transaction_epoch>? AND transaction_epoch<?)"
+        in plan
+        for plan in velocity_plans
+    )
+    assert snapshot_plans and all(
+        "SEARCH s USING INDEX" in plan and "(account_id=? AND snapshot_date<?)" in plan for plan in snapshot_plans
+    )
+
+
+def test_keys_cover_rows_written_before_the_migration(tmp_path: Path):
+    legacy_dir = tmp_path / "migrations"
+    legacy_dir.mkdir()
+    for path in MIGRATIONS_DIR.glob("*.sql"):
+        if path.name < "0014_":
+            shutil.copy(path, legacy_dir / path.name)
+
+    db_path = tmp_path / "keys.db"
+    apply_pending_migrations(db_path, legacy_dir)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(
+            """
+            INSERT INTO ledger_transactions (
+              transaction_id, source_system, external_id, transaction_date, description, correlation_id, input_hash
+            ) VALUES ('t1', 'legacy', 'legacy-1', '2025-12-31T23:59:59Z', 'legacy', 'corr-legacy', 'hash')
+            """
+        )
+        conn.commit()
+        conn.close()
+
+        for path in MIGRATIONS_DIR.glob("0014_*.sql"):
+            shutil.copy(path, legacy_dir / path.name)
+        apply_pending_migrations(db_path, legacy_dir)
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute(
+            "SELECT transaction_day, transaction_epoch FROM ledger_transactions WHERE transaction_id='t1'"
+        ).fetchone() == (20251231, 1767225599)
+    finally:
+        conn.close()
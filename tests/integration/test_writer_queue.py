@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import pytest
+
+from capital_os.db.session import transaction
+from capital_os.db.writer import WriterService
+from capital_os.domain.ledger.repository import create_account
+from capital_os.runtime.execute_tool import execute_tool
+from capital_os.security.context import (
+    RequestSecurityContext,
+    clear_request_security_context,
+    get_request_security_context,
+    set_request_security_context,
+)
+
+
+def _insert_account(code: str) -> str:
+    with transaction() as conn:
+        return create_account(conn, {"code": code, "name": f"Writer {code}", "account_type": "asset"})
+
+
+def _account_codes() -> list[str]:
+    with transaction() as conn:
+        rows = conn.execute("SELECT code FROM accounts ORDER BY code").fetchall()
+    return [row["code"] for row in rows]
+
+
+def test_writer_group_commits_queued_units_in_one_batch(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    writer = WriterService(batch_max=64, queue_max=64, put_timeout_seconds=5.0)
+    started = threading.Event()
+    gate = threading.Event()
+
+    def _blocking_unit() -> str:
+        started.set()
+        gate.wait(5)
+        return _insert_account("W-000")
+
+    try:
+        with ThreadPoolExecutor(max_workers=9) as executor:
+            first = executor.submit(writer.submit, _blocking_unit)
+            assert started.wait(5)
+            deadline = time.monotonic() + 5
+            rest = [
+                executor.submit(writer.submit, lambda code=f"W-{i:03d}": _insert_account(code))
+                for i in range(1, 9)
+            ]
+            while writer._queue.qsize() < 8 and time.monotonic() < deadline:
+                time.sleep(0.001)
+            gate.set()
+            results = [first.result(timeout=5), *[future.result(timeout=5) for future in rest]]
+
+        assert len(set(results)) == 9
+        stats = writer.stats()
+        assert stats["units"] == 9
+        assert stats["batches"] == 2
+        assert stats["max_batch_size"] == 8
+        assert _account_codes() == [f"W-{i:03d}" for i in range(9)]
+    finally:
+        writer.stop()
+
+
+def test_writer_rolls_back_only_the_failing_unit(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    writer = WriterService(batch_max=64, queue_max=64, put_timeout_seconds=5.0)
+    started = threading.Event()
+    gate = threading.Event()
+
+    def _failing_unit() -> None:
+        with transaction() as conn:
+            create_account(conn, {"code": "W-BAD", "name": "Writer bad", "account_type": "asset"})
+            raise ValueError("unit failure")
+
+    def _blocking_unit() -> str:
+        started.set()
+        gate.wait(5)
+        return _insert_account("W-FIRST")
+
+    try:
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            first = executor.submit(writer.submit, _blocking_unit)
+            assert started.wait(5)
+            bad = executor.submit(writer.submit, _failing_unit)
+            good = executor.submit(writer.submit, lambda: _insert_account("W-GOOD"))
+            deadline = time.monotonic() + 5
+            while writer._queue.qsize() < 2 and time.monotonic() < deadline:
+                time.sleep(0.001)
+            gate.set()
+
+            assert first.result(timeout=5)
+            assert good.result(timeout=5)
+            with pytest.raises(ValueError, match="unit failure"):
+                bad.result(timeout=5)
+
+        assert _account_codes() == ["W-FIRST", "W-GOOD"]
+        assert writer.stats()["batch_retries"] == 0
+    finally:
+        writer.stop()
+
+
+def test_write_tools_run_on_writer_thread_with_caller_security_context(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    result = execute_tool(
+        "create_account",
+        {"code": "W-TOOL", "name": "Writer Tool", "account_type": "asset", "correlation_id": "corr-writer-tool"},
+        actor_id="actor-writer",
+        authn_method="header_token",
+        authorization_result="allowed",
+    )
+    assert result.success
+
+    with transaction() as conn:
+        row = conn.execute(
+            "SELECT actor_id, authn_method FROM event_log WHERE correlation_id='corr-writer-tool'"
+        ).fetchone()
+    assert row["actor_id"] == "actor-writer"
+    assert row["authn_method"] == "header_token"
+
+
+def test_concurrent_write_tools_do_not_surface_lock_errors(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    with transaction() as conn:
+        debit = create_account(conn, {"code": "1001", "name": "Writer Cash", "account_type": "asset"})
+        credit = create_account(conn, {"code": "3001", "name": "Writer Equity", "account_type": "equity"})
+
+    def _record(i: int):
+        return execute_tool(
+            "record_transaction_bundle",
+            {
+                "source_system": "pytest-writer",
+                "external_id": f"writer-{i}",
+                "date": f"2026-01-{(i % 28) + 1:02d}T00:00:00Z",
+                "description": "writer queue",
+                "postings": [
+                    {"account_id": debit, "amount": f"{i + 1}.0000", "currency": "USD"},
+                    {"account_id": credit, "amount": f"-{i + 1}.0000", "currency": "USD"},
+                ],
+                "correlation_id": f"corr-writer-{i}",
+            },
+            actor_id="actor-writer",
+            authn_method="header_token",
+            authorization_result="allowed",
+        )
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(_record, range(48)))
+
+    assert all(result.success for result in results), [r.payload for r in results if not r.success]
+    assert {result.payload["status"] for result in results} == {"committed"}
+    with transaction() as conn:
+        count = conn.execute("SELECT COUNT(*) AS c FROM ledger_transactions").fetchone()["c"]
+    assert count == 48
+
+
+def test_writer_units_see_submitter_context_vars(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    writer = WriterService(batch_max=4, queue_max=4, put_timeout_seconds=5.0)
+    token = set_request_security_context(
+        RequestSecurityContext(actor_id="ctx-actor", authn_method="trusted_cli", authorization_result="allowed")
+    )
+    try:
+        seen = writer.submit(get_request_security_context)
+    finally:
+        clear_request_security_context(token)
+        writer.stop()
+    assert seen.actor_id == "ctx-actor"
@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from capital_os.db.session import transaction
+from capital_os.domain.ledger.service import record_transaction_bundles
+from capital_os.domain.query.service import query_account_tree
+
+
+@pytest.mark.performance
+def test_rolled_up_tree_for_twenty_thousand_accounts(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    rows = [("acct-root", "1", "Assets", None)]
+    rows += [(f"acct-g{g}", f"1-{g:02d}", f"Group {g}", "acct-root") for g in range(20)]
+    rows += [(f"acct-g{g}-s{s}", f"1-{g:02d}-{s:02d}", "Sub", f"acct-g{g}") for g in range(20) for s in range(20)]
+    rows += [
+        (f"acct-g{g}-s{s}-l{l}", f"1-{g:02d}-{s:02d}-{l:02d}", "Leaf", f"acct-g{g}-s{s}")
+        for g in range(20)
+        for s in range(20)
+        for l in range(49)
+    ]
+    with transaction() as conn:
+        conn.executemany(
+            "INSERT INTO accounts (account_id, code, name, account_type, parent_account_id) VALUES (?, ?, ?, 'asset', ?)",
+            rows,
+        )
+        conn.execute("INSERT INTO accounts (account_id, code, name, account_type) VALUES ('acct-eq', '3', 'Eq', 'equity')")
+    assert len(rows) > 20_000
+
+    leaves = [row[0] for row in rows if "-l" in row[0]][::20]
+    record_transaction_bundles(
+        {
+            "bundles": [
+                {
+                    "source_system": "perf",
+                    "external_id": f"tree-{i}",
+                    "date": "2026-01-10T00:00:00Z",
+                    "description": "tree",
+                    "postings": [
+                        {"account_id": leaf, "amount": "1.0000", "currency": "USD"},
+                        {"account_id": "acct-eq", "amount": "-1.0000", "currency": "USD"},
+                    ],
+                    "correlation_id": f"corr-tree-{i}",
+                }
+                for i, leaf in enumerate(leaves)
+            ],
+            "correlation_id": "corr-tree-seed",
+        }
+    )
+
+    started = time.perf_counter()
+    tree = query_account_tree(None, as_of_date="2026-01-31")
+    elapsed = time.perf_counter() - started
+
+    root = next(node for node in tree["accounts"] if node["account_id"] == "acct-root")
+    assert root["rolled_up_balance"] == len(leaves)
+    assert sum(group["rolled_up_balance"] for group in root["children"]) == len(leaves)
+    assert elapsed < 2.0
@@ -0,0 +1,54 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from capital_os.api.app import app
+from capital_os.db.session import transaction
+from capital_os.domain.ledger.repository import create_account
+from tests.support.auth import AUTH_HEADERS
+
+
+def _bundles(cash: str, income: str, prefix: str, count: int, *, offset: int = 0) -> list[dict]:
+    return [
+        {
+            "source_system": "bank-feed",
+            "external_id": f"{prefix}-{i}",
+            "date": f"2026-01-{i % 28 + 1:02d}T00:00:00Z",
+            "description": "perf import",
+            "postings": [
+                {"account_id": cash, "amount": f"{i + 1 + offset}.0000", "currency": "USD"},
+                {"account_id": income, "amount": f"-{i + 1 + offset}.0000", "currency": "USD"},
+            ],
+            "correlation_id": f"corr-{prefix}-{i}",
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.performance
+def test_bulk_import_over_http_beats_one_call_per_bundle(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    with transaction() as conn:
+        cash = create_account(conn, {"code": "1000", "name": "Cash", "account_type": "asset"})
+        income = create_account(conn, {"code": "4000", "name": "Income", "account_type": "income"})
+
+    count = 200
+    client = TestClient(app, headers=AUTH_HEADERS)
+
+    started = time.perf_counter()
+    for bundle in _bundles(cash, income, "single", count):
+        assert client.post("/tools/record_transaction_bundle", json=bundle).json()["status"] == "committed"
+    single_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    response = client.post(
+        "/tools/record_transaction_bundles",
+        json={"bundles": _bundles(cash, income, "batch", count, offset=count), "correlation_id": "corr-perf-batch"},
+    )
+    batch_seconds = time.perf_counter() - started
+
+    assert response.json()["committed_count"] == count
+    assert batch_seconds * 4 < single_seconds
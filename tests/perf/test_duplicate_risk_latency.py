@@ -0,0 +1,69 @@
+import statistics
+import time
+
+import pytest
+
+from capital_os.db.session import transaction
+from capital_os.domain.ledger.repository import (
+    create_account,
+    find_duplicate_risk_matches,
+    insert_transaction_bundles,
+    prepare_transaction_bundle,
+)
+
+
+def _seed_history(cash: str, income: str, start: int, count: int) -> None:
+    # Every transaction lands on the same day and account, the worst case for
+    # a match that has to look at all of the day's postings.
+    with transaction() as conn:
+        insert_transaction_bundles(
+            conn,
+            [
+                prepare_transaction_bundle(
+                    {
+                        "source_system": "perf-history",
+                        "external_id": f"hist-{i}",
+                        "date": "2026-03-15T12:00:00Z",
+                        "description": "busy day",
+                        "postings": [
+                            {"account_id": cash, "amount": f"{i + 1}.0000", "currency": "USD"},
+                            {"account_id": income, "amount": f"-{i + 1}.0000", "currency": "USD"},
+                        ],
+                        "correlation_id": f"corr-hist-{i}",
+                        "input_hash": f"hash-{i}",
+                    }
+                )
+                for i in range(start, start + count)
+            ],
+        )
+
+
+def _median_match_ms(cash: str, income: str, amount: str) -> float:
+    postings = [{"account_id": cash, "amount": amount}, {"account_id": income, "amount": f"-{amount}"}]
+    timings = []
+    with transaction() as conn:
+        for _ in range(50):
+            started = time.perf_counter()
+            matches = find_duplicate_risk_matches(conn, effective_date="2026-03-15T18:00:00Z", postings=postings)
+            timings.append((time.perf_counter() - started) * 1000)
+    assert [m["external_id"] for m in matches] == [f"hist-{int(amount.split('.')[0]) - 1}"]
+    return statistics.median(timings)
+
+
+@pytest.mark.performance
+def test_duplicate_risk_match_latency_stays_flat_as_history_grows(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    with transaction() as conn:
+        cash = create_account(conn, {"code": "1000", "name": "Cash", "account_type": "asset"})
+        income = create_account(conn, {"code": "4000", "name": "Income", "account_type": "income"})
+
+    _seed_history(cash, income, 0, 200)
+    small_ms = _median_match_ms(cash, income, "100.0000")
+
+    _seed_history(cash, income, 200, 19_800)
+    large_ms = _median_match_ms(cash, income, "100.0000")
+
+    # 100x the same-day history; a day scan would grow by roughly that factor.
+    assert large_ms < small_ms * 3 + 0.5
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+import random
+
+import pytest
+
+from capital_os.db.query_plans import FIXTURE_KEYS, QUERY_PLAN_CASES, check_query_plans
+from capital_os.db.session import transaction
+from capital_os.domain.approval.repository import insert_decision, insert_proposal
+from capital_os.domain.ledger.repository import (
+    create_account,
+    insert_transaction_bundles,
+    prepare_transaction_bundle,
+    upsert_balance_snapshot,
+    upsert_obligation,
+)
+from capital_os.domain.periods.service import close_period
+from capital_os.observability.event_log import log_event
+
+
+ACCOUNT_COUNT = 60
+TRANSACTION_COUNT = 3000
+START_DAY = date(2025, 1, 1)
+
+
+def _seed_ledger(conn) -> dict:
+    rng = random.Random(21)
+    parents = [
+        create_account(conn, {"code": f"{kind}000", "name": kind, "account_type": account_type})
+        for kind, account_type in (("1", "asset"), ("2", "liability"), ("4", "income"), ("5", "expense"))
+    ]
+    accounts = []
+    for index in range(ACCOUNT_COUNT):
+        parent = parents[index % len(parents)]
+        account_type = ("asset", "liability", "income", "expense")[index % len(parents)]
+        accounts.append(
+            create_account(
+                conn,
+                {
+                    "code": f"{index % len(parents) + 1}{index + 1:03d}",
+                    "name": f"Account {index}",
+                    "account_type": account_type,
+                    "parent_account_id": parent,
+                },
+            )
+        )
+
+    bundles = []
+    for index in range(TRANSACTION_COUNT):
+        debit, credit = rng.sample(accounts, 2)
+        amount = f"{rng.randint(100, 500_000) / 100:.4f}"
+        day = START_DAY + timedelta(days=rng.randrange(365))
+        bundles.append(
+            prepare_transaction_bundle(
+                {
+                    "source_system": rng.choice(("bank", "card", "payroll")),
+                    "external_id": f"qp-{index}",
+                    "date": f"{day.isoformat()}T12:00:00Z",
+                    "description": f"seed {index}",
+                    "correlation_id": f"corr-qp-{index}",
+                    "input_hash": f"hash-{index}",
+                    "postings": [
+                        {"account_id": debit, "amount": amount, "currency": "USD"},
+                        {"account_id": credit, "amount": f"-{amount}", "currency": "USD"},
+                    ],
+                }
+            )
+        )
+    for start in range(0, len(bundles), 500):
+        insert_transaction_bundles(conn, bundles[start : start + 500])
+
+    for index, account_id in enumerate(accounts):
+        for month in range(1, 13, 3):
+            upsert_balance_snapshot(
+                conn,
+                {
+                    "account_id": account_id,
+                    "snapshot_date": f"2025-{month:02d}-28",
+                    "balance": f"{index * 10 + month}.0000",
+                    "currency": "USD",
+                    "source_system": "statement",
+                },
+            )
+        if index % 3 == 0:
+            upsert_obligation(
+                conn,
+                {
+                    "source_system": "bills",
+                    "name": f"Obligation {index}",
+                    "account_id": account_id,
+                    "cadence": "monthly",
+                    "expected_amount": "100.0000",
+                    "next_due_date": (START_DAY + timedelta(days=index)).isoformat(),
+                    "active": index % 2 == 0,
+                },
+            )
+
+    proposal_ids = []
+    for index in range(200):
+        proposal_id = insert_proposal(
+            conn,
+            tool_name="record_transaction_bundle",
+            source_system="bank",
+            external_id=f"proposal-{index}",
+            correlation_id=f"corr-proposal-{index}",
+            input_hash=f"proposal-hash-{index}",
+            policy_threshold_amount="1000.0000",
+            impact_amount="5000.0000",
+            request_payload={"external_id": f"proposal-{index}"},
+        )
+        insert_decision(
+            conn,
+            proposal_id=proposal_id,
+            action="approve",
+            correlation_id=f"corr-decision-{index}",
+            reason=None,
+            approver_id=f"approver-{index % 5}",
+        )
+        proposal_ids.append(proposal_id)
+
+    for month in range(1, 7):
+        close_period(conn, {"period_key": f"2025-{month:02d}", "correlation_id": f"corr-close-{month}"})
+    for index in range(500):
+        log_event(
+            conn,
+            tool_name="list_accounts",
+            correlation_id=f"corr-event-{index}",
+            input_hash="in",
+            output_hash="out",
+            duration_ms=1,
+            status="ok",
+        )
+
+    sample = bundles[TRANSACTION_COUNT // 2]
+    debit = next(p for p in sample["postings"] if not p["amount"].startswith("-"))
+    credit = next(p for p in sample["postings"] if p["amount"].startswith("-"))
+    return {
+        "account_id": debit["account_id"],
+        "counter_account_id": credit["account_id"],
+        "root_account_id": parents[0],
+        "source_system": sample["source_system"],
+        "external_id": sample["external_id"],
+        "transaction_date": sample["date"],
+        "amount": debit["amount"],
+        "proposal_id": proposal_ids[100],
+        "approver_id": "approver-0",
+        "proposal_source_system": "bank",
+        "proposal_external_id": "proposal-100",
+        "period_date": "2025-03-15T00:00:00Z",
+        "as_of_date": "2025-09-30",
+        "start_date": "2025-03-01",
+        "end_date": "2025-03-31",
+    }
+
+
+@pytest.mark.performance
+def test_hot_queries_keep_their_expected_plans(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    with transaction() as conn:
+        fixture = _seed_ledger(conn)
+    assert set(fixture) == set(FIXTURE_KEYS)
+
+    with transaction() as conn:
+        conn.execute("ANALYZE")
+        violations = check_query_plans(conn, fixture)
+    assert violations == []
+    assert len(QUERY_PLAN_CASES) >= 20
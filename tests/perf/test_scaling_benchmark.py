@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from capital_os.db.session import transaction
+from capital_os.db.synthetic import SyntheticLedgerSpec, generate_synthetic_ledger
+from capital_os.db.testing import reset_test_database
+from capital_os.runtime.benchmark import BENCHMARK_PAYLOADS, append_history, find_superlinear, run_scaling_sweep
+from capital_os.runtime.execute_tool import TOOL_HANDLERS
+
+
+def _ledger_digest() -> list[tuple]:
+    with transaction() as conn:
+        return [
+            tuple(row)
+            for row in conn.execute(
+                """
+                SELECT t.transaction_id, t.external_id, t.transaction_date, p.posting_id, p.account_id, p.amount_units
+                FROM ledger_transactions t
+                JOIN ledger_postings p ON p.transaction_id = t.transaction_id
+                ORDER BY p.posting_id
+                """
+            )
+        ]
+
+
+@pytest.mark.performance
+def test_synthetic_ledger_is_deterministic_for_a_seed(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    spec = SyntheticLedgerSpec.for_transactions(300, seed=7)
+    first = generate_synthetic_ledger(spec)
+    digest = _ledger_digest()
+    reset_test_database()
+    second = generate_synthetic_ledger(spec)
+
+    assert _ledger_digest() == digest
+    assert first.account_ids == second.account_ids
+    assert first.transaction_keys == second.transaction_keys
+    assert len(digest) == first.posting_count > 2 * spec.transactions
+    with transaction() as conn:
+        counts = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("accounts", "balance_snapshots", "obligations", "approval_proposals", "event_log")
+        }
+    assert counts == {
+        "accounts": spec.accounts + 5,
+        "balance_snapshots": spec.accounts * spec.snapshots_per_account,
+        "obligations": spec.obligations,
+        "approval_proposals": spec.proposals,
+        "event_log": spec.events,
+    }
+
+
+@pytest.mark.performance
+def test_scaling_sweep_covers_every_tool_and_appends_history(db_available, tmp_path: Path):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    assert set(BENCHMARK_PAYLOADS) == set(TOOL_HANDLERS)
+    run = run_scaling_sweep((200, 800), prepare_database=lambda _size: reset_test_database(), repeats=2)
+
+    assert [entry["transactions"] for entry in run["sizes"]] == [200, 800]
+    assert set(run["tools"]) == set(TOOL_HANDLERS)
+    for series in run["tools"].values():
+        assert len(series["median_ms"]) == 2 and len(series["exponents"]) == 1
+    assert isinstance(run["superlinear"], list)
+
+    history = tmp_path / "scaling-history.json"
+    append_history(history, run)
+    append_history(history, run)
+    assert len(json.loads(history.read_text())["runs"]) == 2
+
+
+def test_superlinear_growth_is_flagged_above_the_noise_floor():
+    run = {
+        "sizes": [{"transactions": 1_000}, {"transactions": 10_000}, {"transactions": 100_000}],
+        "tools": {
+            "flat": {"median_ms": [2.0, 2.1, 2.3]},
+            "linear": {"median_ms": [2.0, 20.0, 200.0]},
+            "quadratic": {"median_ms": [2.0, 200.0, 20_000.0]},
+            "noisy": {"median_ms": [0.01, 0.2, 0.4]},
+        },
+    }
+
+    flagged = find_superlinear(run)
+    assert [(item["tool"], item["to_transactions"]) for item in flagged] == [
+        ("quadratic", 10_000),
+        ("quadratic", 100_000),
+    ]
+    assert flagged[0]["exponent"] == 2.0
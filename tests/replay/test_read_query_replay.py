@@ -70,3 +70,30 @@ def test_read_query_output_hash_reproducible_for_same_state_and_input(db_availab
     bal_second = get_account_balances_tool(balances_payload).model_dump(mode="json")
     assert bal_first == bal_second
     assert bal_first["output_hash"] == bal_second["output_hash"]
+
+
+def test_get_account_tree_without_as_of_date_keeps_pre_rollup_payload_and_hash(db_available):
+    if not db_available:
+        pytest.skip("database unavailable")
+
+    with transaction() as conn:
+        for account_id, code, name, parent_account_id in (
+            ("acct-tree-assets", "1000", "Assets", None),
+            ("acct-tree-cash", "1100", "Cash", "acct-tree-assets"),
+            ("acct-tree-brokerage", "1200", "Brokerage", "acct-tree-assets"),
+        ):
+            conn.execute(
+                "INSERT INTO accounts (account_id, code, name, account_type, parent_account_id) VALUES (?,?,?,?,?)",
+                (account_id, code, name, "asset", parent_account_id),
+            )
+
+    tree = get_account_tree_tool(
+        {"root_account_id": "acct-tree-assets", "correlation_id": "corr-tree-pinned"}
+    ).model_dump(mode="json")
+
+    assert set(tree) == {"root_account_id", "accounts", "correlation_id", "output_hash"}
+    root = tree["accounts"][0]
+    assert set(root) == {"account_id", "code", "name", "account_type", "parent_account_id", "metadata", "children"}
+    assert [child["code"] for child in root["children"]] == ["1100", "1200"]
+    # Hash emitted by get_account_tree before as_of_date rollups existed.
+    assert tree["output_hash"] == "0083e19cb31068ba9aeb27662162837d6c00f8af8bafeb11fc11c218f3408aeb"
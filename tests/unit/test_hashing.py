@@ -1,7 +1,13 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
+from enum import IntEnum
+import hashlib
+import random
 
-from capital_os.observability.hashing import canonical_json, payload_hash
+import pytest
+
+from capital_os.observability import hashing
+from capital_os.observability.hashing import _reference_json, canonical_json, payload_hash
 
 
 def test_hash_stable_for_dict_key_order():
@@ -18,3 +24,97 @@ def test_decimal_and_datetime_normalization():
     encoded = canonical_json(payload)
     assert '"1.2300"' in encoded
     assert "2026-01-01T01:02:03.123456Z" in encoded
+
+
+def _random_text(rng: random.Random) -> str:
+    alphabet = 'abcXYZ019 _-"\\/\n\t\x00\x1f\x7fé€😀\ud800'
+    return "".join(rng.choice(alphabet) for _ in range(rng.randrange(0, 12)))
+
+
+class _Tag(str):
+    pass
+
+
+class _Level(IntEnum):
+    LOW = 1
+    HIGH = 2
+
+
+def _random_scalar(rng: random.Random):
+    choice = rng.randrange(14)
+    if choice == 0:
+        return _random_text(rng)
+    if choice == 1:
+        return rng.randint(-(2**70), 2**70)
+    if choice == 2:
+        return rng.choice([0.0, -0.0, 1e308, 5e-324, float("nan"), float("inf"), -float("inf"), rng.uniform(-1e6, 1e6)])
+    if choice == 3:
+        digits = rng.randint(-(10**12), 10**12)
+        return Decimal(digits).scaleb(-rng.randrange(0, 9))
+    if choice == 4:
+        return rng.choice([Decimal("-0"), Decimal("1E+3"), Decimal("0.00005"), Decimal("0.00015"), Decimal("-2.50005")])
+    if choice == 5:
+        offset = timezone(timedelta(minutes=rng.randrange(-720, 720, 15)))
+        return datetime(2026, rng.randint(1, 12), rng.randint(1, 28), rng.randrange(24), rng.randrange(60), tzinfo=offset)
+    if choice == 6:
+        return datetime(2025, 6, 30, 23, 59, 59, rng.randrange(1_000_000), tzinfo=timezone.utc)
+    if choice == 7:
+        return date(2026, rng.randint(1, 12), rng.randint(1, 28))
+    if choice == 8:
+        return rng.choice([True, False, None])
+    if choice == 9:
+        return _Tag(_random_text(rng))
+    if choice == 10:
+        return rng.choice(list(_Level))
+    if choice == 11:
+        return (rng.randint(0, 9), _random_text(rng))
+    if choice == 12:
+        return {rng.randint(-5, 5): rng.randint(0, 9) for _ in range(rng.randrange(3))}
+    return rng.random()
+
+
+def _random_value(rng: random.Random, depth: int):
+    roll = rng.random()
+    if depth < 4 and roll < 0.25:
+        return {_random_text(rng): _random_value(rng, depth + 1) for _ in range(rng.randrange(0, 6))}
+    if depth < 4 and roll < 0.4:
+        return [_random_value(rng, depth + 1) for _ in range(rng.randrange(0, 6))]
+    return _random_scalar(rng)
+
+
+@pytest.mark.parametrize("stream_rows", [512, 1])
+def test_canonical_encoder_matches_reference_over_fuzz_corpus(monkeypatch, stream_rows):
+    # A one-row threshold sends every top-level list through the chunked path.
+    monkeypatch.setattr(hashing, "_STREAM_ROWS", stream_rows)
+    rng = random.Random(25)
+    for _ in range(2_000):
+        payload = {_random_text(rng): _random_value(rng, 0) for _ in range(rng.randrange(0, 8))}
+        expected = _reference_json(payload)
+        assert canonical_json(payload) == expected
+        assert payload_hash(payload) == hashlib.sha256(expected.encode("utf-8")).hexdigest()
+
+
+def test_payload_hash_streams_large_payloads_identically():
+    rows = [
+        {
+            "account_id": f"acct-{index}",
+            "amount": Decimal(index).scaleb(-3),
+            "as_of": date(2026, 1, 1 + index % 28),
+            "tags": ["a", "b", index],
+        }
+        for index in range(5_000)
+    ]
+    payload = {"rows": rows, "next_cursor": None}
+    expected = _reference_json(payload)
+    assert canonical_json(payload) == expected
+    assert payload_hash(payload) == hashlib.sha256(expected.encode("utf-8")).hexdigest()
+
+
+def test_unsupported_values_fail_like_the_reference():
+    for payload in ({"id": object()}, {"rows": [{"id": object()}]}, {"mixed": {1: "a", "b": 2}}):
+        with pytest.raises(TypeError):
+            _reference_json(payload)
+        with pytest.raises(TypeError):
+            canonical_json(payload)
+        with pytest.raises(TypeError):
+            payload_hash(payload)